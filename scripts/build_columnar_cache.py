@@ -0,0 +1,99 @@
+"""
+Convert data/raw/* trajectory datasets into the memory-mapped columnar cache.
+
+Each dataset directory data/raw/<name>/ (one WorldTrace CSV per trajectory)
+is written to data/processed/columnar/<name>/ as concatenated .npy columns
+plus a manifest.json with per-trajectory point count, bbox and time range.
+Scripts load trajectories through core.columnar_store.load_trajectory_points,
+which uses the cache when present and falls back to the CSVs otherwise.
+
+Usage:
+    uv run python scripts/build_columnar_cache.py                 # every dataset in data/raw
+    uv run python scripts/build_columnar_cache.py NYC_100 London_Final_100
+
+Notes:
+    scripts/clear_processed_data.py deletes the cache along with the rest of
+    data/processed; re-run this script afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "src"))
+
+from constants.columnar_store_defaults import COLUMNAR_STORE_DEFAULT_ROOT
+from core.columnar_store import ColumnarStore
+
+RAW_DIR = Path(project_root) / "data" / "raw"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument(
+        "datasets",
+        nargs="*",
+        help="Dataset directory names under data/raw (default: all).",
+    )
+    parser.add_argument(
+        "--raw-dir",
+        type=str,
+        default=str(RAW_DIR),
+        help=f"Directory holding the raw datasets (default: {RAW_DIR}).",
+    )
+    parser.add_argument(
+        "--out-root",
+        type=str,
+        default=os.path.join(project_root, COLUMNAR_STORE_DEFAULT_ROOT),
+        help="Root directory of the columnar cache.",
+    )
+    args = parser.parse_args()
+
+    raw_dir = Path(args.raw_dir)
+    names = args.datasets or sorted(
+        d.name for d in raw_dir.iterdir() if d.is_dir() and any(d.glob("*.csv"))
+    )
+
+    last_store = None
+    for name in names:
+        source = raw_dir / name
+        if not source.is_dir():
+            print(f"[skip] {source} is not a directory")
+            continue
+        t0 = time.perf_counter()
+        store = ColumnarStore.build(source, Path(args.out_root) / name)
+        elapsed = time.perf_counter() - t0
+
+        last_store = store
+
+        points = store.manifest["total_points"]
+        print(
+            f"[{name}] {len(store)} trajectories, {points:,} points in {elapsed:.2f} s "
+            f"({points / max(elapsed, 1e-9):,.0f} rows/s) -> {store.path}"
+        )
+        bbox = store.bbox()
+        if bbox is None:
+            print("    bbox: none (no valid points)")
+        else:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            print(f"    bbox: lat [{min_lat:.5f}, {max_lat:.5f}], lon [{min_lon:.5f}, {max_lon:.5f}]")
+
+    # Open-time check on the last dataset built
+    if last_store is not None and len(last_store):
+        obj_id = last_store.obj_ids[0]
+        t0 = time.perf_counter()
+        store = ColumnarStore(last_store.path)
+        batch = store.load(obj_id)
+        elapsed_ms = (time.perf_counter() - t0) * 1e3
+        print(f"Open + load of {obj_id} ({len(batch)} points): {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ project_root = os.path.join(current_dir, "..")
 sys.path.append(project_root)
 sys.path.append(os.path.join(project_root, "src"))
 
+from core.columnar_store import trajectory_bbox
 from core.stream import TrajectoryStream
 from engines.hmm import OnlineMapMatcher
 from engines.map_matched_stream import MapMatchedStreamWrapper
@@ -170,10 +171,10 @@ def main():
     if not raw_points:
         return
         
-    lats = [p.lat for p in raw_points]
-    lons = [p.lon for p in raw_points]
-    north, south = max(lats) + 0.01, min(lats) - 0.01
-    east, west = max(lons) + 0.01, min(lons) - 0.01
+    # Manifest bbox from the columnar cache when built, else scanned from the points
+    min_lat, min_lon, max_lat, max_lon = trajectory_bbox(data_path, points=raw_points)
+    north, south = max_lat + 0.01, min_lat - 0.01
+    east, west = max_lon + 0.01, min_lon - 0.01
     
     print(f"Downloading street graph for bounding box: W:{west:.4f}, S:{south:.4f}, E:{east:.4f}, N:{north:.4f}...")
     G = ox.graph_from_bbox(bbox=(west, south, east, north), network_type='drive')
@@ -18,7 +18,7 @@ sys.path.append(os.path.join(project_root, "src"))
 
 from core.point import Point
 from eval import calculate_sed_stats
-from engines.dp import DouglasPeuckerCompressor
+from engines.dp import DouglasPeuckerCompressor, DPSignificance
 
 
 def load_trajectory(filepath: str, obj_id: str) -> List[Point]:
@@ -60,14 +60,30 @@ def pooled_sed_metrics(sed_errors: List[float]) -> Dict[str, float]:
     }
 
 
+def build_significance(
+    trajectories_by_file: Dict[str, List[Point]],
+    logger: logging.Logger,
+) -> Dict[str, DPSignificance]:
+    """One DP pass per trajectory; every epsilon is then a threshold filter."""
+    t_start = time.perf_counter()
+    compressor = DouglasPeuckerCompressor()
+    significance = {
+        name: compressor.significance(points) for name, points in trajectories_by_file.items()
+    }
+    logger.info(
+        f"Built DP significance hierarchies for {len(significance)} files "
+        f"in {time.perf_counter() - t_start:.2f} s"
+    )
+    return significance
+
+
 def evaluate_epsilon(
     epsilon_meters: float,
     trajectories_by_file: Dict[str, List[Point]],
+    significance_by_file: Dict[str, DPSignificance],
     logger: logging.Logger,
     log_every: int,
 ) -> Dict[str, float]:
-    compressor = DouglasPeuckerCompressor(epsilon_meters=epsilon_meters)
-
     sed_errors_pooled: List[float] = []
     total_original = 0
     total_compressed = 0
@@ -76,14 +92,15 @@ def evaluate_epsilon(
     t_start = time.perf_counter()
     total_files = len(trajectories_by_file)
 
-    for file_idx, (_file, original_points) in enumerate(trajectories_by_file.items(), start=1):
+    for file_idx, (filename, original_points) in enumerate(trajectories_by_file.items(), start=1):
         if len(original_points) < 2:
             logger.debug(
                 f"epsilon={epsilon_meters}: skipping file #{file_idx}/{total_files} (n_points={len(original_points)})"
             )
             continue
 
-        compressed_points = compressor.compress(original_points)
+        # Identical to DouglasPeuckerCompressor(epsilon_meters).compress(original_points)
+        compressed_points = significance_by_file[filename].select(epsilon_meters)
 
         total_original += len(original_points)
         total_compressed += len(compressed_points)
@@ -186,6 +203,7 @@ def main() -> None:
             )
 
     epsilon_grid = parse_epsilon_grid(args.epsilon_grid)
+    significance_by_file = build_significance(trajectories_by_file, logger)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_dir = os.path.join(project_root, args.output_dir, f"{timestamp}_{args.subset}")
@@ -199,6 +217,7 @@ def main() -> None:
     baseline_metrics = evaluate_epsilon(
         args.baseline_epsilon,
         trajectories_by_file,
+        significance_by_file,
         logger=logger,
         log_every=args.log_every,
     )
@@ -213,6 +232,7 @@ def main() -> None:
         metrics = evaluate_epsilon(
             eps,
             trajectories_by_file,
+            significance_by_file,
             logger=logger,
             log_every=args.log_every,
         )
@@ -30,6 +30,7 @@ project_root = os.path.join(current_dir, "..")
 sys.path.append(project_root)
 sys.path.append(os.path.join(project_root, "src"))
 
+from core.columnar_store import trajectory_bbox
 from core.stream import TrajectoryStream
 from core.point import Point
 from hysoc.hysocG import HYSOCCompressor, HYSOCConfig, CompressionStrategy
@@ -378,11 +379,10 @@ def main():
     if not raw_points:
         return
 
-    # Get bounding box
-    lats = [p.lat for p in raw_points]
-    lons = [p.lon for p in raw_points]
-    north, south = max(lats) + 0.01, min(lats) - 0.01
-    east, west = max(lons) + 0.01, min(lons) - 0.01
+    # Get bounding box (manifest bbox from the columnar cache when built)
+    min_lat, min_lon, max_lat, max_lon = trajectory_bbox(data_path, points=raw_points)
+    north, south = max_lat + 0.01, min_lat - 0.01
+    east, west = max_lon + 0.01, min_lon - 0.01
 
     print(
         f"Downloading street graph for bounding box: W:{west:.4f}, S:{south:.4f}, "
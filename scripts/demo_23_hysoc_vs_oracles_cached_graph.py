@@ -40,6 +40,7 @@ from constants.segmentation_defaults import (
     STOP_MIN_DURATION_SECONDS,
 )
 from constants.squish_defaults import SQUISH_DEFAULT_CAPACITY
+from core.columnar_store import load_trajectory_points
 from core.compression import CompressionStrategy, HYSOCConfig
 from core.point import Point
 from core.segment import Move, Stop
@@ -100,18 +101,8 @@ def load_cached_graph(graph_path: str) -> Tuple[Any, Dict[str, Any]]:
 
 
 def load_trajectory(filepath: str, obj_id: str) -> List[Point]:
-    points: List[Point] = []
-    with open(filepath, "r", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                dt = datetime.strptime(row["time"], "%Y-%m-%d %H:%M:%S")
-                lat = float(row["latitude"])
-                lon = float(row["longitude"])
-            except (KeyError, ValueError):
-                continue
-            points.append(Point(lat=lat, lon=lon, timestamp=dt, obj_id=obj_id))
-    return points
+    """Raw GPS points only (no road ids); served from the columnar cache when built."""
+    return load_trajectory_points(filepath, obj_id=obj_id, road_ids=False)
 
 
 def reconstruct_for_sed(items: List[object]) -> Tuple[List[Point], int]:
@@ -33,6 +33,7 @@ from constants.segmentation_defaults import (
     STOP_MAX_EPS_METERS,
     STOP_MIN_DURATION_SECONDS,
 )
+from constants.instrumentation_defaults import InstrumentationLevel
 from core.compression import CompressionStrategy, HYSOCConfig
 from core.point import Point
 from core.segment import Move, Stop
@@ -475,6 +476,7 @@ def main() -> None:
         stop_min_duration_seconds=STOP_MIN_DURATION_SECONDS,
         osm_graph=graph,
         enable_map_matching=True,
+        instrumentation_level=InstrumentationLevel.FULL,
     )
     compressor_n = HYSOCCompressor(config=config_n)
     t_hysoc_0 = time.perf_counter()
@@ -6,6 +6,9 @@ algorithms on every trajectory in data/raw/NYC_Top_100_Most_Points/, and
 writes per-trajectory + aggregated statistics to
 data/processed/param_sweep_step_stss.csv.
 
+STEP runs once per trajectory for the whole grid (MultiSTEPSegmenter);
+its wall time is split evenly across the configurations.
+
 Derived STSS `min_samples` per T at 1 Hz:
     min_samples = max(5, round(T * 0.5))
 (50 percent GPS-drop tolerance during the dwell window.)
@@ -39,10 +42,10 @@ sys.path.append(os.path.join(project_root, "src"))
 
 from core.point import Point
 from core.segment import Segment, Stop
-from engines.step import STEPSegmenter
+from engines.step_multi import MultiSTEPSegmenter
 from engines.stss_sklearn import STSSOracleSklearn
 from eval.segmentation import segment_counts, stop_f1
-from core.stream import TrajectoryStream
+from core.columnar_store import load_trajectory_points
 
 
 NYC_DIR = Path(project_root) / "data" / "raw" / "NYC_Top_100_Most_Points"
@@ -76,30 +79,22 @@ class RunResult:
 
 
 def load_trajectory(csv_path: Path) -> list[Point]:
-    """Load a WorldTrace-format NYC CSV into a list of Point."""
-    stream = TrajectoryStream(
-        filepath=csv_path,
-        col_mapping={
-            "lat": "latitude",
-            "lon": "longitude",
-            "timestamp": "time",
-            "obj_id": "obj_id",
-            "road_id": "osm_way_id",
-        },
-        default_obj_id=csv_path.stem,
-    )
-    return list(stream.stream())
+    """Load a WorldTrace-format NYC CSV into a list of Point (columnar cache when built)."""
+    return load_trajectory_points(csv_path)
 
 
 def derive_min_samples(t_s: float) -> int:
     return max(5, round(t_s * 0.5))
 
 
-def run_step(trajectory: list[Point], eps: float, t: float) -> tuple[list[Segment], float]:
-    seg = STEPSegmenter(max_eps=eps, min_duration_seconds=t)
+def run_step_grid(
+    trajectory: list[Point], multi: MultiSTEPSegmenter
+) -> tuple[dict[tuple[float, float], list[Segment]], float]:
+    """STEP segments per (eps, T) and the wall time per configuration."""
     start = time.perf_counter()
-    out = seg.process(trajectory)
-    return out, time.perf_counter() - start
+    out = multi.process(trajectory)
+    wall = (time.perf_counter() - start) / len(multi.configs)
+    return dict(zip(multi.configs, out)), wall
 
 
 def run_stss(
@@ -249,6 +244,13 @@ def main() -> None:
         f"{sum(len(p) for _, p in trajectories):,} points total."
     )
 
+    multi = MultiSTEPSegmenter.from_grid(EPS_GRID_M, T_GRID_S)
+    step_runs = {
+        traj_name: run_step_grid(pts, multi)
+        for traj_name, pts in trajectories
+        if len(pts) >= 5
+    }
+
     done = 0
     total_runs = len(trajectories) * total_configs
     for eps in EPS_GRID_M:
@@ -257,7 +259,8 @@ def main() -> None:
             for traj_name, pts in trajectories:
                 if len(pts) < 5:
                     continue
-                step_segs, step_wall = run_step(pts, eps, t)
+                step_by_cfg, step_wall = step_runs[traj_name]
+                step_segs = step_by_cfg[(eps, t)]
                 stss_segs, stss_wall = run_stss(pts, eps, t, min_samples)
                 results.append(
                     summarise_run(
@@ -53,7 +53,7 @@ from constants.segmentation_defaults import (
 from constants.squish_defaults import SQUISH_DEFAULT_CAPACITY
 from core.compression import CompressionStrategy, HYSOCConfig
 from core.segment import Move, Stop
-from core.stream import TrajectoryStream
+from core.columnar_store import load_trajectory_points
 from engines.dp import DouglasPeuckerCompressor
 from engines.squish import SquishCompressor
 from engines.stop_compressor import CompressedStop, StopCompressor
@@ -80,13 +80,8 @@ DEFAULT_DP_EPSILON_METERS = DP_DEFAULT_EPSILON_METERS
 
 
 def _load_trajectory(filepath: str, obj_id: str) -> List:
-    """Load a CSV trajectory file using TrajectoryStream."""
-    stream = TrajectoryStream(
-        filepath=filepath,
-        col_mapping={"lat": "latitude", "lon": "longitude", "timestamp": "time"},
-        default_obj_id=obj_id,
-    )
-    return list(stream.stream())
+    """Load a CSV trajectory file, from the columnar cache when built."""
+    return load_trajectory_points(filepath, obj_id=obj_id)
 
 
 def _reconstruct_for_sed(items: list) -> tuple:
@@ -0,0 +1,170 @@
+"""
+Demo 33: Time-range read latency over a compressed HYSOC archive.
+
+Chains trajectories of one dataset into a single multi-day trace (each file
+starts a fixed gap after the previous one ends), compresses it with HYSOC-G,
+writes the segments to a core.archive file and times
+
+  - read_range(obj_id, t0, t1) for random windows of several lengths, and
+  - the full-decode baseline (decode every segment, then clip).
+
+Usage:
+    uv run python scripts/demo_33_archive_range_read_latency.py
+    uv run python scripts/demo_33_archive_range_read_latency.py --max-files 100 --queries 200
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from core.archive import ArchiveReader, ArchiveWriter, clip_track
+from core.columnar_store import load_trajectory_points
+from core.compression import HYSOCConfig
+from core.point import Point
+from hysoc.hysocG import HYSOCGCompressor
+
+DEFAULT_INPUT_DIR = os.path.join("data", "raw", "NYC_Top_1000_Longest")
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_33_archive_range_read_latency")
+OBJ_ID = "chained_vehicle"
+GAP_BETWEEN_FILES = timedelta(hours=1)
+WINDOWS = {
+    "1min": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "1d": timedelta(days=1),
+}
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def build_chained_trace(input_dir: str, max_files: int) -> List[Point]:
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".csv"))[:max_files]
+    trace: List[Point] = []
+    cursor = datetime(2024, 1, 1)
+    for fname in files:
+        points = load_trajectory_points(os.path.join(input_dir, fname), obj_id=OBJ_ID)
+        if len(points) < 2:
+            continue
+        shift = cursor - points[0].timestamp
+        trace.extend(Point(p.lat, p.lon, p.timestamp + shift, OBJ_ID, p.road_id) for p in points)
+        cursor = trace[-1].timestamp + GAP_BETWEEN_FILES
+    return trace
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_ms": ordered[-1],
+        "mean_ms": statistics.fmean(ordered),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT_DIR)
+    parser.add_argument("--max-files", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=500, help="Queries per window length.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    input_dir = _to_abs_path(args.input_dir)
+    trace = build_chained_trace(input_dir, args.max_files)
+    if not trace:
+        raise SystemExit(f"No trajectories loaded from {input_dir}")
+    span = trace[-1].timestamp - trace[0].timestamp
+    print(f"Chained trace: {len(trace):,} points over {span.total_seconds() / 86400:.1f} days")
+
+    out_dir = os.path.join(_to_abs_path(args.output_root), datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(out_dir, exist_ok=True)
+    archive_path = os.path.join(out_dir, "trace.hysa")
+
+    compressor = HYSOCGCompressor(HYSOCConfig())
+    t0 = time.perf_counter()
+    with ArchiveWriter(archive_path) as writer:
+        for p in trace:
+            for seg in compressor.process_point(p):
+                writer.append(OBJ_ID, seg)
+        for seg in compressor.flush():
+            writer.append(OBJ_ID, seg)
+    build_s = time.perf_counter() - t0
+
+    reader = ArchiveReader(archive_path)
+    n_segments = reader.segment_count(OBJ_ID)
+    size = os.path.getsize(archive_path)
+    print(f"Archive: {n_segments:,} segments, {size:,} bytes, built in {build_s:.2f} s")
+
+    rng = random.Random(args.seed)
+    first, last = reader.time_range(OBJ_ID)
+    summary: Dict[str, Dict[str, float]] = {}
+
+    for label, width in WINDOWS.items():
+        latest_start = max(0.0, (last - first - width).total_seconds())
+        windows = []
+        for _ in range(args.queries):
+            start = first + timedelta(seconds=rng.uniform(0.0, latest_start))
+            windows.append((start, start + width))
+
+        range_ms = []
+        returned = []
+        for w0, w1 in windows:
+            q0 = time.perf_counter()
+            track = reader.read_range(OBJ_ID, w0, w1)
+            range_ms.append((time.perf_counter() - q0) * 1e3)
+            returned.append(len(track))
+
+        # Baseline: decode every segment then clip (a handful of queries is enough)
+        full_ms = []
+        for w0, w1 in windows[: max(1, min(20, args.queries))]:
+            q0 = time.perf_counter()
+            full = reader.read_trajectory(OBJ_ID)
+            clip_track(full.keypoints, w0, w1)
+            full_ms.append((time.perf_counter() - q0) * 1e3)
+
+        stats = _percentiles(range_ms)
+        stats["full_decode_mean_ms"] = statistics.fmean(full_ms)
+        stats["mean_points_returned"] = statistics.fmean(returned)
+        summary[label] = stats
+        print(
+            f"  {label:>5}: read_range p50 {stats['p50_ms']:.3f} ms, p95 {stats['p95_ms']:.3f} ms, "
+            f"max {stats['max_ms']:.3f} ms | full decode {stats['full_decode_mean_ms']:.1f} ms "
+            f"| {stats['mean_points_returned']:.0f} pts/query"
+        )
+    reader.close()
+
+    summary_path = os.path.join(out_dir, "latency_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "input_dir": input_dir,
+                "points": len(trace),
+                "span_days": span.total_seconds() / 86400,
+                "segments": n_segments,
+                "archive_bytes": size,
+                "queries_per_window": args.queries,
+                "windows": summary,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Summary written to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Demo 34: Load generation against the asyncio HYSOC ingestion server.
+
+Starts hysoc.server.HYSOCIngestServer in-process (or connects to a running
+one with --connect), then replays a dataset through several concurrent
+clients, each streaming an interleaved set of trajectories as fast as the
+server accepts them (optionally rate-limited). Reports sustained points/s,
+queueing delay percentiles and how often the bounded shard queues pushed
+back on the readers.
+
+Usage:
+    uv run python scripts/demo_34_ingest_server_load.py
+    uv run python scripts/demo_34_ingest_server_load.py --clients 8 --protocol binary --queue-size 1000
+    uv run python scripts/demo_34_ingest_server_load.py --serve 127.0.0.1:7070      # standalone server
+    uv run python scripts/demo_34_ingest_server_load.py --connect 127.0.0.1:7070    # clients only
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from constants.server_defaults import SERVER_DEFAULT_QUEUE_SIZE, SERVER_DEFAULT_SHARDS
+from core.columnar_store import load_trajectory_points
+from core.compression import HYSOCConfig
+from core.point import Point
+from hysoc.server import ENCODERS, PROTOCOLS, HYSOCIngestServer, send_points
+
+DEFAULT_INPUT_DIR = os.path.join("data", "raw", "NYC_100")
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def _host_port(value: str):
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def load_client_streams(input_dir: str, max_files: int, clients: int) -> List[List[Point]]:
+    """Round-robins trajectories over clients; each client stream is time-ordered."""
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".csv"))[:max_files]
+    streams: List[List[Point]] = [[] for _ in range(clients)]
+    for i, fname in enumerate(files):
+        streams[i % clients].extend(load_trajectory_points(os.path.join(input_dir, fname), road_ids=False))
+    for stream in streams:
+        stream.sort(key=lambda p: p.timestamp)
+    return [s for s in streams if s]
+
+
+async def _send_paced(points: List[Point], rate: float, protocol: str, host: str, port: int) -> int:
+    if rate <= 0:
+        return await send_points(points, host=host, port=port, protocol=protocol)
+    # Paced client: one connection, chunks of 100 records sent on schedule.
+    encode = ENCODERS[protocol]
+    reader, writer = await asyncio.open_connection(host, port)
+    start = time.perf_counter()
+    for k in range(0, len(points), 100):
+        ahead = k / rate - (time.perf_counter() - start)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+        writer.write(b"".join(encode(p) for p in points[k:k + 100]))
+        await writer.drain()
+    writer.write_eof()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return len(points)
+
+
+async def run_load(args) -> None:
+    streams = load_client_streams(_to_abs_path(args.input_dir), args.max_files, args.clients)
+    total = sum(len(s) for s in streams)
+    print(f"{len(streams)} clients, {total:,} points, protocol={args.protocol}")
+
+    server = None
+    segments = 0
+
+    def sink(obj_id, seg):
+        nonlocal segments
+        segments += 1
+
+    if args.connect:
+        host, port = _host_port(args.connect)
+    else:
+        server = HYSOCIngestServer(
+            sink=sink,
+            config=HYSOCConfig(),
+            protocol=args.protocol,
+            shards=args.shards,
+            queue_size=args.queue_size,
+        )
+        host = "127.0.0.1"
+        port = await server.start_tcp(host, 0)
+
+    t0 = time.perf_counter()
+    sent = await asyncio.gather(
+        *(_send_paced(s, args.rate, args.protocol, host, port) for s in streams)
+    )
+    send_s = time.perf_counter() - t0
+    print(f"Sent {sum(sent):,} points in {send_s:.2f} s ({sum(sent) / send_s:,.0f} points/s offered)")
+
+    if server is None:
+        return
+    await server.stop()
+    total_s = time.perf_counter() - t0
+    diag = server.get_diagnostics()
+    print(f"Processed {diag['points_processed']:,} points in {total_s:.2f} s "
+          f"({diag['points_processed'] / total_s:,.0f} points/s sustained), {segments:,} segments")
+    print(f"Queueing delay: p50 {diag.get('queue_delay_p50_ms', 0.0):.2f} ms, "
+          f"p95 {diag.get('queue_delay_p95_ms', 0.0):.2f} ms, max {diag['max_queue_delay_ms']:.2f} ms")
+    print(f"Backpressure waits: {diag['backpressure_waits']:,}, bad records: {diag['bad_records']}")
+
+
+async def run_server(args) -> None:
+    host, port = _host_port(args.serve)
+    segments = 0
+
+    def sink(obj_id, seg):
+        nonlocal segments
+        segments += 1
+
+    server = HYSOCIngestServer(
+        sink=sink,
+        config=HYSOCConfig(),
+        protocol=args.protocol,
+        shards=args.shards,
+        queue_size=args.queue_size,
+    )
+    await server.start_tcp(host, port)
+    print(f"Listening on {host}:{port} ({args.protocol}); Ctrl-C to stop")
+    try:
+        while True:
+            await asyncio.sleep(5.0)
+            diag = server.get_diagnostics()
+            print(f"  {diag['points_processed']:,} points, {segments:,} segments, "
+                  f"{diag['points_per_second']:,.0f} pts/s, queued {diag['queued_points']}, "
+                  f"p95 delay {diag.get('queue_delay_p95_ms', 0.0):.2f} ms")
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT_DIR)
+    parser.add_argument("--max-files", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Points/s per client (0 = as fast as the server accepts).")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="ndjson")
+    parser.add_argument("--shards", type=int, default=SERVER_DEFAULT_SHARDS)
+    parser.add_argument("--queue-size", type=int, default=SERVER_DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--serve", metavar="HOST:PORT", help="Run a standalone server instead.")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="Send to a running server.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_server(args) if args.serve else run_load(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
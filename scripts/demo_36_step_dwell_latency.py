@@ -0,0 +1,125 @@
+"""
+Demo 36: STEP per-point latency as a function of dwell length.
+
+Feeds STEP a synthetic 1 Hz trace that parks for N points (GPS jitter of a
+few meters) between two short drives, for several N, and reports the mean
+and tail per-point latency of process_point during the dwell. With the
+active stay-point window the per-point cost stays flat as N grows; the
+offline path (process_batch, timed once per trace) is shown for reference.
+
+Usage:
+    uv run python scripts/demo_36_step_dwell_latency.py
+    uv run python scripts/demo_36_step_dwell_latency.py --dwells 1000 10000 86400
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from core.batch import TrajectoryBatch
+from core.point import Point
+from engines.step import STEPSegmenter
+
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_36_step_dwell_latency")
+DEFAULT_DWELLS = [1_000, 5_000, 20_000, 50_000]
+METERS_PER_DEG_LAT = 111_195.0
+DRIVE_POINTS = 300
+JITTER_METERS = 6.0
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def build_trace(dwell_points: int, seed: int) -> List[Point]:
+    """Drive, park for ``dwell_points`` seconds, drive again (1 Hz)."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    points: List[Point] = []
+    lat, lon = 40.70, -74.00
+    t = 0
+    for _ in range(DRIVE_POINTS):
+        lat += 10.0 / METERS_PER_DEG_LAT
+        points.append(Point(lat, lon, start + timedelta(seconds=t), "veh"))
+        t += 1
+    for _ in range(dwell_points):
+        r = rng.uniform(0.0, JITTER_METERS)
+        a = rng.uniform(0.0, 2 * math.pi)
+        points.append(Point(lat + r * math.sin(a) / METERS_PER_DEG_LAT,
+                            lon + r * math.cos(a) / METERS_PER_DEG_LAT,
+                            start + timedelta(seconds=t), "veh"))
+        t += 1
+    for _ in range(DRIVE_POINTS):
+        lat += 10.0 / METERS_PER_DEG_LAT
+        points.append(Point(lat, lon, start + timedelta(seconds=t), "veh"))
+        t += 1
+    return points
+
+
+def time_dwell(points: List[Point]) -> Dict[str, float]:
+    segmenter = STEPSegmenter()
+    perf = time.perf_counter
+    dwell_us: List[float] = []
+    for i, p in enumerate(points):
+        t0 = perf()
+        segmenter.process_point(p)
+        elapsed = perf() - t0
+        if DRIVE_POINTS <= i < len(points) - DRIVE_POINTS:
+            dwell_us.append(elapsed * 1e6)
+    segmenter.flush()
+
+    quarter = max(1, len(dwell_us) // 4)
+    first = sum(dwell_us[:quarter]) / quarter
+    last = sum(dwell_us[-quarter:]) / quarter
+    ordered = sorted(dwell_us)
+    return {
+        "dwell_mean_us": sum(ordered) / len(ordered),
+        "dwell_p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        # Mean latency over the last vs the first quarter of the dwell; ~1 is flat.
+        "last_vs_first_quarter": last / first,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--dwells", type=int, nargs="+", default=DEFAULT_DWELLS,
+                        help="Dwell lengths in points (1 Hz).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.dwells:
+        points = build_trace(n, args.seed)
+        row = {"dwell_points": n, **time_dwell(points)}
+        if n <= 20_000:
+            batch = TrajectoryBatch.from_points(points)
+            t0 = time.perf_counter()
+            STEPSegmenter().process_batch(batch)
+            row["batch_us_per_point"] = (time.perf_counter() - t0) * 1e6 / len(points)
+        rows.append(row)
+        print(f"dwell={n:>7}  mean={row['dwell_mean_us']:7.2f} us  p99={row['dwell_p99_us']:7.2f} us"
+              f"  last/first quarter={row['last_vs_first_quarter']:5.2f}"
+              + (f"  batch={row['batch_us_per_point']:9.2f} us/pt" if "batch_us_per_point" in row else ""))
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "dwell_latency.json"), "w") as f:
+        json.dump(rows, f, indent=2)
+    print(f"Wrote {os.path.join(out_dir, 'dwell_latency.json')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Demo 37: Offline (vectorized) STEP vs streaming STEP on whole trajectories.
+
+Runs STEPSegmenter.process (point by point) and STEPSegmenter.process_batch
+(NumPy, whole trajectory) on every trajectory of a dataset for a few (D, T)
+settings, checks that both produce the same Stop/Move boundaries and reports
+the wall time of each. Batches come from the columnar store when it has been
+built (scripts/build_columnar_cache.py), else from the parsed CSV points.
+
+Usage:
+    uv run python scripts/demo_37_step_batch_speedup.py
+    uv run python scripts/demo_37_step_batch_speedup.py --max-files 200
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from core.batch import TrajectoryBatch
+from core.columnar_store import find_store, load_trajectory_points
+from core.point import Point
+from core.segment import Segment, SegmentSpan, Stop
+from engines.step import STEPSegmenter
+
+DEFAULT_INPUT_DIR = os.path.join("data", "raw", "NYC_Top_1000_Longest")
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_37_step_batch_speedup")
+SETTINGS: List[Tuple[float, float]] = [(15.0, 30.0), (10.0, 10.0), (40.0, 120.0)]
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def load_dataset(input_dir: str, max_files: int) -> List[Tuple[List[Point], TrajectoryBatch]]:
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".csv"))[:max_files]
+    store = find_store(input_dir)
+    data = []
+    for fname in files:
+        path = os.path.join(input_dir, fname)
+        points = load_trajectory_points(path)
+        stem = os.path.splitext(fname)[0]
+        if store is not None and stem in store and store.is_fresh(stem, path):
+            batch = store.load(stem)
+        else:
+            batch = TrajectoryBatch.from_points(points)
+        if points:
+            data.append((points, batch))
+    return data
+
+
+def _boundaries(segments: List[Segment]) -> List[Tuple[str, int]]:
+    return [("stop" if isinstance(s, Stop) else "move", len(s.points)) for s in segments]
+
+
+def _span_boundaries(spans: List[SegmentSpan]) -> List[Tuple[str, int]]:
+    return [(s.kind, len(s)) for s in spans]
+
+
+def compare(data: List[Tuple[List[Point], TrajectoryBatch]], eps: float, t: float) -> Dict[str, float]:
+    stream_s = 0.0
+    batch_s = 0.0
+    mismatches = 0
+    for points, batch in data:
+        start = time.perf_counter()
+        segments = STEPSegmenter(max_eps=eps, min_duration_seconds=t).process(points)
+        stream_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        spans = STEPSegmenter(max_eps=eps, min_duration_seconds=t).process_batch(batch)
+        batch_s += time.perf_counter() - start
+
+        if _boundaries(segments) != _span_boundaries(spans):
+            mismatches += 1
+    return {
+        "eps_m": eps,
+        "t_s": t,
+        "stream_s": stream_s,
+        "batch_s": batch_s,
+        "speedup": stream_s / batch_s if batch_s > 0 else float("inf"),
+        "mismatches": mismatches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT_DIR)
+    parser.add_argument("--max-files", type=int, default=1000)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    data = load_dataset(_to_abs_path(args.input_dir), args.max_files)
+    n_points = sum(len(points) for points, _ in data)
+    print(f"Loaded {len(data)} trajectories, {n_points} points")
+
+    rows = []
+    for eps, t in SETTINGS:
+        row = compare(data, eps, t)
+        rows.append(row)
+        print(f"D={eps:5.1f} m  T={t:5.1f} s  stream={row['stream_s']:7.3f} s  "
+              f"batch={row['batch_s']:7.3f} s  speedup={row['speedup']:5.1f}x  "
+              f"mismatches={row['mismatches']}")
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "step_batch_speedup.json")
+    with open(out_path, "w") as f:
+        json.dump({"trajectories": len(data), "points": n_points, "settings": rows}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Demo 38: StopCompressor MEDOID / SNAP_TO_NEAREST cost vs stop length.
+
+Builds synthetic 1 Hz stops (GPS jitter around a parking spot, with a few
+drifting fixes) of several lengths and times StopCompressor with the MEDOID
+and SNAP_TO_NEAREST strategies against the original pure-Python loops
+(O(n^2) pairwise medoid, O(n) snap). For each length it also reports how far
+the chosen medoid is from the exact one: the relative excess of its sum of
+distances, under the original pairwise metric. The reference medoid loop is
+only run up to --max-reference points (it takes minutes beyond that).
+
+Usage:
+    uv run python scripts/demo_38_stop_medoid_speed.py
+    uv run python scripts/demo_38_stop_medoid_speed.py --lengths 600 3600 7200 --tolerance 0.001
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from constants.stop_compression_defaults import StopCompressionStrategy
+from core.point import Point
+from engines.stop_compressor import StopCompressor
+
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_38_stop_medoid_speed")
+DEFAULT_LENGTHS = [100, 600, 1800, 3600, 7200]
+METERS_PER_DEG_LAT = 111_195.0
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def build_stop(n: int, seed: int) -> List[Point]:
+    """n fixes at 1 Hz: Gaussian jitter (sigma 6 m) plus 5% fixes drifting up to 60 m."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    lat0, lon0 = 40.75, -73.99
+    meters_per_deg_lon = METERS_PER_DEG_LAT * math.cos(math.radians(lat0))
+    points = []
+    for i in range(n):
+        dx = rng.gauss(0.0, 6.0)
+        dy = rng.gauss(0.0, 6.0)
+        if rng.random() < 0.05:
+            dx += rng.uniform(-60.0, 60.0)
+            dy += rng.uniform(-60.0, 60.0)
+        points.append(Point(lat0 + dy / METERS_PER_DEG_LAT, lon0 + dx / meters_per_deg_lon,
+                            start + timedelta(seconds=i), "veh"))
+    return points
+
+
+def reference_medoid(points: List[Point]) -> Point:
+    """The original O(n^2) StopCompressor medoid loop."""
+    best_point = None
+    min_sum_dist = float("inf")
+    for p1 in points:
+        sum_dist = 0.0
+        for p2 in points:
+            dlat = p1.lat - p2.lat
+            dlon = (p1.lon - p2.lon) * math.cos(math.radians((p1.lat + p2.lat) / 2.0))
+            sum_dist += math.sqrt(dlat * dlat + dlon * dlon)
+        if sum_dist < min_sum_dist:
+            min_sum_dist = sum_dist
+            best_point = p1
+    return best_point
+
+
+def reference_snap(points: List[Point]) -> Point:
+    """The original O(n) StopCompressor snap-to-nearest loop."""
+    lat = sum(p.lat for p in points) / len(points)
+    lon = sum(p.lon for p in points) / len(points)
+    best_point = None
+    min_dist_sq = float("inf")
+    for p in points:
+        dlat = p.lat - lat
+        dlon = (p.lon - lon) * math.cos(math.radians((p.lat + lat) / 2.0))
+        dist_sq = dlat * dlat + dlon * dlon
+        if dist_sq < min_dist_sq:
+            min_dist_sq = dist_sq
+            best_point = p
+    return best_point
+
+
+def sum_of_distances(points: List[Point], q: Point) -> float:
+    return sum(
+        math.hypot(q.lat - p.lat, (q.lon - p.lon) * math.cos(math.radians((q.lat + p.lat) / 2.0)))
+        for p in points
+    )
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(n: int, seed: int, tolerance: float, max_reference: int) -> Dict[str, float]:
+    points = build_stop(n, seed)
+    medoid = StopCompressor(StopCompressionStrategy.MEDOID, medoid_tolerance=tolerance)
+    snap = StopCompressor(StopCompressionStrategy.SNAP_TO_NEAREST)
+
+    row: Dict[str, float] = {"points": n}
+    row["medoid_s"] = _best_of(lambda: medoid.compress(points), 3)
+    row["snap_s"] = _best_of(lambda: snap.compress(points), 3)
+    row["snap_reference_s"] = _best_of(lambda: reference_snap(points), 3)
+    snap_ref = reference_snap(points)
+    row["snap_matches"] = snap.compress(points).centroid.lat == snap_ref.lat
+
+    if n <= max_reference:
+        t0 = time.perf_counter()
+        exact = reference_medoid(points)
+        row["medoid_reference_s"] = time.perf_counter() - t0
+        chosen = medoid.compress(points).centroid
+        chosen_point = next(p for p in points if p.lat == chosen.lat and p.lon == chosen.lon)
+        exact_sum = sum_of_distances(points, exact)
+        row["medoid_excess"] = sum_of_distances(points, chosen_point) / exact_sum - 1.0
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=DEFAULT_LENGTHS,
+                        help="Stop lengths in points (1 Hz).")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="StopCompressor medoid_tolerance.")
+    parser.add_argument("--max-reference", type=int, default=3600,
+                        help="Longest stop the O(n^2) reference medoid is run on.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.lengths:
+        row = measure(n, args.seed, args.tolerance, args.max_reference)
+        rows.append(row)
+        line = (f"n={n:>6}  medoid={row['medoid_s'] * 1e3:9.2f} ms  snap={row['snap_s'] * 1e3:7.2f} ms"
+                f" (loop {row['snap_reference_s'] * 1e3:7.2f} ms)")
+        if "medoid_reference_s" in row:
+            line += (f"  medoid loop={row['medoid_reference_s']:8.2f} s"
+                     f"  excess={row['medoid_excess']:.2e}")
+        print(line)
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "stop_medoid_speed.json")
+    with open(out_path, "w") as f:
+        json.dump({"tolerance": args.tolerance, "rows": rows}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Demo 39: SQUISH engine throughput vs buffer capacity.
+
+Compresses one long synthetic 1 Hz trajectory (a jittery random drive) with
+SquishCompressor at capacities from 10 to 1000 and compares it against the
+original SQUISH loop (Node objects, lazy heap of dataclass entries, O(K)
+list removal per eviction, kept here as the reference). Both must keep the
+same points; the reference breaks exact priority ties the same way (oldest
+point first) so the check is exact.
+
+Usage:
+    uv run python scripts/demo_39_squish_engine_speed.py
+    uv run python scripts/demo_39_squish_engine_speed.py --points 200000 --capacities 10 100 1000
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from core.point import Point, epoch_seconds
+from engines.squish import SquishCompressor, _sed_priority
+
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_39_squish_engine_speed")
+DEFAULT_CAPACITIES = [10, 30, 100, 300, 1000]
+METERS_PER_DEG_LAT = 111_195.0
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def build_drive(n: int, seed: int) -> List[Point]:
+    """Random drive at ~10 m/s with slowly turning heading and 3 m GPS jitter (1 Hz)."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    lat, lon = 40.70, -74.00
+    heading = 0.0
+    points = []
+    for i in range(n):
+        heading += rng.gauss(0.0, 0.08)
+        lat += (10.0 * math.cos(heading) + rng.gauss(0.0, 3.0)) / METERS_PER_DEG_LAT
+        lon += (10.0 * math.sin(heading) + rng.gauss(0.0, 3.0)) / (METERS_PER_DEG_LAT * 0.76)
+        points.append(Point(lat, lon, start + timedelta(seconds=i), "veh"))
+    return points
+
+
+# --- Reference: the original SQUISH loop ----------------------------------
+
+@dataclass(order=True)
+class _Entry:
+    priority: float
+    index: int
+
+
+class _Node:
+    def __init__(self, index: int):
+        self.index = index
+        self.prev: Optional["_Node"] = None
+        self.next: Optional["_Node"] = None
+        self.priority = float("inf")
+        self.removed = False
+
+
+def reference_squish(points: List[Point], capacity: int) -> List[Point]:
+    if len(points) <= capacity:
+        return points
+    lats = [p.lat for p in points]
+    lons = [p.lon for p in points]
+    ts = [epoch_seconds(p) for p in points]
+    nodes = [_Node(i) for i in range(len(points))]
+    pq: List[_Entry] = []
+    buffer: List[_Node] = []
+
+    def update(node: _Node) -> None:
+        a, b, c = node.prev.index, node.index, node.next.index
+        node.priority = _sed_priority(lats[a], lons[a], ts[a], lats[b], lons[b], ts[b], lats[c], lons[c], ts[c])
+        heapq.heappush(pq, _Entry(node.priority, node.index))
+
+    for node in nodes:
+        if buffer:
+            last = buffer[-1]
+            last.next = node
+            node.prev = last
+            if last.prev:
+                update(last)
+        buffer.append(node)
+        if len(buffer) > capacity:
+            while True:
+                entry = heapq.heappop(pq)
+                victim = nodes[entry.index]
+                if not victim.removed and victim.priority == entry.priority:
+                    break
+            victim.removed = True
+            victim.prev.next = victim.next
+            victim.next.prev = victim.prev
+            if victim.prev.prev:
+                update(victim.prev)
+            if victim.next.next:
+                update(victim.next)
+            buffer.remove(victim)
+
+    result = []
+    curr = nodes[0]
+    while curr:
+        result.append(points[curr.index])
+        curr = curr.next
+    return result
+
+
+# ---------------------------------------------------------------------------
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(points: List[Point], capacity: int, repeat: int) -> Dict[str, float]:
+    compressor = SquishCompressor(capacity=capacity)
+    same = compressor.compress(points) == reference_squish(points, capacity)
+    engine_s = _best_of(lambda: compressor.compress(points), repeat)
+    reference_s = _best_of(lambda: reference_squish(points, capacity), repeat)
+    return {
+        "capacity": capacity,
+        "engine_s": engine_s,
+        "reference_s": reference_s,
+        "engine_points_per_s": len(points) / engine_s,
+        "speedup": reference_s / engine_s,
+        "identical": same,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--capacities", type=int, nargs="+", default=DEFAULT_CAPACITIES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    points = build_drive(args.points, args.seed)
+    rows = []
+    for capacity in args.capacities:
+        row = measure(points, capacity, args.repeat)
+        rows.append(row)
+        print(f"capacity={capacity:>5}  engine={row['engine_s']:7.3f} s"
+              f" ({row['engine_points_per_s'] / 1e3:7.1f} k pts/s)  reference={row['reference_s']:7.3f} s"
+              f"  speedup={row['speedup']:5.2f}x  identical={row['identical']}")
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "squish_engine_speed.json")
+    with open(out_path, "w") as f:
+        json.dump({"points": args.points, "rows": rows}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Demo 40: Douglas-Peucker engine throughput on long trajectories.
+
+Simplifies synthetic 1 Hz trajectories (a jittery random drive, 100k points
+by default) with DouglasPeuckerCompressor at several epsilons and compares it
+against the original recursive DP (slices each split, concatenates the two
+halves, scores every point with the scalar distance function; kept here as the
+reference, with the recursion limit raised so it can finish). Both must keep
+the same points. Timings cover compress() on Point lists and compress_indices()
+on coordinate arrays.
+
+Usage:
+    uv run python scripts/demo_40_dp_engine_speed.py
+    uv run python scripts/demo_40_dp_engine_speed.py --points 200000 --epsilons 5 15 50
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from core.point import Point
+from engines.dp import DouglasPeuckerCompressor, _perpendicular_distance_deg
+
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_40_dp_engine_speed")
+DEFAULT_EPSILONS = [1.0, 5.0, 15.0, 50.0]
+METERS_PER_DEG_LAT = 111_195.0
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def build_drive(n: int, seed: int) -> List[Point]:
+    """Random drive at ~10 m/s with slowly turning heading and 3 m GPS jitter (1 Hz)."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    lat, lon = 40.70, -74.00
+    heading = 0.0
+    points = []
+    for i in range(n):
+        heading += rng.gauss(0.0, 0.08)
+        lat += (10.0 * math.cos(heading) + rng.gauss(0.0, 3.0)) / METERS_PER_DEG_LAT
+        lon += (10.0 * math.sin(heading) + rng.gauss(0.0, 3.0)) / (METERS_PER_DEG_LAT * 0.76)
+        points.append(Point(lat, lon, start + timedelta(seconds=i), "veh"))
+    return points
+
+
+def reference_dp(points: List[Point], epsilon: float) -> List[Point]:
+    """The original recursive DouglasPeuckerCompressor.compress."""
+    if len(points) <= 2:
+        return points
+    dmax = 0.0
+    index = 0
+    end = len(points) - 1
+    s, e = points[0], points[end]
+    for i in range(1, end):
+        p = points[i]
+        d = _perpendicular_distance_deg(p.lat, p.lon, s.lat, s.lon, e.lat, e.lon)
+        if d > dmax:
+            index = i
+            dmax = d
+    if dmax > epsilon:
+        return reference_dp(points[:index + 1], epsilon)[:-1] + reference_dp(points[index:], epsilon)
+    return [points[0], points[end]]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(points: List[Point], epsilon: float, repeat: int) -> Dict[str, float]:
+    compressor = DouglasPeuckerCompressor(epsilon_meters=epsilon)
+    lats = np.array([p.lat for p in points])
+    lons = np.array([p.lon for p in points])
+    kept = compressor.compress(points)
+    same = kept == reference_dp(points, epsilon)
+    engine_s = _best_of(lambda: compressor.compress(points), repeat)
+    indices_s = _best_of(lambda: compressor.compress_indices(lats, lons), repeat)
+    reference_s = _best_of(lambda: reference_dp(points, epsilon), 1)
+    return {
+        "epsilon_m": epsilon,
+        "kept": len(kept),
+        "engine_s": engine_s,
+        "indices_s": indices_s,
+        "reference_s": reference_s,
+        "speedup": reference_s / engine_s,
+        "identical": same,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--epsilons", type=float, nargs="+", default=DEFAULT_EPSILONS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    # The reference recurses once per split level.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * args.points))
+    points = build_drive(args.points, args.seed)
+    rows = []
+    for epsilon in args.epsilons:
+        row = measure(points, epsilon, args.repeat)
+        rows.append(row)
+        print(f"eps={epsilon:6.1f} m  kept={row['kept']:>7}  engine={row['engine_s']:6.3f} s"
+              f" (indices {row['indices_s']:6.3f} s)  reference={row['reference_s']:6.3f} s"
+              f"  speedup={row['speedup']:5.2f}x  identical={row['identical']}")
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "dp_engine_speed.json")
+    with open(out_path, "w") as f:
+        json.dump({"points": args.points, "rows": rows}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Demo 41: SED cost of the per-device byte budget (rate control) in HYSOC-G.
+
+Compresses every trajectory of a dataset with the fixed-capacity GEOMETRIC
+pipeline (SQUISH -> DP, no budget) and again under several byte budgets per
+sliding window (HYSOCConfig.byte_budget_bytes / byte_budget_window_seconds).
+For each setting it reports the total and peak-window encoded bytes, the
+compression ratio, mean / max SED against the original points and how many
+moves were throttled (DP epsilon raised) or dropped, next to the baseline.
+
+Usage:
+    uv run python scripts/demo_41_rate_control_sed.py
+    uv run python scripts/demo_41_rate_control_sed.py --max-files 20 --budgets 500 1000 --window 1800
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from constants.rate_control_defaults import RATE_CONTROL_DEFAULT_WINDOW_SECONDS
+from core.columnar_store import load_trajectory_points
+from core.compression import HYSOCConfig, SegmentResult
+from core.point import Point
+from eval.sed import calculate_sed_stats
+from hysoc import HYSOCGCompressor
+
+DEFAULT_INPUT_DIR = os.path.join("data", "raw", "NYC_Top_1000_Longest")
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_41_rate_control_sed")
+DEFAULT_BUDGETS = [500, 1000, 2000, 4000]
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def peak_window_bytes(segments: List[SegmentResult], window_seconds: float) -> int:
+    """Largest byte total of segments ending within any window_seconds span."""
+    ends = [(s.end_time.timestamp(), s.encoded_bytes) for s in segments]
+    peak = total = 0
+    first = 0
+    for t, nbytes in ends:
+        total += nbytes
+        while ends[first][0] <= t - window_seconds:
+            total -= ends[first][1]
+            first += 1
+        peak = max(peak, total)
+    return peak
+
+
+def run_setting(
+    trajectories: List[List[Point]], budget: Optional[int], window_seconds: float
+) -> Dict[str, float]:
+    config = HYSOCConfig(byte_budget_bytes=budget, byte_budget_window_seconds=window_seconds)
+    original = encoded = peak = throttled = dropped = 0
+    sed_sum = sed_count = 0
+    sed_max = 0.0
+    for points in trajectories:
+        compressor = HYSOCGCompressor(config)
+        result = compressor.compress(points)
+        diag = compressor.get_diagnostics()
+        original += result.original_bytes
+        encoded += result.encoded_bytes
+        peak = max(peak, peak_window_bytes(result.segments, window_seconds))
+        throttled += diag["rate_control_throttled_moves"]
+        dropped += diag["rate_control_dropped_moves"]
+        stats = calculate_sed_stats(points, result.keypoints)
+        sed_sum += sum(stats["sed_errors"])
+        sed_count += len(stats["sed_errors"])
+        sed_max = max(sed_max, stats["max_sed"])
+    return {
+        "budget_bytes": budget,
+        "encoded_bytes": encoded,
+        "peak_window_bytes": peak,
+        "compression_ratio": original / encoded if encoded else float("inf"),
+        "average_sed_m": sed_sum / sed_count if sed_count else 0.0,
+        "max_sed_m": sed_max,
+        "throttled_moves": throttled,
+        "dropped_moves": dropped,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT_DIR)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    parser.add_argument("--max-files", type=int, default=60)
+    parser.add_argument("--budgets", type=int, nargs="+", default=DEFAULT_BUDGETS)
+    parser.add_argument("--window", type=float, default=RATE_CONTROL_DEFAULT_WINDOW_SECONDS)
+    args = parser.parse_args()
+
+    input_dir = _to_abs_path(args.input_dir)
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Input directory not found: {input_dir}")
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".csv"))[: args.max_files]
+    trajectories = [p for p in (load_trajectory_points(os.path.join(input_dir, f)) for f in files) if p]
+    print(f"Demo 41: {len(trajectories)} trajectories, {sum(map(len, trajectories))} points, "
+          f"window {args.window:g} s")
+
+    baseline = run_setting(trajectories, None, args.window)
+    rows = [baseline] + [run_setting(trajectories, b, args.window) for b in args.budgets]
+    for row in rows:
+        label = "fixed" if row["budget_bytes"] is None else f"{row['budget_bytes']} B"
+        print(f"{label:>9}  bytes={row['encoded_bytes']:>8}  peak={row['peak_window_bytes']:>7}"
+              f"  CR={row['compression_ratio']:6.1f}x"
+              f"  SED mean={row['average_sed_m']:6.2f} m ({row['average_sed_m'] - baseline['average_sed_m']:+.2f})"
+              f"  max={row['max_sed_m']:7.1f} m"
+              f"  throttled={row['throttled_moves']}  dropped={row['dropped_moves']}")
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "rate_control_sed.json")
+    with open(out_path, "w") as f:
+        json.dump({"window_seconds": args.window, "files": len(trajectories), "rows": rows}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Demo 42: Coarse-to-fine (ranked) move records and top-k archive reads.
+
+Compresses every trajectory of a dataset with HYSOC-G, once as plain records
+and once with HYSOCConfig.progressive_keypoints (moves carry DP ranks and are
+stored in rank order). Both are written to a segment archive; the ranked one
+is then read back with max_keypoints = k for a few k. Reports the archive
+sizes, the bytes each top-k read decodes and the mean / max SED of the coarse
+track against the original points.
+
+Usage:
+    uv run python scripts/demo_42_progressive_keypoints.py
+    uv run python scripts/demo_42_progressive_keypoints.py --max-files 20 --top-k 2 4 8
+"""
+
+# ruff: noqa: E402
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, "..")
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from core.archive import ArchiveReader, ArchiveWriter
+from core.columnar_store import load_trajectory_points
+from core.compression import HYSOCConfig, TrajectoryResult
+from eval.sed import calculate_sed_stats
+from hysoc import HYSOCGCompressor
+
+DEFAULT_INPUT_DIR = os.path.join("data", "raw", "NYC_Top_1000_Longest")
+DEFAULT_OUTPUT_ROOT = os.path.join("data", "processed", "demo_42_progressive_keypoints")
+DEFAULT_TOP_K = [2, 4, 8, 16]
+
+
+def _to_abs_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+
+def write_archive(path: str, results: List[TrajectoryResult]) -> int:
+    with ArchiveWriter(path) as writer:
+        for result in results:
+            writer.write_result(result)
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--input-dir", default=DEFAULT_INPUT_DIR)
+    parser.add_argument("--output-root", default=DEFAULT_OUTPUT_ROOT)
+    parser.add_argument("--max-files", type=int, default=60)
+    parser.add_argument("--top-k", type=int, nargs="+", default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    input_dir = _to_abs_path(args.input_dir)
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Input directory not found: {input_dir}")
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".csv"))[: args.max_files]
+    trajectories = [p for p in (load_trajectory_points(os.path.join(input_dir, f)) for f in files) if p]
+
+    plain = [HYSOCGCompressor(HYSOCConfig()).compress(p) for p in trajectories]
+    ranked = [HYSOCGCompressor(HYSOCConfig(progressive_keypoints=True)).compress(p) for p in trajectories]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_bytes = write_archive(os.path.join(tmp, "plain.hysa"), plain)
+        ranked_path = os.path.join(tmp, "ranked.hysa")
+        ranked_bytes = write_archive(ranked_path, ranked)
+        print(f"Demo 42: {len(trajectories)} trajectories, archive {plain_bytes} B plain, "
+              f"{ranked_bytes} B ranked ({ranked_bytes / plain_bytes - 1:+.1%})")
+
+        rows: List[Dict[str, float]] = []
+        with ArchiveReader(ranked_path) as reader:
+            for k in args.top_k + [None]:
+                read_bytes = 0
+                sed_sum = sed_max = 0.0
+                sed_count = 0
+                for points, result in zip(trajectories, ranked):
+                    segments = reader.segments(result.object_id, max_keypoints=k)
+                    read_bytes += sum(s.encoded_bytes for s in segments)
+                    coarse = TrajectoryResult(result.object_id, points, segments, result.strategy)
+                    stats = calculate_sed_stats(points, coarse.keypoints)
+                    sed_sum += sum(stats["sed_errors"])
+                    sed_count += len(stats["sed_errors"])
+                    sed_max = max(sed_max, stats["max_sed"])
+                row = {
+                    "top_k": k,
+                    "bytes_read": read_bytes,
+                    "average_sed_m": sed_sum / sed_count if sed_count else 0.0,
+                    "max_sed_m": sed_max,
+                }
+                rows.append(row)
+                label = "all" if k is None else f"k={k}"
+                print(f"{label:>6}  read={read_bytes:>8} B  SED mean={row['average_sed_m']:7.2f} m"
+                      f"  max={row['max_sed_m']:8.1f} m")
+
+    out_dir = _to_abs_path(args.output_root)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "progressive_keypoints.json")
+    with open(out_path, "w") as f:
+        json.dump({"plain_archive_bytes": plain_bytes, "ranked_archive_bytes": ranked_bytes, "rows": rows}, f, indent=2)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
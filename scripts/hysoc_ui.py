@@ -178,8 +178,7 @@ class HYSOCVisualizer:
 
         # Update Buffer Vis
         # Step segmenter cache holds current working set
-        cached_items = self.segmenter.cache
-        buffer_points = [item[0] for item in cached_items]
+        buffer_points = self.segmenter.cached_points()
         
         # Update Plots
         # 1. Raw Trail (Optimization: only plot last N points to avoid lag, or decimate)
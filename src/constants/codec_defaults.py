@@ -0,0 +1,26 @@
+"""
+Default parameters for the binary segment codec (core/codec.py).
+
+Coordinates are stored as fixed-point integers of 1e-7 degrees (about 1.1 cm
+of latitude), timestamps as integers of CODEC_DEFAULT_TIME_RESOLUTION_US
+microseconds. Both are delta + zigzag-varint coded inside a segment.
+"""
+
+from __future__ import annotations
+
+# Fixed-point scale for lat/lon: 1 unit = 1e-7 degrees.
+CODEC_COORD_SCALE: int = 10_000_000
+
+# Time unit of encoded timestamps, in microseconds (1000 = milliseconds).
+CODEC_DEFAULT_TIME_RESOLUTION_US: int = 1_000
+
+# Stream header magic and layout version. Version 2 adds ranked
+# (coarse-to-fine) move records; version 1 streams still decode.
+CODEC_MAGIC: bytes = b"HYSC"
+CODEC_FORMAT_VERSION: int = 2
+
+# Archive file (core/archive.py) magic and layout version. The magic opens
+# the file and closes the footer. Version 2 may hold ranked records;
+# version 1 archives still open.
+ARCHIVE_MAGIC: bytes = b"HYSA"
+ARCHIVE_FORMAT_VERSION: int = 2
@@ -0,0 +1,18 @@
+"""
+Default parameters for the memory-mapped columnar dataset cache
+(core/columnar_store.py, scripts/build_columnar_cache.py).
+"""
+
+from __future__ import annotations
+
+import os
+
+# Root of the converted datasets, relative to the project root. Each dataset
+# data/raw/<name>/ is written to <root>/<name>/.
+COLUMNAR_STORE_DEFAULT_ROOT: str = os.path.join("data", "processed", "columnar")
+
+# Timestamp layout of the WorldTrace CSVs under data/raw/.
+COLUMNAR_STORE_TIMESTAMP_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+
+# Bumped whenever the on-disk layout or manifest schema changes.
+COLUMNAR_STORE_FORMAT_VERSION: int = 1
@@ -0,0 +1,7 @@
+"""Default parameters for dead-reckoning online move compression."""
+
+from __future__ import annotations
+
+# Largest allowed distance (meters) between a point and the position dead-reckoned
+# from the last two keypoints before the point is emitted as a keypoint.
+DEAD_RECKONING_DEFAULT_EPSILON_METERS: float = 15.0
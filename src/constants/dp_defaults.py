@@ -5,3 +5,8 @@ from __future__ import annotations
 # Spatial tolerance for the Ramer-Douglas-Peucker simplification (meters).
 # Chosen as the baseline epsilon from the epsilon-sweep experiments.
 DP_DEFAULT_EPSILON_METERS: float = 15.0
+
+# Engine layout (engines/dp.py): a split range with at most this many points
+# is scanned for its farthest point one point at a time; longer ranges are
+# scored with one vectorized numpy pass.
+DP_SCAN_SCALAR_POINTS: int = 32
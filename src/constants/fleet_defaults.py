@@ -0,0 +1,15 @@
+"""
+Default parameters for the multi-object HYSOC fleet compressor
+(hysoc/fleet.py).
+"""
+
+from __future__ import annotations
+
+# An object that has not reported for this long (stream time, seconds) is
+# flushed and its per-object state is dropped.
+FLEET_DEFAULT_IDLE_TIMEOUT_SECONDS: float = 600.0
+
+# Global ceiling on points buffered across all objects. When exceeded, the
+# least recently active objects are flushed and evicted until the fleet is
+# back under the ceiling.
+FLEET_DEFAULT_MAX_BUFFERED_POINTS: int = 1_000_000
@@ -12,3 +12,11 @@ HYSOC_DEFAULT_STRATEGY: str = "geometric"  # "geometric" (HYSOC-G) or "network_s
 
 # Whether stop segments should be compressed to a single centroid by default.
 HYSOC_DEFAULT_COMPRESS_STOPS: bool = True
+
+# Whether SegmentResult.encoded_bytes reports the measured size of the binary
+# segment record (core/codec.py) instead of the per-point estimate.
+HYSOC_DEFAULT_MEASURE_ENCODED_BYTES: bool = False
+
+# Whether move results carry per-keypoint importance ranks (SegmentResult.ranks)
+# so the codec stores them coarse-to-fine and readers can fetch the top k.
+HYSOC_DEFAULT_PROGRESSIVE_KEYPOINTS: bool = False
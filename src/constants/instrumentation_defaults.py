@@ -0,0 +1,27 @@
+"""
+Default configuration for per-stage latency instrumentation
+(core/instrumentation.py).
+"""
+
+from __future__ import annotations
+from enum import Enum
+
+
+class InstrumentationLevel(Enum):
+    """How many points the pipeline times."""
+    OFF = "off"          # no timing calls at all
+    SAMPLED = "sampled"  # time 1 in every ``instrumentation_sample_every`` points
+    FULL = "full"        # time every point
+
+
+# FULL keeps the summed *_time_s diagnostics exact. With SAMPLED they are
+# estimates (timed cost x sampling period), so it is opt-in for deployments
+# that only need the latency percentiles and want fewer timing calls.
+INSTRUMENTATION_DEFAULT_LEVEL: InstrumentationLevel = InstrumentationLevel.FULL
+
+# Sampling period of the SAMPLED level (points).
+INSTRUMENTATION_DEFAULT_SAMPLE_EVERY: int = 100
+
+# Histogram buckets per power of two. 8 sub-buckets bound the relative error
+# of a reported percentile to about 9%.
+INSTRUMENTATION_HISTOGRAM_SUB_BUCKETS: int = 8
@@ -0,0 +1,13 @@
+"""Default parameters for opening-window (SED-bounded) online move compression."""
+
+from __future__ import annotations
+
+# Hard SED bound (meters) between every dropped point and its reconstruction by
+# linear interpolation between the surrounding keypoints.
+OPENING_WINDOW_DEFAULT_EPSILON_METERS: float = 15.0
+
+# Each window point's tolerance disk (in velocity space) is replaced by its
+# inscribed regular polygon with this many sides, all with the same edge
+# normals, so the window's feasible region is this many half-plane offsets.
+# More sides: closer to the exact opening window, more work per point.
+OPENING_WINDOW_POLYGON_SIDES: int = 16
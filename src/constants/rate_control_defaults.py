@@ -0,0 +1,13 @@
+"""Default parameters for the per-device byte-budget rate controller (core/rate_control.py)."""
+
+from __future__ import annotations
+
+# Bytes a device may emit per sliding window (None = no rate control).
+RATE_CONTROL_DEFAULT_BUDGET_BYTES: int | None = None
+
+# Sliding window length in stream (trajectory) seconds: a cellular plan's hour.
+RATE_CONTROL_DEFAULT_WINDOW_SECONDS: float = 3600.0
+
+# Budget accrues at budget / window per stream second; at most this fraction of
+# the window budget can be saved up by simple moves and spent by one complex move.
+RATE_CONTROL_DEFAULT_BURST_FRACTION: float = 0.25
@@ -0,0 +1,17 @@
+"""
+Default parameters for the accelerated fleet replay harness (core/replay.py).
+"""
+
+from __future__ import annotations
+
+# Virtual-clock speedup: stream seconds replayed per wall-clock second.
+# float("inf") replays as fast as the consumer accepts points.
+REPLAY_DEFAULT_SPEEDUP: float = float("inf")
+
+# Rows read ahead per source file. Every file of the merge holds at most one
+# chunk in memory, so memory grows with (files x chunk) rather than dataset size.
+REPLAY_DEFAULT_CHUNKSIZE: int = 4096
+
+# Pacing sleeps shorter than this are skipped and the debt carried forward;
+# sub-millisecond sleeps cost more in scheduler overhead than they save.
+REPLAY_MIN_SLEEP_SECONDS: float = 0.001
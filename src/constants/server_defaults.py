@@ -0,0 +1,20 @@
+"""
+Default parameters for the asyncio ingestion server (hysoc/server.py).
+"""
+
+from __future__ import annotations
+
+# Wire format of incoming point records: "ndjson" (one JSON object per line)
+# or "binary" (fixed-size struct header + UTF-8 object id).
+SERVER_DEFAULT_PROTOCOL: str = "ndjson"
+
+# Number of compressor shards. Objects are hashed to a shard so that the
+# points of one object are always processed in arrival order.
+SERVER_DEFAULT_SHARDS: int = 4
+
+# Capacity (points) of each shard queue. When a queue is full the connection
+# readers feeding it stop reading, which pushes back on the clients.
+SERVER_DEFAULT_QUEUE_SIZE: int = 10_000
+
+# Number of most recent queueing-delay samples kept for percentiles.
+SERVER_DELAY_SAMPLE_SIZE: int = 10_000
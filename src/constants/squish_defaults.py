@@ -4,3 +4,16 @@ from __future__ import annotations
 
 SQUISH_DEFAULT_CAPACITY: int = 50
 
+# HYSOC-G: push move points into an incremental SQUISH as STEP releases them
+# (STEP then runs bounded) instead of compressing each completed Move.
+SQUISH_DEFAULT_STREAMING: bool = False
+
+
+# SQUISH-E(lambda, mu) (engines/squish.py, CompressionStrategy.SQUISH_E):
+# compression ratio lower bound lambda (1 = none) and SED bound mu in meters.
+# The buffer never drops below SQUISH_E_MIN_CAPACITY points (the paper's 4);
+# slot arrays start at SQUISH_E_INITIAL_SLOTS and double as needed.
+SQUISH_E_DEFAULT_RATIO: float = 1.0
+SQUISH_E_DEFAULT_SED_METERS: float = 15.0
+SQUISH_E_MIN_CAPACITY: int = 4
+SQUISH_E_INITIAL_SLOTS: int = 64
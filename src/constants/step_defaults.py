@@ -24,3 +24,35 @@ from math import sqrt
 # Grid factor: g = STEP_DEFAULT_GRID_FACTOR * D, i.e. n = 1 in the DASFAA
 # formula g = (sqrt(2) / (4 n)) D. This is the authors' baseline choice.
 STEP_DEFAULT_GRID_FACTOR: float = sqrt(2) / 4.0
+
+# Bounded-memory mode: once an ongoing move holds more than this many points
+# (or spans more than this many seconds), STEP emits its older part as a
+# partial Move chunk. None disables the limit (moves are buffered until the
+# next stop or flush, as in the paper).
+STEP_DEFAULT_MAX_MOVE_POINTS: int | None = None
+STEP_DEFAULT_MAX_MOVE_SECONDS: float | None = None
+
+# Fused stop statistics: while a stay point is open, STEP folds the points it
+# can no longer scan into running statistics (core/stop_stats.py) and emits
+# stops carrying those instead of their points. Off by default.
+STEP_DEFAULT_STOP_STATS: bool = False
+
+# Projection drift: STEP measures distances in a local equirectangular
+# projection whose east-west scale is exact only at its anchor latitude. Once
+# a new point is more than this many degrees of latitude from the anchor,
+# STEP re-anchors at it (keeping coordinates continuous), so the scale error
+# stays below ~tan(lat) * 1.7e-4 (about 3 mm over D = 15 m at 45 deg).
+STEP_REANCHOR_LAT_DEGREES: float = 0.01
+
+# Cache layout (engines/step.py): the ring buffer starts with this many slots
+# (a power of two) and doubles when full. The Alg 1 backward scan checks the
+# first STEP_SCAN_SCALAR_POINTS points one at a time (it usually stops there)
+# and then classifies blocks of STEP_SCAN_BLOCK_POINTS (doubling) with numpy.
+STEP_CACHE_INITIAL_CAPACITY: int = 256
+STEP_SCAN_SCALAR_POINTS: int = 32
+STEP_SCAN_BLOCK_POINTS: int = 256
+
+# Offline STEP (process_batch): after the oldest-point check, points still
+# forming a candidate stay test this many lags per vectorized pass in the first
+# round of the dwell-window check; the block width doubles every round.
+STEP_BATCH_LAG_BLOCK: int = 16
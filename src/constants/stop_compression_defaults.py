@@ -13,3 +13,15 @@ class StopCompressionStrategy(Enum):
     FIRST_POINT = "first_point"
 
 STOP_COMPRESSION_DEFAULT_STRATEGY: StopCompressionStrategy = StopCompressionStrategy.CENTROID
+
+# Fused STEP + stop compression (core/stop_stats.py): stops keep running
+# statistics plus a uniform reservoir of at most this many points, which
+# SNAP_TO_NEAREST and MEDOID choose from. The seed keeps results reproducible.
+STOP_STATS_RESERVOIR_SIZE: int = 64
+STOP_STATS_RESERVOIR_SEED: int = 0
+
+# MEDOID (engines/stop_compressor.py): candidates evaluated per vectorized
+# block, and the default relative tolerance on the sum of distances of the
+# chosen point vs the true medoid (0 = exact in the local projection).
+STOP_MEDOID_BLOCK_POINTS: int = 64
+STOP_MEDOID_DEFAULT_TOLERANCE: float = 0.0
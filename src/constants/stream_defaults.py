@@ -0,0 +1,7 @@
+"""Default parameters for CSV trajectory ingestion (core.stream)."""
+
+from __future__ import annotations
+
+# Rows parsed per pandas chunk. Larger chunks amortise per-chunk overhead in
+# the column-wise conversion; memory grows linearly with the chunk size.
+STREAM_DEFAULT_CHUNKSIZE: int = 50_000
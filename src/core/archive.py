@@ -0,0 +1,367 @@
+"""
+HYSOC Core: Time-Indexed Segment Archive
+
+Multi-object archive of codec segment records (core/codec.py) with a footer
+index, so that "where was object X between t0 and t1" decodes only the
+segments overlapping [t0, t1].
+
+File layout:
+
+    MAGIC "HYSA" | u8 version | varint time_resolution_us
+    record*                         segment records, any object order
+    index                           see below
+    u64 index_offset (LE) | MAGIC
+
+    index   := varint n_objects | n_objects x object
+    object  := str obj_id | str strategy | varint n_segments
+               | n_segments x (zz dstart | varint duration | zz doffset | varint length)
+
+Within an object, segments are stored in emission order (chronological for
+HYSOC output), so segment start and end times are both non-decreasing and a
+range lookup is two bisections.
+
+Ranked (coarse-to-fine) move records can be read partially: with
+``max_keypoints=k`` the reader decodes only the first k entries of each such
+record, i.e. a prefix of its bytes, for low-zoom views of the same file.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from constants.codec_defaults import (
+    ARCHIVE_FORMAT_VERSION,
+    ARCHIVE_MAGIC,
+    CODEC_DEFAULT_TIME_RESOLUTION_US,
+)
+from .batch import datetime_to_epoch_us
+from .codec import (
+    decode_segment,
+    encode_segment,
+    read_str,
+    read_varint,
+    read_zigzag,
+    write_str,
+    write_varint,
+    write_zigzag,
+)
+from .compression import CompressionStrategy, SegmentResult, TrajectoryResult
+from .point import Point
+
+_EPOCH = datetime(1970, 1, 1)
+_FOOTER = struct.Struct("<Q4s")
+
+
+class _ObjectIndex:
+    """Per-object segment index (times in archive time units)."""
+    __slots__ = ("strategy", "starts", "ends", "offsets", "lengths")
+
+    def __init__(self, strategy: CompressionStrategy):
+        self.strategy = strategy
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.offsets: List[int] = []
+        self.lengths: List[int] = []
+
+
+class ArchiveWriter:
+    """
+    Writes segment records as they are produced and the time index on close.
+    Usable as a context manager.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+    ):
+        self.path = Path(path)
+        self.time_resolution_us = time_resolution_us
+        self.fp = open(self.path, "wb")
+        header = bytearray(ARCHIVE_MAGIC)
+        header.append(ARCHIVE_FORMAT_VERSION)
+        write_varint(header, time_resolution_us)
+        self.fp.write(header)
+        self._offset = len(header)
+        self._index: Dict[str, _ObjectIndex] = {}
+
+    def _units(self, ts: datetime) -> int:
+        return round(datetime_to_epoch_us(ts) / self.time_resolution_us)
+
+    def append(
+        self,
+        obj_id: str,
+        seg: SegmentResult,
+        strategy: CompressionStrategy = CompressionStrategy.GEOMETRIC,
+    ) -> int:
+        """Appends one segment of ``obj_id``; returns its record size in bytes."""
+        entry = self._index.get(obj_id)
+        if entry is None:
+            entry = self._index[obj_id] = _ObjectIndex(strategy)
+        start = self._units(seg.start_time)
+        end = self._units(seg.end_time)
+        if entry.starts and (start < entry.starts[-1] or end < entry.ends[-1]):
+            raise ValueError(f"Segments of '{obj_id}' must be appended in chronological order")
+
+        record = encode_segment(seg, self.time_resolution_us)
+        self.fp.write(record)
+        entry.starts.append(start)
+        entry.ends.append(end)
+        entry.offsets.append(self._offset)
+        entry.lengths.append(len(record))
+        self._offset += len(record)
+        return len(record)
+
+    def append_many(
+        self,
+        emitted: Iterable[Tuple[str, SegmentResult]],
+        strategy: CompressionStrategy = CompressionStrategy.GEOMETRIC,
+    ) -> int:
+        """Appends ``(obj_id, segment)`` pairs, e.g. HYSOCFleetCompressor output."""
+        return sum(self.append(obj_id, seg, strategy) for obj_id, seg in emitted)
+
+    def write_result(self, result: TrajectoryResult) -> int:
+        return sum(self.append(result.object_id, seg, result.strategy) for seg in result.segments)
+
+    def close(self) -> None:
+        if self.fp.closed:
+            return
+        index = bytearray()
+        write_varint(index, len(self._index))
+        for obj_id, entry in self._index.items():
+            write_str(index, obj_id)
+            write_str(index, entry.strategy.value)
+            write_varint(index, len(entry.starts))
+            prev_start = prev_offset = 0
+            for start, end, offset, length in zip(entry.starts, entry.ends, entry.offsets, entry.lengths):
+                write_zigzag(index, start - prev_start)
+                write_varint(index, end - start)
+                write_zigzag(index, offset - prev_offset)
+                write_varint(index, length)
+                prev_start, prev_offset = start, offset
+        self.fp.write(index)
+        self.fp.write(_FOOTER.pack(self._offset, ARCHIVE_MAGIC))
+        self.fp.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ArchiveReader:
+    """
+    Random-access reader. The file is memory-mapped and the index parsed on
+    open; segment records are decoded only when a query touches them.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._fp = open(self.path, "rb")
+        self._data = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._data
+
+        if len(data) < len(ARCHIVE_MAGIC) + 1 + _FOOTER.size or data[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            raise ValueError(f"{self.path} is not a HYSOC archive")
+        version = data[len(ARCHIVE_MAGIC)]
+        if not 1 <= version <= ARCHIVE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported archive version {version}")
+        self.time_resolution_us, _ = read_varint(data, len(ARCHIVE_MAGIC) + 1)
+
+        index_offset, magic = _FOOTER.unpack_from(data, len(data) - _FOOTER.size)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError(f"{self.path} has no archive footer (truncated?)")
+
+        self._index: Dict[str, _ObjectIndex] = {}
+        pos = index_offset
+        n_objects, pos = read_varint(data, pos)
+        for _ in range(n_objects):
+            obj_id, pos = read_str(data, pos)
+            strategy, pos = read_str(data, pos)
+            entry = _ObjectIndex(CompressionStrategy(strategy))
+            n_segments, pos = read_varint(data, pos)
+            start = offset = 0
+            for _ in range(n_segments):
+                dstart, pos = read_zigzag(data, pos)
+                duration, pos = read_varint(data, pos)
+                doffset, pos = read_zigzag(data, pos)
+                length, pos = read_varint(data, pos)
+                start += dstart
+                offset += doffset
+                entry.starts.append(start)
+                entry.ends.append(start + duration)
+                entry.offsets.append(offset)
+                entry.lengths.append(length)
+            self._index[obj_id] = entry
+
+    # ------------------------------------------------------------------
+    # Index queries
+    # ------------------------------------------------------------------
+
+    @property
+    def objects(self) -> List[str]:
+        return list(self._index)
+
+    def __contains__(self, obj_id: str) -> bool:
+        return obj_id in self._index
+
+    def _entry(self, obj_id: str) -> _ObjectIndex:
+        try:
+            return self._index[obj_id]
+        except KeyError:
+            raise KeyError(f"Object '{obj_id}' not in archive {self.path}") from None
+
+    def _units(self, ts: datetime) -> int:
+        return round(datetime_to_epoch_us(ts) / self.time_resolution_us)
+
+    def _datetime(self, units: int) -> datetime:
+        return _EPOCH + timedelta(microseconds=units * self.time_resolution_us)
+
+    def segment_count(self, obj_id: str) -> int:
+        return len(self._entry(obj_id).starts)
+
+    def time_range(self, obj_id: str) -> Optional[Tuple[datetime, datetime]]:
+        """(first segment start, last segment end), or None if no segments."""
+        entry = self._entry(obj_id)
+        if not entry.starts:
+            return None
+        return self._datetime(entry.starts[0]), self._datetime(entry.ends[-1])
+
+    def _overlap(self, entry: _ObjectIndex, t0: int, t1: int) -> Tuple[int, int]:
+        """Index range [lo, hi) of segments with end >= t0 and start <= t1."""
+        return bisect_left(entry.ends, t0), bisect_right(entry.starts, t1)
+
+    def _decode(
+        self, obj_id: str, entry: _ObjectIndex, i: int, max_keypoints: Optional[int] = None
+    ) -> SegmentResult:
+        seg, _ = decode_segment(
+            self._data, entry.offsets[i], obj_id, self.time_resolution_us, max_keypoints
+        )
+        return seg
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+
+    def segments(
+        self,
+        obj_id: str,
+        t0: Optional[datetime] = None,
+        t1: Optional[datetime] = None,
+        max_keypoints: Optional[int] = None,
+    ) -> List[SegmentResult]:
+        """
+        Decodes the segments overlapping [t0, t1] (all segments by default);
+        ranked records only up to their top ``max_keypoints`` keypoints.
+        """
+        entry = self._entry(obj_id)
+        lo = 0 if t0 is None else bisect_left(entry.ends, self._units(t0))
+        hi = len(entry.starts) if t1 is None else bisect_right(entry.starts, self._units(t1))
+        return [self._decode(obj_id, entry, i, max_keypoints) for i in range(lo, hi)]
+
+    def read_trajectory(self, obj_id: str) -> TrajectoryResult:
+        """Full decode of one object (original points are not stored)."""
+        entry = self._entry(obj_id)
+        return TrajectoryResult(
+            object_id=obj_id,
+            original_points=[],
+            segments=self.segments(obj_id),
+            strategy=entry.strategy,
+        )
+
+    def read_range(
+        self,
+        obj_id: str,
+        t0: datetime,
+        t1: datetime,
+        max_keypoints: Optional[int] = None,
+    ) -> List[Point]:
+        """
+        Reconstructed position track of ``obj_id`` over [t0, t1].
+
+        Stops contribute their keypoint at both the stop start and end time,
+        moves their keypoints; the track is linear in between. Keypoints
+        inside the window are returned as stored, and positions at t0 / t1
+        are interpolated when the track covers them. Only segments
+        overlapping the window are decoded, plus the neighbouring segment when
+        a window edge falls in the gap between two segments. ``max_keypoints``
+        limits ranked moves to their coarse top-k shape.
+        """
+        entry = self._entry(obj_id)
+        u0 = self._units(t0)
+        u1 = self._units(t1)
+        if u1 < u0 or not entry.starts:
+            return []
+
+        lo, hi = self._overlap(entry, u0, u1)
+        n = len(entry.starts)
+        if lo > 0 and (lo == n or entry.starts[lo] > u0):
+            lo -= 1  # t0 falls between segments: the previous one brackets it
+        if hi < n and (hi == 0 or entry.ends[hi - 1] < u1):
+            hi += 1  # t1 falls between segments: the next one brackets it
+        if lo >= hi:
+            return []
+
+        track: List[Point] = []
+        for i in range(lo, hi):
+            seg = self._decode(obj_id, entry, i, max_keypoints)
+            if seg.kind == "stop" and seg.keypoints:
+                kp = seg.keypoints[0]
+                track.append(Point(kp.lat, kp.lon, seg.start_time, obj_id, kp.road_id))
+                if seg.end_time > seg.start_time:
+                    track.append(Point(kp.lat, kp.lon, seg.end_time, obj_id, kp.road_id))
+            else:
+                track.extend(seg.keypoints)
+
+        # Decoded timestamps are naive UTC; clip aware windows in the same terms.
+        return clip_track(track, _naive_utc(t0), _naive_utc(t1))
+
+    def close(self) -> None:
+        self._data.close()
+        self._fp.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.replace(tzinfo=None) - ts.utcoffset()
+    return ts
+
+
+def _interpolate(a: Point, b: Point, ts: datetime) -> Point:
+    span = (b.timestamp - a.timestamp).total_seconds()
+    f = (ts - a.timestamp).total_seconds() / span if span > 0 else 0.0
+    return Point(
+        lat=a.lat + f * (b.lat - a.lat),
+        lon=a.lon + f * (b.lon - a.lon),
+        timestamp=ts,
+        obj_id=a.obj_id,
+        road_id=a.road_id,
+    )
+
+
+def clip_track(track: List[Point], t0: datetime, t1: datetime) -> List[Point]:
+    """Keypoints within [t0, t1] plus interpolated positions at the window edges."""
+    if not track:
+        return []
+    times = [p.timestamp for p in track]
+    lo = bisect_left(times, t0)
+    hi = bisect_right(times, t1)
+
+    out: List[Point] = []
+    if 0 < lo < len(track) and times[lo] != t0:
+        out.append(_interpolate(track[lo - 1], track[lo], t0))
+    out.extend(track[lo:hi])
+    if 0 < hi < len(track) and times[hi - 1] != t1:
+        out.append(_interpolate(track[hi - 1], track[hi], t1))
+    return out
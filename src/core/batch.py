@@ -0,0 +1,237 @@
+"""
+HYSOC Core: Columnar Trajectory Batches
+
+Struct-of-arrays counterpart of ``list[Point]``. A TrajectoryBatch stores one
+NumPy column per field instead of one object per GPS fix, so batch engines
+can walk whole trajectories without allocating per-point objects.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from core.point import Point
+
+# Naive timestamps are interpreted as UTC wall-clock time (numpy datetime64
+# convention), so conversion never depends on the local timezone.
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+
+# Code stored in ``road_code`` for points without a road id.
+NO_ROAD: int = -1
+
+
+def datetime_to_epoch_us(ts: datetime) -> int:
+    """Converts a (naive-as-UTC or timezone-aware) datetime to epoch microseconds."""
+    if ts.tzinfo is not None:
+        ts = ts.replace(tzinfo=None) - ts.utcoffset()
+    return (ts - _EPOCH) // _ONE_US
+
+
+def intern_column(values: Iterable[Any]) -> tuple[np.ndarray, tuple]:
+    """
+    Interns a column of hashable values.
+
+    Returns (codes, vocabulary) where ``vocabulary[codes[i]] == values[i]``.
+    ``None`` is mapped to NO_ROAD (-1) and is not added to the vocabulary.
+    """
+    lookup: dict[Any, int] = {}
+    codes: list[int] = []
+    for v in values:
+        if v is None:
+            codes.append(NO_ROAD)
+            continue
+        code = lookup.get(v)
+        if code is None:
+            code = len(lookup)
+            lookup[v] = code
+        codes.append(code)
+    return np.asarray(codes, dtype=np.int32), tuple(lookup)
+
+
+@dataclass(frozen=True, eq=False)
+class TrajectoryBatch:
+    """
+    Columnar trajectory: parallel arrays of equal length.
+
+    lat, lon  — float64 degrees.
+    epoch_us  — int64 microseconds since the Unix epoch.
+    road_code — int32 index into ``road_ids``; NO_ROAD (-1) when absent.
+    obj_code  — int32 index into ``obj_ids``.
+
+    Slicing with a ``slice`` returns a batch of NumPy views (no copy) that
+    shares the interned vocabularies; integer indexing returns a ``Point``.
+    """
+    lat: np.ndarray
+    lon: np.ndarray
+    epoch_us: np.ndarray
+    road_code: np.ndarray
+    obj_code: np.ndarray
+    road_ids: tuple = ()
+    obj_ids: tuple = ()
+
+    def __post_init__(self):
+        n = len(self.lat)
+        for name in ("lon", "epoch_us", "road_code", "obj_code"):
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"Column '{name}' has length {len(getattr(self, name))}, expected {n}")
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_arrays(
+        cls,
+        lat: Sequence[float] | np.ndarray,
+        lon: Sequence[float] | np.ndarray,
+        epoch_us: Sequence[int] | np.ndarray,
+        obj_id: str = "unknown_obj",
+        road_code: np.ndarray | None = None,
+        road_ids: tuple = (),
+    ) -> "TrajectoryBatch":
+        """Builds a single-object batch from raw columns."""
+        lat_arr = np.ascontiguousarray(lat, dtype=np.float64)
+        n = len(lat_arr)
+        if road_code is None:
+            road_code = np.full(n, NO_ROAD, dtype=np.int32)
+        return cls(
+            lat=lat_arr,
+            lon=np.ascontiguousarray(lon, dtype=np.float64),
+            epoch_us=np.ascontiguousarray(epoch_us, dtype=np.int64),
+            road_code=np.ascontiguousarray(road_code, dtype=np.int32),
+            obj_code=np.zeros(n, dtype=np.int32),
+            road_ids=tuple(road_ids),
+            obj_ids=(obj_id,),
+        )
+
+    @classmethod
+    def from_points(cls, points: Sequence[Point]) -> "TrajectoryBatch":
+        """Converts a ``list[Point]`` into columnar form."""
+        road_code, road_ids = intern_column(p.road_id for p in points)
+        obj_code, obj_ids = intern_column(p.obj_id for p in points)
+        return cls(
+            lat=np.fromiter((p.lat for p in points), dtype=np.float64, count=len(points)),
+            lon=np.fromiter((p.lon for p in points), dtype=np.float64, count=len(points)),
+            epoch_us=np.fromiter(
+                (datetime_to_epoch_us(p.timestamp) for p in points), dtype=np.int64, count=len(points)
+            ),
+            road_code=road_code,
+            obj_code=obj_code,
+            road_ids=road_ids,
+            obj_ids=obj_ids,
+        )
+
+    # ------------------------------------------------------------------
+    # Conversion back to points
+    # ------------------------------------------------------------------
+
+    def to_points(self) -> list[Point]:
+        """Materialises the batch as a ``list[Point]``."""
+        timestamps = self.epoch_us.astype("datetime64[us]").tolist()
+        road_ids = self.road_ids
+        obj_ids = self.obj_ids
+        return [
+            Point(
+                lat=lat,
+                lon=lon,
+                timestamp=ts,
+                obj_id=obj_ids[oc],
+                road_id=road_ids[rc] if rc >= 0 else None,
+            )
+            for lat, lon, ts, rc, oc in zip(
+                self.lat.tolist(),
+                self.lon.tolist(),
+                timestamps,
+                self.road_code.tolist(),
+                self.obj_code.tolist(),
+            )
+        ]
+
+    def point(self, index: int) -> Point:
+        """Materialises a single point."""
+        rc = int(self.road_code[index])
+        return Point(
+            lat=float(self.lat[index]),
+            lon=float(self.lon[index]),
+            timestamp=self.epoch_us[index].astype("datetime64[us]").item(),
+            obj_id=self.obj_ids[int(self.obj_code[index])],
+            road_id=self.road_ids[rc] if rc >= 0 else None,
+        )
+
+    # ------------------------------------------------------------------
+    # Sequence protocol
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.to_points())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return TrajectoryBatch(
+                lat=self.lat[key],
+                lon=self.lon[key],
+                epoch_us=self.epoch_us[key],
+                road_code=self.road_code[key],
+                obj_code=self.obj_code[key],
+                road_ids=self.road_ids,
+                obj_ids=self.obj_ids,
+            )
+        if isinstance(key, (int, np.integer)):
+            n = len(self)
+            if key < 0:
+                key += n
+            if not 0 <= key < n:
+                raise IndexError("TrajectoryBatch index out of range")
+            return self.point(int(key))
+        return self.take(key)
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "TrajectoryBatch":
+        """Gathers the given row indices into a new (copied) batch."""
+        idx = np.asarray(indices, dtype=np.intp)
+        return TrajectoryBatch(
+            lat=self.lat[idx],
+            lon=self.lon[idx],
+            epoch_us=self.epoch_us[idx],
+            road_code=self.road_code[idx],
+            obj_code=self.obj_code[idx],
+            road_ids=self.road_ids,
+            obj_ids=self.obj_ids,
+        )
+
+    # ------------------------------------------------------------------
+    # Derived columns
+    # ------------------------------------------------------------------
+
+    @property
+    def object_id(self) -> str:
+        """Object id of the first row ('' for an empty batch)."""
+        if len(self) == 0:
+            return ""
+        return self.obj_ids[int(self.obj_code[0])]
+
+    @property
+    def epoch_seconds(self) -> np.ndarray:
+        """float64 seconds since the Unix epoch."""
+        return self.epoch_us / 1e6
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """datetime64[us] view of ``epoch_us``."""
+        return self.epoch_us.view("datetime64[us]")
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.lat.nbytes
+            + self.lon.nbytes
+            + self.epoch_us.nbytes
+            + self.road_code.nbytes
+            + self.obj_code.nbytes
+        )
@@ -0,0 +1,514 @@
+"""
+HYSOC Core: Binary Segment Codec
+
+Compact, self-delimiting binary encoding of SegmentResult / TrajectoryResult.
+
+Stream layout (one object per stream):
+
+    header  := MAGIC "HYSC" | u8 version | varint time_resolution_us
+               | str obj_id | str strategy
+    record* := varint body_len | body
+
+    body    := u8 flags | zz start | varint (end - start) | varint n
+               | n x keypoint                      (time order)
+               | n x (varint index | keypoint)     (rank order, ranked records)
+    keypoint:= zz dlat | zz dlon | zz dt [| varint road_id + 1]
+
+    str     := varint byte_len | utf-8 bytes
+
+flags bit 0 is the kind (0 = stop, 1 = move); bit 1 marks per-keypoint road
+ids (non-negative integers only; 0 encodes None); bit 2 marks a partial move
+chunk (SegmentResult.partial) that continues in the next record; bit 3 marks a
+ranked record (SegmentResult.ranks). Latitude and longitude are
+fixed-point integers of 1e-7 degrees, times are integers of
+``time_resolution_us`` microseconds. The first keypoint is delta-coded against
+(0, 0, start), each later one against its predecessor, so every record decodes
+on its own given the stream header. ``zz`` is zigzag + LEB128 varint.
+
+Ranked records are progressive: keypoints follow in rank order, each with
+its time-order index, so the first k entries are the segment's top-k shape
+and ``decode_segment(max_keypoints=k)`` stops reading there. Each entry is
+coded against the entries already decoded: its time against the nearest
+earlier one (or start), its position against the linear interpolation at
+that time between the nearest earlier and later ones (or the one present).
+Fine keypoints thus cost about as much as their deviation from the coarse
+shape.
+
+Decoding is exact up to the fixed-point rounding (<= 0.5e-7 degrees, half a
+time unit). Decoded timestamps are naive UTC datetimes.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta
+from bisect import bisect_left
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from constants.codec_defaults import (
+    CODEC_COORD_SCALE,
+    CODEC_DEFAULT_TIME_RESOLUTION_US,
+    CODEC_FORMAT_VERSION,
+    CODEC_MAGIC,
+)
+from .batch import datetime_to_epoch_us
+from .compression import CompressionStrategy, SegmentResult, TrajectoryResult
+from .point import Point
+
+_EPOCH = datetime(1970, 1, 1)
+
+FLAG_MOVE = 0x01
+FLAG_ROAD_IDS = 0x02
+FLAG_PARTIAL = 0x04
+FLAG_RANKED = 0x08
+
+
+# ----------------------------------------------------------------------
+# Varint primitives
+# ----------------------------------------------------------------------
+
+def write_varint(buf: bytearray, value: int) -> None:
+    """Appends an unsigned LEB128 varint."""
+    if value < 0:
+        raise ValueError(f"varint must be non-negative, got {value}")
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    """Reads an unsigned LEB128 varint at ``pos``; returns (value, next_pos)."""
+    result = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[pos]
+        except IndexError:
+            raise ValueError("Truncated varint") from None
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def write_zigzag(buf: bytearray, value: int) -> None:
+    """Appends a signed integer as a zigzag varint."""
+    write_varint(buf, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def read_zigzag(data, pos: int) -> Tuple[int, int]:
+    raw, pos = read_varint(data, pos)
+    return (raw >> 1) ^ -(raw & 1), pos
+
+
+def write_str(buf: bytearray, value: str) -> None:
+    """Appends a varint-length-prefixed UTF-8 string."""
+    encoded = value.encode("utf-8")
+    write_varint(buf, len(encoded))
+    buf += encoded
+
+
+def read_str(data, pos: int) -> Tuple[str, int]:
+    n, pos = read_varint(data, pos)
+    if pos + n > len(data):
+        raise ValueError("Truncated string")
+    return bytes(data[pos:pos + n]).decode("utf-8"), pos + n
+
+
+# ----------------------------------------------------------------------
+# Segment records
+# ----------------------------------------------------------------------
+
+def _time_units(ts: datetime, time_resolution_us: int) -> int:
+    return round(datetime_to_epoch_us(ts) / time_resolution_us)
+
+
+def _has_int_road_ids(keypoints: List[Point]) -> bool:
+    has_any = False
+    for p in keypoints:
+        road_id = p.road_id
+        if road_id is None:
+            continue
+        if not isinstance(road_id, int) or isinstance(road_id, bool) or road_id < 0:
+            return False
+        has_any = True
+    return has_any
+
+
+def _predict(
+    lats: List[int], lons: List[int], times: List[int], decoded: List[int], index: int, t: int
+) -> Tuple[int, int]:
+    """Position of keypoint ``index`` at time ``t`` predicted from the already decoded ones."""
+    pos = bisect_left(decoded, index)
+    left = decoded[pos - 1] if pos > 0 else None
+    right = decoded[pos] if pos < len(decoded) else None
+    if left is None:
+        return (0, 0) if right is None else (lats[right], lons[right])
+    if right is None or times[right] == times[left]:
+        return lats[left], lons[left]
+    span = times[right] - times[left]
+    f = t - times[left]
+    return (
+        lats[left] + (lats[right] - lats[left]) * f // span,
+        lons[left] + (lons[right] - lons[left]) * f // span,
+    )
+
+
+def _encode_ranked(
+    body: bytearray,
+    keypoints: List[Point],
+    ranks: List[int],
+    start: int,
+    time_resolution_us: int,
+    with_roads: bool,
+) -> None:
+    n = len(keypoints)
+    order = sorted(range(n), key=ranks.__getitem__)
+    if [ranks[i] for i in order] != list(range(n)):
+        raise ValueError("SegmentResult.ranks must be a permutation of range(len(keypoints))")
+    lats = [round(p.lat * CODEC_COORD_SCALE) for p in keypoints]
+    lons = [round(p.lon * CODEC_COORD_SCALE) for p in keypoints]
+    times = [_time_units(p.timestamp, time_resolution_us) for p in keypoints]
+    decoded: List[int] = []
+    for i in order:
+        pos = bisect_left(decoded, i)
+        base_t = times[decoded[pos - 1]] if pos > 0 else start
+        pred_lat, pred_lon = _predict(lats, lons, times, decoded, i, times[i])
+        write_varint(body, i)
+        write_zigzag(body, lats[i] - pred_lat)
+        write_zigzag(body, lons[i] - pred_lon)
+        write_zigzag(body, times[i] - base_t)
+        if with_roads:
+            road_id = keypoints[i].road_id
+            write_varint(body, 0 if road_id is None else road_id + 1)
+        decoded.insert(pos, i)
+
+
+def encode_segment(
+    seg: SegmentResult,
+    time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+) -> bytes:
+    """Encodes one segment as a length-prefixed record."""
+    body = bytearray()
+    keypoints = seg.keypoints
+    with_roads = _has_int_road_ids(keypoints)
+
+    flags = FLAG_MOVE if seg.kind == "move" else 0
+    if with_roads:
+        flags |= FLAG_ROAD_IDS
+    if seg.partial:
+        flags |= FLAG_PARTIAL
+    ranked = seg.ranks is not None
+    if ranked:
+        flags |= FLAG_RANKED
+    body.append(flags)
+
+    start = _time_units(seg.start_time, time_resolution_us)
+    end = _time_units(seg.end_time, time_resolution_us)
+    write_zigzag(body, start)
+    write_varint(body, max(0, end - start))
+    write_varint(body, len(keypoints))
+
+    if ranked:
+        _encode_ranked(body, keypoints, seg.ranks, start, time_resolution_us, with_roads)
+        keypoints = []
+
+    prev_lat = prev_lon = 0
+    prev_t = start
+    for p in keypoints:
+        lat = round(p.lat * CODEC_COORD_SCALE)
+        lon = round(p.lon * CODEC_COORD_SCALE)
+        t = _time_units(p.timestamp, time_resolution_us)
+        write_zigzag(body, lat - prev_lat)
+        write_zigzag(body, lon - prev_lon)
+        write_zigzag(body, t - prev_t)
+        if with_roads:
+            write_varint(body, 0 if p.road_id is None else p.road_id + 1)
+        prev_lat, prev_lon, prev_t = lat, lon, t
+
+    record = bytearray()
+    write_varint(record, len(body))
+    record += body
+    return bytes(record)
+
+
+def decode_segment(
+    data,
+    pos: int = 0,
+    obj_id: str = "",
+    time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+    max_keypoints: Optional[int] = None,
+) -> Tuple[SegmentResult, int]:
+    """
+    Decodes the record at ``pos``; returns (segment, next_pos).
+    ``encoded_bytes`` of the result is the record size, length prefix included.
+
+    With ``max_keypoints`` a ranked record is read only up to its top
+    ``max_keypoints`` entries: the segment holds those keypoints (time order,
+    with their ranks) and ``encoded_bytes`` counts the bytes read. Records
+    without ranks decode in full.
+    """
+    record_start = pos
+    body_len, pos = read_varint(data, pos)
+    end_pos = pos + body_len
+    if end_pos > len(data):
+        raise ValueError("Truncated segment record")
+
+    flags = data[pos]
+    pos += 1
+    start, pos = read_zigzag(data, pos)
+    duration, pos = read_varint(data, pos)
+    n, pos = read_varint(data, pos)
+    with_roads = bool(flags & FLAG_ROAD_IDS)
+
+    kind = "move" if flags & FLAG_MOVE else "stop"
+    start_time = _EPOCH + timedelta(microseconds=start * time_resolution_us)
+    end_time = _EPOCH + timedelta(microseconds=(start + duration) * time_resolution_us)
+    if flags & FLAG_RANKED:
+        k = n if max_keypoints is None else max(0, min(n, max_keypoints))
+        keypoints, ranks, pos = _decode_ranked(
+            data, pos, n, k, start, obj_id, time_resolution_us, with_roads
+        )
+        if k == n and pos != end_pos:
+            raise ValueError("Corrupt segment record (length mismatch)")
+        seg = SegmentResult(
+            kind=kind,
+            start_time=start_time,
+            end_time=end_time,
+            keypoints=keypoints,
+            encoded_bytes=pos - record_start,
+            partial=bool(flags & FLAG_PARTIAL),
+            ranks=ranks,
+        )
+        return seg, end_pos
+
+    keypoints: List[Point] = []
+    lat = lon = 0
+    t = start
+    for _ in range(n):
+        dlat, pos = read_zigzag(data, pos)
+        dlon, pos = read_zigzag(data, pos)
+        dt, pos = read_zigzag(data, pos)
+        lat += dlat
+        lon += dlon
+        t += dt
+        road_id = None
+        if with_roads:
+            code, pos = read_varint(data, pos)
+            road_id = code - 1 if code else None
+        keypoints.append(Point(
+            lat=lat / CODEC_COORD_SCALE,
+            lon=lon / CODEC_COORD_SCALE,
+            timestamp=_EPOCH + timedelta(microseconds=t * time_resolution_us),
+            obj_id=obj_id,
+            road_id=road_id,
+        ))
+    if pos != end_pos:
+        raise ValueError("Corrupt segment record (length mismatch)")
+
+    seg = SegmentResult(
+        kind=kind,
+        start_time=start_time,
+        end_time=end_time,
+        keypoints=keypoints,
+        encoded_bytes=end_pos - record_start,
+        partial=bool(flags & FLAG_PARTIAL),
+    )
+    return seg, end_pos
+
+
+def _decode_ranked(
+    data, pos: int, n: int, k: int, start: int, obj_id: str, time_resolution_us: int, with_roads: bool
+) -> Tuple[List[Point], List[int], int]:
+    """Reads the first ``k`` of ``n`` rank-ordered entries; returns (keypoints, ranks, next_pos)."""
+    lats = [0] * n
+    lons = [0] * n
+    times = [0] * n
+    roads: List[Optional[int]] = [None] * n
+    rank_of = [0] * n
+    decoded: List[int] = []
+    for rank in range(k):
+        index, pos = read_varint(data, pos)
+        at = bisect_left(decoded, index)
+        if index >= n or (at < len(decoded) and decoded[at] == index):
+            raise ValueError("Corrupt ranked segment record (bad keypoint index)")
+        dlat, pos = read_zigzag(data, pos)
+        dlon, pos = read_zigzag(data, pos)
+        dt, pos = read_zigzag(data, pos)
+        t = (times[decoded[at - 1]] if at > 0 else start) + dt
+        pred_lat, pred_lon = _predict(lats, lons, times, decoded, index, t)
+        lats[index] = pred_lat + dlat
+        lons[index] = pred_lon + dlon
+        times[index] = t
+        if with_roads:
+            code, pos = read_varint(data, pos)
+            roads[index] = code - 1 if code else None
+        rank_of[index] = rank
+        decoded.insert(at, index)
+
+    keypoints = [
+        Point(
+            lat=lats[i] / CODEC_COORD_SCALE,
+            lon=lons[i] / CODEC_COORD_SCALE,
+            timestamp=_EPOCH + timedelta(microseconds=times[i] * time_resolution_us),
+            obj_id=obj_id,
+            road_id=roads[i],
+        )
+        for i in decoded
+    ]
+    return keypoints, [rank_of[i] for i in decoded], pos
+
+
+def measure_segment(
+    seg: SegmentResult,
+    time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+) -> SegmentResult:
+    """Returns ``seg`` with ``encoded_bytes`` set to its measured record size."""
+    return replace(seg, encoded_bytes=len(encode_segment(seg, time_resolution_us)))
+
+
+# ----------------------------------------------------------------------
+# Streams
+# ----------------------------------------------------------------------
+
+def encode_header(
+    obj_id: str,
+    strategy: CompressionStrategy,
+    time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+) -> bytes:
+    buf = bytearray(CODEC_MAGIC)
+    buf.append(CODEC_FORMAT_VERSION)
+    write_varint(buf, time_resolution_us)
+    write_str(buf, obj_id)
+    write_str(buf, strategy.value)
+    return bytes(buf)
+
+
+def decode_header(data, pos: int = 0) -> Tuple[str, CompressionStrategy, int, int]:
+    """Returns (obj_id, strategy, time_resolution_us, next_pos)."""
+    if bytes(data[pos:pos + len(CODEC_MAGIC)]) != CODEC_MAGIC:
+        raise ValueError("Not a HYSOC segment stream (bad magic)")
+    pos += len(CODEC_MAGIC)
+    version = data[pos]
+    if not 1 <= version <= CODEC_FORMAT_VERSION:
+        raise ValueError(f"Unsupported segment stream version {version}")
+    pos += 1
+    time_resolution_us, pos = read_varint(data, pos)
+    obj_id, pos = read_str(data, pos)
+    strategy, pos = read_str(data, pos)
+    return obj_id, CompressionStrategy(strategy), time_resolution_us, pos
+
+
+def encode_trajectory(
+    result: TrajectoryResult,
+    time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+) -> bytes:
+    """Header + one record per segment."""
+    out = bytearray(encode_header(result.object_id, result.strategy, time_resolution_us))
+    for seg in result.segments:
+        out += encode_segment(seg, time_resolution_us)
+    return bytes(out)
+
+
+def decode_trajectory(data) -> TrajectoryResult:
+    """
+    Decodes a full stream. The original trajectory is not part of the
+    encoding, so ``original_points`` is empty.
+    """
+    obj_id, strategy, time_resolution_us, pos = decode_header(data)
+    segments: List[SegmentResult] = []
+    while pos < len(data):
+        seg, pos = decode_segment(data, pos, obj_id, time_resolution_us)
+        segments.append(seg)
+    return TrajectoryResult(object_id=obj_id, original_points=[], segments=segments, strategy=strategy)
+
+
+class SegmentWriter:
+    """
+    Appends segment records to a binary file object as they are emitted,
+    e.g. straight from ``HYSOCGCompressor.process_point``. The header is
+    written on construction.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        obj_id: str,
+        strategy: CompressionStrategy = CompressionStrategy.GEOMETRIC,
+        time_resolution_us: int = CODEC_DEFAULT_TIME_RESOLUTION_US,
+    ):
+        self.fp = fp
+        self.obj_id = obj_id
+        self.strategy = strategy
+        self.time_resolution_us = time_resolution_us
+        header = encode_header(obj_id, strategy, time_resolution_us)
+        fp.write(header)
+        self.header_bytes = len(header)
+        self.segment_bytes = 0
+        self.segments_written = 0
+
+    @property
+    def bytes_written(self) -> int:
+        return self.header_bytes + self.segment_bytes
+
+    def write(self, seg: SegmentResult) -> int:
+        """Writes one segment; returns its record size in bytes."""
+        record = encode_segment(seg, self.time_resolution_us)
+        self.fp.write(record)
+        self.segment_bytes += len(record)
+        self.segments_written += 1
+        return len(record)
+
+    def write_all(self, segments: List[SegmentResult]) -> int:
+        return sum(self.write(seg) for seg in segments)
+
+
+class SegmentReader:
+    """
+    Iterates the records of a segment stream from a binary file object,
+    reading one record at a time. Header fields are available after
+    construction.
+    """
+
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        head = fp.read(len(CODEC_MAGIC) + 1)
+        if head[:len(CODEC_MAGIC)] != CODEC_MAGIC:
+            raise ValueError("Not a HYSOC segment stream (bad magic)")
+        if not 1 <= head[-1] <= CODEC_FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment stream version {head[-1]}")
+        self.time_resolution_us = self._read_varint()
+        self.obj_id = self._read_str()
+        self.strategy = CompressionStrategy(self._read_str())
+
+    def _read_varint(self, first: Optional[bytes] = None) -> int:
+        buf = bytearray(first or b"")
+        while not buf or buf[-1] & 0x80:
+            byte = self.fp.read(1)
+            if not byte:
+                raise ValueError("Truncated varint")
+            buf += byte
+        return read_varint(buf, 0)[0]
+
+    def _read_str(self) -> str:
+        n = self._read_varint()
+        raw = self.fp.read(n)
+        if len(raw) != n:
+            raise ValueError("Truncated string")
+        return raw.decode("utf-8")
+
+    def __iter__(self) -> Iterator[SegmentResult]:
+        while True:
+            first = self.fp.read(1)
+            if not first:
+                return
+            body_len = self._read_varint(first)
+            body = self.fp.read(body_len)
+            if len(body) != body_len:
+                raise ValueError("Truncated segment record")
+            record = bytearray()
+            write_varint(record, body_len)
+            record += body
+            seg, _ = decode_segment(record, 0, self.obj_id, self.time_resolution_us)
+            yield seg
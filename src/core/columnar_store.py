@@ -0,0 +1,374 @@
+"""
+HYSOC Core: Memory-Mapped Columnar Dataset Store
+
+One-time conversion of a ``data/raw/<dataset>/`` directory of per-trajectory
+CSVs into a columnar store that opens without parsing:
+
+    <root>/<dataset>/
+        manifest.json   dataset summary + per-trajectory offset, count,
+                        bbox and time range
+        lat.npy         float64 degrees          (all trajectories, concatenated)
+        lon.npy         float64 degrees
+        epoch_us.npy    int64 microseconds since the Unix epoch
+        road_code.npy   int32 index into manifest["road_ids"]; -1 when absent
+        obj_code.npy    int32 index into the trajectory list
+
+Columns are opened with ``np.load(mmap_mode="r")``; ``ColumnarStore.load``
+returns a TrajectoryBatch of read-only views into the mapped files, so
+opening a trajectory costs a dictionary lookup rather than a CSV parse.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from constants.columnar_store_defaults import (
+    COLUMNAR_STORE_DEFAULT_ROOT,
+    COLUMNAR_STORE_FORMAT_VERSION,
+    COLUMNAR_STORE_TIMESTAMP_FORMAT,
+)
+from .batch import NO_ROAD, TrajectoryBatch
+from .point import Point
+from .stream import TrajectoryStream
+
+MANIFEST_NAME = "manifest.json"
+COLUMNS = ("lat", "lon", "epoch_us", "road_code", "obj_code")
+
+# Project root (two levels above src/core/), used to resolve the default root.
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# WorldTrace CSV column names.
+WORLDTRACE_CSV_MAPPING = {
+    "lat": "latitude",
+    "lon": "longitude",
+    "timestamp": "time",
+    "road_id": "osm_way_id",
+}
+
+
+@dataclass(frozen=True)
+class TrajectoryInfo:
+    """Manifest entry of one trajectory."""
+    obj_id: str
+    source: str
+    offset: int
+    count: int
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    start_us: int
+    end_us: int
+    source_size: int
+    source_mtime_ns: int
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        """(min_lat, min_lon, max_lat, max_lon)."""
+        return (self.min_lat, self.min_lon, self.max_lat, self.max_lon)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_us - self.start_us) / 1e6
+
+
+def default_store_root() -> Path:
+    return _PROJECT_ROOT / COLUMNAR_STORE_DEFAULT_ROOT
+
+
+def _normalise_road_id(value):
+    # Road ids parsed from a column with gaps come back as floats (e.g. 4.2e8).
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def union_bbox(infos: Iterable[TrajectoryInfo]) -> tuple[float, float, float, float]:
+    """Bounding box (min_lat, min_lon, max_lat, max_lon) covering all given trajectories."""
+    infos = list(infos)
+    if not infos:
+        raise ValueError("union_bbox() needs at least one trajectory")
+    return (
+        min(i.min_lat for i in infos),
+        min(i.min_lon for i in infos),
+        max(i.max_lat for i in infos),
+        max(i.max_lon for i in infos),
+    )
+
+
+class ColumnarStore:
+    """
+    Read-only view of a converted dataset. Columns are memory-mapped once on
+    open; ``load`` slices them without copying.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No columnar store at {self.path} (missing {MANIFEST_NAME})")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        version = self.manifest.get("format_version")
+        if version != COLUMNAR_STORE_FORMAT_VERSION:
+            raise ValueError(
+                f"Columnar store {self.path} has format version {version}, "
+                f"expected {COLUMNAR_STORE_FORMAT_VERSION}; rebuild it"
+            )
+
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+        }
+        self.road_ids = tuple(self.manifest["road_ids"])
+        self.trajectories: Dict[str, TrajectoryInfo] = {
+            entry["obj_id"]: TrajectoryInfo(**entry) for entry in self.manifest["trajectories"]
+        }
+        self.obj_ids = tuple(self.trajectories)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    @property
+    def dataset(self) -> str:
+        return self.manifest["dataset"]
+
+    def __len__(self) -> int:
+        return len(self.trajectories)
+
+    def __contains__(self, obj_id: str) -> bool:
+        return obj_id in self.trajectories
+
+    def info(self, obj_id: str) -> TrajectoryInfo:
+        try:
+            return self.trajectories[obj_id]
+        except KeyError:
+            raise KeyError(f"Trajectory '{obj_id}' not in columnar store {self.path}") from None
+
+    def bbox(self, obj_ids: Optional[Iterable[str]] = None) -> Optional[tuple[float, float, float, float]]:
+        """Bounding box of the given trajectories (default: the whole dataset; None if it has no points)."""
+        if obj_ids is None:
+            bbox = self.manifest["bbox"]
+            return tuple(bbox) if bbox is not None else None
+        return union_bbox(self.info(oid) for oid in obj_ids)
+
+    def is_fresh(self, obj_id: str, csv_path: str | Path) -> bool:
+        """True when ``csv_path`` is unchanged since the store was built."""
+        info = self.info(obj_id)
+        try:
+            st = os.stat(csv_path)
+        except OSError:
+            return False
+        return st.st_size == info.source_size and st.st_mtime_ns == info.source_mtime_ns
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, obj_id: str) -> TrajectoryBatch:
+        """Zero-copy TrajectoryBatch (read-only memmap views) of one trajectory."""
+        info = self.info(obj_id)
+        window = slice(info.offset, info.offset + info.count)
+        cols = self.columns
+        return TrajectoryBatch(
+            lat=cols["lat"][window],
+            lon=cols["lon"][window],
+            epoch_us=cols["epoch_us"][window],
+            road_code=cols["road_code"][window],
+            obj_code=cols["obj_code"][window],
+            road_ids=self.road_ids,
+            obj_ids=self.obj_ids,
+        )
+
+    def points(self, obj_id: str, road_ids: bool = True) -> List[Point]:
+        """Materialises one trajectory as ``list[Point]`` (road ids optional)."""
+        points = self.load(obj_id).to_points()
+        if not road_ids:
+            points = [Point(p.lat, p.lon, p.timestamp, p.obj_id) for p in points]
+        return points
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        source_dir: str | Path,
+        dest_dir: str | Path,
+        timestamp_format: Optional[str] = COLUMNAR_STORE_TIMESTAMP_FORMAT,
+        col_mapping: Optional[Dict[str, str]] = None,
+    ) -> "ColumnarStore":
+        """
+        Converts every ``*.csv`` in ``source_dir`` (one trajectory per file,
+        object id = file stem) into a store at ``dest_dir``.
+        Rows whose time, lat or lon is missing or does not parse are skipped,
+        as by the CSV path of ``load_trajectory_points``.
+        """
+        source_dir = Path(source_dir)
+        dest_dir = Path(dest_dir)
+        csv_files = sorted(source_dir.glob("*.csv"), key=lambda f: (not f.stem.isdigit(), len(f.stem), f.stem))
+        if not csv_files:
+            raise FileNotFoundError(f"No CSV files in {source_dir}")
+
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS}
+        road_lookup: Dict[object, int] = {}
+        entries: List[dict] = []
+        offset = 0
+
+        for obj_code, csv_path in enumerate(csv_files):
+            stream = TrajectoryStream(
+                csv_path,
+                col_mapping=dict(col_mapping or WORLDTRACE_CSV_MAPPING),
+                default_obj_id=csv_path.stem,
+                chunksize=1 << 20,
+                timestamp_format=timestamp_format,
+                skip_invalid=True,
+            )
+            batches = list(stream.stream_batches())
+            lat = np.concatenate([b.lat for b in batches]) if batches else np.empty(0)
+            lon = np.concatenate([b.lon for b in batches]) if batches else np.empty(0)
+            epoch_us = np.concatenate([b.epoch_us for b in batches]) if batches else np.empty(0, np.int64)
+
+            # Re-code per-chunk road vocabularies into the dataset vocabulary.
+            road_code_parts = []
+            for b in batches:
+                remap = np.empty(len(b.road_ids) + 1, dtype=np.int32)
+                remap[-1] = NO_ROAD
+                for k, road_id in enumerate(b.road_ids):
+                    road_id = _normalise_road_id(road_id)
+                    remap[k] = road_lookup.setdefault(road_id, len(road_lookup))
+                road_code_parts.append(remap[b.road_code])
+            road_code = np.concatenate(road_code_parts) if road_code_parts else np.empty(0, np.int32)
+
+            n = len(lat)
+            parts["lat"].append(lat)
+            parts["lon"].append(lon)
+            parts["epoch_us"].append(epoch_us)
+            parts["road_code"].append(road_code)
+            parts["obj_code"].append(np.full(n, obj_code, dtype=np.int32))
+
+            st = csv_path.stat()
+            entries.append({
+                "obj_id": csv_path.stem,
+                "source": csv_path.name,
+                "offset": offset,
+                "count": n,
+                "min_lat": float(lat.min()) if n else float("nan"),
+                "min_lon": float(lon.min()) if n else float("nan"),
+                "max_lat": float(lat.max()) if n else float("nan"),
+                "max_lon": float(lon.max()) if n else float("nan"),
+                "start_us": int(epoch_us[0]) if n else 0,
+                "end_us": int(epoch_us[-1]) if n else 0,
+                "source_size": st.st_size,
+                "source_mtime_ns": st.st_mtime_ns,
+            })
+            offset += n
+
+        dtypes = {"lat": np.float64, "lon": np.float64, "epoch_us": np.int64,
+                  "road_code": np.int32, "obj_code": np.int32}
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            np.save(dest_dir / f"{name}.npy", np.concatenate(parts[name]).astype(dtypes[name], copy=False))
+
+        non_empty = [TrajectoryInfo(**e) for e in entries if e["count"] > 0]
+        manifest = {
+            "format_version": COLUMNAR_STORE_FORMAT_VERSION,
+            "dataset": source_dir.name,
+            "source_dir": str(source_dir),
+            "total_points": offset,
+            "bbox": list(union_bbox(non_empty)) if non_empty else None,
+            "road_ids": list(road_lookup),
+            "trajectories": entries,
+        }
+        # Manifest last: a store without one is treated as absent.
+        with open(dest_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        return cls(dest_dir)
+
+
+# ----------------------------------------------------------------------
+# Script helpers
+# ----------------------------------------------------------------------
+
+_OPEN_STORES: Dict[Path, ColumnarStore] = {}
+
+
+def find_store(dataset_dir: str | Path, root: Optional[str | Path] = None) -> Optional[ColumnarStore]:
+    """
+    Store converted from ``dataset_dir`` (looked up by directory name under
+    ``root``), or None when it has not been built. Stores are opened once per
+    process.
+    """
+    store_path = Path(root) if root is not None else default_store_root()
+    store_path = store_path / Path(dataset_dir).name
+    store = _OPEN_STORES.get(store_path)
+    if store is None:
+        try:
+            store = ColumnarStore(store_path)
+        except FileNotFoundError:
+            return None
+        _OPEN_STORES[store_path] = store
+    return store
+
+
+def load_trajectory_points(
+    csv_path: str | Path,
+    obj_id: Optional[str] = None,
+    road_ids: bool = True,
+    root: Optional[str | Path] = None,
+) -> List[Point]:
+    """
+    Loads one ``data/raw/<dataset>/<id>.csv`` trajectory, from the columnar
+    store when it exists and the CSV is unchanged since it was built, else by
+    parsing the CSV. Points carry ``obj_id`` (default: file stem). Either way,
+    rows whose time, lat or lon is missing or does not parse are skipped.
+    """
+    csv_path = Path(csv_path)
+    stem = csv_path.stem
+    obj_id = obj_id if obj_id is not None else stem
+
+    store = find_store(csv_path.parent, root=root)
+    if store is not None and stem in store and store.is_fresh(stem, csv_path):
+        points = store.points(stem, road_ids=road_ids)
+        if obj_id != stem:
+            points = [Point(p.lat, p.lon, p.timestamp, obj_id, p.road_id) for p in points]
+        return points
+
+    stream = TrajectoryStream(
+        csv_path,
+        col_mapping=dict(WORLDTRACE_CSV_MAPPING),
+        default_obj_id=obj_id,
+        timestamp_format=COLUMNAR_STORE_TIMESTAMP_FORMAT,
+        skip_invalid=True,
+    )
+    points = list(stream.stream())
+    if not road_ids:
+        points = [Point(p.lat, p.lon, p.timestamp, p.obj_id) for p in points]
+    return points
+
+
+def trajectory_bbox(
+    csv_path: str | Path,
+    points: Optional[Sequence[Point]] = None,
+    root: Optional[str | Path] = None,
+) -> Optional[tuple[float, float, float, float]]:
+    """
+    Bounding box (min_lat, min_lon, max_lat, max_lon) of one CSV trajectory,
+    read from the store manifest when available and fresh. Otherwise it is
+    computed from ``points`` if given, else None.
+    """
+    csv_path = Path(csv_path)
+    store = find_store(csv_path.parent, root=root)
+    if store is not None and csv_path.stem in store and store.is_fresh(csv_path.stem, csv_path):
+        return store.info(csv_path.stem).bbox
+    if not points:
+        return None
+    lats = [p.lat for p in points]
+    lons = [p.lon for p in points]
+    return (min(lats), min(lons), max(lats), max(lons))
@@ -5,18 +5,49 @@ Contains the shared types and data structures for the HYSOC compression pipeline
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
 from typing import Any, Literal, Optional
 
+from core.batch import TrajectoryBatch
 from core.point import Point
 from core.trace_config import TraceConfig
+from constants.dead_reckoning_defaults import DEAD_RECKONING_DEFAULT_EPSILON_METERS
 from constants.dp_defaults import DP_DEFAULT_EPSILON_METERS
-from constants.hysoc_defaults import HYSOC_DEFAULT_COMPRESS_STOPS
+from constants.hysoc_defaults import (
+    HYSOC_DEFAULT_COMPRESS_STOPS,
+    HYSOC_DEFAULT_MEASURE_ENCODED_BYTES,
+    HYSOC_DEFAULT_PROGRESSIVE_KEYPOINTS,
+)
+from constants.instrumentation_defaults import (
+    INSTRUMENTATION_DEFAULT_LEVEL,
+    INSTRUMENTATION_DEFAULT_SAMPLE_EVERY,
+    InstrumentationLevel,
+)
+from constants.opening_window_defaults import OPENING_WINDOW_DEFAULT_EPSILON_METERS
+from constants.rate_control_defaults import (
+    RATE_CONTROL_DEFAULT_BUDGET_BYTES,
+    RATE_CONTROL_DEFAULT_BURST_FRACTION,
+    RATE_CONTROL_DEFAULT_WINDOW_SECONDS,
+)
 from constants.segmentation_defaults import STOP_MAX_EPS_METERS, STOP_MIN_DURATION_SECONDS
-from constants.squish_defaults import SQUISH_DEFAULT_CAPACITY
-from constants.stop_compression_defaults import StopCompressionStrategy, STOP_COMPRESSION_DEFAULT_STRATEGY
+from constants.squish_defaults import (
+    SQUISH_DEFAULT_CAPACITY,
+    SQUISH_DEFAULT_STREAMING,
+    SQUISH_E_DEFAULT_RATIO,
+    SQUISH_E_DEFAULT_SED_METERS,
+)
+from constants.step_defaults import (
+    STEP_DEFAULT_MAX_MOVE_POINTS,
+    STEP_DEFAULT_MAX_MOVE_SECONDS,
+    STEP_DEFAULT_STOP_STATS,
+)
+from constants.stop_compression_defaults import (
+    StopCompressionStrategy,
+    STOP_COMPRESSION_DEFAULT_STRATEGY,
+    STOP_MEDOID_DEFAULT_TOLERANCE,
+)
 
 # Byte cost of one raw GPS fix: lat (float64=8) + lon (float64=8) + timestamp (int64=8).
 BYTES_PER_POINT: int = 24
@@ -26,6 +57,11 @@ class CompressionStrategy(Enum):
     """Move-segment compression strategy."""
     GEOMETRIC = "geometric"
     NETWORK_SEMANTIC = "network_semantic"
+    # Error-bounded SQUISH-E(lambda, mu) on its own, no DP refinement
+    SQUISH_E = "squish_e"
+    # Online, O(1) per point: keypoints are emitted as soon as the error bound is hit
+    OPENING_WINDOW = "opening_window"
+    DEAD_RECKONING = "dead_reckoning"
 
 
 @dataclass
@@ -33,14 +69,45 @@ class HYSOCConfig:
     """Configuration for the unified HYSOC pipeline."""
     move_compression_strategy: CompressionStrategy = CompressionStrategy.GEOMETRIC
     stop_compression_strategy: StopCompressionStrategy = STOP_COMPRESSION_DEFAULT_STRATEGY
+    # MEDOID: accepted relative excess of the keypoint's sum of distances (0 = exact)
+    stop_medoid_tolerance: float = STOP_MEDOID_DEFAULT_TOLERANCE
     stop_max_eps_meters: float = STOP_MAX_EPS_METERS
     stop_min_duration_seconds: float = STOP_MIN_DURATION_SECONDS
+    # Bounded-memory STEP: emit partial move chunks past these limits (None = unbounded)
+    step_max_move_points: Optional[int] = STEP_DEFAULT_MAX_MOVE_POINTS
+    step_max_move_seconds: Optional[float] = STEP_DEFAULT_MAX_MOVE_SECONDS
+    # Fused STEP + stop compression: stops keep running statistics, not points (needs compress_stops)
+    step_stop_stats: bool = STEP_DEFAULT_STOP_STATS
     compress_stops: bool = HYSOC_DEFAULT_COMPRESS_STOPS
     squish_buffer_capacity: int = SQUISH_DEFAULT_CAPACITY
+    # GEOMETRIC / SQUISH_E: SQUISH consumes move points as STEP releases them; STEP runs bounded
+    # (step_max_move_seconds defaults to stop_min_duration_seconds) so no move is buffered whole
+    squish_streaming: bool = SQUISH_DEFAULT_STREAMING
+    # SQUISH_E: keep at most 1 in squish_e_ratio points of a move (>= 1, 1 = no ratio bound)
+    # and drop every point whose removal keeps the SED within squish_e_sed_meters
+    squish_e_ratio: float = SQUISH_E_DEFAULT_RATIO
+    squish_e_sed_meters: float = SQUISH_E_DEFAULT_SED_METERS
+    # OPENING_WINDOW: hard SED bound; DEAD_RECKONING: bound on the dead-reckoned position.
+    # Both always stream (STEP runs bounded as with squish_streaming) and emit partial
+    # move results as keypoints appear.
+    opening_window_epsilon_meters: float = OPENING_WINDOW_DEFAULT_EPSILON_METERS
+    dead_reckoning_epsilon_meters: float = DEAD_RECKONING_DEFAULT_EPSILON_METERS
     dp_epsilon_meters: float = DP_DEFAULT_EPSILON_METERS
+    # GEOMETRIC rate control (core.rate_control): at most byte_budget_bytes of segments per
+    # sliding byte_budget_window_seconds; moves over their allowance get a larger DP epsilon
+    byte_budget_bytes: Optional[int] = RATE_CONTROL_DEFAULT_BUDGET_BYTES
+    byte_budget_window_seconds: float = RATE_CONTROL_DEFAULT_WINDOW_SECONDS
+    byte_budget_burst_fraction: float = RATE_CONTROL_DEFAULT_BURST_FRACTION
     trace_config: TraceConfig = field(default_factory=TraceConfig)
     osm_graph: Optional[Any] = None
     enable_map_matching: bool = False
+    # Report the measured core.codec record size as SegmentResult.encoded_bytes
+    measure_encoded_bytes: bool = HYSOC_DEFAULT_MEASURE_ENCODED_BYTES
+    # Rank move keypoints by importance (SegmentResult.ranks) for coarse-to-fine records
+    progressive_keypoints: bool = HYSOC_DEFAULT_PROGRESSIVE_KEYPOINTS
+    # Per-stage latency histograms (core.instrumentation): OFF, SAMPLED (1 in N points) or FULL
+    instrumentation_level: InstrumentationLevel = INSTRUMENTATION_DEFAULT_LEVEL
+    instrumentation_sample_every: int = INSTRUMENTATION_DEFAULT_SAMPLE_EVERY
 
 
 @dataclass(frozen=True)
@@ -51,16 +118,80 @@ class SegmentResult:
     keypoints     — reconstruction points for SED and trajectory rebuilding.
                     For stops: the centroid (one point).
                     For geometric moves: SQUISH/DP output.
+                    For SQUISH-E moves: SQUISH-E output.
+                    For opening-window / dead-reckoning moves: the keypoints
+                    emitted so far (partial) or up to the move end.
                     For network moves: TRACE residual points.
     encoded_bytes — byte cost of the compressed representation.
                     For point-list strategies: len(keypoints) * BYTES_PER_POINT.
                     For TRACE: the actual encoding size from the compressor.
+                    With HYSOCConfig.measure_encoded_bytes: the size of the
+                    binary record written by core.codec.encode_segment.
+    partial       — True for an early move chunk (bounded-memory STEP); the
+                    move continues in the next segment of the same object.
+    ranks         — optional importance rank per keypoint (0 = most important,
+                    a permutation of range(len(keypoints))): the keypoints
+                    with rank < k are the segment's coarse top-k shape, e.g.
+                    the points DP at a larger epsilon or SQUISH at a smaller
+                    capacity would keep. The codec then stores the keypoints
+                    in rank order so readers can decode only a prefix.
     """
     kind: Literal["stop", "move"]
     start_time: datetime
     end_time: datetime
     keypoints: list[Point]
     encoded_bytes: int
+    partial: bool = False
+    ranks: Optional[list[int]] = None
+
+    def top_k(self, k: int) -> list[Point]:
+        """The ``k`` most important keypoints in time order (all without ranks)."""
+        if self.ranks is None or k >= len(self.keypoints):
+            return self.keypoints
+        return [p for p, r in zip(self.keypoints, self.ranks) if r < k]
+
+
+def stitch_partial_moves(segments: list[SegmentResult]) -> list[SegmentResult]:
+    """
+    Joins each run of partial move chunks with the move segment that closes
+    it into one move (keypoints concatenated, byte costs summed). Chunks are
+    contiguous, so the joined keypoints reconstruct the same polyline.
+    A run followed by a stop is complete (the stop ends the move); only a
+    trailing run at the end of the list stays partial. Per-chunk ranks
+    do not order the joined move, so a joined move has none.
+    """
+    stitched: list[SegmentResult] = []
+    run: list[SegmentResult] = []
+    for seg in segments:
+        if seg.kind == "move" and (run or seg.partial):
+            run.append(seg)
+            if not seg.partial:
+                stitched.append(_join_moves(run))
+                run = []
+            continue
+        if run:
+            stitched.append(_join_moves(run, closed=True))
+            run = []
+        stitched.append(seg)
+    if run:
+        stitched.append(_join_moves(run))
+    return stitched
+
+
+def _join_moves(run: list[SegmentResult], closed: bool = False) -> SegmentResult:
+    if len(run) == 1:
+        return replace(run[0], partial=False) if closed and run[0].partial else run[0]
+    keypoints: list[Point] = []
+    for seg in run:
+        keypoints.extend(seg.keypoints)
+    return SegmentResult(
+        kind="move",
+        start_time=run[0].start_time,
+        end_time=run[-1].end_time,
+        keypoints=keypoints,
+        encoded_bytes=sum(seg.encoded_bytes for seg in run),
+        partial=run[-1].partial and not closed,
+    )
 
 
 @dataclass
@@ -70,12 +201,30 @@ class TrajectoryResult:
 
     All strategies — HYSOC-G, HYSOC-N, OracleDP, OracleSTC — produce a
     TrajectoryResult so that eval code operates on a single type.
+
+    original_points may be a columnar TrajectoryBatch; byte metrics then only
+    use its length and never materialise per-point objects.
     """
     object_id: str
-    original_points: list[Point]
+    original_points: list[Point] | TrajectoryBatch
     segments: list[SegmentResult]
     strategy: CompressionStrategy
 
+    @classmethod
+    def from_batch(
+        cls,
+        batch: TrajectoryBatch,
+        segments: list[SegmentResult],
+        strategy: CompressionStrategy,
+    ) -> "TrajectoryResult":
+        """Builds a result whose original trajectory is kept in columnar form."""
+        return cls(
+            object_id=batch.object_id,
+            original_points=batch,
+            segments=segments,
+            strategy=strategy,
+        )
+
     # ------------------------------------------------------------------
     # Reconstruction
     # ------------------------------------------------------------------
@@ -0,0 +1,163 @@
+"""
+HYSOC Core: Per-Stage Latency Instrumentation
+
+Log-bucketed latency histograms keyed by pipeline stage, behind a switchable
+level (constants.instrumentation_defaults.InstrumentationLevel):
+
+  - OFF      the pipeline makes no perf_counter calls.
+  - SAMPLED  1 in every ``sample_every`` points is timed end to end through
+             every stage it triggers; other points pay one counter decrement.
+  - FULL     every point is timed.
+
+Histograms keep counts per bucket (``sub_buckets`` buckets per power of two
+of the latency in nanoseconds), so recording is O(1), memory is bounded, and
+p50 / p95 / p99 are available at any time without storing samples.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional
+
+from constants.instrumentation_defaults import (
+    INSTRUMENTATION_DEFAULT_LEVEL,
+    INSTRUMENTATION_DEFAULT_SAMPLE_EVERY,
+    INSTRUMENTATION_HISTOGRAM_SUB_BUCKETS,
+    InstrumentationLevel,
+)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (values recorded in seconds)."""
+    __slots__ = ("sub_buckets", "buckets", "count", "total_s", "max_s")
+
+    def __init__(self, sub_buckets: int = INSTRUMENTATION_HISTOGRAM_SUB_BUCKETS):
+        self.sub_buckets = sub_buckets
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, seconds: float):
+        ns = seconds * 1e9
+        idx = int(math.log2(ns) * self.sub_buckets) if ns > 1.0 else 0
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.count += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        """Adds the samples of ``other`` (same bucket resolution)."""
+        if other.sub_buckets != self.sub_buckets:
+            raise ValueError("Cannot merge histograms with different bucket resolution")
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.count += other.count
+        self.total_s += other.total_s
+        self.max_s = max(self.max_s, other.max_s)
+
+    def percentile(self, q: float) -> float:
+        """Approximate ``q``-th percentile (0-100) in seconds; 0.0 when empty."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                # Geometric middle of the bucket, never above the observed max.
+                return min(2.0 ** ((idx + 0.5) / self.sub_buckets) * 1e-9, self.max_s)
+        return self.max_s
+
+    def summary(self) -> dict:
+        """count, mean / p50 / p95 / p99 / max in microseconds, total in seconds."""
+        return {
+            "count": self.count,
+            "total_s": self.total_s,
+            "mean_us": self.total_s / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.percentile(50) * 1e6,
+            "p95_us": self.percentile(95) * 1e6,
+            "p99_us": self.percentile(99) * 1e6,
+            "max_us": self.max_s * 1e6,
+        }
+
+
+class Instrumentation:
+    """
+    Per-stage histograms plus the sampling decision.
+
+    The owner calls ``begin_point()`` once per input point and times its
+    stages only while ``active`` is True; nested components (e.g. TRACE)
+    check ``active`` so a sampled point is timed through every stage.
+    """
+
+    def __init__(
+        self,
+        level: InstrumentationLevel = INSTRUMENTATION_DEFAULT_LEVEL,
+        sample_every: int = INSTRUMENTATION_DEFAULT_SAMPLE_EVERY,
+    ):
+        if sample_every < 1:
+            raise ValueError(f"sample_every must be >= 1, got {sample_every}")
+        self.level = level
+        self.sample_every = sample_every
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.active = False
+        self.current_weight = 1.0
+        self.points_seen = 0
+        self.points_timed = 0
+        self._countdown = 1  # time the first point
+
+    @property
+    def enabled(self) -> bool:
+        return self.level is not InstrumentationLevel.OFF
+
+    @property
+    def weight(self) -> float:
+        """Points represented by one timed point (for estimating totals)."""
+        return float(self.sample_every) if self.level is InstrumentationLevel.SAMPLED else 1.0
+
+    def begin_point(self) -> bool:
+        """Decides whether the next point is timed; returns ``active``."""
+        level = self.level
+        if level is InstrumentationLevel.OFF:
+            return False
+        self.points_seen += 1
+        if level is InstrumentationLevel.FULL:
+            self.active = True
+        else:
+            self._countdown -= 1
+            self.active = self._countdown <= 0
+            if self.active:
+                self._countdown = self.sample_every
+        if self.active:
+            self.points_timed += 1
+            self.current_weight = self.weight
+        return self.active
+
+    def begin_flush(self) -> bool:
+        """End-of-stream work is timed whenever instrumentation is enabled, with weight 1."""
+        self.active = self.enabled
+        self.current_weight = 1.0
+        return self.active
+
+    def end_point(self):
+        self.active = False
+
+    def record(self, stage: str, seconds: float):
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms[stage] = LatencyHistogram()
+        hist.record(seconds)
+
+    def histogram(self, stage: str) -> Optional[LatencyHistogram]:
+        return self.histograms.get(stage)
+
+    def summary(self) -> dict:
+        """``{stage: histogram summary}`` plus sampling metadata."""
+        return {
+            "level": self.level.value,
+            "sample_every": self.sample_every if self.level is InstrumentationLevel.SAMPLED else 1,
+            "points_seen": self.points_seen,
+            "points_timed": self.points_timed,
+            "stages": {stage: hist.summary() for stage, hist in sorted(self.histograms.items())},
+        }
@@ -1,6 +1,14 @@
+import math
 from dataclasses import dataclass
 from datetime import datetime
 
+from constants.geo_defaults import EARTH_RADIUS_M
+
+# Naive timestamps are read as UTC wall-clock time everywhere in the engines,
+# matching the TrajectoryBatch (numpy datetime64) convention.
+_EPOCH = datetime(1970, 1, 1)
+
+
 @dataclass(frozen=True)
 class Point:
     """
@@ -17,3 +25,121 @@ class Point:
     def tuple(self):
         return (self.lat, self.lon, self.timestamp, self.obj_id, self.road_id)
 
+
+class LocalProjection:
+    """
+    Local equirectangular ENU projection anchored at an origin fix.
+    x points east and y north, both in meters from the origin, shifted by the
+    optional false easting / northing ``x0`` / ``y0`` (the origin's coordinates).
+    """
+    __slots__ = ("origin_lat", "origin_lon", "lat0_rad", "lon0_rad", "cos_lat0", "x0", "y0")
+
+    def __init__(self, origin_lat: float, origin_lon: float, x0: float = 0.0, y0: float = 0.0):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+        self.lat0_rad = math.radians(origin_lat)
+        self.lon0_rad = math.radians(origin_lon)
+        self.cos_lat0 = math.cos(self.lat0_rad)
+        self.x0 = x0
+        self.y0 = y0
+
+    def project(self, lat: float, lon: float) -> tuple[float, float]:
+        x = (math.radians(lon) - self.lon0_rad) * EARTH_RADIUS_M * self.cos_lat0 + self.x0
+        y = (math.radians(lat) - self.lat0_rad) * EARTH_RADIUS_M + self.y0
+        return x, y
+
+    def unproject(self, x: float, y: float) -> tuple[float, float]:
+        lat = math.degrees((y - self.y0) / EARTH_RADIUS_M + self.lat0_rad)
+        lon = math.degrees((x - self.x0) / (EARTH_RADIUS_M * self.cos_lat0) + self.lon0_rad)
+        return lat, lon
+
+    def reanchored(self, lat: float, lon: float) -> "LocalProjection":
+        """Projection anchored at (lat, lon) that gives it the same coordinates as this one."""
+        x, y = self.project(lat, lon)
+        return LocalProjection(lat, lon, x, y)
+
+    def point(self, p: "Point | ProjectedPoint") -> "ProjectedPoint":
+        """Builds the compact streaming form of ``p`` in this projection."""
+        x, y = self.project(p.lat, p.lon)
+        return ProjectedPoint(
+            p.lat, p.lon, p.timestamp, p.obj_id, p.road_id,
+            to_epoch_seconds(p.timestamp), x, y, self,
+        )
+
+
+class ProjectedPoint:
+    """
+    Compact streaming variant of Point, computed once at ingest.
+
+    Carries the Point fields plus the epoch time ``t`` (float seconds) and the
+    local ENU coordinates ``x``/``y`` (meters) in ``projection``. It compares
+    and hashes equal to the Point with the same fields, so engines can return
+    it wherever a Point is expected. Treat instances as immutable.
+    """
+    __slots__ = ("lat", "lon", "timestamp", "obj_id", "road_id", "t", "x", "y", "projection")
+
+    def __init__(
+        self,
+        lat: float,
+        lon: float,
+        timestamp: datetime,
+        obj_id: str,
+        road_id: str | int | None,
+        t: float,
+        x: float,
+        y: float,
+        projection: LocalProjection,
+    ):
+        self.lat = lat
+        self.lon = lon
+        self.timestamp = timestamp
+        self.obj_id = obj_id
+        self.road_id = road_id
+        self.t = t
+        self.x = x
+        self.y = y
+        self.projection = projection
+
+    @property
+    def tuple(self):
+        return (self.lat, self.lon, self.timestamp, self.obj_id, self.road_id)
+
+    def to_point(self) -> Point:
+        return Point(self.lat, self.lon, self.timestamp, self.obj_id, self.road_id)
+
+    def __eq__(self, other):
+        if isinstance(other, (Point, ProjectedPoint)):
+            return self.tuple == other.tuple
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.tuple)
+
+    def __repr__(self):
+        return (
+            f"ProjectedPoint(lat={self.lat!r}, lon={self.lon!r}, timestamp={self.timestamp!r}, "
+            f"obj_id={self.obj_id!r}, road_id={self.road_id!r}, x={self.x:.2f}, y={self.y:.2f})"
+        )
+
+
+def to_epoch_seconds(ts: datetime) -> float:
+    """Epoch seconds of ``ts``; naive timestamps are read as UTC."""
+    if ts.tzinfo is None:
+        return (ts - _EPOCH).total_seconds()
+    return ts.timestamp()
+
+
+def epoch_seconds(p: "Point | ProjectedPoint") -> float:
+    """Epoch seconds of a point, using the cached value when available."""
+    if p.__class__ is ProjectedPoint:
+        return p.t
+    return to_epoch_seconds(p.timestamp)
+
+
+def shares_projection(p1: "Point | ProjectedPoint", p2: "Point | ProjectedPoint") -> bool:
+    """True when both points carry ENU coordinates in the same projection."""
+    return (
+        p1.__class__ is ProjectedPoint
+        and p2.__class__ is ProjectedPoint
+        and p1.projection is p2.projection
+    )
@@ -0,0 +1,83 @@
+"""
+HYSOC Core: Byte-Budget Rate Control
+
+Per-device byte budget over a sliding window of stream time (e.g. a cellular
+uplink allowance per hour), spent segment by segment:
+
+  - Pacing: the budget accrues at ``budget_bytes / window_seconds`` per
+    second of trajectory time into a bucket of at most
+    ``burst_fraction * budget_bytes``. Moves that need fewer bytes than
+    their share leave the rest for later, more complex moves.
+  - Cap: a move is never allowed more than what keeps the bytes of all
+    segments ending in the last ``window_seconds`` within ``budget_bytes``.
+
+Stops are charged but not shrunk (one keypoint each); the cap holds as long
+as a window's stops alone fit in the budget. The pipeline decides how to fit
+a move into its allowance (HYSOC-G raises the move's DP epsilon).
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional, Tuple
+
+from core.point import to_epoch_seconds
+from constants.rate_control_defaults import (
+    RATE_CONTROL_DEFAULT_BURST_FRACTION,
+    RATE_CONTROL_DEFAULT_WINDOW_SECONDS,
+)
+
+
+class ByteBudgetController:
+    """Byte allowances for one device's segments; see the module docstring."""
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        window_seconds: float = RATE_CONTROL_DEFAULT_WINDOW_SECONDS,
+        burst_fraction: float = RATE_CONTROL_DEFAULT_BURST_FRACTION,
+    ):
+        if budget_bytes <= 0:
+            raise ValueError(f"budget_bytes must be > 0, got {budget_bytes}")
+        if window_seconds <= 0:
+            raise ValueError(f"window_seconds must be > 0, got {window_seconds}")
+        if not 0.0 < burst_fraction <= 1.0:
+            raise ValueError(f"burst_fraction must be in (0, 1], got {burst_fraction}")
+        self.budget_bytes = budget_bytes
+        self.window_seconds = window_seconds
+        self.rate = budget_bytes / window_seconds
+        self.burst_bytes = burst_fraction * budget_bytes
+        self._tokens = self.burst_bytes
+        self._now: Optional[float] = None
+        self._charged: Deque[Tuple[float, int]] = deque()  # (end time, bytes) within the window
+        self._window_bytes = 0
+
+    def _advance(self, t: float) -> None:
+        if self._now is None:
+            self._now = t
+        elif t > self._now:
+            self._tokens = min(self.burst_bytes, self._tokens + (t - self._now) * self.rate)
+            self._now = t
+        horizon = self._now - self.window_seconds
+        charged = self._charged
+        while charged and charged[0][0] <= horizon:
+            self._window_bytes -= charged.popleft()[1]
+
+    def window_bytes(self, now: datetime) -> int:
+        """Bytes charged to segments ending in the window up to ``now``."""
+        self._advance(to_epoch_seconds(now))
+        return self._window_bytes
+
+    def allowance(self, end_time: datetime, demand_bytes: int) -> int:
+        """Bytes a segment ending at ``end_time`` that would like ``demand_bytes`` may use."""
+        self._advance(to_epoch_seconds(end_time))
+        cap = self.budget_bytes - self._window_bytes
+        return max(0, min(demand_bytes, int(self._tokens), cap))
+
+    def record(self, end_time: datetime, nbytes: int) -> None:
+        """Charges an emitted segment (stops too; the bucket may go into debt)."""
+        t = to_epoch_seconds(end_time)
+        self._advance(t)
+        self._tokens -= nbytes
+        self._window_bytes += nbytes
+        self._charged.append((t, nbytes))
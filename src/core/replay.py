@@ -0,0 +1,267 @@
+"""
+HYSOC Core: Accelerated Multi-Device Fleet Replay
+
+Replays a dataset directory (one CSV per device) as one interleaved,
+time-ordered point stream, as a fleet of devices would deliver it:
+
+  - Each file is read lazily in chunks (from the columnar store when it is
+    built and fresh, else from the CSV), and the per-file streams are merged
+    by timestamp with a heap-based k-way merge (``heapq.merge``), so memory
+    is bounded by one chunk per file.
+  - Points are released on a virtual clock: with ``speedup=60`` one hour of
+    recorded data takes one wall-clock minute; ``speedup=inf`` replays as
+    fast as the consumer accepts points. Timestamps are kept as recorded
+    unless ``align_to`` shifts every file to a common start.
+
+``FleetReplay.run`` drives a HYSOCFleetCompressor (or any object with the
+same ``process_point`` / ``flush`` interface) and reports throughput and the
+per-point emission delay: the stream time between a point being released and
+the segment covering it being emitted.
+
+Unlike ``TrajectorySimulator``, nothing sleeps per point; pacing sleeps are
+only taken when the replay runs ahead of the virtual clock.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from constants.columnar_store_defaults import COLUMNAR_STORE_TIMESTAMP_FORMAT
+from constants.replay_defaults import (
+    REPLAY_DEFAULT_CHUNKSIZE,
+    REPLAY_DEFAULT_SPEEDUP,
+    REPLAY_MIN_SLEEP_SECONDS,
+)
+from .columnar_store import WORLDTRACE_CSV_MAPPING, find_store
+from .point import Point, to_epoch_seconds
+from .stream import TrajectoryStream
+
+
+class VirtualClock:
+    """
+    Maps stream time to wall time at a fixed speedup. ``time_fn`` and
+    ``sleep_fn`` are injectable so tests can run without sleeping.
+    """
+
+    def __init__(
+        self,
+        speedup: float = REPLAY_DEFAULT_SPEEDUP,
+        time_fn: Callable[[], float] = time.perf_counter,
+        sleep_fn: Callable[[float], None] = time.sleep,
+    ):
+        if not speedup > 0:
+            raise ValueError(f"speedup must be > 0, got {speedup}")
+        self.speedup = speedup
+        self.time_fn = time_fn
+        self.sleep_fn = sleep_fn
+        self.stream_origin: Optional[float] = None
+        self.wall_origin: Optional[float] = None
+        self.slept_seconds = 0.0
+
+    @property
+    def unbounded(self) -> bool:
+        return math.isinf(self.speedup)
+
+    def start(self, stream_t: float):
+        """Anchors stream time ``stream_t`` (epoch seconds) to the current wall time."""
+        self.stream_origin = stream_t
+        self.wall_origin = self.time_fn()
+
+    def wait_until(self, stream_t: float):
+        """Blocks until the virtual clock reaches ``stream_t`` (no-op when unbounded)."""
+        if self.stream_origin is None:
+            self.start(stream_t)
+            return
+        if self.unbounded:
+            return
+        ahead = self.wall_origin + (stream_t - self.stream_origin) / self.speedup - self.time_fn()
+        if ahead >= REPLAY_MIN_SLEEP_SECONDS:
+            self.sleep_fn(ahead)
+            self.slept_seconds += ahead
+
+
+@dataclass(frozen=True)
+class ReplayStats:
+    """Summary of one ``FleetReplay.run``."""
+    points: int
+    objects: int
+    segments: int
+    wall_seconds: float
+    stream_seconds: float
+    emission_delay_p50_s: float
+    emission_delay_p95_s: float
+    emission_delay_max_s: float
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def effective_speedup(self) -> float:
+        """Stream seconds replayed per wall second."""
+        return self.stream_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+
+class FleetReplay:
+    """
+    Time-ordered replay of every ``*.csv`` in a directory (or of an explicit
+    list of files). Object id = file stem. Each file must be sorted by time.
+    """
+
+    def __init__(
+        self,
+        source: str | Path | Sequence[str | Path],
+        speedup: float = REPLAY_DEFAULT_SPEEDUP,
+        max_files: Optional[int] = None,
+        chunksize: int = REPLAY_DEFAULT_CHUNKSIZE,
+        timestamp_format: Optional[str] = COLUMNAR_STORE_TIMESTAMP_FORMAT,
+        col_mapping: Optional[Dict[str, str]] = None,
+        use_store: bool = True,
+        align_to: Optional[datetime] = None,
+        clock: Optional[VirtualClock] = None,
+    ):
+        """
+        Args:
+            source: Dataset directory, or a list of CSV paths.
+            speedup: Virtual-clock speedup (``float("inf")`` = as fast as possible).
+            max_files: Replay only the first ``max_files`` files (sorted by name).
+            chunksize: Rows read ahead per file.
+            timestamp_format: strptime format of the CSV time column.
+            col_mapping: CSV column mapping (default: WorldTrace columns).
+            use_store: Read files from the columnar store when it is fresh.
+            align_to: Shift every file so that its first point is at this
+                      time, replaying recordings from different days as
+                      one concurrent fleet.
+            clock: Custom clock (overrides ``speedup``).
+        """
+        if isinstance(source, (str, Path)) and Path(source).is_dir():
+            files = sorted(Path(source).glob("*.csv"))
+        elif isinstance(source, (str, Path)):
+            files = [Path(source)]
+        else:
+            files = [Path(f) for f in source]
+        if max_files is not None:
+            files = files[:max_files]
+        if not files:
+            raise FileNotFoundError(f"No CSV files to replay in {source}")
+
+        self.files: List[Path] = files
+        self.chunksize = chunksize
+        self.timestamp_format = timestamp_format
+        self.col_mapping = dict(col_mapping or WORLDTRACE_CSV_MAPPING)
+        self.use_store = use_store
+        self.align_to = align_to
+        self.clock = clock if clock is not None else VirtualClock(speedup)
+
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+
+    def _file_points(self, csv_path: Path) -> Iterator[Point]:
+        points = self._read_file(csv_path)
+        if self.align_to is None:
+            return points
+        return self._aligned(points)
+
+    def _aligned(self, points: Iterator[Point]) -> Iterator[Point]:
+        shift = None
+        for p in points:
+            if shift is None:
+                shift = self.align_to - p.timestamp
+            yield Point(p.lat, p.lon, p.timestamp + shift, p.obj_id, p.road_id)
+
+    def _read_file(self, csv_path: Path) -> Iterator[Point]:
+        stem = csv_path.stem
+        store = find_store(csv_path.parent) if self.use_store else None
+        if store is not None and stem in store and store.is_fresh(stem, csv_path):
+            batch = store.load(stem)
+            for start in range(0, len(batch), self.chunksize):
+                yield from batch[start:start + self.chunksize].to_points()
+            return
+        yield from TrajectoryStream(
+            csv_path,
+            col_mapping=self.col_mapping,
+            default_obj_id=stem,
+            chunksize=self.chunksize,
+            timestamp_format=self.timestamp_format,
+            skip_invalid=True,  # as the store build, so both paths replay the same rows
+        ).stream()
+
+    def merged(self) -> Iterator[Point]:
+        """All files merged by timestamp, without pacing."""
+        return heapq.merge(*(self._file_points(f) for f in self.files), key=lambda p: p.timestamp)
+
+    def stream(self) -> Iterator[Point]:
+        """Merged stream released on the virtual clock."""
+        clock = self.clock
+        for point in self.merged():
+            clock.wait_until(to_epoch_seconds(point.timestamp))
+            yield point
+
+    # ------------------------------------------------------------------
+    # Driving a pipeline
+    # ------------------------------------------------------------------
+
+    def run(self, pipeline, sink: Optional[Callable[[str, object], None]] = None) -> ReplayStats:
+        """
+        Replays the stream through ``pipeline.process_point`` and finally
+        ``pipeline.flush()``; both must return ``(obj_id, SegmentResult)``
+        pairs (HYSOCFleetCompressor). Every emitted pair is passed to ``sink``.
+
+        Emission delay: when a segment of an object is emitted at stream time
+        ``now`` (the newest released point), every pending point of that
+        object up to the segment end is charged ``now - point time``. Points
+        still pending at the end are charged at the final flush.
+        """
+        pending: Dict[str, deque] = {}
+        delays: List[float] = []
+        n_points = 0
+        n_segments = 0
+        first_t = now = None
+
+        def account(emitted: Iterable):
+            nonlocal n_segments
+            for obj_id, seg in emitted:
+                n_segments += 1
+                queue = pending.get(obj_id)
+                if queue:
+                    end_t = to_epoch_seconds(seg.end_time)
+                    while queue and queue[0] <= end_t:
+                        delays.append(now - queue.popleft())
+                if sink is not None:
+                    sink(obj_id, seg)
+
+        wall_start = time.perf_counter()
+        for point in self.stream():
+            t = to_epoch_seconds(point.timestamp)
+            if first_t is None:
+                first_t = t
+            now = t
+            n_points += 1
+            pending.setdefault(point.obj_id, deque()).append(t)
+            account(pipeline.process_point(point))
+
+        account(pipeline.flush())
+        for queue in pending.values():
+            delays.extend(now - t for t in queue)
+        wall_seconds = time.perf_counter() - wall_start
+
+        arr = np.asarray(delays) if delays else np.zeros(1)
+        return ReplayStats(
+            points=n_points,
+            objects=len(pending),
+            segments=n_segments,
+            wall_seconds=wall_seconds,
+            stream_seconds=(now - first_t) if n_points else 0.0,
+            emission_delay_p50_s=float(np.percentile(arr, 50)),
+            emission_delay_p95_s=float(np.percentile(arr, 95)),
+            emission_delay_max_s=float(arr.max()),
+        )
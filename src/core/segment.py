@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Literal
 from .point import Point
+from .stop_stats import StopStats
 
 @dataclass(frozen=True)
 class Segment:
@@ -26,12 +28,45 @@ class Segment:
 class Stop(Segment):
     """
     Represents a Stop segment.
+
+    ``stats`` is set by a segmenter running in fused stop-statistics mode:
+    the stop is then summarised by running statistics and ``points`` is empty.
     """
     centroid: Point | None = None
+    stats: StopStats | None = None
+
+    @property
+    def start_time(self) -> datetime:
+        if self.stats is not None:
+            return self.stats.start_time
+        return super().start_time
+
+    @property
+    def end_time(self) -> datetime:
+        if self.stats is not None:
+            return self.stats.end_time
+        return super().end_time
 
 @dataclass(frozen=True)
 class Move(Segment):
     """
     Represents a Move segment.
+
+    ``partial`` marks a chunk emitted early by a length-bounded segmenter:
+    the move continues in the next Move, which starts with the point right
+    after this chunk's last point.
+    """
+    partial: bool = False
+
+@dataclass(frozen=True)
+class SegmentSpan:
+    """
+    Index range [start, stop) of a Stop or Move inside a TrajectoryBatch.
+    Produced by batch engines that never materialise per-point objects.
     """
-    pass
+    kind: Literal["stop", "move"]
+    start: int
+    stop: int
+
+    def __len__(self) -> int:
+        return self.stop - self.start
@@ -21,6 +21,9 @@ class TrajectorySimulator(Simulator):
     """
     Simulates a device stream by reading a trajectory CSV file and emitting
     points at a fixed interval with updated timestamps.
+
+    Sleeps ``interval`` seconds per point; for multi-device load tests use
+    core.replay.FleetReplay, which merges many files on a virtual clock.
     """
 
     def __init__(
@@ -0,0 +1,85 @@
+import random
+from datetime import datetime
+from typing import List, Optional
+
+from .point import Point
+from constants.stop_compression_defaults import STOP_STATS_RESERVOIR_SIZE, STOP_STATS_RESERVOIR_SEED
+
+
+class StopStats:
+    """
+    Running sufficient statistics of a stop, updated one point at a time.
+
+    Holds what stop compression needs without the raw points: count and
+    coordinate sums (exact centroid), bounding box, first point, time range,
+    and a uniform reservoir sample (Algorithm R) of at most
+    ``reservoir_size`` points for the SNAP_TO_NEAREST / MEDOID strategies.
+    Points must be added in stream order.
+    """
+
+    __slots__ = (
+        "count", "sum_lat", "sum_lon", "min_lat", "max_lat", "min_lon", "max_lon",
+        "first", "end_time", "reservoir", "reservoir_size", "_rng",
+    )
+
+    def __init__(self, reservoir_size: int = STOP_STATS_RESERVOIR_SIZE):
+        if reservoir_size < 1:
+            raise ValueError(f"reservoir_size must be >= 1, got {reservoir_size}")
+        self.count = 0
+        self.sum_lat = 0.0
+        self.sum_lon = 0.0
+        self.min_lat = float("inf")
+        self.max_lat = float("-inf")
+        self.min_lon = float("inf")
+        self.max_lon = float("-inf")
+        self.first: Optional[Point] = None
+        self.end_time: Optional[datetime] = None
+        self.reservoir: List[Point] = []
+        self.reservoir_size = reservoir_size
+        self._rng = random.Random(STOP_STATS_RESERVOIR_SEED)
+
+    def add(self, p: Point) -> None:
+        if self.first is None:
+            self.first = p
+        self.count += 1
+        lat = p.lat
+        lon = p.lon
+        self.sum_lat += lat
+        self.sum_lon += lon
+        if lat < self.min_lat:
+            self.min_lat = lat
+        if lat > self.max_lat:
+            self.max_lat = lat
+        if lon < self.min_lon:
+            self.min_lon = lon
+        if lon > self.max_lon:
+            self.max_lon = lon
+        self.end_time = p.timestamp
+
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(p)
+        else:
+            j = self._rng.randrange(self.count)
+            if j < self.reservoir_size:
+                self.reservoir[j] = p
+
+    def extend(self, points: List[Point]) -> None:
+        for p in points:
+            self.add(p)
+
+    @property
+    def start_time(self) -> datetime:
+        if self.first is None:
+            raise ValueError("StopStats is empty")
+        return self.first.timestamp
+
+    def centroid(self) -> Point:
+        """Mean lat/lon of the added points, stamped at the stop start."""
+        if self.first is None:
+            raise ValueError("StopStats is empty")
+        return Point(
+            lat=self.sum_lat / self.count,
+            lon=self.sum_lon / self.count,
+            timestamp=self.first.timestamp,
+            obj_id=self.first.obj_id,
+        )
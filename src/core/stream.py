@@ -1,23 +1,72 @@
-import pandas as pd 
+import time
+from dataclasses import dataclass
 from typing import Iterator, Dict, Optional
 from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from constants.stream_defaults import STREAM_DEFAULT_CHUNKSIZE
+from .batch import NO_ROAD, TrajectoryBatch
 from .point import Point
 
+
+def _road_column(col: pd.Series) -> pd.Series:
+    """Integer road ids of a column with gaps (parsed as float) back as ints, gaps as NA."""
+    if col.dtype.kind == 'f' and col.hasnans:
+        known = col.dropna()
+        if (known == np.floor(known)).all():
+            return col.astype('Int64')
+    return col
+
+
+@dataclass
+class IngestStats:
+    """
+    Ingest counters of the last pass over the file.
+    ``seconds`` covers CSV parsing and conversion only, not the time the
+    consumer spends on the yielded points.
+    """
+    rows: int = 0
+    skipped_rows: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
 class TrajectoryStream:
     """
     Simulates a live GPS stream by reading a CSV file line-by-line.
     Handles both multi-object streams (via column) and single-object files (via default_id)
+
+    Chunks are converted column-wise; pass ``timestamp_format`` (e.g.
+    "%Y-%m-%d %H:%M:%S") to skip per-row format inference when parsing time.
+    With ``skip_invalid``, rows whose time, lat or lon is missing or does not
+    parse are skipped (counted in ``stats.skipped_rows``) instead of raising
+    or yielding NaN / NaT.
     """
     def __init__(
         self,
         filepath: str | Path,
         sep: str= ',',
         col_mapping: Dict[str, str] = None,
-        default_obj_id: Optional[str] = 'unknown_obj'
+        default_obj_id: Optional[str] = 'unknown_obj',
+        chunksize: int = STREAM_DEFAULT_CHUNKSIZE,
+        timestamp_format: Optional[str] = None,
+        skip_invalid: bool = False,
     ):
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be >= 1, got {chunksize}")
         self.filepath = Path(filepath)
         self.sep = sep
         self.default_obj_id = default_obj_id
+        self.chunksize = chunksize
+        self.timestamp_format = timestamp_format
+        self.skip_invalid = skip_invalid
+        self.stats = IngestStats()
 
         self.mapping = col_mapping or {
             'lat': 'lat',
@@ -27,13 +76,11 @@ class TrajectoryStream:
             'road_id': 'osm_way_id'
         }
 
-    def stream(self) -> Iterator[Point]:
-        """
-        Yields points from the stream one by one.
-        """
+    def _resolve_columns(self) -> tuple[bool, bool]:
+        """Resolves the column mapping against the file header; returns (has_id_col, has_road_col)."""
         header = pd.read_csv(self.filepath, nrows=0, sep=self.sep)
         header_cols = set(header.columns)
-        
+
         # Auto-detect columns if the configured ones are missing
         variants = {
             'lat': ['lat', 'latitude', 'y'],
@@ -42,7 +89,7 @@ class TrajectoryStream:
             'obj_id': ['obj_id', 'oid', 'user_id', 'trajectory_id'],
             'road_id': ['road_id', 'osm_way_id', 'edge_id']
         }
-        
+
         for key, possible_names in variants.items():
             current_col = self.mapping.get(key)
             # If current mapping is invalid/missing in file, try to find an alternative
@@ -51,20 +98,117 @@ class TrajectoryStream:
                     if name in header_cols:
                         self.mapping[key] = name
                         break
-        
+
         has_id_col = self.mapping.get('obj_id') in header_cols
         has_road_col = self.mapping.get('road_id') in header_cols
+        return has_id_col, has_road_col
 
-        with pd.read_csv(self.filepath, chunksize=1000, sep=self.sep) as reader:
+    def _chunks(self) -> Iterator[tuple[pd.DataFrame, pd.Series]]:
+        """
+        Yields (chunk, parsed timestamps) and keeps ``self.stats`` up to date.
+        Only the mapped columns are parsed.
+        """
+        has_id_col, has_road_col = self._resolve_columns()
+        m = self.mapping
+        usecols = [m['lat'], m['lon'], m['timestamp']]
+        if has_id_col:
+            usecols.append(m['obj_id'])
+        if has_road_col:
+            usecols.append(m['road_id'])
+
+        self.stats = IngestStats()
+        started = time.perf_counter()
+        with pd.read_csv(
+            self.filepath,
+            chunksize=self.chunksize,
+            sep=self.sep,
+            usecols=usecols,
+            dtype=None if self.skip_invalid else {m['lat']: np.float64, m['lon']: np.float64},
+        ) as reader:
             for chunk in reader:
-                chunk[self.mapping['timestamp']] = pd.to_datetime(chunk[self.mapping['timestamp']])
-                
-                for _, row in chunk.iterrows():
-                    yield Point(
-                        lat=row[self.mapping['lat']],
-                        lon=row[self.mapping['lon']],
-                        timestamp=row[self.mapping['timestamp']],
-                        obj_id=row[self.mapping['obj_id']] if has_id_col else self.default_obj_id,
-                        road_id=row[self.mapping['road_id']] if has_road_col else None
-                    )
+                self.stats.rows += len(chunk)
+                if self.skip_invalid:
+                    chunk, ts = self._valid_rows(chunk)
+                else:
+                    ts = pd.to_datetime(chunk[m['timestamp']], format=self.timestamp_format)
+                self.stats.chunks += 1
+                self.stats.seconds += time.perf_counter() - started
+                yield chunk, ts
+                started = time.perf_counter()
+        self.stats.seconds += time.perf_counter() - started
+
+    def _valid_rows(self, chunk: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+        """Rows of ``chunk`` with a parseable time, lat and lon (as float64), and their times."""
+        m = self.mapping
+        lat = pd.to_numeric(chunk[m['lat']], errors='coerce').astype(np.float64)
+        lon = pd.to_numeric(chunk[m['lon']], errors='coerce').astype(np.float64)
+        ts = pd.to_datetime(chunk[m['timestamp']], format=self.timestamp_format, errors='coerce')
+        chunk = chunk.assign(**{m['lat']: lat, m['lon']: lon})
+        valid = lat.notna() & lon.notna() & ts.notna()
+        if not valid.all():
+            self.stats.skipped_rows += int((~valid).sum())
+            chunk, ts = chunk[valid], ts[valid]
+        return chunk, ts
 
+    def stream(self) -> Iterator[Point]:
+        """
+        Yields points from the stream one by one.
+        Timestamps are plain ``datetime`` objects; missing road ids are None.
+        """
+        for chunk, ts in self._chunks():
+            m = self.mapping
+            started = time.perf_counter()
+            n = len(chunk)
+            lats = chunk[m['lat']].tolist()
+            lons = chunk[m['lon']].tolist()
+            timestamps = pd.DatetimeIndex(ts).to_pydatetime().tolist()
+            if m.get('obj_id') in chunk.columns:
+                obj_ids = chunk[m['obj_id']].tolist()
+            else:
+                obj_ids = [self.default_obj_id] * n
+            if m.get('road_id') in chunk.columns:
+                road_col = _road_column(chunk[m['road_id']])
+                if road_col.hasnans:
+                    road_col = road_col.astype(object).where(road_col.notna(), None)
+                road_ids = road_col.tolist()
+            else:
+                road_ids = [None] * n
+            points = list(map(Point, lats, lons, timestamps, obj_ids, road_ids))
+            self.stats.seconds += time.perf_counter() - started
+            yield from points
+
+    def stream_batches(self) -> Iterator[TrajectoryBatch]:
+        """
+        Yields one columnar TrajectoryBatch per chunk (see ``chunksize``).
+        Object and road ids are interned per chunk.
+        """
+        for chunk, ts in self._chunks():
+            m = self.mapping
+            started = time.perf_counter()
+            n = len(chunk)
+            if ts.dt.tz is not None:
+                ts = ts.dt.tz_convert('UTC').dt.tz_localize(None)
+            epoch_us = ts.to_numpy().astype('datetime64[us]').view(np.int64)
+            if m.get('obj_id') in chunk.columns:
+                # A missing object id is its own object (as in stream()), not the sentinel -1
+                obj_code, obj_ids = pd.factorize(chunk[m['obj_id']], use_na_sentinel=False)
+                obj_ids = tuple(obj_ids.tolist())
+            else:
+                obj_code, obj_ids = np.zeros(n, dtype=np.int32), (self.default_obj_id,)
+            if m.get('road_id') in chunk.columns:
+                # NaN road ids get the factorize sentinel -1 (NO_ROAD)
+                road_code, road_ids = pd.factorize(_road_column(chunk[m['road_id']]))
+                road_ids = tuple(road_ids.tolist())
+            else:
+                road_code, road_ids = np.full(n, NO_ROAD, dtype=np.int32), ()
+            batch = TrajectoryBatch(
+                lat=chunk[m['lat']].to_numpy(dtype=np.float64),
+                lon=chunk[m['lon']].to_numpy(dtype=np.float64),
+                epoch_us=np.ascontiguousarray(epoch_us),
+                road_code=np.asarray(road_code, dtype=np.int32),
+                obj_code=np.asarray(obj_code, dtype=np.int32),
+                road_ids=road_ids,
+                obj_ids=obj_ids,
+            )
+            self.stats.seconds += time.perf_counter() - started
+            yield batch
@@ -3,10 +3,13 @@ Flat registry of shared trajectory algorithms used across HYSOC and oracle pipel
 
 One file per algorithm:
     dp             - Ramer-Douglas-Peucker line simplification
-    squish         - SQUISH SED-based priority-queue geometric compressor
+    squish         - SQUISH SED-based priority-queue geometric compressor (and SQUISH-E)
+    opening_window - Online opening-window compressor with a hard SED bound
+    dead_reckoning - Online dead-reckoning compressor
     squish_dp      - Hybrid SQUISH + DP refinement compressor
     trace          - TRACE network-semantic k-mer referential compressor
     step           - STEP streaming stay-point segmenter
+    step_multi     - STEP over a grid of (D, T) settings in one offline pass
     stop_compressor- Stop centroid/duration compressor
     hmm            - Online HMM map matcher (Viterbi sliding window)
     map_matched_stream - Stream wrapper that injects map-matched road_ids
@@ -15,13 +18,16 @@ One file per algorithm:
     stc            - STC offline network-semantic move compressor
 """
 
-from .dp import DouglasPeuckerCompressor
+from .dead_reckoning import DeadReckoningCompressor
+from .dp import DouglasPeuckerCompressor, DPSignificance
 from .hmm import OnlineMapMatcher
 from .map_matched_stream import MapMatchedStreamWrapper
+from .opening_window import OpeningWindowCompressor
 from .squish import SquishCompressor
 from .squish_dp import HybridSquishDPCompressor, HybridSquishDPConfig
 from .stc import STCOracle
 from .step import STEPSegmenter
+from .step_multi import MultiSTEPSegmenter
 from .stop_compressor import CompressedStop, StopCompressor
 from .stss_manual import STSSOracleManual
 from .stss_sklearn import STSSOracleSklearn
@@ -29,11 +35,15 @@ from .trace import Reference, TraceCompressor
 
 __all__ = [
     "CompressedStop",
+    "DeadReckoningCompressor",
     "DouglasPeuckerCompressor",
+    "DPSignificance",
     "HybridSquishDPCompressor",
     "HybridSquishDPConfig",
     "MapMatchedStreamWrapper",
+    "MultiSTEPSegmenter",
     "OnlineMapMatcher",
+    "OpeningWindowCompressor",
     "Reference",
     "STCOracle",
     "STEPSegmenter",
@@ -0,0 +1,110 @@
+import math
+from typing import List, Optional, Sequence
+
+from constants.dead_reckoning_defaults import DEAD_RECKONING_DEFAULT_EPSILON_METERS
+from constants.geo_defaults import METERS_PER_DEGREE_LAT
+from core.point import Point, epoch_seconds
+
+_NO_KEYPOINTS: Sequence[Point] = ()
+
+
+class DeadReckoningStream:
+    """
+    Dead-reckoning move compression with O(1) work and memory per point.
+
+    The predicted position at time t starts from the last keypoint and moves
+    at the velocity between the last two keypoints (zero after the first).
+    A point is emitted as a keypoint as soon as it lies more than
+    ``epsilon_meters`` from that prediction. A receiver can therefore
+    dead-reckon every position within epsilon from the keypoints alone,
+    without separate velocity updates. The last point of a move is always a
+    keypoint.
+
+    The bound holds for the dead-reckoned position, not for linear
+    interpolation between keypoints (how SED is evaluated). Use
+    OpeningWindowStream when SED needs a hard bound.
+
+    Distances are in meters on an equirectangular projection at the first
+    point pushed since the last ``finish``.
+    """
+
+    def __init__(self, epsilon_meters: float = DEAD_RECKONING_DEFAULT_EPSILON_METERS):
+        if epsilon_meters < 0:
+            raise ValueError(f"epsilon_meters must be >= 0, got {epsilon_meters}")
+        self.epsilon_meters = epsilon_meters
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lat0: Optional[float] = None
+        self._lon0 = 0.0
+        self._meters_per_deg_lon = 0.0
+        self._has_anchor = False
+        self._ax = self._ay = self._at = 0.0
+        self._vx = self._vy = 0.0
+        self._last: Optional[Point] = None  # newest point, if not a keypoint yet
+        self._pushed = 0
+
+    @property
+    def pushed(self) -> int:
+        """Points pushed since the last ``finish``."""
+        return self._pushed
+
+    def __len__(self) -> int:
+        """Points held that have not been emitted as keypoints (0 or 1)."""
+        return 0 if self._last is None else 1
+
+    def push(self, point: Point) -> Sequence[Point]:
+        """Adds the next point; returns it as a keypoint if the prediction misses it."""
+        self._pushed += 1
+        lat = point.lat
+        if self._lat0 is None:
+            self._lat0 = lat
+            self._lon0 = point.lon
+            self._meters_per_deg_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+        x = (point.lon - self._lon0) * self._meters_per_deg_lon
+        y = (lat - self._lat0) * METERS_PER_DEGREE_LAT
+        t = epoch_seconds(point)
+
+        if not self._has_anchor:
+            self._has_anchor = True
+            self._ax, self._ay, self._at = x, y, t
+            return (point,)
+
+        dt = t - self._at
+        if math.hypot(x - (self._ax + self._vx * dt), y - (self._ay + self._vy * dt)) <= self.epsilon_meters:
+            self._last = point
+            return _NO_KEYPOINTS
+
+        if dt > 0.0:
+            self._vx = (x - self._ax) / dt
+            self._vy = (y - self._ay) / dt
+        else:
+            self._vx = self._vy = 0.0
+        self._ax, self._ay, self._at = x, y, t
+        self._last = None
+        return (point,)
+
+    def finish(self) -> List[Point]:
+        """Returns the remaining keypoint (the last point, if not emitted yet) and resets."""
+        result = [] if self._last is None else [self._last]
+        self._reset()
+        return result
+
+
+class DeadReckoningCompressor:
+    """Online dead-reckoning move compressor; see DeadReckoningStream."""
+
+    def __init__(self, epsilon_meters: float = DEAD_RECKONING_DEFAULT_EPSILON_METERS):
+        DeadReckoningStream(epsilon_meters)  # validates the parameters
+        self.epsilon_meters = epsilon_meters
+
+    def stream(self) -> DeadReckoningStream:
+        return DeadReckoningStream(self.epsilon_meters)
+
+    def compress(self, points: List[Point]) -> List[Point]:
+        stream = self.stream()
+        keypoints: List[Point] = []
+        for p in points:
+            keypoints.extend(stream.push(p))
+        keypoints.extend(stream.finish())
+        return keypoints
@@ -1,14 +1,28 @@
 import math
-from typing import List
+from typing import Iterable, List, Optional, Tuple, Union
 
-from constants.dp_defaults import DP_DEFAULT_EPSILON_METERS
+import numpy as np
+
+from constants.dp_defaults import DP_DEFAULT_EPSILON_METERS, DP_SCAN_SCALAR_POINTS
 from constants.geo_defaults import METERS_PER_DEGREE_LAT
+from core.batch import TrajectoryBatch
 from core.point import Point
 
+# Relative band below the vectorized maximum within which candidates are
+# re-scored with the scalar metric, so splits match it bit for bit.
+_NEAR_MAX = 1e-9
+
 
 class DouglasPeuckerCompressor:
     """
     Implements the standard offline Ramer-Douglas-Peucker (DP) line simplification algorithm.
+
+    Split ranges are processed from an explicit stack over coordinate arrays
+    (no slicing, no recursion limit); each range's farthest point is found
+    with one vectorized distance pass.
+
+    ``significance`` runs the split hierarchy once, for every epsilon at once
+    (see DPSignificance).
     """
 
     def __init__(self, epsilon_meters: float = DP_DEFAULT_EPSILON_METERS):
@@ -26,37 +40,13 @@ class DouglasPeuckerCompressor:
         Calculates the perpendicular geometric distance from 'point' to the line passing
         through 'start' and 'end' in meters.
         """
-        if start.lat == end.lat and start.lon == end.lon:
-            # The line is actually a single point
-            d_lat = point.lat - start.lat
-            d_lon = point.lon - start.lon
-            avg_lat = math.radians((point.lat + start.lat) / 2.0)
-            d_lat_m = d_lat * METERS_PER_DEGREE_LAT
-            d_lon_m = d_lon * METERS_PER_DEGREE_LAT * math.cos(avg_lat)
-            return math.sqrt(d_lat_m * d_lat_m + d_lon_m * d_lon_m)
-
-        # Standard cross-track distance approximation for short distances
-        avg_lat = math.radians((start.lat + end.lat + point.lat) / 3.0)
-
-        # Convert all to local metric space centered around (start.lon, start.lat) == (0,0)
-        x0 = (point.lon - start.lon) * METERS_PER_DEGREE_LAT * math.cos(avg_lat)
-        y0 = (point.lat - start.lat) * METERS_PER_DEGREE_LAT
-
-        x2 = (end.lon - start.lon) * METERS_PER_DEGREE_LAT * math.cos(avg_lat)
-        y2 = (end.lat - start.lat) * METERS_PER_DEGREE_LAT
-
-        # Line from start(0,0) to end(x2, y2). Eq: y2*x - x2*y = 0
-        num = abs(y2 * x0 - x2 * y0)
-        den = math.sqrt(y2**2 + x2**2)
-
-        if den == 0:
-            return 0.0
-
-        return num / den
+        return _perpendicular_distance_deg(
+            point.lat, point.lon, start.lat, start.lon, end.lat, end.lon
+        )
 
     def compress(self, points: List[Point]) -> List[Point]:
         """
-        Applies the DP algorithm to recursively simplify the sequence of points.
+        Applies the DP algorithm to simplify the sequence of points.
 
         Args:
             points: Ordered sequence of raw points to simplify.
@@ -64,25 +54,245 @@ class DouglasPeuckerCompressor:
         Returns:
             A simplified, ordered list of preserved points.
         """
-        if len(points) <= 2:
+        n = len(points)
+        if n <= 2:
             return points
 
-        dmax = 0.0
-        index = 0
-        end = len(points) - 1
-
-        for i in range(1, end):
-            d = self._perpendicular_distance(points[i], points[0], points[end])
-            if d > dmax:
-                index = i
-                dmax = d
-
-        if dmax > self.epsilon_meters:
-            # Recursive call
-            results1 = self.compress(points[:index + 1])
-            results2 = self.compress(points[index:])
-
-            # Combine, excluding the duplicate point at 'index'
-            return results1[:-1] + results2
-        else:
-            return [points[0], points[end]]
+        lats = np.fromiter((p.lat for p in points), dtype=np.float64, count=n)
+        lons = np.fromiter((p.lon for p in points), dtype=np.float64, count=n)
+        return [points[i] for i in self.compress_indices(lats, lons).tolist()]
+
+    def compress_batch(self, batch: TrajectoryBatch) -> TrajectoryBatch:
+        """
+        Applies DP to a columnar trajectory without building Point objects.
+
+        Returns the retained rows as a new TrajectoryBatch.
+        """
+        return batch.take(self.compress_indices(batch.lat, batch.lon))
+
+    def compress_indices(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Runs DP over raw coordinate columns and returns the sorted indices of
+        the retained points. Equivalent to ``compress`` on the same points.
+        """
+        n = len(lats)
+        if n <= 2:
+            return np.arange(n, dtype=np.intp)
+
+        lat = np.asarray(lats, dtype=np.float64)
+        lon = np.asarray(lons, dtype=np.float64)
+        lat_list = lat.tolist()
+        lon_list = lon.tolist()
+        keep = np.zeros(n, dtype=bool)
+        keep[0] = keep[n - 1] = True
+        epsilon = self.epsilon_meters
+        stack = [(0, n - 1)]
+        while stack:
+            first, last = stack.pop()
+            if last - first < 2:
+                continue
+            if last - first <= DP_SCAN_SCALAR_POINTS:
+                index, dmax = _farthest_scalar(lat_list, lon_list, first, last, range(first + 1, last))
+            else:
+                index, dmax = _farthest(lat, lon, lat_list, lon_list, first, last)
+            if dmax > epsilon:
+                keep[index] = True
+                stack.append((index, last))
+                stack.append((first, index))
+        return np.flatnonzero(keep)
+
+    def significance(self, points: List[Point]) -> "DPSignificance":
+        """Split hierarchy of ``points``; ``select(eps)`` equals DP at any eps >= 0."""
+        n = len(points)
+        lats = np.fromiter((p.lat for p in points), dtype=np.float64, count=n)
+        lons = np.fromiter((p.lon for p in points), dtype=np.float64, count=n)
+        return DPSignificance(points, self.significance_values(lats, lons))
+
+    def significance_batch(self, batch: TrajectoryBatch) -> "DPSignificance":
+        """Columnar form of ``significance``; ``select`` returns TrajectoryBatch rows."""
+        return DPSignificance(batch, self.significance_values(batch.lat, batch.lon))
+
+    def significance_values(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Per point, the largest epsilon at which DP still keeps it (inf for the
+        endpoints, 0.0 for points no split ever selects). DP at epsilon >= 0
+        keeps exactly the points whose value exceeds epsilon.
+
+        DP splits every range at the same point whatever epsilon is, and
+        only stops once the split distance is <= epsilon, so a point survives
+        iff its own split distance and those of all enclosing ranges exceed
+        epsilon: its value is the minimum over that chain. Independent of
+        ``self.epsilon_meters``.
+        """
+        n = len(lats)
+        values = np.zeros(n, dtype=np.float64)
+        if n == 0:
+            return values
+        values[0] = values[n - 1] = math.inf
+        lat = np.asarray(lats, dtype=np.float64)
+        lon = np.asarray(lons, dtype=np.float64)
+        lat_list = lat.tolist()
+        lon_list = lon.tolist()
+        stack = [(0, n - 1, math.inf)]
+        while stack:
+            first, last, bound = stack.pop()
+            if last - first < 2:
+                continue
+            if last - first <= DP_SCAN_SCALAR_POINTS:
+                index, dmax = _farthest_scalar(lat_list, lon_list, first, last, range(first + 1, last))
+            else:
+                index, dmax = _farthest(lat, lon, lat_list, lon_list, first, last)
+            if dmax > 0.0:
+                value = min(bound, dmax)
+                values[index] = value
+                stack.append((index, last, value))
+                stack.append((first, index, value))
+        return values
+
+
+class DPSignificance:
+    """
+    Douglas-Peucker significance hierarchy of one trajectory, from
+    ``DouglasPeuckerCompressor.significance``: each epsilon's output is a
+    threshold filter over ``values`` (O(n) per query, no re-run), identical to
+    ``DouglasPeuckerCompressor(epsilon).compress`` on the same points.
+    """
+
+    __slots__ = ("points", "values")
+
+    def __init__(self, points: Union[List[Point], TrajectoryBatch], values: np.ndarray):
+        self.points = points
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def indices(self, epsilon_meters: float) -> np.ndarray:
+        """Sorted indices DP keeps at ``epsilon_meters`` (>= 0)."""
+        if epsilon_meters < 0:
+            raise ValueError(f"epsilon_meters must be >= 0, got {epsilon_meters}")
+        return np.flatnonzero(self.values > epsilon_meters)
+
+    def num_kept(self, epsilon_meters: float) -> int:
+        return len(self.indices(epsilon_meters))
+
+    def epsilon_for(self, max_points: int, epsilon_meters: float = 0.0) -> float:
+        """
+        Smallest epsilon >= ``epsilon_meters`` at which DP keeps at most
+        ``max_points`` points (inf, i.e. nothing kept, below two points).
+        """
+        if self.num_kept(epsilon_meters) <= max_points:
+            return epsilon_meters
+        if max_points <= 0:
+            return math.inf
+        # The (max_points + 1)-th largest value: strictly above it are at most max_points points.
+        return float(-np.partition(-self.values, max_points)[max_points])
+
+    def ranks(self, epsilon_meters: Optional[float] = None) -> List[int]:
+        """
+        Importance rank of each point ``select(epsilon_meters)`` returns (all
+        points if None): by decreasing value, ties oldest first, so the end
+        points rank 0 and 1 and the points ranked below k are DP's output at
+        the epsilon that keeps k points (up to ties).
+        """
+        idx = np.arange(len(self.values)) if epsilon_meters is None else self.indices(epsilon_meters)
+        order = np.argsort(-self.values[idx], kind="stable")
+        ranks = np.empty(len(idx), dtype=np.int64)
+        ranks[order] = np.arange(len(idx))
+        return ranks.tolist()
+
+    def select(self, epsilon_meters: float) -> Union[List[Point], TrajectoryBatch]:
+        """DP output at ``epsilon_meters``: Points, or rows for a TrajectoryBatch."""
+        idx = self.indices(epsilon_meters)
+        if isinstance(self.points, TrajectoryBatch):
+            return self.points.take(idx)
+        points = self.points
+        return [points[i] for i in idx.tolist()]
+
+
+def _farthest_scalar(
+    lats: List[float], lons: List[float], first: int, last: int, candidates: Iterable[int]
+) -> Tuple[int, float]:
+    """(index, distance) of the first farthest candidate from the line first-last; (first, 0.0) if none."""
+    dmax = 0.0
+    index = first
+    s_lat, s_lon = lats[first], lons[first]
+    e_lat, e_lon = lats[last], lons[last]
+    for i in candidates:
+        d = _perpendicular_distance_deg(lats[i], lons[i], s_lat, s_lon, e_lat, e_lon)
+        if d > dmax:
+            index = i
+            dmax = d
+    return index, dmax
+
+
+def _farthest(
+    lat: np.ndarray, lon: np.ndarray, lats: List[float], lons: List[float], first: int, last: int
+) -> Tuple[int, float]:
+    """
+    Vectorized form of ``_farthest_scalar`` over every interior point of
+    first-last. The points scoring within ``_NEAR_MAX`` of the maximum are
+    re-scored with the scalar metric, so a platform whose numpy math differs
+    in the last bits still splits at the same point.
+    """
+    d = _perpendicular_distances_deg(
+        lat[first + 1:last], lon[first + 1:last], lats[first], lons[first], lats[last], lons[last]
+    )
+    vmax = float(d.max())
+    if not vmax > 0.0:
+        return first, 0.0
+    near = np.flatnonzero(d >= vmax * (1.0 - _NEAR_MAX)) + (first + 1)
+    return _farthest_scalar(lats, lons, first, last, near.tolist())
+
+
+def _perpendicular_distance_deg(
+    lat: float, lon: float, s_lat: float, s_lon: float, e_lat: float, e_lon: float
+) -> float:
+    """Perpendicular distance in meters from (lat, lon) to the line start-end."""
+    if s_lat == e_lat and s_lon == e_lon:
+        # The line is actually a single point
+        d_lat = lat - s_lat
+        d_lon = lon - s_lon
+        avg_lat = math.radians((lat + s_lat) / 2.0)
+        d_lat_m = d_lat * METERS_PER_DEGREE_LAT
+        d_lon_m = d_lon * METERS_PER_DEGREE_LAT * math.cos(avg_lat)
+        return math.sqrt(d_lat_m * d_lat_m + d_lon_m * d_lon_m)
+
+    # Standard cross-track distance approximation for short distances
+    avg_lat = math.radians((s_lat + e_lat + lat) / 3.0)
+
+    # Convert all to local metric space centered around (start.lon, start.lat) == (0,0)
+    x0 = (lon - s_lon) * METERS_PER_DEGREE_LAT * math.cos(avg_lat)
+    y0 = (lat - s_lat) * METERS_PER_DEGREE_LAT
+
+    x2 = (e_lon - s_lon) * METERS_PER_DEGREE_LAT * math.cos(avg_lat)
+    y2 = (e_lat - s_lat) * METERS_PER_DEGREE_LAT
+
+    # Line from start(0,0) to end(x2, y2). Eq: y2*x - x2*y = 0
+    num = abs(y2 * x0 - x2 * y0)
+    den = math.sqrt(y2**2 + x2**2)
+
+    if den == 0:
+        return 0.0
+
+    return num / den
+
+
+def _perpendicular_distances_deg(
+    lat: np.ndarray, lon: np.ndarray, s_lat: float, s_lon: float, e_lat: float, e_lon: float
+) -> np.ndarray:
+    """``_perpendicular_distance_deg`` over arrays of points, same operations in the same order."""
+    if s_lat == e_lat and s_lon == e_lon:
+        d_lat_m = (lat - s_lat) * METERS_PER_DEGREE_LAT
+        d_lon_m = (lon - s_lon) * METERS_PER_DEGREE_LAT * np.cos(np.radians((lat + s_lat) / 2.0))
+        return np.sqrt(d_lat_m * d_lat_m + d_lon_m * d_lon_m)
+
+    cos_lat = np.cos(np.radians((s_lat + e_lat + lat) / 3.0))
+    x0 = (lon - s_lon) * METERS_PER_DEGREE_LAT * cos_lat
+    y0 = (lat - s_lat) * METERS_PER_DEGREE_LAT
+    x2 = (e_lon - s_lon) * METERS_PER_DEGREE_LAT * cos_lat
+    y2 = (e_lat - s_lat) * METERS_PER_DEGREE_LAT
+
+    num = np.abs(y2 * x0 - x2 * y0)
+    den = np.sqrt(y2**2 + x2**2)
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
@@ -0,0 +1,169 @@
+import math
+from typing import List, Optional, Sequence
+
+from constants.geo_defaults import METERS_PER_DEGREE_LAT
+from constants.opening_window_defaults import (
+    OPENING_WINDOW_DEFAULT_EPSILON_METERS,
+    OPENING_WINDOW_POLYGON_SIDES,
+)
+from core.point import Point, epoch_seconds
+
+_NO_KEYPOINTS: Sequence[Point] = ()
+
+
+class OpeningWindowStream:
+    """
+    One-pass opening-window move compression with a hard SED bound and O(1)
+    work and memory per point.
+
+    The window runs from the last keypoint (anchor) to the newest point
+    (float). A new point extends it if the segment anchor -> point keeps the
+    SED of every point in the window within ``epsilon_meters``. Otherwise
+    the float becomes a keypoint at once (``push`` returns it) and becomes
+    the new anchor. Keypoints are original points.
+
+    The window is never rescanned, following the synchronous-distance cone
+    test of Lin et al. (VLDB J. 2019). In velocity space
+    v = (end - anchor) / (t_end - t_anchor), window point i stays within
+    epsilon iff v is inside the disk centred on its own velocity from the
+    anchor with radius epsilon / (t_i - t_anchor). Each disk is replaced by
+    its inscribed regular ``polygon_sides``-gon, all with the same edge
+    normals, so their intersection is one offset per normal.
+
+    Distances are in meters on an equirectangular projection at the first
+    point pushed since the last ``finish``.
+    """
+
+    def __init__(
+        self,
+        epsilon_meters: float = OPENING_WINDOW_DEFAULT_EPSILON_METERS,
+        polygon_sides: int = OPENING_WINDOW_POLYGON_SIDES,
+    ):
+        if epsilon_meters < 0:
+            raise ValueError(f"epsilon_meters must be >= 0, got {epsilon_meters}")
+        if polygon_sides < 3:
+            raise ValueError(f"polygon_sides must be >= 3, got {polygon_sides}")
+        self.epsilon_meters = epsilon_meters
+        self.polygon_sides = polygon_sides
+        angles = [2.0 * math.pi * k / polygon_sides for k in range(polygon_sides)]
+        self._normals = [(math.cos(a), math.sin(a)) for a in angles]
+        # Inscribed polygon of a disk of radius r: every edge at distance r * apothem.
+        self._apothem = math.cos(math.pi / polygon_sides)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lat0: Optional[float] = None
+        self._lon0 = 0.0
+        self._meters_per_deg_lon = 0.0
+        self._anchor: Optional[Point] = None
+        self._ax = self._ay = self._at = 0.0
+        self._float: Optional[Point] = None
+        self._fx = self._fy = self._ft = 0.0
+        self._offsets = [math.inf] * self.polygon_sides
+        self._pushed = 0
+
+    @property
+    def pushed(self) -> int:
+        """Points pushed since the last ``finish``."""
+        return self._pushed
+
+    def __len__(self) -> int:
+        """Points held that have not been emitted as keypoints (0 or 1)."""
+        return 0 if self._float is None else 1
+
+    def push(self, point: Point) -> Sequence[Point]:
+        """Adds the next point; returns the keypoints it closes (usually none)."""
+        self._pushed += 1
+        lat = point.lat
+        if self._lat0 is None:
+            self._lat0 = lat
+            self._lon0 = point.lon
+            self._meters_per_deg_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+        x = (point.lon - self._lon0) * self._meters_per_deg_lon
+        y = (lat - self._lat0) * METERS_PER_DEGREE_LAT
+        t = epoch_seconds(point)
+
+        if self._anchor is None:
+            self._set_anchor(point, x, y, t)
+            return (point,)
+        if self._extend(point, x, y, t):
+            return _NO_KEYPOINTS
+
+        # The window cannot reach this point: its float is a keypoint and the new anchor.
+        keypoint = self._float
+        if keypoint is None:
+            # Nothing in the window (timestamp not after the anchor's): keep the point itself.
+            self._set_anchor(point, x, y, t)
+            return (point,)
+        self._set_anchor(keypoint, self._fx, self._fy, self._ft)
+        if self._extend(point, x, y, t):
+            return (keypoint,)
+        self._set_anchor(point, x, y, t)
+        return (keypoint, point)
+
+    def finish(self) -> List[Point]:
+        """Returns the remaining keypoint (the last point, if not emitted yet) and resets."""
+        result = [] if self._float is None else [self._float]
+        self._reset()
+        return result
+
+    def _set_anchor(self, point: Point, x: float, y: float, t: float) -> None:
+        self._anchor = point
+        self._ax = x
+        self._ay = y
+        self._at = t
+        self._float = None
+        offsets = self._offsets
+        for k in range(len(offsets)):
+            offsets[k] = math.inf
+
+    def _extend(self, point: Point, x: float, y: float, t: float) -> bool:
+        """Makes ``point`` the float if anchor -> point bounds the window's SED."""
+        dt = t - self._at
+        if dt <= 0.0:
+            return False
+        vx = (x - self._ax) / dt
+        vy = (y - self._ay) / dt
+        offsets = self._offsets
+        projections = [vx * nx + vy * ny for nx, ny in self._normals]
+        for k, proj in enumerate(projections):
+            if proj > offsets[k]:
+                return False
+        # The point joins the window: its own disk constrains later ends.
+        radius = self._apothem * self.epsilon_meters / dt
+        for k, proj in enumerate(projections):
+            bound = proj + radius
+            if bound < offsets[k]:
+                offsets[k] = bound
+        self._float = point
+        self._fx = x
+        self._fy = y
+        self._ft = t
+        return True
+
+
+class OpeningWindowCompressor:
+    """
+    Online opening-window move compressor with a hard SED bound; see
+    OpeningWindowStream.
+    """
+
+    def __init__(
+        self,
+        epsilon_meters: float = OPENING_WINDOW_DEFAULT_EPSILON_METERS,
+        polygon_sides: int = OPENING_WINDOW_POLYGON_SIDES,
+    ):
+        OpeningWindowStream(epsilon_meters, polygon_sides)  # validates the parameters
+        self.epsilon_meters = epsilon_meters
+        self.polygon_sides = polygon_sides
+
+    def stream(self) -> OpeningWindowStream:
+        return OpeningWindowStream(self.epsilon_meters, self.polygon_sides)
+
+    def compress(self, points: List[Point]) -> List[Point]:
+        stream = self.stream()
+        keypoints: List[Point] = []
+        for p in points:
+            keypoints.extend(stream.push(p))
+        keypoints.extend(stream.finish())
+        return keypoints
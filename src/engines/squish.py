@@ -1,23 +1,254 @@
-from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Optional
-import heapq
+from typing import Any, List, Optional, Tuple
 import math
-from core.point import Point
-from constants.squish_defaults import SQUISH_DEFAULT_CAPACITY
-
-@dataclass(order=True)
-class PriorityObject:
-    priority: float
-    index: int = field(compare=False)
-
-class Node:
-    def __init__(self, point: Point, index: int):
-        self.point = point
-        self.index = index
-        self.prev: Optional['Node'] = None
-        self.next: Optional['Node'] = None
-        self.priority = float('inf')
-        self.removed = False
+from core.batch import TrajectoryBatch
+from core.point import Point, epoch_seconds
+from constants.geo_defaults import METERS_PER_DEGREE_LAT
+from constants.squish_defaults import (
+    SQUISH_DEFAULT_CAPACITY,
+    SQUISH_E_DEFAULT_RATIO,
+    SQUISH_E_DEFAULT_SED_METERS,
+    SQUISH_E_INITIAL_SLOTS,
+    SQUISH_E_MIN_CAPACITY,
+)
+
+class SquishStream:
+    """
+    Incremental SQUISH over one trajectory (or move): ``push`` points as they
+    arrive, ``finish`` returns the surviving points in order.
+
+    Holds at most ``capacity`` points plus the newest one in fixed slot
+    arrays (coordinates, epoch seconds, prev/next links, priority), and the
+    interior points in an indexed binary heap keyed on (SED priority, arrival
+    order): a neighbour whose priority changes is moved in place
+    (decrease/increase-key), so there are no stale entries and no per-update
+    allocations. Memory is bounded by the capacity however long the stream
+    runs. ``SquishCompressor.compress`` is implemented on top of it.
+    """
+
+    def __init__(self, capacity: int = SQUISH_DEFAULT_CAPACITY):
+        if capacity < 3:
+            raise ValueError("Buffer capacity must be at least 3 to maintain start, end, and one intermediate point.")
+        self.capacity = capacity
+        self._reset()
+
+    def _initial_slots(self) -> int:
+        return self.capacity + 1
+
+    def _reset(self) -> None:
+        size = self._initial_slots()
+        self._item: List[Any] = [None] * size
+        # Coordinates the SED is measured in (degrees here, meters in SQUISH-E)
+        self._ys = [0.0] * size
+        self._xs = [0.0] * size
+        self._t = [0.0] * size
+        self._seq = [0] * size  # arrival order, breaks priority ties (oldest first)
+        self._prev = [-1] * size
+        self._next = [-1] * size
+        self._prio = [math.inf] * size
+        self._pos = [-1] * size  # heap position of an interior slot, else -1
+        self._heap: List[int] = []
+        self._free = list(range(size - 1, -1, -1))
+        self._head = -1
+        self._tail = -1
+        self._count = 0
+        self._pushed = 0
+
+    def __len__(self) -> int:
+        """Number of points currently buffered."""
+        return self._count
+
+    @property
+    def pushed(self) -> int:
+        """Number of points pushed since the last ``finish``."""
+        return self._pushed
+
+    def push(self, point: Point) -> None:
+        self._push(point, point.lat, point.lon, epoch_seconds(point))
+
+    def finish(self) -> List[Any]:
+        """Returns the surviving points (oldest first) and starts a new stream."""
+        result = []
+        nxt = self._next
+        item = self._item
+        s = self._head
+        while s != -1:
+            result.append(item[s])
+            s = nxt[s]
+        self._reset()
+        return result
+
+    def finish_ranked(self) -> Tuple[List[Any], List[int]]:
+        """
+        ``finish`` plus an importance rank per survivor: the end points rank
+        0 and 1, interior points in reverse order of the evictions SQUISH
+        would make if it kept evicting the lowest priority, so the points
+        ranked below k are the survivors once only k remain.
+        """
+        slots = []
+        s = self._head
+        while s != -1:
+            slots.append(s)
+            s = self._next[s]
+        if not slots:
+            return [], []
+        rank = {slots[0]: 0}
+        if len(slots) > 1:
+            rank[slots[-1]] = 1
+        dropped = []
+        while self._heap:
+            s = self._heap_pop()
+            dropped.append(s)
+            item = self._item[s]
+            self._unlink(s)
+            self._item[s] = item  # still needed for the result
+        for r, s in enumerate(reversed(dropped), start=len(rank)):
+            rank[s] = r
+        result = [self._item[s] for s in slots]
+        ranks = [rank[s] for s in slots]
+        self._reset()
+        return result, ranks
+
+    def _push(self, item: Any, y: float, x: float, t: float) -> None:
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._item[slot] = item
+        self._ys[slot] = y
+        self._xs[slot] = x
+        self._t[slot] = t
+        self._seq[slot] = self._pushed
+        self._pushed += 1
+        self._next[slot] = -1
+        last = self._tail
+        self._prev[slot] = last
+        self._tail = slot
+        self._count += 1
+        if last == -1:
+            self._head = slot
+            return
+
+        self._next[last] = slot
+        if self._prev[last] != -1:
+            self._set_priority(last)
+
+        if self._count > self.capacity:
+            # Buffer full: remove the interior point with min priority.
+            self._unlink(self._heap_pop())
+
+    def _grow(self) -> None:
+        """Doubles the slot arrays (only streams with a growing buffer need it)."""
+        size = len(self._item)
+        self._item.extend([None] * size)
+        self._ys.extend([0.0] * size)
+        self._xs.extend([0.0] * size)
+        self._t.extend([0.0] * size)
+        self._seq.extend([0] * size)
+        self._prev.extend([-1] * size)
+        self._next.extend([-1] * size)
+        self._prio.extend([math.inf] * size)
+        self._pos.extend([-1] * size)
+        self._free.extend(range(2 * size - 1, size - 1, -1))
+
+    def _priority(self, a: int, s: int, c: int) -> float:
+        """Priority of slot ``s`` between its neighbours ``a`` and ``c``: its SED."""
+        ys = self._ys
+        xs = self._xs
+        t = self._t
+        return _sed_priority(ys[a], xs[a], t[a], ys[s], xs[s], t[s], ys[c], xs[c], t[c])
+
+    def _set_priority(self, s: int) -> None:
+        """Recomputes the priority of interior slot ``s`` and restores the heap."""
+        p = self._priority(self._prev[s], s, self._next[s])
+        old = self._prio[s]
+        self._prio[s] = p
+        i = self._pos[s]
+        if i == -1:
+            self._heap.append(s)
+            self._pos[s] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+        elif p < old:
+            self._sift_up(i)
+        elif p > old:
+            self._sift_down(i)
+
+    def _heap_pop(self) -> int:
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        self._pos[top] = -1
+        if heap:
+            heap[0] = last
+            self._pos[last] = 0
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, i: int) -> None:
+        heap = self._heap
+        pos = self._pos
+        prio = self._prio
+        seq = self._seq
+        s = heap[i]
+        p = prio[s]
+        q = seq[s]
+        while i > 0:
+            parent = (i - 1) >> 1
+            u = heap[parent]
+            pu = prio[u]
+            if pu < p or (pu == p and seq[u] < q):
+                break
+            heap[i] = u
+            pos[u] = i
+            i = parent
+        heap[i] = s
+        pos[s] = i
+
+    def _sift_down(self, i: int) -> None:
+        heap = self._heap
+        pos = self._pos
+        prio = self._prio
+        seq = self._seq
+        n = len(heap)
+        s = heap[i]
+        p = prio[s]
+        q = seq[s]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            u = heap[child]
+            pu = prio[u]
+            right = child + 1
+            if right < n:
+                v = heap[right]
+                pv = prio[v]
+                if pv < pu or (pv == pu and seq[v] < seq[u]):
+                    child = right
+                    u = v
+                    pu = pv
+            if p < pu or (p == pu and q < seq[u]):
+                break
+            heap[i] = u
+            pos[u] = i
+            i = child
+        heap[i] = s
+        pos[s] = i
+
+    def _unlink(self, s: int) -> None:
+        """Removes interior slot ``s`` (already out of the heap) and re-prioritises its neighbours."""
+        prev_s = self._prev[s]
+        next_s = self._next[s]
+        self._next[prev_s] = next_s
+        self._prev[next_s] = prev_s
+        self._item[s] = None
+        self._prio[s] = math.inf
+        self._free.append(s)
+        self._count -= 1
+
+        if self._prev[prev_s] != -1:
+            self._set_priority(prev_s)
+        if self._next[next_s] != -1:
+            self._set_priority(next_s)
+
 
 class SquishCompressor:
     def __init__(self, capacity: int = SQUISH_DEFAULT_CAPACITY):
@@ -31,6 +262,10 @@ class SquishCompressor:
             raise ValueError("Buffer capacity must be at least 3 to maintain start, end, and one intermediate point.")
         self.capacity = capacity
 
+    def stream(self, capacity: Optional[int] = None) -> SquishStream:
+        """A new incremental compressor with this compressor's (or the given) capacity."""
+        return SquishStream(capacity if capacity is not None else self.capacity)
+
     def compress(self, points: List[Point], capacity: Optional[int] = None) -> List[Point]:
         """
         Compresses a list of points using the SQUISH algorithm.
@@ -49,103 +284,178 @@ class SquishCompressor:
         if len(points) <= target_capacity:
             return points
 
-        nodes: List[Node] = [Node(p, i) for i, p in enumerate(points)]
-        
-        # Priority queue to efficiently find the point with minimum SED error
-        pq: List[PriorityObject] = []
-        
-        # Maintain a linked buffer of active nodes
-        current_buffer_nodes: List[Node] = []
-        
-        for i in range(len(points)):
-            new_node = nodes[i]
-            
-            if len(current_buffer_nodes) < target_capacity:
-                if current_buffer_nodes:
-                    last_node = current_buffer_nodes[-1]
-                    last_node.next = new_node
-                    new_node.prev = last_node
-                    
-                    if last_node.prev:
-                        p = self._compute_priority(last_node.prev.point, last_node.point, new_node.point)
-                        last_node.priority = p
-                        heapq.heappush(pq, PriorityObject(p, last_node.index))
-                        
-                current_buffer_nodes.append(new_node)
-                
-            else:
-                # Buffer full. Link new node to end and remove the node with min priority.
-                last_node = current_buffer_nodes[-1]
-                last_node.next = new_node
-                new_node.prev = last_node
-                
-                if last_node.prev:
-                     p = self._compute_priority(last_node.prev.point, last_node.point, new_node.point)
-                     last_node.priority = p
-                     heapq.heappush(pq, PriorityObject(p, last_node.index))
-
-                current_buffer_nodes.append(new_node)
-                
-                # Find valid victim (lazy removal from heap)
-                while True:
-                    victim_item = heapq.heappop(pq)
-                    victim_idx = victim_item.index
-                    victim_node = nodes[victim_idx]
-                    
-                    if not victim_node.removed and victim_node.priority == victim_item.priority:
-                        break
-                
-                self._remove_node(victim_node, pq)
-                # Note: removing from list is O(K), could be optimized but K is small.
-                current_buffer_nodes.remove(victim_node)
-
-        # Collect results by traversing the surviving linked list
-        result = []
-        head = nodes[0]
-        curr = head
-        while curr:
-            result.append(curr.point)
-            curr = curr.next
-            
-        return result
+        stream = SquishStream(target_capacity)
+        for p in points:
+            stream.push(p)
+        return stream.finish()
 
-    def _remove_node(self, node: Node, pq: List[PriorityObject]):
-        node.removed = True
-        prev_node = node.prev
-        next_node = node.next
-        
-        if prev_node:
-            prev_node.next = next_node
-        if next_node:
-            next_node.prev = prev_node
-            
-        if prev_node and prev_node.prev and next_node:
-            p = self._compute_priority(prev_node.prev.point, prev_node.point, next_node.point)
-            prev_node.priority = p
-            heapq.heappush(pq, PriorityObject(p, prev_node.index))
-            
-        if next_node and next_node.next and prev_node:
-            p = self._compute_priority(prev_node.point, next_node.point, next_node.next.point)
-            next_node.priority = p
-            heapq.heappush(pq, PriorityObject(p, next_node.index))
-
-    def _compute_priority(self, p1: Point, p2: Point, p3: Point) -> float:
+    def compress_ranked(
+        self, points: List[Point], capacity: Optional[int] = None
+    ) -> Tuple[List[Point], List[int]]:
+        """``compress`` plus each kept point's importance rank (see SquishStream.finish_ranked)."""
+        stream = self.stream(capacity)
+        for p in points:
+            stream.push(p)
+        return stream.finish_ranked()
+
+    def compress_batch(self, batch: TrajectoryBatch, capacity: Optional[int] = None) -> TrajectoryBatch:
         """
-        Compute the Synchronized Euclidean Distance (SED) error.
+        Compresses a columnar trajectory without building Point objects.
+        Returns the surviving rows as a new TrajectoryBatch.
         """
-        t1 = p1.timestamp.timestamp()
-        t2 = p2.timestamp.timestamp()
-        t3 = p3.timestamp.timestamp()
-        
-        if t1 == t3:
-            return 0.0
+        target_capacity = capacity if capacity is not None else self.capacity
+        if len(batch) <= target_capacity:
+            return batch
 
-        ratio = (t2 - t1) / (t3 - t1)
-        
-        lat_pred = p1.lat + (p3.lat - p1.lat) * ratio
-        lon_pred = p1.lon + (p3.lon - p1.lon) * ratio
-        
-        d_lat = p2.lat - lat_pred
-        d_lon = p2.lon - lon_pred
-        
-        return math.sqrt(d_lat*d_lat + d_lon*d_lon)
+        stream = SquishStream(target_capacity)
+        for i, (lat, lon, t) in enumerate(zip(batch.lat.tolist(), batch.lon.tolist(), batch.epoch_seconds.tolist())):
+            stream._push(i, lat, lon, t)
+        return batch.take(stream.finish())
+
+
+class SquishEStream(SquishStream):
+    """
+    Incremental SQUISH-E(lambda, mu) (Muckell et al., GeoInformatica 2014).
+
+    Priorities are SED in meters (local equirectangular projection at the
+    stream's first point) plus the largest priority of any neighbour removed
+    next to the point so far, which makes every priority an upper bound on
+    the SED the point's removal causes, including earlier removals it absorbs.
+
+    - ``ratio`` (lambda >= 1): the buffer is capped at max(4, i / lambda)
+      after i points, so the compression ratio is at least lambda.
+    - ``sed_bound_meters`` (mu >= 0): any point whose priority is at most mu
+      is removed as soon as it is (not only at the end as in the paper, which
+      keeps memory low on straight moves). With ratio = 1 the SED of every
+      removed point is at most mu; a ratio cap above 1 takes precedence
+      and may remove points beyond mu.
+    """
+
+    def __init__(
+        self,
+        ratio: float = SQUISH_E_DEFAULT_RATIO,
+        sed_bound_meters: float = SQUISH_E_DEFAULT_SED_METERS,
+    ):
+        if ratio < 1.0:
+            raise ValueError(f"ratio must be >= 1, got {ratio}")
+        if sed_bound_meters < 0.0:
+            raise ValueError(f"sed_bound_meters must be >= 0, got {sed_bound_meters}")
+        self.ratio = ratio
+        self.sed_bound_meters = sed_bound_meters
+        self.capacity = SQUISH_E_MIN_CAPACITY
+        self._reset()
+
+    def _initial_slots(self) -> int:
+        return SQUISH_E_INITIAL_SLOTS
+
+    def _reset(self) -> None:
+        super()._reset()
+        self._acc = [0.0] * len(self._item)  # largest priority removed next to each slot
+        self._lat0: Optional[float] = None
+        self._lon0 = 0.0
+        self._meters_per_deg_lon = 0.0
+
+    def _grow(self) -> None:
+        self._acc.extend([0.0] * len(self._item))
+        super()._grow()
+
+    def push(self, point: Point) -> None:
+        self._push_degrees(point, point.lat, point.lon, epoch_seconds(point))
+
+    def _push_degrees(self, item: Any, lat: float, lon: float, t: float) -> None:
+        if self._lat0 is None:
+            self._lat0 = lat
+            self._lon0 = lon
+            self._meters_per_deg_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+        y = (lat - self._lat0) * METERS_PER_DEGREE_LAT
+        x = (lon - self._lon0) * self._meters_per_deg_lon
+        self._push(item, y, x, t)
+
+    def _push(self, item: Any, y: float, x: float, t: float) -> None:
+        # The base push evicts once the buffer exceeds self.capacity.
+        self.capacity = max(SQUISH_E_MIN_CAPACITY, int((self._pushed + 1) / self.ratio))
+        super()._push(item, y, x, t)
+        heap = self._heap
+        prio = self._prio
+        mu = self.sed_bound_meters
+        while heap and prio[heap[0]] <= mu:
+            self._unlink(self._heap_pop())
+
+    def _priority(self, a: int, s: int, c: int) -> float:
+        return self._acc[s] + super()._priority(a, s, c)
+
+    def _unlink(self, s: int) -> None:
+        p = self._prio[s]
+        acc = self._acc
+        prev_s = self._prev[s]
+        next_s = self._next[s]
+        if p > acc[prev_s]:
+            acc[prev_s] = p
+        if p > acc[next_s]:
+            acc[next_s] = p
+        acc[s] = 0.0
+        super()._unlink(s)
+
+
+class SquishECompressor:
+    """
+    Error-bounded SQUISH-E(lambda, mu) move compressor; see SquishEStream.
+    Same interface as SquishCompressor, without a fixed capacity.
+    """
+
+    def __init__(
+        self,
+        ratio: float = SQUISH_E_DEFAULT_RATIO,
+        sed_bound_meters: float = SQUISH_E_DEFAULT_SED_METERS,
+    ):
+        SquishEStream(ratio, sed_bound_meters)  # validates the parameters
+        self.ratio = ratio
+        self.sed_bound_meters = sed_bound_meters
+
+    def stream(self) -> SquishEStream:
+        return SquishEStream(self.ratio, self.sed_bound_meters)
+
+    def compress(self, points: List[Point]) -> List[Point]:
+        stream = self.stream()
+        for p in points:
+            stream.push(p)
+        return stream.finish()
+
+    def compress_ranked(self, points: List[Point]) -> Tuple[List[Point], List[int]]:
+        """``compress`` plus each kept point's importance rank (see SquishStream.finish_ranked)."""
+        stream = self.stream()
+        for p in points:
+            stream.push(p)
+        return stream.finish_ranked()
+
+    def compress_batch(self, batch: TrajectoryBatch) -> TrajectoryBatch:
+        """Compresses a columnar trajectory; returns the surviving rows."""
+        if len(batch) == 0:
+            return batch
+        stream = self.stream()
+        for i, (lat, lon, t) in enumerate(zip(batch.lat.tolist(), batch.lon.tolist(), batch.epoch_seconds.tolist())):
+            stream._push_degrees(i, lat, lon, t)
+        return batch.take(stream.finish())
+
+
+def _sed_priority(
+    lat1: float, lon1: float, t1: float,
+    lat2: float, lon2: float, t2: float,
+    lat3: float, lon3: float, t3: float,
+) -> float:
+    """
+    Compute the Synchronized Euclidean Distance (SED) error of point 2
+    with respect to the segment 1 -> 3 (in degree space).
+    """
+    if t1 == t3:
+        return 0.0
+
+    ratio = (t2 - t1) / (t3 - t1)
+    
+    lat_pred = lat1 + (lat3 - lat1) * ratio
+    lon_pred = lon1 + (lon3 - lon1) * ratio
+    
+    d_lat = lat2 - lat_pred
+    d_lon = lon2 - lon_pred
+    
+    return math.sqrt(d_lat*d_lat + d_lon*d_lon)
@@ -50,6 +50,7 @@ class HybridSquishDPCompressor:
         *,
         capacity: Optional[int] = None,
         dp_epsilon_meters: Optional[float] = None,
+        max_keypoints: Optional[int] = None,
     ) -> List[Point]:
         """
         Compress a single move segment.
@@ -58,6 +59,9 @@ class HybridSquishDPCompressor:
             points: Ordered GPS points belonging to one Move segment.
             capacity: Optional override of the fixed buffer capacity.
             dp_epsilon_meters: Optional override of DP's epsilon (meters).
+            max_keypoints: Optional keypoint budget (rate control): SQUISH's capacity
+                is capped at it (but stays >= 3), and DP's epsilon is raised for this
+                segment until at most this many points remain (none below two).
         """
         if not points:
             return []
@@ -68,14 +72,22 @@ class HybridSquishDPCompressor:
         # If we never exceed capacity, the SQUISH buffer contains the entire segment.
         # This exactly matches the "evictions_occurred == False" branch in the idea doc.
         if len(points) <= cap:
-            dp = DouglasPeuckerCompressor(epsilon_meters=dp_eps)
-            return dp.compress(points)
+            return _dp_within(points, dp_eps, max_keypoints)
 
-        squish_points = self._squish.compress(points, capacity=cap)
+        squish_cap = cap if max_keypoints is None else max(3, min(cap, max_keypoints))
+        squish_points = self._squish.compress(points, capacity=squish_cap)
 
-        if not self.config.dp_refine_when_evictions:
-            return squish_points
+        if self.config.dp_refine_when_evictions:
+            return _dp_within(squish_points, dp_eps, max_keypoints)
+        if max_keypoints is not None and len(squish_points) > max_keypoints:
+            return _dp_within(squish_points, 0.0, max_keypoints)
+        return squish_points
 
-        dp = DouglasPeuckerCompressor(epsilon_meters=dp_eps)
-        return dp.compress(squish_points)
+
+def _dp_within(points: List[Point], dp_eps: float, max_keypoints: Optional[int]) -> List[Point]:
+    """DP at ``dp_eps``, or at the smallest larger epsilon keeping at most ``max_keypoints``."""
+    if max_keypoints is None:
+        return DouglasPeuckerCompressor(epsilon_meters=dp_eps).compress(points)
+    significance = DouglasPeuckerCompressor().significance(points)
+    return significance.select(significance.epsilon_for(max_keypoints, dp_eps))
 
@@ -1,15 +1,36 @@
+import array
 import math
-from typing import List, Tuple, Optional
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Optional
 from datetime import datetime
 
-from core.point import Point
-from core.segment import Segment, Stop, Move
+import numpy as np
+
+from core.batch import TrajectoryBatch
+from core.point import LocalProjection, Point, ProjectedPoint
+from core.segment import Segment, SegmentSpan, Stop, Move
+from core.stop_stats import StopStats
 from constants.geo_defaults import EARTH_RADIUS_M
 from constants.segmentation_defaults import (
     STOP_MAX_EPS_METERS,
     STOP_MIN_DURATION_SECONDS,
 )
-from constants.step_defaults import STEP_DEFAULT_GRID_FACTOR
+from constants.step_defaults import (
+    STEP_CACHE_INITIAL_CAPACITY,
+    STEP_DEFAULT_GRID_FACTOR,
+    STEP_DEFAULT_MAX_MOVE_POINTS,
+    STEP_DEFAULT_MAX_MOVE_SECONDS,
+    STEP_DEFAULT_STOP_STATS,
+    STEP_BATCH_LAG_BLOCK,
+    STEP_REANCHOR_LAT_DEGREES,
+    STEP_SCAN_BLOCK_POINTS,
+    STEP_SCAN_SCALAR_POINTS,
+)
+
+# Relative band around D^2 inside which process_batch defers to the grid
+# classification (rounding of grid cells and distances is ~1e-12 relative).
+_EDGE_BAND = 1e-6
 
 def local_distance(p1: Point, p2: Point) -> float:
     """
@@ -21,10 +42,167 @@ def local_distance(p1: Point, p2: Point) -> float:
     dy = math.radians(p2.lat - p1.lat)
     return EARTH_RADIUS_M * math.sqrt(dx*dx + dy*dy)
 
+class _GridRing:
+    """
+    Growable ring buffer behind the STEP cache, addressed by absolute index.
+
+    Points are kept in a list; their grid cells (int32) and ENU coordinates
+    (float64) in parallel ``array.array`` columns of the same power-of-two
+    capacity, with zero-copy numpy views for vectorized scans. ``offset`` is
+    the absolute index of the oldest entry: dropping a prefix only advances
+    the head, and the capacity doubles when the buffer is full.
+    """
+    __slots__ = ("points", "gx", "gy", "x", "y", "gx_np", "gy_np", "x_np", "y_np",
+                 "head", "size", "mask", "offset")
+
+    def __init__(self, capacity: int = STEP_CACHE_INITIAL_CAPACITY):
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError(f"capacity must be a power of two, got {capacity}")
+        self._allocate(capacity)
+        self.head = 0
+        self.size = 0
+        self.offset = 0
+
+    def _allocate(self, capacity: int) -> None:
+        self.points: List[Optional[ProjectedPoint]] = [None] * capacity
+        self.gx = array.array("i", bytes(4 * capacity))
+        self.gy = array.array("i", bytes(4 * capacity))
+        self.x = array.array("d", bytes(8 * capacity))
+        self.y = array.array("d", bytes(8 * capacity))
+        self.gx_np = np.frombuffer(self.gx, dtype=np.int32)
+        self.gy_np = np.frombuffer(self.gy, dtype=np.int32)
+        self.x_np = np.frombuffer(self.x, dtype=np.float64)
+        self.y_np = np.frombuffer(self.y, dtype=np.float64)
+        self.mask = capacity - 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return self.mask + 1
+
+    @property
+    def end(self) -> int:
+        """Absolute index one past the newest entry."""
+        return self.offset + self.size
+
+    def slot(self, abs_index: int) -> int:
+        return (self.head + abs_index - self.offset) & self.mask
+
+    def append(self, p: ProjectedPoint, gx: int, gy: int) -> None:
+        if self.size > self.mask:
+            self._grow()
+        j = (self.head + self.size) & self.mask
+        self.points[j] = p
+        self.gx[j] = gx
+        self.gy[j] = gy
+        self.x[j] = p.x
+        self.y[j] = p.y
+        self.size += 1
+
+    def _grow(self) -> None:
+        order = self._slots(0, self.size)
+        points = [self.points[j] for j in order]
+        gx = self.gx_np[order]
+        gy = self.gy_np[order]
+        x = self.x_np[order]
+        y = self.y_np[order]
+        self._allocate(2 * self.capacity)
+        n = self.size
+        self.points[:n] = points
+        self.gx_np[:n] = gx
+        self.gy_np[:n] = gy
+        self.x_np[:n] = x
+        self.y_np[:n] = y
+        self.head = 0
+
+    def _slots(self, rel_start: int, rel_stop: int) -> np.ndarray:
+        return (np.arange(rel_start, rel_stop) + self.head) & self.mask
+
+    def slots(self, start_abs_idx: int, stop_abs_idx: int) -> np.ndarray:
+        """Ring slots of the absolute range [start, stop), oldest first."""
+        return self._slots(start_abs_idx - self.offset, stop_abs_idx - self.offset)
+
+    def item(self, abs_index: int) -> Tuple[ProjectedPoint, int, int]:
+        j = (self.head + abs_index - self.offset) & self.mask
+        return self.points[j], self.gx[j], self.gy[j]
+
+    def point(self, abs_index: int) -> ProjectedPoint:
+        return self.points[(self.head + abs_index - self.offset) & self.mask]
+
+    def points_between(self, start_abs_idx: int, stop_abs_idx: int) -> List[ProjectedPoint]:
+        """Points of the absolute range [start, stop), oldest first."""
+        j = self.slot(start_abs_idx)
+        n = stop_abs_idx - start_abs_idx
+        if n <= 0:
+            return []
+        cap = self.mask + 1
+        if j + n <= cap:
+            return self.points[j:j + n]
+        return self.points[j:] + self.points[:j + n - cap]
+
+    def drop_before(self, abs_index: int) -> None:
+        """Forgets every entry older than ``abs_index`` (O(1))."""
+        k = abs_index - self.offset
+        if k <= 0:
+            return
+        k = min(k, self.size)
+        self.head = (self.head + k) & self.mask
+        self.size -= k
+        self.offset += k
+
+    def clear(self) -> None:
+        """Empties the buffer, keeping the capacity and the absolute indexing."""
+        self.offset += self.size
+        self.points = [None] * self.capacity
+        self.head = 0
+        self.size = 0
+
+
 class STEPSegmenter:
     """
     Streaming Trajectory Segmentation Based on Stay-Point Detection (STEP).
     Identifies STOP and MOVE segments on the fly.
+
+    Bounded-memory mode (``max_move_points`` / ``max_move_seconds``): an
+    ongoing move is otherwise buffered until the next stop. Past either
+    limit, the move's older part is emitted as ``Move(partial=True)`` and only
+    the tail that can still belong to a future stay point is kept. A future
+    stay point is a run of points all within D of its last point, hence
+    within 2D of each other; every point more than 2D from the newest point
+    (and everything before it) can therefore be emitted without changing the
+    segmentation. If no such point exists (slow drift that never separates by
+    2D) the older half of the cache is force-emitted once the limit is
+    exceeded twice over, but never a point of the last T seconds: any dwell
+    of at least T is still detected, and memory is bounded by twice the
+    limit or T seconds of points, whichever is larger. Forced cuts can
+    change the segmentation of slow drift (they are counted in
+    ``forced_cuts``); 2D cuts never do.
+
+    Active stay points: Alg 1 scans back from every new point to the start of
+    the stay, which is quadratic over a long dwell. While a stay point is
+    open, the new point only changes the state if it extends the stay (Case
+    1.2), and that holds iff every point from ``m = min(sp_end, k)`` to the
+    previous point is within D of it, where k is the newest point at least T
+    older. Both bounds only move forward, so the points of ``[m, c)`` are kept
+    in a per-grid-cell occupancy index that is trimmed and extended
+    incrementally; whole cells are confirmed or pruned at once and only
+    points in Check cells are measured. The full scan runs only when the
+    window check fails (the stay ends or a new one begins).
+
+    Fused stop statistics (``stop_stats``): the points of an open stay point
+    older than ``m`` are never scanned again (with ordered timestamps), so
+    they are folded into a running ``StopStats`` and dropped from the cache.
+    Stops are then emitted as ``Stop(points=[], stats=...)`` and a dwell of
+    any length holds only about T seconds of points.
+
+    Distances are measured in a local equirectangular projection, whose
+    east-west scale is exact only at its anchor latitude. When a new point is
+    more than ``STEP_REANCHOR_LAT_DEGREES`` from the anchor, the projection is
+    re-anchored there with a false easting / northing that keeps coordinates
+    (and grid cells) continuous, so a long drive is measured at its local
+    scale. ``process_batch`` re-anchors at the same points.
     """
 
     def __init__(
@@ -32,15 +210,29 @@ class STEPSegmenter:
         max_eps: float = STOP_MAX_EPS_METERS,
         min_duration_seconds: float = STOP_MIN_DURATION_SECONDS,
         grid_size_meters: Optional[float] = None,
+        max_move_points: Optional[int] = STEP_DEFAULT_MAX_MOVE_POINTS,
+        max_move_seconds: Optional[float] = STEP_DEFAULT_MAX_MOVE_SECONDS,
+        stop_stats: bool = STEP_DEFAULT_STOP_STATS,
     ):
         """
         Args:
             max_eps: Distance threshold D in meters.
             min_duration_seconds: Time threshold T in seconds.
             grid_size_meters: Custom grid cell dimension g. If None, uses default g = (sqrt(2)/4) * D.
+            max_move_points: Emit partial move chunks once a move buffers more points (None = unbounded).
+            max_move_seconds: Emit partial move chunks once a move spans more seconds (None = unbounded).
+            stop_stats: Emit stops as running statistics instead of their points.
         """
+        if max_move_points is not None and max_move_points < 2:
+            raise ValueError(f"max_move_points must be >= 2, got {max_move_points}")
+        if max_move_seconds is not None and max_move_seconds <= 0:
+            raise ValueError(f"max_move_seconds must be > 0, got {max_move_seconds}")
         self.max_eps = max_eps
         self.min_duration_seconds = min_duration_seconds
+        self.max_move_points = max_move_points
+        self.max_move_seconds = max_move_seconds
+        self.bounded = max_move_points is not None or max_move_seconds is not None
+        self.stop_stats = stop_stats
         
         if grid_size_meters is not None and grid_size_meters > 0:
             self.g = grid_size_meters
@@ -48,39 +240,69 @@ class STEPSegmenter:
             self.g = STEP_DEFAULT_GRID_FACTOR * max_eps
             
         self.threshold_sq = (self.max_eps / self.g) ** 2
+        # Exact checks compare squared ENU distances (meters^2)
+        self.max_eps_sq = self.max_eps ** 2
             
         # Origin for local 2D projection
         self.origin_lat: Optional[float] = None
         self.origin_lon: Optional[float] = None
+        self.projection: Optional[LocalProjection] = None
         
         # State Arrays
-        # cache holds points that are not yet flushed
-        # Elements are tuple: (Point, gx, gy)
-        self.cache: List[Tuple[Point, int, int]] = []
-        self.cache_offset = 0 # The absolute index matching cache[0]
+        # cache holds points that are not yet flushed, converted once at ingest,
+        # with their grid cells; cache.offset is the absolute index of the oldest.
+        self.cache = _GridRing()
         
         # Absolute indices of currently identified stay-point
         self.current_sp_start: Optional[int] = None
         self.current_sp_end: Optional[int] = None
 
-    def _get_cached_item(self, abs_index: int) -> Tuple[Point, int, int]:
-        return self.cache[abs_index - self.cache_offset]
+        # Bounded-memory counters
+        self.partial_chunks = 0
+        self.forced_cuts = 0
+
+        # Active stay point window [m, c) (see class docstring). Cells map
+        # (gx, gy) to the ascending absolute indices of window points there.
+        self._win_sp: Optional[int] = None  # stay start the window belongs to
+        self._win_lo = 0
+        self._win_hi = -1
+        self._win_k = -1
+        self._win_cells: Dict[Tuple[int, int], Deque[int]] = {}
+        # Absolute index of the last point older than its predecessor; the
+        # window shortcut needs ordered timestamps from the cache start on.
+        self._last_unordered = -1
+
+        # Fused mode: statistics of the open stay point's points already
+        # dropped from the cache.
+        self._sp_stats: Optional[StopStats] = None
+
+    @property
+    def buffered_points(self) -> int:
+        """Number of points currently held in the cache (not yet emitted)."""
+        return len(self.cache)
+
+    @property
+    def cache_offset(self) -> int:
+        """Absolute index of the oldest cached point."""
+        return self.cache.offset
+
+    def cached_points(self) -> List[Point]:
+        """Points currently held in the cache, oldest first."""
+        return self.cache.points_between(self.cache.offset, self.cache.end)
+
+    def _get_cached_item(self, abs_index: int) -> Tuple[ProjectedPoint, int, int]:
+        return self.cache.item(abs_index)
         
-    def _get_point(self, abs_index: int) -> Point:
-        return self.cache[abs_index - self.cache_offset][0]
+    def _get_point(self, abs_index: int) -> ProjectedPoint:
+        return self.cache.point(abs_index)
         
     def _get_points(self, start_abs_idx: int, end_abs_idx: int) -> List[Point]:
         if start_abs_idx > end_abs_idx:
             return []
-        rel_start = max(0, start_abs_idx - self.cache_offset)
-        rel_end = end_abs_idx - self.cache_offset
-        return [item[0] for item in self.cache[rel_start:rel_end + 1]]
+        return self.cache.points_between(max(start_abs_idx, self.cache.offset), end_abs_idx + 1)
 
     def _prune_cache(self, new_start_abs_idx: int):
-        if new_start_abs_idx > self.cache_offset:
-            idx_to_remove = new_start_abs_idx - self.cache_offset
-            self.cache = self.cache[idx_to_remove:]
-            self.cache_offset = new_start_abs_idx
+        self.cache.drop_before(new_start_abs_idx)
 
     def _create_stop(self, points: List[Point]) -> Stop:
         if not points:
@@ -94,58 +316,77 @@ class STEPSegmenter:
         )
         return Stop(points=points, centroid=centroid)
 
+    def _emit_stop(self) -> Stop:
+        """Stop for the open stay point [current_sp_start, current_sp_end]."""
+        points = self._get_points(self.current_sp_start, self.current_sp_end)
+        if not self.stop_stats:
+            return self._create_stop(points)
+        stats = self._sp_stats if self._sp_stats is not None else StopStats()
+        stats.extend(points)
+        self._sp_stats = None
+        return Stop(points=[], centroid=stats.centroid(), stats=stats)
+
+    def _fold_stay_prefix(self, stop_abs_idx: int) -> None:
+        """Moves the cached points of the open stay below ``stop_abs_idx`` into its statistics."""
+        offset = self.cache.offset
+        if stop_abs_idx <= offset:
+            return
+        if self._sp_stats is None:
+            self._sp_stats = StopStats()
+        self._sp_stats.extend(self.cache.points_between(offset, stop_abs_idx))
+        self._prune_cache(stop_abs_idx)
+
     def process_point(self, p_c: Point) -> List[Segment]:
         """
         Processes a newly arrived point, updating states and emitting finished sub-trajectories.
+
+        The point is converted once to a ProjectedPoint (cached epoch seconds and
+        local ENU meters); emitted segments carry these compact points.
         """
         segments = []
         
-        if not self.cache:
-            self.origin_lat = math.radians(p_c.lat)
-            self.origin_lon = math.radians(p_c.lon)
+        cache = self.cache
+        if not cache.size:
+            if p_c.__class__ is ProjectedPoint:
+                self.projection = p_c.projection
+            else:
+                self.projection = LocalProjection(p_c.lat, p_c.lon)
+            self.origin_lat = self.projection.lat0_rad
+            self.origin_lon = self.projection.lon0_rad
+        elif abs(p_c.lat - self.projection.origin_lat) > STEP_REANCHOR_LAT_DEGREES:
+            # Keep the east-west scale true near the newest points; coordinates
+            # stay continuous, so cached points and their cells remain valid.
+            self.projection = self.projection.reanchored(p_c.lat, p_c.lon)
+
+        if p_c.__class__ is not ProjectedPoint or p_c.projection is not self.projection:
+            p_c = self.projection.point(p_c)
             
         # Calculate local grid
-        dx_meters = (
-            (math.radians(p_c.lon) - self.origin_lon)
-            * EARTH_RADIUS_M
-            * math.cos(self.origin_lat)
-        )
-        dy_meters = (math.radians(p_c.lat) - self.origin_lat) * EARTH_RADIUS_M
-        gx_c = int(dx_meters // self.g)
-        gy_c = int(dy_meters // self.g)
+        gx_c = int(p_c.x // self.g)
+        gy_c = int(p_c.y // self.g)
         
-        self.cache.append((p_c, gx_c, gy_c))
-        c = self.cache_offset + len(self.cache) - 1
+        cache.append(p_c, gx_c, gy_c)
+        c = cache.offset + cache.size - 1
         
+        if c > cache.offset and p_c.t < cache.point(c - 1).t:
+            self._last_unordered = c
+
         # 1. Indexed Stay Point Detection (Alg 1)
         Is = None
         Ie = c
-        i = c - 1
-        
-        while i >= self.cache_offset:
-            p_i, gx_i, gy_i = self._get_cached_item(i)
-            delta_x = abs(gx_i - gx_c)
-            delta_y = abs(gy_i - gy_c)
-
-            if (delta_x + 1) ** 2 + (delta_y + 1) ** 2 <= self.threshold_sq:
-                i -= 1 # Confirmed Area
-            elif max(0, delta_x - 1) ** 2 + max(0, delta_y - 1) ** 2 > self.threshold_sq:
-                i += 1 # Pruned Area -> Out of bound, restore i to first valid
-                break
-            elif local_distance(p_c, p_i) <= self.max_eps:
-                i -= 1 # Exact check satisfying constraint
+        x_c = p_c.x
+        y_c = p_c.y
+
+        if self.current_sp_start is not None and self._last_unordered <= cache.offset:
+            m = self._advance_stay_window(c, p_c.t)
+            if m is None:
+                pass  # nothing in the cache is T older: no stay point
+            elif self._window_within_eps(x_c, y_c, gx_c, gy_c):
+                Is = m  # Case 1.2 below; the exact start is not needed
             else:
-                i += 1 # Exact check violating
-                break
-                
-        if i < self.cache_offset:
-            i = self.cache_offset
-            
-        if i <= c:
-            p_i_point = self._get_point(i)
-            duration_secs = (p_c.timestamp - p_i_point.timestamp).total_seconds()
-            if duration_secs >= self.min_duration_seconds:
-                Is = i
+                Is = self._scan_stay_start(c, p_c, gx_c, gy_c)
+        else:
+            Is = self._scan_stay_start(c, p_c, gx_c, gy_c)
 
         # 2. Trajectory Segmentation Handling
         if Is is not None:
@@ -157,8 +398,7 @@ class STEPSegmenter:
                 else:
                     # Case 1.1: Separated, flush first stay point and in-between move
                     # Emit in chronological order: STOP first (happened earlier), then MOVE (happened after)
-                    sp1_points = self._get_points(self.current_sp_start, self.current_sp_end)
-                    segments.append(self._create_stop(sp1_points))
+                    segments.append(self._emit_stop())
                     
                     move_points = self._get_points(self.current_sp_end + 1, Is - 1)
                     if move_points:
@@ -180,10 +420,9 @@ class STEPSegmenter:
             # Case 2: New point does NOT form stay point
             if self.current_sp_start is not None:
                 p_Ie = self._get_point(self.current_sp_end)
-                if local_distance(p_c, p_Ie) > self.max_eps:
+                if (x_c - p_Ie.x) ** 2 + (y_c - p_Ie.y) ** 2 > self.max_eps_sq:
                     # Case 2.1: Far away from last stay point. Flush stay point.
-                    sp1_points = self._get_points(self.current_sp_start, self.current_sp_end)
-                    segments.append(self._create_stop(sp1_points))
+                    segments.append(self._emit_stop())
                     
                     # DO NOT EMIT THE MOVE YET. The move is ongoing until the next stop or flush.
                     # We leave the ongoing move points (from current_sp_end + 1 to c) in the cache.
@@ -193,29 +432,579 @@ class STEPSegmenter:
                     self.current_sp_end = None
             # Else Case 2.2/2.3: do nothing.
 
+        if self.current_sp_start != self._win_sp:
+            self._reset_stay_window()
+        elif self.stop_stats and self.current_sp_start is not None and self._last_unordered <= cache.offset:
+            # Nothing below the stay window (or sp_end) is scanned again.
+            self._fold_stay_prefix(min(self._win_lo, self.current_sp_end))
+
+        if self.bounded and self.current_sp_start is None and self._move_over_limit(1):
+            chunk = self._cut_move_chunk()
+            if chunk is not None:
+                segments.append(chunk)
+
         return segments
 
+    def _scan_stay_start(self, c: int, p_c: ProjectedPoint, gx_c: int, gy_c: int) -> Optional[int]:
+        """
+        Alg 1 backward scan: returns the start index of the stay point ending
+        at ``c``, or None if the points within D of ``p_c`` span less than T.
+        """
+        cache = self.cache
+        offset = cache.offset
+        points = cache.points
+        gxs = cache.gx
+        gys = cache.gy
+        mask = cache.mask
+        x_c = p_c.x
+        y_c = p_c.y
+        threshold_sq = self.threshold_sq
+        max_eps_sq = self.max_eps_sq
+
+        # The scan usually stops within a few points; walk those one by one.
+        i = c - 1
+        stop = max(offset, c - STEP_SCAN_SCALAR_POINTS)
+        j = (cache.head + i - offset) & mask
+        while i >= stop:
+            delta_x = abs(gxs[j] - gx_c)
+            delta_y = abs(gys[j] - gy_c)
+
+            if (delta_x + 1) ** 2 + (delta_y + 1) ** 2 <= threshold_sq:
+                pass # Confirmed Area
+            elif max(0, delta_x - 1) ** 2 + max(0, delta_y - 1) ** 2 > threshold_sq:
+                break # Pruned Area -> Out of bound
+            else:
+                p_i = points[j]
+                if (x_c - p_i.x) ** 2 + (y_c - p_i.y) ** 2 > max_eps_sq:
+                    break # Exact check violating
+            i -= 1
+            j = (j - 1) & mask
+        else:
+            # Longer runs: classify whole blocks on the grid columns.
+            i = self._scan_blocks(stop, x_c, y_c, gx_c, gy_c)
+        i += 1 # restore i to first valid
+
+        if i < offset:
+            i = offset
+
+        if p_c.t - points[(cache.head + i - offset) & mask].t >= self.min_duration_seconds:
+            return i
+        return None
+
+    def _scan_blocks(self, stop: int, x_c: float, y_c: float, gx_c: int, gy_c: int) -> int:
+        """
+        Vectorized Alg 1 scan below absolute index ``stop``: returns the
+        newest index whose point is farther than D from (x_c, y_c), or
+        ``cache.offset - 1`` if there is none.
+        """
+        cache = self.cache
+        offset = cache.offset
+        threshold_sq = self.threshold_sq
+        block = STEP_SCAN_BLOCK_POINTS
+        while stop > offset:
+            start = max(offset, stop - block)
+            slots = cache.slots(start, stop)
+            delta_x = np.abs(cache.gx_np[slots] - gx_c).astype(np.float64)
+            delta_y = np.abs(cache.gy_np[slots] - gy_c).astype(np.float64)
+            confirmed = (delta_x + 1) ** 2 + (delta_y + 1) ** 2 <= threshold_sq
+            pruned = np.maximum(delta_x - 1, 0) ** 2 + np.maximum(delta_y - 1, 0) ** 2 > threshold_sq
+            d_sq = (x_c - cache.x_np[slots]) ** 2 + (y_c - cache.y_np[slots]) ** 2
+            fails = np.flatnonzero(~confirmed & (pruned | (d_sq > self.max_eps_sq)))
+            if fails.size:
+                return start + int(fails[-1])
+            stop = start
+            block *= 2
+        return offset - 1
+
+    def _reset_stay_window(self) -> None:
+        self._win_sp = self.current_sp_start
+        self._win_lo = self.cache_offset
+        self._win_hi = self.cache_offset - 1
+        self._win_k = self.cache_offset - 1
+        self._win_cells = {}
+
+    def _advance_stay_window(self, c: int, t_c: float) -> Optional[int]:
+        """
+        Moves the active stay window to ``[m, c)`` and returns m, or None when
+        no cached point is at least T older than the new point.
+        """
+        cache = self.cache
+        offset = cache.offset
+        k = self._win_k
+        t_limit = t_c - self.min_duration_seconds
+        while k + 1 < c and cache.point(k + 1).t <= t_limit:
+            k += 1
+        self._win_k = k
+        if k < offset:
+            return None
+        m = min(self.current_sp_end, k)
+
+        cells = self._win_cells
+        lo = self._win_lo
+        while lo < m:
+            if lo <= self._win_hi:
+                _, gx, gy = cache.item(lo)
+                bucket = cells[(gx, gy)]
+                bucket.popleft()
+                if not bucket:
+                    del cells[(gx, gy)]
+            lo += 1
+        self._win_lo = lo
+
+        hi = max(self._win_hi, lo - 1)
+        while hi < c - 1:
+            hi += 1
+            _, gx, gy = cache.item(hi)
+            bucket = cells.get((gx, gy))
+            if bucket is None:
+                cells[(gx, gy)] = deque((hi,))
+            else:
+                bucket.append(hi)
+        self._win_hi = hi
+        return m
+
+    def _window_within_eps(self, x_c: float, y_c: float, gx_c: int, gy_c: int) -> bool:
+        """True if every point of the active stay window is within D of (x_c, y_c)."""
+        threshold_sq = self.threshold_sq
+        for (gx, gy), bucket in self._win_cells.items():
+            delta_x = abs(gx - gx_c)
+            delta_y = abs(gy - gy_c)
+            if (delta_x + 1) ** 2 + (delta_y + 1) ** 2 <= threshold_sq:
+                continue
+            if max(0, delta_x - 1) ** 2 + max(0, delta_y - 1) ** 2 > threshold_sq:
+                return False
+            for i in bucket:
+                p_i = self._get_point(i)
+                if (x_c - p_i.x) ** 2 + (y_c - p_i.y) ** 2 > self.max_eps_sq:
+                    return False
+        return True
+
+    def _move_over_limit(self, factor: int) -> bool:
+        """True when the buffered move exceeds ``factor`` times a configured limit."""
+        cache = self.cache
+        n = len(cache)
+        if self.max_move_points is not None and n > factor * self.max_move_points:
+            return True
+        if self.max_move_seconds is not None and n > 1:
+            span = cache.point(cache.end - 1).t - cache.point(cache.offset).t
+            if span > factor * self.max_move_seconds:
+                return True
+        return False
+
+    def _cut_move_chunk(self) -> Optional[Move]:
+        """
+        Emits the part of the ongoing move that can no longer join a stay
+        point: everything up to the newest point farther than 2D from the
+        newest point. Falls back to a forced cut (older half) at twice the
+        limit, restricted to points more than T older than the newest point.
+        """
+        cache = self.cache
+        p_c = cache.point(cache.end - 1)
+        reach_sq = 4.0 * self.max_eps_sq  # (2D)^2
+        slots = cache.slots(cache.offset, cache.end - 1)
+        d_sq = (p_c.x - cache.x_np[slots]) ** 2 + (p_c.y - cache.y_np[slots]) ** 2
+        far = np.flatnonzero(d_sq > reach_sq)
+        if far.size:
+            cut = int(far[-1])
+        else:
+            if not self._move_over_limit(2):
+                return None
+            # A stay point forming later may start at any point of the last T seconds.
+            t_limit = p_c.t - self.min_duration_seconds
+            cut = -1
+            while cut + 1 < len(cache) // 2 and cache.point(cache.offset + cut + 1).t < t_limit:
+                cut += 1
+            if cut < 0:
+                return None
+            self.forced_cuts += 1
+
+        points = self._get_points(cache.offset, cache.offset + cut)
+        self._prune_cache(cache.offset + cut + 1)
+        self.partial_chunks += 1
+        return Move(points=points, partial=True)
+
     def flush(self) -> List[Segment]:
         """
         Emits remaining cached segments upon termination of stream.
         """
         segments = []
         if self.current_sp_start is not None:
-            sp_points = self._get_points(self.current_sp_start, self.current_sp_end)
-            segments.append(self._create_stop(sp_points))
-            move_points = self._get_points(self.current_sp_end + 1, self.cache_offset + len(self.cache) - 1)
+            segments.append(self._emit_stop())
+            move_points = self._get_points(self.current_sp_end + 1, self.cache.end - 1)
             if move_points:
                 segments.append(Move(points=move_points))
         else:
-            move_points = self._get_points(self.cache_offset, self.cache_offset + len(self.cache) - 1)
+            move_points = self._get_points(self.cache_offset, self.cache.end - 1)
             if move_points:
                 segments.append(Move(points=move_points))
                 
-        self.cache = []
+        self.cache.clear()
         self.current_sp_start = None
         self.current_sp_end = None
+        self._reset_stay_window()
+        return segments
+
+    def process_batch(self, batch: TrajectoryBatch) -> List[SegmentSpan]:
+        """
+        Segments a complete columnar trajectory without building Point objects.
+
+        Produces the same boundaries as ``process_point`` + ``flush`` over the
+        batch and returns index spans instead of Stop/Move objects. Does not
+        touch the streaming state of this segmenter. The move-length limits
+        do not apply: the whole trajectory is already in memory.
+
+        With ordered timestamps, a new point c forms a stay point iff every
+        point from k(c), the newest point at least T older, to c - 1 passes
+        the Alg 1 test against it. That flag is computed for all points at
+        once (one vectorized pass per lag), after which the state machine
+        only visits points where something can change: candidates while no
+        stay point is open, and the ends of runs of flagged points while one
+        is. Exact stay-point starts come from vectorized backward scans.
+        Unordered timestamps fall back to the per-point scan.
+        """
+        n = len(batch)
+        if n == 0:
+            return []
+
+        xs, ys = self._batch_enu(batch)
+        ts = batch.epoch_seconds
+        if n > 1 and bool(np.any(ts[1:] < ts[:-1])):
+            return self._process_batch_scan(xs, ys, ts)
+
+        k = self._batch_dwell_starts(ts)
+        forms = self._batch_window_passes(xs, ys, k)
+        return self._batch_spans(xs, ys, xs.tolist(), ys.tolist(), k, forms)
+
+    def _batch_spans(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        xl: List[float],
+        yl: List[float],
+        k: np.ndarray,
+        forms: np.ndarray,
+    ) -> List[SegmentSpan]:
+        """
+        Alg 1 state machine of ``process_batch`` over the dwell starts ``k``
+        and stay-point flags ``forms``; ``xl``/``yl`` are ``xs``/``ys`` as lists.
+        """
+        n = len(xs)
+        spans: List[SegmentSpan] = []
+        candidates = np.flatnonzero(forms)
+        candidate_k = k[candidates].tolist()
+        candidates = candidates.tolist()
+        breaks = np.flatnonzero(~forms).tolist()
+        offset = 0
+        sp_start: Optional[int] = None
+        sp_end: Optional[int] = None
+        c = 0
+
+        while c < n:
+            if sp_start is None:
+                # Case 2 without a stay point does nothing: jump to the next
+                # point whose window lies inside the cache (k only grows).
+                pos = max(bisect_left(candidates, c), bisect_left(candidate_k, offset))
+                if pos == len(candidates):
+                    break
+                c = candidates[pos]
+                Is = self._batch_last_far(xs, ys, xl, yl, c, offset, k[c]) + 1
+                if Is > offset:
+                    spans.append(SegmentSpan("move", offset, Is))
+                sp_start, sp_end = Is, c
+                offset = Is
+                c += 1
+                continue
+
+            if sp_end == c - 1:
+                # Case 1.2 for every flagged point in a row.
+                pos = bisect_left(breaks, c)
+                run_end = breaks[pos] if pos < len(breaks) else n
+                if run_end > c:
+                    sp_end = run_end - 1
+                    c = run_end
+                    continue
+
+            if forms[c]:
+                if k[c] <= sp_end:
+                    sp_end = c  # Case 1.2
+                else:
+                    far = self._batch_last_far(xs, ys, xl, yl, c, sp_end, k[c])
+                    if far < sp_end:
+                        sp_end = c  # Case 1.2
+                    else:
+                        # Case 1.1: separated stay points
+                        Is = far + 1
+                        spans.append(SegmentSpan("stop", sp_start, sp_end + 1))
+                        if Is > sp_end + 1:
+                            spans.append(SegmentSpan("move", sp_end + 1, Is))
+                        sp_start, sp_end = Is, c
+                        offset = Is
+            elif (xl[c] - xl[sp_end]) ** 2 + (yl[c] - yl[sp_end]) ** 2 > self.max_eps_sq:
+                # Case 2.1
+                spans.append(SegmentSpan("stop", sp_start, sp_end + 1))
+                offset = sp_end + 1
+                sp_start = None
+                sp_end = None
+            c += 1
+
+        if sp_start is not None:
+            spans.append(SegmentSpan("stop", sp_start, sp_end + 1))
+            if n > sp_end + 1:
+                spans.append(SegmentSpan("move", sp_end + 1, n))
+        elif n > offset:
+            spans.append(SegmentSpan("move", offset, n))
+        return spans
+
+    def process_offline(self, trajectory: List[Point]) -> List[Segment]:
+        """
+        Segments a complete trajectory with ``process_batch``.
+
+        Returns the same Stop/Move segments as ``process`` on a fresh
+        segmenter (without move-length limits), holding the input points.
+        """
+        if not trajectory:
+            return []
+        segments: List[Segment] = []
+        for span in self.process_batch(TrajectoryBatch.from_points(trajectory)):
+            points = trajectory[span.start:span.stop]
+            segments.append(self._create_stop(points) if span.kind == "stop" else Move(points=points))
         return segments
 
+    def _batch_enu(self, batch: TrajectoryBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """ENU meters of a batch, anchored at its first point and re-anchored like process_point."""
+        lat = batch.lat
+        lat_rad = np.radians(lat)
+        lon_rad = np.radians(batch.lon)
+        x = np.empty(len(lat))
+        y = np.empty(len(lat))
+        starts = self._batch_anchor_starts(lat)
+        x0 = y0 = 0.0
+        for a, b in zip(starts, starts[1:] + [len(lat)]):
+            anchor_lat = float(lat_rad[a])
+            scale = EARTH_RADIUS_M * math.cos(anchor_lat)
+            anchor_lon = float(lon_rad[a])
+            x[a:b] = (lon_rad[a:b] - anchor_lon) * scale + x0
+            y[a:b] = (lat_rad[a:b] - anchor_lat) * EARTH_RADIUS_M + y0
+            if b < len(lat):
+                # The next anchor keeps the coordinates it has in this piece.
+                x0 = (float(lon_rad[b]) - anchor_lon) * scale + x0
+                y0 = (float(lat_rad[b]) - anchor_lat) * EARTH_RADIUS_M + y0
+        return x, y
+
+    @staticmethod
+    def _batch_anchor_starts(lat: np.ndarray) -> List[int]:
+        """Indices where process_point (re-)anchors its projection."""
+        if not len(lat) or float(np.ptp(lat)) <= STEP_REANCHOR_LAT_DEGREES:
+            return [0]
+        starts = [0]
+        anchor = float(lat[0])
+        for i, v in enumerate(lat.tolist()):
+            if abs(v - anchor) > STEP_REANCHOR_LAT_DEGREES:
+                starts.append(i)
+                anchor = v
+        return starts
+
+    def _cells(self, meters: np.ndarray) -> np.ndarray:
+        """Grid cell indices of ENU coordinates, as ``int(x // g)`` in process_point."""
+        return np.floor_divide(meters, self.g).astype(np.int64)
+
+    def _batch_dwell_starts(self, ts: np.ndarray) -> np.ndarray:
+        """
+        k(c) for ordered ``ts``: the newest index i <= c with
+        ``ts[c] - ts[i] >= T`` (the streaming duration test), or -1.
+        """
+        n = len(ts)
+        T = self.min_duration_seconds
+        idx = np.arange(n)
+        k = np.minimum(np.searchsorted(ts, ts - T, side="right") - 1, idx)
+        # searchsorted compares ts[i] <= ts[c] - T; settle rounding ties with
+        # the subtraction process_point uses.
+        while True:
+            valid = k >= 0
+            low = valid & ~(ts - ts[np.maximum(k, 0)] >= T)
+            nxt = np.minimum(k + 1, idx)
+            high = (nxt > k) & (ts - ts[nxt] >= T)
+            if not (low.any() or high.any()):
+                return k
+            k = k - low + high
+
+    def _batch_window_passes(
+        self, xs: np.ndarray, ys: np.ndarray, k: np.ndarray
+    ) -> np.ndarray:
+        """
+        For every c: True iff k(c) >= 0 and every point of [k(c), c) passes
+        the Alg 1 test against c (Confirmed, or not Pruned and within D).
+        """
+        window = np.arange(len(xs)) - k  # number of points in [k(c), c)
+        passes = k >= 0
+
+        # The oldest window point is the one a moving object is farthest
+        # from: testing it first rejects nearly every point that fails.
+        alive = np.flatnonzero(window > 0)
+        oldest = k[alive]
+        d_sq = (xs[alive] - xs[oldest]) ** 2 + (ys[alive] - ys[oldest]) ** 2
+        failed = self._pair_fails(alive, oldest, xs, ys, d_sq)
+        passes[alive[failed]] = False
+        alive = alive[~failed & (window[alive] > 1)]
+
+        # The rest (mostly dwell points) test lags 1 .. window - 1 in
+        # doubling blocks, one 2D pass each.
+        lag = 1
+        width = STEP_BATCH_LAG_BLOCK
+        while alive.size:
+            lags = np.arange(lag, lag + width)
+            window_alive = window[alive]
+            j = np.maximum(alive[:, None] - lags, 0)
+            d_sq = (xs[alive, None] - xs[j]) ** 2 + (ys[alive, None] - ys[j]) ** 2
+            far = self._pair_fails(alive[:, None], j, xs, ys, d_sq)
+            far &= lags < window_alive[:, None]
+            failed = far.any(axis=1)
+            passes[alive[failed]] = False
+            # Keep the points that passed and still have untested lags.
+            alive = alive[~failed & (window_alive > lag + width)]
+            lag += width
+            width *= 2
+        return passes
+
+    def _pair_fails(
+        self, c: np.ndarray, j: np.ndarray, xs: np.ndarray, ys: np.ndarray, d_sq: np.ndarray
+    ) -> np.ndarray:
+        """
+        Alg 1 outcome for the point pairs (c, j) (broadcast to ``d_sq``).
+
+        Confirmed cells are within D and Pruned cells beyond it, so the grid
+        only overrules the exact test up to rounding; the Alg 1 classification
+        is re-run on pairs that close to the threshold.
+        """
+        max_eps_sq = self.max_eps_sq
+        far = d_sq > max_eps_sq
+        edge = np.abs(d_sq - max_eps_sq) <= _EDGE_BAND * max_eps_sq
+        if edge.any():
+            c_edge = np.broadcast_to(c, d_sq.shape)[edge]
+            j_edge = np.broadcast_to(j, d_sq.shape)[edge]
+            far[edge] = self._grid_fails(xs[c_edge], ys[c_edge], xs[j_edge], ys[j_edge], d_sq[edge])
+        return far
+
+    def _grid_fails(
+        self, x_c: np.ndarray, y_c: np.ndarray, x_i: np.ndarray, y_i: np.ndarray, d_sq: np.ndarray
+    ) -> np.ndarray:
+        """Alg 1 outcome per pair: not Confirmed and (Pruned or farther than D)."""
+        threshold_sq = self.threshold_sq
+        delta_x = np.abs(self._cells(x_i) - self._cells(x_c))
+        delta_y = np.abs(self._cells(y_i) - self._cells(y_c))
+        confirmed = (delta_x + 1) ** 2 + (delta_y + 1) ** 2 <= threshold_sq
+        pruned = np.maximum(delta_x - 1, 0) ** 2 + np.maximum(delta_y - 1, 0) ** 2 > threshold_sq
+        return ~confirmed & (pruned | (d_sq > self.max_eps_sq))
+
+    def _batch_last_far(
+        self, xs: np.ndarray, ys: np.ndarray, xl: List[float], yl: List[float], c: int, lo: int, hi: int
+    ) -> int:
+        """
+        Newest index in [lo, hi) whose point fails the Alg 1 test against c,
+        or ``lo - 1`` if all pass. ``xl``/``yl`` are ``xs``/``ys`` as lists.
+
+        A failing point usually sits right below ``hi``: the first few are
+        checked one by one, the rest backward in doubling blocks.
+        """
+        x_c = xl[c]
+        y_c = yl[c]
+        max_eps_sq = self.max_eps_sq
+        band = _EDGE_BAND * max_eps_sq
+        stop = max(lo, hi - STEP_SCAN_SCALAR_POINTS)
+        for j in range(hi - 1, stop - 1, -1):
+            d_sq = (x_c - xl[j]) ** 2 + (y_c - yl[j]) ** 2
+            if abs(d_sq - max_eps_sq) <= band:
+                if self._pair_fails(np.array([c]), np.array([j]), xs, ys, np.array([d_sq]))[0]:
+                    return j
+            elif d_sq > max_eps_sq:
+                return j
+
+        block = STEP_SCAN_BLOCK_POINTS
+        while stop > lo:
+            start = max(lo, stop - block)
+            j = np.arange(start, stop)
+            d_sq = (x_c - xs[start:stop]) ** 2 + (y_c - ys[start:stop]) ** 2
+            fails = np.flatnonzero(self._pair_fails(c, j, xs, ys, d_sq))
+            if fails.size:
+                return start + int(fails[-1])
+            stop = start
+            block *= 2
+        return lo - 1
+
+    def _process_batch_scan(
+        self, xs: np.ndarray, ys: np.ndarray, ts: np.ndarray
+    ) -> List[SegmentSpan]:
+        """Per-point Alg 1 scan over batch columns; handles unordered timestamps."""
+        n = len(xs)
+        gxs = self._cells(xs).tolist()
+        gys = self._cells(ys).tolist()
+        xs = xs.tolist()
+        ys = ys.tolist()
+        ts = ts.tolist()
+        max_eps_sq = self.max_eps_sq
+        min_duration = self.min_duration_seconds
+        threshold_sq = self.threshold_sq
+
+        spans: List[SegmentSpan] = []
+        offset = 0
+        sp_start: Optional[int] = None
+        sp_end: Optional[int] = None
+
+        for c in range(n):
+            gx_c = gxs[c]
+            gy_c = gys[c]
+            x_c = xs[c]
+            y_c = ys[c]
+
+            i = c - 1
+            while i >= offset:
+                delta_x = abs(gxs[i] - gx_c)
+                delta_y = abs(gys[i] - gy_c)
+                if (delta_x + 1) ** 2 + (delta_y + 1) ** 2 <= threshold_sq:
+                    i -= 1
+                elif max(0, delta_x - 1) ** 2 + max(0, delta_y - 1) ** 2 > threshold_sq:
+                    i += 1
+                    break
+                elif (x_c - xs[i]) ** 2 + (y_c - ys[i]) ** 2 <= max_eps_sq:
+                    i -= 1
+                else:
+                    i += 1
+                    break
+            if i < offset:
+                i = offset
+
+            Is = i if ts[c] - ts[i] >= min_duration else None
+
+            if Is is not None:
+                if sp_start is not None:
+                    if Is <= sp_end:
+                        sp_end = c
+                    else:
+                        spans.append(SegmentSpan("stop", sp_start, sp_end + 1))
+                        if Is > sp_end + 1:
+                            spans.append(SegmentSpan("move", sp_end + 1, Is))
+                        sp_start, sp_end = Is, c
+                        offset = max(offset, Is)
+                else:
+                    if Is > offset:
+                        spans.append(SegmentSpan("move", offset, Is))
+                    sp_start, sp_end = Is, c
+                    offset = max(offset, Is)
+            elif sp_start is not None:
+                if (x_c - xs[sp_end]) ** 2 + (y_c - ys[sp_end]) ** 2 > max_eps_sq:
+                    spans.append(SegmentSpan("stop", sp_start, sp_end + 1))
+                    offset = max(offset, sp_end + 1)
+                    sp_start = None
+                    sp_end = None
+
+        if sp_start is not None:
+            spans.append(SegmentSpan("stop", sp_start, sp_end + 1))
+            if n > sp_end + 1:
+                spans.append(SegmentSpan("move", sp_end + 1, n))
+        elif n > offset:
+            spans.append(SegmentSpan("move", offset, n))
+        return spans
+
     def process(self, trajectory: List[Point]) -> List[Segment]:
         """
         Batch-processing helper for testing/benchmarking.
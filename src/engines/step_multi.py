@@ -0,0 +1,132 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from core.batch import TrajectoryBatch
+from core.point import Point
+from core.segment import Move, Segment, SegmentSpan
+from constants.step_defaults import STEP_BATCH_LAG_BLOCK
+from engines.step import STEPSegmenter
+
+
+class MultiSTEPSegmenter:
+    """
+    Offline STEP for a grid of (max_eps, min_duration_seconds) settings in
+    one pass over a trajectory, e.g. for parameter sweeps.
+
+    Each setting gives exactly the segmentation of
+    ``STEPSegmenter(max_eps, min_duration_seconds).process_batch``. The shared
+    work is done once per trajectory instead of once per setting:
+
+    - the ENU projection and the timestamp order check;
+    - the dwell starts k(c), once per distinct T;
+    - the point-to-point distances of every dwell window: for each distinct D
+      the first lag at which a point fails the Alg 1 test is found from the
+      same distance blocks, up to the longest window over all T. A point
+      forms a stay point under (D, T) iff that lag lies beyond its T window.
+
+    Only the cheap per-setting state machine runs once per setting.
+    """
+
+    def __init__(self, configs: Sequence[Tuple[float, float]]):
+        """
+        Args:
+            configs: (max_eps, min_duration_seconds) pairs; results come back
+                in this order.
+        """
+        if not configs:
+            raise ValueError("configs must not be empty")
+        self.configs: List[Tuple[float, float]] = [(float(eps), float(t)) for eps, t in configs]
+        self.segmenters: List[STEPSegmenter] = [
+            STEPSegmenter(max_eps=eps, min_duration_seconds=t) for eps, t in self.configs
+        ]
+        self.eps_values: List[float] = sorted({eps for eps, _ in self.configs})
+        self.t_values: List[float] = sorted({t for _, t in self.configs})
+        # One segmenter per distinct D / T for the shared per-D and per-T work.
+        self._by_eps: Dict[float, STEPSegmenter] = {}
+        self._by_t: Dict[float, STEPSegmenter] = {}
+        for (eps, t), segmenter in zip(self.configs, self.segmenters):
+            self._by_eps.setdefault(eps, segmenter)
+            self._by_t.setdefault(t, segmenter)
+
+    @classmethod
+    def from_grid(cls, eps_values: Sequence[float], t_values: Sequence[float]) -> "MultiSTEPSegmenter":
+        """Every (max_eps, min_duration_seconds) of ``eps_values`` x ``t_values``, eps-major."""
+        return cls([(eps, t) for eps in eps_values for t in t_values])
+
+    def process_batch(self, batch: TrajectoryBatch) -> List[List[SegmentSpan]]:
+        """Index spans of ``batch`` for every setting, in ``configs`` order."""
+        n = len(batch)
+        if n == 0:
+            return [[] for _ in self.configs]
+
+        first = self.segmenters[0]
+        xs, ys = first._batch_enu(batch)
+        ts = batch.epoch_seconds
+        if n > 1 and bool(np.any(ts[1:] < ts[:-1])):
+            return [segmenter._process_batch_scan(xs, ys, ts) for segmenter in self.segmenters]
+
+        k_by_t = {t: self._by_t[t]._batch_dwell_starts(ts) for t in self.t_values}
+        idx = np.arange(n)
+        longest = np.zeros(n, dtype=np.int64)
+        for k in k_by_t.values():
+            longest = np.maximum(longest, np.where(k >= 0, idx - k, 0))
+        fail_lag = self._first_fail_lags(xs, ys, longest)
+
+        xl = xs.tolist()
+        yl = ys.tolist()
+        results: List[List[SegmentSpan]] = []
+        for (eps, t), segmenter in zip(self.configs, self.segmenters):
+            k = k_by_t[t]
+            forms = (k >= 0) & (fail_lag[eps] > idx - k)
+            results.append(segmenter._batch_spans(xs, ys, xl, yl, k, forms))
+        return results
+
+    def process(self, trajectory: List[Point]) -> List[List[Segment]]:
+        """Stop/Move segments of ``trajectory`` for every setting, in ``configs`` order."""
+        if not trajectory:
+            return [[] for _ in self.configs]
+        all_spans = self.process_batch(TrajectoryBatch.from_points(trajectory))
+        results: List[List[Segment]] = []
+        for segmenter, spans in zip(self.segmenters, all_spans):
+            segments: List[Segment] = []
+            for span in spans:
+                points = trajectory[span.start:span.stop]
+                segments.append(segmenter._create_stop(points) if span.kind == "stop" else Move(points=points))
+            results.append(segments)
+        return results
+
+    def _first_fail_lags(
+        self, xs: np.ndarray, ys: np.ndarray, longest: np.ndarray
+    ) -> Dict[float, np.ndarray]:
+        """
+        Per distinct D: for every c, the smallest lag L in 1 .. longest[c]
+        such that c - L fails the Alg 1 test against c, else longest[c] + 1.
+        """
+        fail_lag = {eps: longest + 1 for eps in self.eps_values}
+        # Points with at least one D still unresolved and lags left to test.
+        alive = np.flatnonzero(longest > 0)
+        lag = 1
+        width = STEP_BATCH_LAG_BLOCK
+        while alive.size:
+            lags = np.arange(lag, lag + width)
+            longest_alive = longest[alive]
+            j = np.maximum(alive[:, None] - lags, 0)
+            in_window = lags <= longest_alive[:, None]
+            d_sq = (xs[alive, None] - xs[j]) ** 2 + (ys[alive, None] - ys[j]) ** 2
+            unresolved = np.zeros(alive.size, dtype=bool)
+            for eps in self.eps_values:
+                lags_eps = fail_lag[eps]
+                rows = np.flatnonzero(lags_eps[alive] > longest_alive)
+                if not rows.size:
+                    continue
+                c = alive[rows]
+                far = self._by_eps[eps]._pair_fails(c[:, None], j[rows], xs, ys, d_sq[rows])
+                far &= in_window[rows]
+                hit = far.any(axis=1)
+                lags_eps[c[hit]] = lag + far[hit].argmax(axis=1)
+                unresolved[rows[~hit]] = True
+            alive = alive[unresolved & (longest_alive >= lag + width)]
+            lag += width
+            width *= 2
+        return fail_lag
@@ -3,8 +3,16 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List
 
+import numpy as np
+
 from core.point import Point
-from constants.stop_compression_defaults import StopCompressionStrategy, STOP_COMPRESSION_DEFAULT_STRATEGY
+from core.stop_stats import StopStats
+from constants.stop_compression_defaults import (
+    StopCompressionStrategy,
+    STOP_COMPRESSION_DEFAULT_STRATEGY,
+    STOP_MEDOID_BLOCK_POINTS,
+    STOP_MEDOID_DEFAULT_TOLERANCE,
+)
 
 @dataclass(frozen=True)
 class CompressedStop:
@@ -13,8 +21,21 @@ class CompressedStop:
     end_time: datetime
 
 class StopCompressor:
-    def __init__(self, strategy: StopCompressionStrategy = STOP_COMPRESSION_DEFAULT_STRATEGY):
+    def __init__(
+        self,
+        strategy: StopCompressionStrategy = STOP_COMPRESSION_DEFAULT_STRATEGY,
+        medoid_tolerance: float = STOP_MEDOID_DEFAULT_TOLERANCE,
+    ):
+        """
+        Args:
+            strategy: How a stop is reduced to one keypoint.
+            medoid_tolerance: MEDOID may return a point whose sum of distances
+                exceeds the medoid's by this relative amount (0 = exact).
+        """
+        if medoid_tolerance < 0:
+            raise ValueError(f"medoid_tolerance must be >= 0, got {medoid_tolerance}")
         self.strategy = strategy
+        self.medoid_tolerance = medoid_tolerance
 
     def compress(self, points: List[Point]) -> CompressedStop:
         """
@@ -29,62 +50,120 @@ class StopCompressor:
 
         if self.strategy == StopCompressionStrategy.FIRST_POINT:
             keypoint = points[0]
-            
         elif self.strategy == StopCompressionStrategy.MEDOID:
-            # O(n^2) exact medoid minimizing sum of distances to all other points
-            best_point = None
-            min_sum_dist = float('inf')
-            for p1 in points:
-                sum_dist = 0.0
-                for p2 in points:
-                    dlat = p1.lat - p2.lat
-                    dlon = (p1.lon - p2.lon) * math.cos(math.radians((p1.lat + p2.lat) / 2.0))
-                    sum_dist += math.sqrt(dlat*dlat + dlon*dlon)
-                if sum_dist < min_sum_dist:
-                    min_sum_dist = sum_dist
-                    best_point = p1
-            keypoint = best_point
-
+            keypoint = _medoid(points, self.medoid_tolerance)
         else:
             # CENTROID or SNAP_TO_NEAREST
             lats = [p.lat for p in points]
             lons = [p.lon for p in points]
             centroid_lat = sum(lats) / len(lats)
             centroid_lon = sum(lons) / len(lons)
-            
-            centroid_p = Point(
-                lat=centroid_lat,
-                lon=centroid_lon,
-                timestamp=start_time,
-                obj_id=points[0].obj_id
-            )
-            
+
             if self.strategy == StopCompressionStrategy.SNAP_TO_NEAREST:
-                # O(n) find closest raw point to centroid
-                best_point = None
-                min_dist_sq = float('inf')
-                for p in points:
-                    dlat = p.lat - centroid_lat
-                    dlon = (p.lon - centroid_lon) * math.cos(math.radians((p.lat + centroid_lat) / 2.0))
-                    dist_sq = dlat*dlat + dlon*dlon
-                    if dist_sq < min_dist_sq:
-                        min_dist_sq = dist_sq
-                        best_point = p
-                keypoint = best_point
+                keypoint = _nearest(points, centroid_lat, centroid_lon)
             else:
-                keypoint = centroid_p
-
-        # Return a CompressedStop, making sure the keypoint timestamp is the start_time 
-        # (for consistency with how the centroid behaved previously, though medoid/snap have their own timestamps)
-        final_keypoint = Point(
-            lat=keypoint.lat,
-            lon=keypoint.lon,
-            timestamp=start_time,
-            obj_id=keypoint.obj_id
-        )
-
-        return CompressedStop(
-            centroid=final_keypoint,
-            start_time=start_time,
-            end_time=end_time
-        )
+                keypoint = Point(
+                    lat=centroid_lat,
+                    lon=centroid_lon,
+                    timestamp=start_time,
+                    obj_id=points[0].obj_id
+                )
+
+        return _compressed(keypoint, start_time, end_time)
+
+    def compress_stats(self, stats: StopStats) -> CompressedStop:
+        """
+        Same as ``compress`` for a stop summarised by running statistics
+        (fused STEP mode). FIRST_POINT and CENTROID are exact; SNAP_TO_NEAREST
+        and MEDOID choose among the reservoir sample of the stop's points.
+        """
+        if stats.count == 0:
+            raise ValueError("Cannot compress empty stop statistics")
+
+        if self.strategy == StopCompressionStrategy.FIRST_POINT:
+            keypoint = stats.first
+        elif self.strategy == StopCompressionStrategy.MEDOID:
+            keypoint = _medoid(stats.reservoir, self.medoid_tolerance)
+        else:
+            keypoint = stats.centroid()
+            if self.strategy == StopCompressionStrategy.SNAP_TO_NEAREST:
+                keypoint = _nearest(stats.reservoir, keypoint.lat, keypoint.lon)
+
+        return _compressed(keypoint, stats.start_time, stats.end_time)
+
+
+def _medoid(points: List[Point], tolerance: float = 0.0) -> Point:
+    """
+    Point minimizing the sum of distances to all others (local equirectangular
+    projection at the mean latitude), within ``tolerance`` relative.
+
+    Candidates are evaluated in blocks, nearest to the centroid first, each
+    block as one vectorized row of distances. The sum of distances S is
+    convex, so the tangent plane of every evaluated candidate a,
+    S(a) + grad S(a) . (p - a), bounds S(p) from below for all points;
+    points whose bound reaches the best sum are never evaluated. Near the
+    centroid the planes surround the minimum, so a few blocks usually
+    settle a stop of any length.
+    """
+    n = len(points)
+    if n <= 2:
+        return points[0]
+    lats = np.fromiter((p.lat for p in points), dtype=np.float64, count=n)
+    lons = np.fromiter((p.lon for p in points), dtype=np.float64, count=n)
+    xs = lons * math.cos(math.radians(float(lats.mean())))
+    ys = lats
+
+    order = np.argsort((xs - xs.mean()) ** 2 + (ys - ys.mean()) ** 2, kind="stable")
+    lower = np.zeros(n)
+    open_ = np.ones(n, dtype=bool)
+    best_sum = math.inf
+    best = int(order[0])
+    while True:
+        block = order[open_[order]][:STOP_MEDOID_BLOCK_POINTS]
+        if not block.size:
+            break
+        dx = xs[block, None] - xs
+        dy = ys[block, None] - ys
+        dist = np.hypot(dx, dy)
+        sums = dist.sum(axis=1)
+        k = int(np.argmin(sums))
+        if sums[k] < best_sum:
+            best_sum = float(sums[k])
+            best = int(block[k])
+        open_[block] = False
+
+        # Gradient of S at each candidate (0 is a subgradient of |p - q| at q = p).
+        safe = np.where(dist > 0, dist, 1.0)
+        gx = np.where(dist > 0, dx / safe, 0.0).sum(axis=1)
+        gy = np.where(dist > 0, dy / safe, 0.0).sum(axis=1)
+        base = sums - gx * xs[block] - gy * ys[block]
+        planes = base[:, None] + gx[:, None] * xs + gy[:, None] * ys
+        np.maximum(lower, planes.max(axis=0), out=lower)
+        open_ &= lower * (1.0 + tolerance) < best_sum
+    return points[best]
+
+
+def _nearest(points: List[Point], lat: float, lon: float) -> Point:
+    """Closest raw point to (lat, lon), one vectorized pass."""
+    lats = np.fromiter((p.lat for p in points), dtype=np.float64, count=len(points))
+    lons = np.fromiter((p.lon for p in points), dtype=np.float64, count=len(points))
+    dlat = lats - lat
+    dlon = (lons - lon) * np.cos(np.radians((lats + lat) / 2.0))
+    return points[int(np.argmin(dlat * dlat + dlon * dlon))]
+
+
+def _compressed(keypoint: Point, start_time: datetime, end_time: datetime) -> CompressedStop:
+    # Make sure the keypoint timestamp is the start_time (for consistency with
+    # how the centroid behaved previously, though medoid/snap have their own timestamps)
+    final_keypoint = Point(
+        lat=keypoint.lat,
+        lon=keypoint.lon,
+        timestamp=start_time,
+        obj_id=keypoint.obj_id
+    )
+
+    return CompressedStop(
+        centroid=final_keypoint,
+        start_time=start_time,
+        end_time=end_time
+    )
@@ -1,6 +1,6 @@
 from typing import List, Dict, Tuple, Any
 from dataclasses import dataclass, field
-from core.point import Point
+from core.point import Point, epoch_seconds, shares_projection
 from core.trace_config import TraceConfig
 import collections
 import math
@@ -33,8 +33,11 @@ class TraceCompressor:
     3. Reference management (Selection, Deletion, Rewriting) (Section 3.3 in trace.txt)
     """
 
-    def __init__(self, config: TraceConfig = TraceConfig()):
+    def __init__(self, config: TraceConfig = TraceConfig(), instrumentation=None):
         self.config = config
+        # Optional core.instrumentation.Instrumentation shared with the owning
+        # pipeline; sub-step timings are recorded while it is active.
+        self.instrumentation = instrumentation
         self.references: Dict[int, Reference] = {} # ref_id -> Reference
         self.reference_freshness_sum: float = 0.0
         self.current_ref_id_counter: int = 0
@@ -85,6 +88,7 @@ class TraceCompressor:
         speed_rep = self._speed_based_representation(points)
         t1 = time.perf_counter()
         self.diagnostics["speed_rep_time_s"] += float(t1 - t0)
+        self._record("trace.speed_rep", t1 - t0)
         self.diagnostics["speed_rep_points"] += len(speed_rep)
         if len(points) > 0:
             self.diagnostics["speed_rep_reduction_ratio"] = float(len(speed_rep) / len(points))
@@ -95,10 +99,11 @@ class TraceCompressor:
         compressed_rep = self._referential_compression(speed_rep)
         t1 = time.perf_counter()
         self.diagnostics["referential_time_s"] += float(t1 - t0)
+        self._record("trace.referential", t1 - t0)
 
         # Step 3: Reference Management (Selection, Deletion, Rewriting)
         # Updates the reference set based on usage
-        current_time = points[-1].timestamp.timestamp() # Use last point time as approximation
+        current_time = epoch_seconds(points[-1]) # Use last point time as approximation
         
         # Identify used references to update their freshness
         used_refs = set()
@@ -112,6 +117,7 @@ class TraceCompressor:
         self._manage_references(points, speed_rep, used_refs, current_time)
         t1 = time.perf_counter()
         self.diagnostics["reference_manage_time_s"] += float(t1 - t0)
+        self._record("trace.reference_manage", t1 - t0)
 
         self.diagnostics["factor_count_e"] = len(compressed_rep.get("E", []))
         self.diagnostics["factor_count_v"] = len(compressed_rep.get("V", []))
@@ -135,6 +141,11 @@ class TraceCompressor:
 
         return compressed_rep
 
+    def _record(self, stage: str, seconds: float):
+        instr = self.instrumentation
+        if instr is not None and instr.active:
+            instr.record(stage, seconds)
+
     def _speed_based_representation(self, points: List[Point]) -> List[Tuple]:
         """
         Implements Section 3.1: Speed-Based Representation.
@@ -188,11 +199,15 @@ class TraceCompressor:
 
             # Same road segment
             prev_p = points[i-1]
-            dist = lat_lon_dist(prev_p, p)
+            if shares_projection(prev_p, p):
+                # Cached ENU coordinates from ingest: no trig per point
+                dist = math.hypot(p.x - prev_p.x, p.y - prev_p.y)
+                time_diff = p.t - prev_p.t
+            else:
+                dist = lat_lon_dist(prev_p, p)
+                time_diff = epoch_seconds(p) - epoch_seconds(prev_p)
             segment_offset += dist
             
-            time_diff = (p.timestamp - prev_p.timestamp).total_seconds()
-            
             if time_diff > 0:
                 current_speed = dist / time_diff
             else:
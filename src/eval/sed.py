@@ -4,7 +4,7 @@ from __future__ import annotations
 import math
 from typing import Dict, List
 
-from core.point import Point
+from core.point import Point, epoch_seconds
 from core.compression import TrajectoryResult
 
 
@@ -15,9 +15,9 @@ def calculate_sed_error(p_original: Point, p_start: Point, p_end: Point) -> floa
     Returns the Euclidean distance (metres) between p_original and its
     temporal projection onto the segment.
     """
-    t_orig = p_original.timestamp.timestamp()
-    t_start = p_start.timestamp.timestamp()
-    t_end = p_end.timestamp.timestamp()
+    t_orig = epoch_seconds(p_original)
+    t_start = epoch_seconds(p_start)
+    t_end = epoch_seconds(p_end)
 
     if t_start == t_end:
         d_lat = p_original.lat - p_start.lat
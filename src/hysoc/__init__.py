@@ -1,7 +1,9 @@
 from .hysocG import HYSOCGCompressor
 from .hysocN import HYSOCNCompressor
+from .fleet import HYSOCFleetCompressor
+from .server import HYSOCIngestServer
 
 # Backward-friendly alias for existing scripts that still call HYSOCCompressor
 HYSOCCompressor = HYSOCGCompressor
 
-__all__ = ["HYSOCGCompressor", "HYSOCNCompressor", "HYSOCCompressor"]
+__all__ = ["HYSOCFleetCompressor", "HYSOCIngestServer", "HYSOCGCompressor", "HYSOCNCompressor", "HYSOCCompressor"]
@@ -0,0 +1,245 @@
+"""
+HYSOC Fleet: multi-object streaming orchestrator.
+
+Routes one interleaved point stream (many vehicles) to per-object HYSOC
+pipelines. Each object owns its own STEP / SQUISH / TRACE state; objects that
+stop reporting are flushed and dropped after an idle timeout, and a global
+ceiling on buffered points bounds the memory of the whole fleet.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.point import Point, epoch_seconds
+from core.compression import HYSOCConfig, SegmentResult, TrajectoryResult
+from constants.fleet_defaults import (
+    FLEET_DEFAULT_IDLE_TIMEOUT_SECONDS,
+    FLEET_DEFAULT_MAX_BUFFERED_POINTS,
+)
+from .hysocG import HYSOCGCompressor
+
+
+class _ObjectState:
+    """Per-object entry of the fleet state table."""
+    __slots__ = ("compressor", "last_seen", "buffered")
+
+    def __init__(self, compressor: HYSOCGCompressor, last_seen: float):
+        self.compressor = compressor
+        self.last_seen = last_seen
+        self.buffered = 0
+
+
+class HYSOCFleetCompressor:
+    """
+    Fleet-level HYSOC compressor.
+
+    ``process_point`` accepts points of any object in (approximately) time
+    order and returns ``(obj_id, SegmentResult)`` pairs for every segment
+    closed by that point, including segments flushed by evictions.
+
+    Eviction policy:
+      - Idle: an object whose last point is older than ``idle_timeout_seconds``
+        relative to the newest point seen by the fleet (stream time) is
+        flushed and removed.
+      - Memory: while the total number of buffered points exceeds
+        ``max_buffered_points``, the least recently active object is flushed
+        and removed.
+
+    An evicted object that reports again starts with fresh state.
+    """
+
+    def __init__(
+        self,
+        config: Optional[HYSOCConfig] = None,
+        idle_timeout_seconds: float = FLEET_DEFAULT_IDLE_TIMEOUT_SECONDS,
+        max_buffered_points: int = FLEET_DEFAULT_MAX_BUFFERED_POINTS,
+        compressor_factory: Optional[Callable[[HYSOCConfig], HYSOCGCompressor]] = None,
+    ):
+        """
+        Args:
+            config: Pipeline configuration shared by all objects.
+            idle_timeout_seconds: Stream-time inactivity after which an object is evicted.
+            max_buffered_points: Global ceiling on buffered points across all objects.
+            compressor_factory: Builds the per-object pipeline from ``config``.
+                                Defaults to HYSOCGCompressor.
+        """
+        if max_buffered_points < 1:
+            raise ValueError(f"max_buffered_points must be >= 1, got {max_buffered_points}")
+        self.config = config if config is not None else HYSOCConfig()
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_buffered_points = max_buffered_points
+        self.compressor_factory = compressor_factory or HYSOCGCompressor
+
+        # Ordered from least to most recently active object.
+        self.objects: "OrderedDict[str, _ObjectState]" = OrderedDict()
+        self.stream_time: Optional[float] = None
+        self._total_buffered = 0
+
+        self.diagnostics = {
+            "points_in": 0,
+            "objects_created": 0,
+            "idle_evictions": 0,
+            "memory_evictions": 0,
+            "peak_buffered_points": 0,
+            "peak_active_objects": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Buffer accounting
+    # ------------------------------------------------------------------
+
+    @property
+    def total_buffered_points(self) -> int:
+        """Points buffered across all active objects."""
+        return self._total_buffered
+
+    def buffered_points(self, obj_id: Optional[str] = None):
+        """
+        Buffered points of ``obj_id`` (0 if unknown), or a dict of
+        per-object counts when ``obj_id`` is None.
+        """
+        if obj_id is None:
+            return {oid: state.buffered for oid, state in self.objects.items()}
+        state = self.objects.get(obj_id)
+        return state.buffered if state is not None else 0
+
+    @property
+    def active_objects(self) -> int:
+        return len(self.objects)
+
+    def __contains__(self, obj_id: str) -> bool:
+        return obj_id in self.objects
+
+    def _refresh_buffered(self, state: _ObjectState):
+        buffered = state.compressor.buffered_points
+        self._total_buffered += buffered - state.buffered
+        state.buffered = buffered
+
+    # ------------------------------------------------------------------
+    # Streaming interface
+    # ------------------------------------------------------------------
+
+    def process_point(self, point: Point) -> List[Tuple[str, SegmentResult]]:
+        """
+        Routes a point to its object's pipeline.
+        Returns segments closed by this point or by evictions it triggered.
+        """
+        self.diagnostics["points_in"] += 1
+        obj_id = point.obj_id
+        t = epoch_seconds(point)
+        if self.stream_time is None or t > self.stream_time:
+            self.stream_time = t
+
+        emitted: List[Tuple[str, SegmentResult]] = []
+
+        state = self.objects.get(obj_id)
+        if state is None:
+            state = _ObjectState(self.compressor_factory(self.config), t)
+            self.objects[obj_id] = state
+            self.diagnostics["objects_created"] += 1
+        else:
+            state.last_seen = t
+            self.objects.move_to_end(obj_id)
+
+        for seg in state.compressor.process_point(point):
+            emitted.append((obj_id, seg))
+        self._refresh_buffered(state)
+
+        emitted.extend(self.evict_idle())
+        emitted.extend(self._enforce_memory_ceiling())
+
+        if self._total_buffered > self.diagnostics["peak_buffered_points"]:
+            self.diagnostics["peak_buffered_points"] = self._total_buffered
+        if len(self.objects) > self.diagnostics["peak_active_objects"]:
+            self.diagnostics["peak_active_objects"] = len(self.objects)
+        return emitted
+
+    def evict(self, obj_id: str) -> List[Tuple[str, SegmentResult]]:
+        """Flushes and removes one object. Unknown ids return []."""
+        state = self.objects.pop(obj_id, None)
+        if state is None:
+            return []
+        self._total_buffered -= state.buffered
+        return [(obj_id, seg) for seg in state.compressor.flush()]
+
+    def evict_idle(self, now: Optional[float] = None) -> List[Tuple[str, SegmentResult]]:
+        """
+        Evicts every object idle for longer than ``idle_timeout_seconds``
+        at stream time ``now`` (defaults to the newest point seen).
+
+        Walks from the least recently active object and stops at the first
+        active one, so the cost is proportional to the number of evictions.
+        """
+        if now is None:
+            now = self.stream_time
+        if now is None:
+            return []
+        cutoff = now - self.idle_timeout_seconds
+        emitted: List[Tuple[str, SegmentResult]] = []
+        while self.objects:
+            obj_id, state = next(iter(self.objects.items()))
+            if state.last_seen >= cutoff:
+                break
+            emitted.extend(self.evict(obj_id))
+            self.diagnostics["idle_evictions"] += 1
+        return emitted
+
+    def _enforce_memory_ceiling(self) -> List[Tuple[str, SegmentResult]]:
+        """
+        Evicts least recently active objects until the ceiling holds. The
+        object that just reported is the most recent one, so it is only
+        evicted when it alone exceeds the ceiling.
+        """
+        emitted: List[Tuple[str, SegmentResult]] = []
+        while self._total_buffered > self.max_buffered_points and self.objects:
+            emitted.extend(self.evict(next(iter(self.objects))))
+            self.diagnostics["memory_evictions"] += 1
+        return emitted
+
+    def flush(self) -> List[Tuple[str, SegmentResult]]:
+        """Flushes and removes every active object (end of stream)."""
+        emitted: List[Tuple[str, SegmentResult]] = []
+        for obj_id in list(self.objects):
+            emitted.extend(self.evict(obj_id))
+        return emitted
+
+    # ------------------------------------------------------------------
+    # Batch interface
+    # ------------------------------------------------------------------
+
+    def compress(self, points: List[Point]) -> Dict[str, TrajectoryResult]:
+        """
+        Batch wrapper — streams an interleaved point list through the fleet
+        and returns one TrajectoryResult per object.
+        """
+        self.__init__(
+            self.config,
+            idle_timeout_seconds=self.idle_timeout_seconds,
+            max_buffered_points=self.max_buffered_points,
+            compressor_factory=self.compressor_factory,
+        )
+
+        originals: Dict[str, List[Point]] = {}
+        segments: Dict[str, List[SegmentResult]] = {}
+        for point in points:
+            originals.setdefault(point.obj_id, []).append(point)
+            for obj_id, seg in self.process_point(point):
+                segments.setdefault(obj_id, []).append(seg)
+        for obj_id, seg in self.flush():
+            segments.setdefault(obj_id, []).append(seg)
+
+        return {
+            obj_id: TrajectoryResult(
+                object_id=obj_id,
+                original_points=obj_points,
+                segments=segments.get(obj_id, []),
+                strategy=self.config.move_compression_strategy,
+            )
+            for obj_id, obj_points in originals.items()
+        }
+
+    def get_diagnostics(self) -> dict:
+        diag = dict(self.diagnostics)
+        diag["active_objects"] = len(self.objects)
+        diag["total_buffered_points"] = self._total_buffered
+        return diag
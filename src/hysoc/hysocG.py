@@ -15,9 +15,13 @@ Run directly:
 import os
 import math
 import time
-from typing import List, Optional
+from dataclasses import replace
+from typing import List, Optional, Tuple, Union
 
-from core.point import Point
+from core.codec import measure_segment
+from core.instrumentation import Instrumentation
+from core.point import Point, epoch_seconds, shares_projection
+from core.rate_control import ByteBudgetController
 from core.segment import Segment, Stop, Move
 from core.compression import (
     BYTES_PER_POINT,
@@ -28,8 +32,10 @@ from core.compression import (
 )
 from engines.step import STEPSegmenter
 from engines.stop_compressor import StopCompressor
-from engines.squish import SquishCompressor
+from engines.squish import SquishCompressor, SquishECompressor, SquishStream
 from engines.dp import DouglasPeuckerCompressor
+from engines.dead_reckoning import DeadReckoningCompressor, DeadReckoningStream
+from engines.opening_window import OpeningWindowCompressor, OpeningWindowStream
 from engines.trace import TraceCompressor
 from engines.hmm import OnlineMapMatcher
 from constants.geo_defaults import EARTH_RADIUS_M
@@ -39,6 +45,17 @@ from constants.geo_defaults import EARTH_RADIUS_M
 # ---------------------------------------------------------------------------
 DEFAULT_INPUT_FILE: str = os.path.join("data", "raw", "subset_50", "4494499.csv")
 
+# Instrumented stage -> summed diagnostics key it also feeds. With SAMPLED
+# instrumentation the sums are estimates (timed cost x sampling period).
+_STAGE_TOTAL_KEYS = {
+    "map_matching": "map_matching_time_s",
+    "segmentation": "segmentation_time_s",
+    "stop_compression": "compression_time_s",
+    "move_compression": "compression_time_s",
+    "trace": "trace_time_s",
+    "trace_retained_extract": "trace_retained_extract_time_s",
+}
+
 
 class HYSOCGCompressor:
     """
@@ -57,27 +74,89 @@ class HYSOCGCompressor:
                 raise ValueError(
                     "NETWORK_SEMANTIC strategy with map matching requires osm_graph."
                 )
+        if self.config.step_stop_stats and not self.config.compress_stops:
+            raise ValueError("step_stop_stats requires compress_stops (stops keep no raw points).")
+        if (
+            self.config.byte_budget_bytes is not None
+            and self.config.move_compression_strategy != CompressionStrategy.GEOMETRIC
+        ):
+            raise ValueError("byte_budget_bytes (rate control) requires the GEOMETRIC strategy.")
+
+        strategy = self.config.move_compression_strategy
+        geometric = strategy == CompressionStrategy.GEOMETRIC
+        squish_e = strategy == CompressionStrategy.SQUISH_E
+        online = strategy in (CompressionStrategy.OPENING_WINDOW, CompressionStrategy.DEAD_RECKONING)
+        streaming = ((geometric or squish_e) and self.config.squish_streaming) or online
+        max_move_seconds = self.config.step_max_move_seconds
+        if streaming and max_move_seconds is None and self.config.step_max_move_points is None:
+            # Bound STEP by T, not by a point count: forced cuts keep the last T seconds,
+            # so the cache holds about 2T seconds of points whatever the sampling rate.
+            max_move_seconds = self.config.stop_min_duration_seconds
 
         # Module I: Segmentation
         self.segmenter = STEPSegmenter(
             max_eps=self.config.stop_max_eps_meters,
             min_duration_seconds=self.config.stop_min_duration_seconds,
+            max_move_points=self.config.step_max_move_points,
+            max_move_seconds=max_move_seconds,
+            stop_stats=self.config.step_stop_stats,
         )
 
         # Module II: Stop Compression
-        self.stop_compressor = StopCompressor(strategy=self.config.stop_compression_strategy)
+        self.stop_compressor = StopCompressor(
+            strategy=self.config.stop_compression_strategy,
+            medoid_tolerance=self.config.stop_medoid_tolerance,
+        )
 
         # Module III: Move Compression
-        if self.config.move_compression_strategy == CompressionStrategy.GEOMETRIC:
+        self.squish_stream: Optional[SquishStream] = None
+        self.online_stream: Optional[Union[OpeningWindowStream, DeadReckoningStream]] = None
+        self._online_end_time = None
+        self.rate_controller: Optional[ByteBudgetController] = None
+        if self.config.byte_budget_bytes is not None:
+            self.rate_controller = ByteBudgetController(
+                budget_bytes=self.config.byte_budget_bytes,
+                window_seconds=self.config.byte_budget_window_seconds,
+                burst_fraction=self.config.byte_budget_burst_fraction,
+            )
+        if geometric:
             self.squish_compressor = SquishCompressor(
                 capacity=self.config.squish_buffer_capacity
             )
+            if streaming:
+                # Move chunks (partial or final) flow straight into one incremental SQUISH
+                self.squish_stream = self.squish_compressor.stream()
             self.dp_compressor = DouglasPeuckerCompressor(
                 epsilon_meters=self.config.dp_epsilon_meters
             )
+        elif squish_e:
+            self.squish_compressor = SquishECompressor(
+                ratio=self.config.squish_e_ratio,
+                sed_bound_meters=self.config.squish_e_sed_meters,
+            )
+            if streaming:
+                self.squish_stream = self.squish_compressor.stream()
+        elif strategy == CompressionStrategy.OPENING_WINDOW:
+            self.move_compressor = OpeningWindowCompressor(
+                epsilon_meters=self.config.opening_window_epsilon_meters
+            )
+            self.online_stream = self.move_compressor.stream()
+        elif strategy == CompressionStrategy.DEAD_RECKONING:
+            self.move_compressor = DeadReckoningCompressor(
+                epsilon_meters=self.config.dead_reckoning_epsilon_meters
+            )
+            self.online_stream = self.move_compressor.stream()
         else:  # NETWORK_SEMANTIC
             self.move_compressor = TraceCompressor(config=self.config.trace_config)
 
+        # Per-stage latency histograms; TRACE records its sub-steps into the same set
+        self.instrumentation = Instrumentation(
+            level=self.config.instrumentation_level,
+            sample_every=self.config.instrumentation_sample_every,
+        )
+        if self.config.move_compression_strategy == CompressionStrategy.NETWORK_SEMANTIC:
+            self.move_compressor.instrumentation = self.instrumentation
+
         # Optional map matcher
         self.map_matcher: Optional[OnlineMapMatcher] = None
         if self.config.enable_map_matching and self.config.osm_graph is not None:
@@ -98,77 +177,127 @@ class HYSOCGCompressor:
             "retention_kept_speed_change": 0,
             "retention_forced_last_point": 0,
             "retention_move_segments": 0,
+            # Rate control: moves given a larger DP epsilon / dropped to fit the byte budget
+            "rate_control_throttled_moves": 0,
+            "rate_control_dropped_moves": 0,
         }
 
     # ------------------------------------------------------------------
     # Streaming interface
     # ------------------------------------------------------------------
 
+    @property
+    def buffered_points(self) -> int:
+        """Points held by the pipeline that have not been emitted in a segment yet."""
+        buffered = self.segmenter.buffered_points
+        if self.squish_stream is not None:
+            buffered += len(self.squish_stream)
+        if self.online_stream is not None:
+            buffered += len(self.online_stream)
+        if self.map_matcher is not None:
+            buffered += len(self.map_matcher.buffer)
+        return buffered
+
     def process_point(self, point: Point) -> List[SegmentResult]:
         """
         Processes a single point through the streaming pipeline.
         Returns any fully compressed segments that were closed by this point.
         """
         self._total_points_in += 1
+        instr = self.instrumentation
+        if not instr.begin_point():
+            return self._process_point(point)
+
+        t0 = time.perf_counter()
+        try:
+            return self._process_point(point)
+        finally:
+            instr.record("point_total", time.perf_counter() - t0)
+            instr.end_point()
+
+    def _process_point(self, point: Point) -> List[SegmentResult]:
+        timed = self.instrumentation.active
 
         # Stage 1: Map Matching
         if self.map_matcher is not None:
-            t0 = time.perf_counter()
+            if timed:
+                t0 = time.perf_counter()
             matched_point = self.map_matcher.process_point(point)
-            t1 = time.perf_counter()
-            self.diagnostics["map_matching_time_s"] += float(t1 - t0)
+            if timed:
+                self._record("map_matching", time.perf_counter() - t0)
             if matched_point is None:
                 return []
             point = matched_point
 
         # Stage 2: Segmentation
-        t0 = time.perf_counter()
+        if timed:
+            t0 = time.perf_counter()
         segments = self.segmenter.process_point(point)
-        t1 = time.perf_counter()
-        self.diagnostics["segmentation_time_s"] += float(t1 - t0)
+        if timed:
+            self._record("segmentation", time.perf_counter() - t0)
 
         # Stage 3: Compression
-        compressed = []
-        t0 = time.perf_counter()
-        for seg in segments:
-            c_seg = self._compress_segment(seg)
-            if c_seg is not None:
-                compressed.append(c_seg)
-        t1 = time.perf_counter()
-        self.diagnostics["compression_time_s"] += float(t1 - t0)
-
-        return compressed
+        return self._compress_segments(segments)
 
     def flush(self) -> List[SegmentResult]:
         """Flushes and compresses any remaining buffered segments."""
+        instr = self.instrumentation
+        timed = instr.begin_flush()
         compressed = []
 
         # Flush map matcher buffers through segmenter
         if self.map_matcher is not None:
             for point in self.map_matcher.flush():
-                t0 = time.perf_counter()
+                if timed:
+                    t0 = time.perf_counter()
                 segments = self.segmenter.process_point(point)
-                t1 = time.perf_counter()
-                self.diagnostics["segmentation_time_s"] += float(t1 - t0)
-                t0 = time.perf_counter()
-                for seg in segments:
-                    c_seg = self._compress_segment(seg)
-                    if c_seg is not None:
-                        compressed.append(c_seg)
-                t1 = time.perf_counter()
-                self.diagnostics["compression_time_s"] += float(t1 - t0)
+                if timed:
+                    self._record("segmentation", time.perf_counter() - t0)
+                compressed.extend(self._compress_segments(segments))
 
         # Flush segmenter
-        t0 = time.perf_counter()
-        for seg in self.segmenter.flush():
-            c_seg = self._compress_segment(seg)
-            if c_seg is not None:
-                compressed.append(c_seg)
-        t1 = time.perf_counter()
-        self.diagnostics["compression_time_s"] += float(t1 - t0)
+        compressed.extend(self._compress_segments(self.segmenter.flush()))
+        if self.squish_stream is not None and self.squish_stream.pushed:
+            self._collect(compressed, self._close_streamed_move())
+        if self.online_stream is not None and self.online_stream.pushed:
+            self._collect(compressed, self._close_online_move())
+        instr.end_point()
+        return compressed
 
+    def _compress_segments(self, segments: List[Segment]) -> List[SegmentResult]:
+        timed = self.instrumentation.active
+        compressed = []
+        for seg in segments:
+            if self.squish_stream is not None and self.squish_stream.pushed and isinstance(seg, Stop):
+                # A stop right after partial chunks closes their move
+                self._collect(compressed, self._close_streamed_move())
+            if self.online_stream is not None and self.online_stream.pushed and isinstance(seg, Stop):
+                self._collect(compressed, self._close_online_move())
+            if timed:
+                t0 = time.perf_counter()
+            c_seg = self._compress_segment(seg)
+            if timed:
+                stage = "stop_compression" if isinstance(seg, Stop) else "move_compression"
+                self._record(stage, time.perf_counter() - t0)
+            self._collect(compressed, c_seg)
         return compressed
 
+    def _collect(self, compressed: List[SegmentResult], result: Optional[SegmentResult]):
+        """Appends an emitted segment result and charges it to the byte budget."""
+        if result is None:
+            return
+        if self.rate_controller is not None:
+            self.rate_controller.record(result.end_time, result.encoded_bytes)
+        compressed.append(result)
+
+    def _record(self, stage: str, seconds: float):
+        """Adds one stage timing to its histogram and to the summed (*_time_s) diagnostics."""
+        instr = self.instrumentation
+        instr.record(stage, seconds)
+        total_key = _STAGE_TOTAL_KEYS.get(stage)
+        if total_key is not None:
+            self.diagnostics[total_key] += seconds * instr.current_weight
+
     # ------------------------------------------------------------------
     # Batch interface
     # ------------------------------------------------------------------
@@ -202,34 +331,54 @@ class HYSOCGCompressor:
         """Routes a detected segment to the appropriate compressor."""
         if isinstance(seg, Stop):
             if self.config.compress_stops:
-                compressed_stop = self.stop_compressor.compress(seg.points)
+                if seg.stats is not None:
+                    compressed_stop = self.stop_compressor.compress_stats(seg.stats)
+                else:
+                    compressed_stop = self.stop_compressor.compress(seg.points)
                 keypoints = [compressed_stop.centroid]
             else:
                 keypoints = list(seg.points)
 
             self._total_points_compressed += len(keypoints)
-            return SegmentResult(
+            return self._finalize(SegmentResult(
                 kind="stop",
                 start_time=seg.start_time,
                 end_time=seg.end_time,
                 keypoints=keypoints,
                 encoded_bytes=len(keypoints) * BYTES_PER_POINT,
-            )
+            ))
 
         elif isinstance(seg, Move):
+            if self.squish_stream is not None:
+                for p in seg.points:
+                    self.squish_stream.push(p)
+                return None if seg.partial else self._close_streamed_move()
+            if self.online_stream is not None:
+                return self._push_online_move(seg)
+
             if self.config.move_compression_strategy == CompressionStrategy.GEOMETRIC:
                 squish_result = self.squish_compressor.compress(seg.points)
-                keypoints = self.dp_compressor.compress(squish_result)
+                if self.rate_controller is not None:
+                    return self._budgeted_move(squish_result, seg.start_time, seg.end_time, seg.partial)
+                keypoints, ranks = self._refine(squish_result)
+                encoded_bytes = len(keypoints) * BYTES_PER_POINT
+            elif self.config.move_compression_strategy == CompressionStrategy.SQUISH_E:
+                if self.config.progressive_keypoints:
+                    keypoints, ranks = self.squish_compressor.compress_ranked(seg.points)
+                else:
+                    keypoints, ranks = self.squish_compressor.compress(seg.points), None
                 encoded_bytes = len(keypoints) * BYTES_PER_POINT
             else:
-                t0 = time.perf_counter()
+                timed = self.instrumentation.active
+                if timed:
+                    t0 = time.perf_counter()
                 trace_result = self.move_compressor.compress(seg.points)
-                t1 = time.perf_counter()
-                self.diagnostics["trace_time_s"] += float(t1 - t0)
-                t0 = time.perf_counter()
+                if timed:
+                    t1 = time.perf_counter()
+                    self._record("trace", t1 - t0)
                 keypoints, counters = self._extract_retained_points_from_trace(seg.points)
-                t1 = time.perf_counter()
-                self.diagnostics["trace_retained_extract_time_s"] += float(t1 - t0)
+                if timed:
+                    self._record("trace_retained_extract", time.perf_counter() - t1)
                 self.diagnostics["retention_move_segments"] += 1
                 self.diagnostics["retention_input_points"] += counters["input_points"]
                 self.diagnostics["retention_kept_points"] += counters["kept_points"]
@@ -237,18 +386,148 @@ class HYSOCGCompressor:
                 self.diagnostics["retention_kept_speed_change"] += counters["speed_change_kept"]
                 self.diagnostics["retention_forced_last_point"] += counters["forced_last_point"]
                 encoded_bytes = self._trace_encoded_bytes(trace_result)
+                ranks = None
 
             self._total_points_compressed += len(keypoints)
-            return SegmentResult(
+            return self._finalize(SegmentResult(
                 kind="move",
                 start_time=seg.start_time,
                 end_time=seg.end_time,
                 keypoints=keypoints,
                 encoded_bytes=encoded_bytes,
-            )
+                partial=seg.partial,
+                ranks=ranks,
+            ))
 
         return None
 
+    def _close_streamed_move(self) -> Optional[SegmentResult]:
+        """Move result from the incremental SQUISH: its survivors, refined by DP (GEOMETRIC)."""
+        geometric = self.config.move_compression_strategy == CompressionStrategy.GEOMETRIC
+        if self.config.progressive_keypoints and not geometric:
+            squish_result, ranks = self.squish_stream.finish_ranked()
+        else:
+            squish_result, ranks = self.squish_stream.finish(), None
+        if self.rate_controller is not None:
+            return self._budgeted_move(
+                squish_result, squish_result[0].timestamp, squish_result[-1].timestamp, False
+            )
+        if geometric:
+            keypoints, ranks = self._refine(squish_result)
+        else:
+            keypoints = squish_result
+        self._total_points_compressed += len(keypoints)
+        return self._finalize(SegmentResult(
+            kind="move",
+            start_time=squish_result[0].timestamp,
+            end_time=squish_result[-1].timestamp,
+            keypoints=keypoints,
+            encoded_bytes=len(keypoints) * BYTES_PER_POINT,
+            ranks=ranks,
+        ))
+
+    def _refine(self, squish_result: List[Point]) -> Tuple[List[Point], Optional[List[int]]]:
+        """GEOMETRIC: DP over the SQUISH survivors, plus their DP ranks with progressive_keypoints."""
+        if not self.config.progressive_keypoints:
+            return self.dp_compressor.compress(squish_result), None
+        significance = self.dp_compressor.significance(squish_result)
+        epsilon = self.dp_compressor.epsilon_meters
+        return significance.select(epsilon), significance.ranks(epsilon)
+
+    def _budgeted_move(
+        self, squish_result: List[Point], start_time, end_time, partial: bool
+    ) -> Optional[SegmentResult]:
+        """
+        GEOMETRIC move under rate control: SQUISH survivors refined by DP at the
+        configured epsilon (the move's demand), or at the smallest larger epsilon
+        that fits the controller's allowance. A move keeps at least its two end
+        points; one that cannot fit them is dropped, with or without measured
+        codec bytes.
+        """
+        significance = self.dp_compressor.significance(squish_result)
+        epsilon = self.config.dp_epsilon_meters
+        progressive = self.config.progressive_keypoints
+
+        def build(keypoints: List[Point]) -> SegmentResult:
+            return self._finalize(SegmentResult(
+                kind="move",
+                start_time=start_time,
+                end_time=end_time,
+                keypoints=keypoints,
+                encoded_bytes=len(keypoints) * BYTES_PER_POINT,
+                partial=partial,
+                ranks=significance.ranks(epsilon) if progressive else None,
+            ))
+
+        keypoints = significance.select(epsilon)
+        result = build(keypoints)
+        allowance = self.rate_controller.allowance(end_time, result.encoded_bytes)
+        if result.encoded_bytes > allowance:
+            self.diagnostics["rate_control_throttled_moves"] += 1
+        while result.encoded_bytes > allowance:
+            if len(keypoints) <= 2:
+                self.diagnostics["rate_control_dropped_moves"] += 1
+                return None
+            # Shrink the keypoint budget in proportion to the overshoot.
+            max_points = max(2, min(len(keypoints) - 1, len(keypoints) * allowance // result.encoded_bytes))
+            epsilon = significance.epsilon_for(max_points, epsilon)
+            keypoints = significance.select(epsilon)
+            result = build(keypoints)
+        self._total_points_compressed += len(keypoints)
+        return result
+
+    def _push_online_move(self, seg: Move) -> Optional[SegmentResult]:
+        """
+        Pushes a move chunk into the online compressor. Keypoints it emits leave
+        at once as a partial move result; the final chunk closes the move.
+        """
+        stream = self.online_stream
+        keypoints: List[Point] = []
+        for p in seg.points:
+            keypoints.extend(stream.push(p))
+        self._online_end_time = seg.end_time
+        if not seg.partial:
+            return self._close_online_move(keypoints)
+        if not keypoints:
+            return None
+        self._total_points_compressed += len(keypoints)
+        return self._finalize(SegmentResult(
+            kind="move",
+            start_time=keypoints[0].timestamp,
+            end_time=keypoints[-1].timestamp,
+            keypoints=keypoints,
+            encoded_bytes=len(keypoints) * BYTES_PER_POINT,
+            partial=True,
+        ))
+
+    def _close_online_move(self, keypoints: Optional[List[Point]] = None) -> SegmentResult:
+        """Closing move result of the online compressor (empty if its last point already left)."""
+        keypoints = (keypoints or []) + self.online_stream.finish()
+        self._total_points_compressed += len(keypoints)
+        if keypoints:
+            start_time, end_time = keypoints[0].timestamp, keypoints[-1].timestamp
+        else:
+            start_time = end_time = self._online_end_time
+        return self._finalize(SegmentResult(
+            kind="move",
+            start_time=start_time,
+            end_time=end_time,
+            keypoints=keypoints,
+            encoded_bytes=len(keypoints) * BYTES_PER_POINT,
+        ))
+
+    def _finalize(self, result: SegmentResult) -> SegmentResult:
+        """
+        Ranks move keypoints by their DP significance if progressive_keypoints
+        is set and the compressor gave no ranks, and replaces the estimated
+        byte cost with the measured codec record size if configured.
+        """
+        if self.config.progressive_keypoints and result.kind == "move" and result.ranks is None:
+            result = replace(result, ranks=DouglasPeuckerCompressor().significance(result.keypoints).ranks())
+        if self.config.measure_encoded_bytes:
+            return measure_segment(result)
+        return result
+
     def _extract_retained_points_from_trace(self, points: List[Point]) -> tuple[List[Point], dict]:
         """Identifies retained velocity-change points for TRACE rendering."""
         if not points or len(points) < 2:
@@ -289,8 +568,12 @@ class HYSOCGCompressor:
                 continue
 
             prev_p = points[i - 1]
-            dist = lat_lon_dist(prev_p, p)
-            time_diff = (p.timestamp - prev_p.timestamp).total_seconds()
+            if shares_projection(prev_p, p):
+                dist = math.hypot(p.x - prev_p.x, p.y - prev_p.y)
+                time_diff = p.t - prev_p.t
+            else:
+                dist = lat_lon_dist(prev_p, p)
+                time_diff = epoch_seconds(p) - epoch_seconds(prev_p)
 
             if time_diff > 0:
                 current_speed = dist / time_diff
@@ -345,6 +628,8 @@ class HYSOCGCompressor:
             )
         else:
             diag["retention_ratio"] = 0.0
+        if self.instrumentation.enabled:
+            diag["latency"] = self.instrumentation.summary()
         return diag
 
     def get_compression_summary(self) -> str:
@@ -361,9 +646,29 @@ class HYSOCGCompressor:
 
         if self.config.move_compression_strategy == CompressionStrategy.GEOMETRIC:
             lines.append(
-                f"  - SquishCompressor (capacity={self.config.squish_buffer_capacity}) → "
+                f"  - SquishCompressor (capacity={self.config.squish_buffer_capacity}"
+                f"{', streaming' if self.squish_stream is not None else ''}) → "
                 f"DouglasPeuckerCompressor (ε={self.config.dp_epsilon_meters}m)"
             )
+            if self.rate_controller is not None:
+                lines.append(
+                    f"  - Byte budget: {self.config.byte_budget_bytes} B per "
+                    f"{self.config.byte_budget_window_seconds:g}s (DP ε raised per move to fit)"
+                )
+        elif self.config.move_compression_strategy == CompressionStrategy.SQUISH_E:
+            lines.append(
+                f"  - SquishECompressor (λ={self.config.squish_e_ratio}, "
+                f"μ={self.config.squish_e_sed_meters}m"
+                f"{', streaming' if self.squish_stream is not None else ''})"
+            )
+        elif self.config.move_compression_strategy == CompressionStrategy.OPENING_WINDOW:
+            lines.append(
+                f"  - OpeningWindowCompressor (SED ≤ {self.config.opening_window_epsilon_meters}m, online)"
+            )
+        elif self.config.move_compression_strategy == CompressionStrategy.DEAD_RECKONING:
+            lines.append(
+                f"  - DeadReckoningCompressor (ε={self.config.dead_reckoning_epsilon_meters}m, online)"
+            )
         else:
             lines.append("  - TraceCompressor (Network-Semantic)")
             lines.append(
@@ -0,0 +1,411 @@
+"""
+HYSOC Server: asyncio ingestion service.
+
+Accepts point records on a TCP or Unix socket and feeds them to per-object
+HYSOC-G pipelines. Closed segments go to a pluggable sink.
+
+Wire formats (one per server, chosen with ``protocol``):
+
+    ndjson   one JSON object per line:
+             {"obj_id": "42", "lat": 40.71, "lon": -74.0, "t": 1704096000.0, "road_id": 5}
+             ``t`` is epoch seconds (UTC); ``road_id`` is optional.
+    binary   repeated records of
+             f64 lat | f64 lon | i64 epoch_us | i64 road_id (-1 = none)
+             | u16 len | len bytes UTF-8 obj_id            (little-endian)
+
+Pipeline:
+
+    connection readers --(hash(obj_id))--> shard queues --> shard workers --> sink
+
+Each shard worker owns one HYSOCFleetCompressor, so the points of one object
+are processed in arrival order and idle objects are evicted as usual. Shard
+queues are bounded; a reader whose shard queue is full stops reading from its
+socket until the worker catches up, so a fast client is slowed down by TCP
+flow control instead of growing server memory. A point the pipeline fails on
+and a segment the sink fails on are counted (``point_errors`` /
+``sink_errors``), logged and skipped, so a worker never dies with its queue
+still being fed.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import struct
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from core.batch import NO_ROAD, datetime_to_epoch_us
+from core.compression import HYSOCConfig, SegmentResult
+from core.point import Point, to_epoch_seconds
+from constants.fleet_defaults import (
+    FLEET_DEFAULT_IDLE_TIMEOUT_SECONDS,
+    FLEET_DEFAULT_MAX_BUFFERED_POINTS,
+)
+from constants.server_defaults import (
+    SERVER_DEFAULT_PROTOCOL,
+    SERVER_DEFAULT_QUEUE_SIZE,
+    SERVER_DEFAULT_SHARDS,
+    SERVER_DELAY_SAMPLE_SIZE,
+)
+from .fleet import HYSOCFleetCompressor
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_BINARY_HEADER = struct.Struct("<ddqqH")
+PROTOCOLS = ("ndjson", "binary")
+
+# Sink: called once per closed segment; may be a plain function or a coroutine
+# function. ``ArchiveWriter.append`` fits this signature.
+SegmentSink = Callable[[str, SegmentResult], Union[None, Awaitable[None]]]
+
+
+# ----------------------------------------------------------------------
+# Record encoding (shared by the server and test / load-generation clients)
+# ----------------------------------------------------------------------
+
+def encode_ndjson(point: Point) -> bytes:
+    record = {
+        "obj_id": point.obj_id,
+        "lat": point.lat,
+        "lon": point.lon,
+        "t": to_epoch_seconds(point.timestamp),
+    }
+    if point.road_id is not None:
+        record["road_id"] = point.road_id
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_ndjson(line: bytes) -> Point:
+    record = json.loads(line)
+    return Point(
+        lat=float(record["lat"]),
+        lon=float(record["lon"]),
+        timestamp=_EPOCH + timedelta(seconds=float(record["t"])),
+        obj_id=str(record["obj_id"]),
+        road_id=record.get("road_id"),
+    )
+
+
+def encode_binary(point: Point) -> bytes:
+    """Binary record of ``point``; road ids must be integers (or None)."""
+    obj_id = str(point.obj_id).encode("utf-8")
+    road_id = NO_ROAD if point.road_id is None else int(point.road_id)
+    return _BINARY_HEADER.pack(
+        point.lat, point.lon, datetime_to_epoch_us(point.timestamp), road_id, len(obj_id)
+    ) + obj_id
+
+
+def _decode_binary(header: bytes, obj_id: bytes) -> Point:
+    lat, lon, epoch_us, road_id, _ = _BINARY_HEADER.unpack(header)
+    return Point(
+        lat=lat,
+        lon=lon,
+        timestamp=_EPOCH + timedelta(microseconds=epoch_us),
+        obj_id=obj_id.decode("utf-8"),
+        road_id=None if road_id == NO_ROAD else road_id,
+    )
+
+
+ENCODERS: Dict[str, Callable[[Point], bytes]] = {"ndjson": encode_ndjson, "binary": encode_binary}
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+
+class HYSOCIngestServer:
+    """
+    asyncio ingestion server in front of sharded HYSOCFleetCompressors.
+
+    Usage::
+
+        server = HYSOCIngestServer(sink=writer.append, config=HYSOCConfig())
+        await server.start_tcp("127.0.0.1", 7070)      # or start_unix(path)
+        ...
+        await server.stop()                            # drains and flushes
+
+    Queueing delay is measured per point from the moment its record is parsed
+    to the moment its shard worker picks it up.
+    """
+
+    def __init__(
+        self,
+        sink: SegmentSink,
+        config: Optional[HYSOCConfig] = None,
+        protocol: str = SERVER_DEFAULT_PROTOCOL,
+        shards: int = SERVER_DEFAULT_SHARDS,
+        queue_size: int = SERVER_DEFAULT_QUEUE_SIZE,
+        idle_timeout_seconds: float = FLEET_DEFAULT_IDLE_TIMEOUT_SECONDS,
+        max_buffered_points: int = FLEET_DEFAULT_MAX_BUFFERED_POINTS,
+    ):
+        """
+        Args:
+            sink: Receives ``(obj_id, segment)`` for every closed segment.
+            config: Pipeline configuration shared by all objects.
+            protocol: Wire format, "ndjson" or "binary".
+            shards: Number of compressor shards (queue + worker + fleet each).
+            queue_size: Capacity of each shard queue, in points.
+            idle_timeout_seconds: Per-shard fleet idle eviction timeout.
+            max_buffered_points: Buffered-point ceiling across the whole server
+                                 (split evenly over the shards).
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"protocol must be one of {PROTOCOLS}, got {protocol!r}")
+        if shards < 1:
+            raise ValueError(f"shards must be >= 1, got {shards}")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be >= 1, got {queue_size}")
+        self.sink = sink
+        self.config = config if config is not None else HYSOCConfig()
+        self.protocol = protocol
+        self.queue_size = queue_size
+        self.fleets = [
+            HYSOCFleetCompressor(
+                self.config,
+                idle_timeout_seconds=idle_timeout_seconds,
+                max_buffered_points=max(1, max_buffered_points // shards),
+            )
+            for _ in range(shards)
+        ]
+
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._servers: List[asyncio.AbstractServer] = []
+        self._connections: set = set()
+        self._started_at: Optional[float] = None
+        self._delays: deque = deque(maxlen=SERVER_DELAY_SAMPLE_SIZE)
+
+        self.stats = {
+            "connections": 0,
+            "points_in": 0,
+            "points_processed": 0,
+            "bad_records": 0,
+            "point_errors": 0,
+            "segments_out": 0,
+            "sink_errors": 0,
+            "backpressure_waits": 0,
+            "max_queue_delay_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _start_workers(self):
+        if self._workers:
+            return
+        self._started_at = time.perf_counter()
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.fleets]
+        self._workers = [
+            asyncio.create_task(self._worker(queue, fleet))
+            for queue, fleet in zip(self._queues, self.fleets)
+        ]
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Starts listening on TCP; returns the bound port (useful with port=0)."""
+        self._start_workers()
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def start_unix(self, path: str):
+        """Starts listening on a Unix domain socket at ``path``."""
+        self._start_workers()
+        server = await asyncio.start_unix_server(self._handle_connection, path)
+        self._servers.append(server)
+
+    async def stop(self):
+        """
+        Stops accepting connections, waits for open connections to finish,
+        drains the shard queues and flushes every object to the sink.
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        for queue in self._queues:
+            await queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        for fleet in self.fleets:
+            await self._emit(fleet.flush())
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def _shard(self, obj_id: str) -> int:
+        # crc32 rather than hash(): stable across processes (PYTHONHASHSEED)
+        return zlib.crc32(obj_id.encode("utf-8")) % len(self._queues)
+
+    async def submit(self, point: Point):
+        """Enqueues one point, waiting while its shard queue is full."""
+        queue = self._queues[self._shard(point.obj_id)]
+        self.stats["points_in"] += 1
+        item = (time.perf_counter(), point)
+        if queue.full():
+            self.stats["backpressure_waits"] += 1
+        await queue.put(item)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        self.stats["connections"] += 1
+        try:
+            records = self._read_ndjson if self.protocol == "ndjson" else self._read_binary
+            async for point in records(reader):
+                await self.submit(point)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_ndjson(self, reader: asyncio.StreamReader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            try:
+                yield decode_ndjson(line)
+            except (ValueError, KeyError, TypeError):
+                self.stats["bad_records"] += 1
+
+    async def _read_binary(self, reader: asyncio.StreamReader):
+        while True:
+            try:
+                header = await reader.readexactly(_BINARY_HEADER.size)
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    self.stats["bad_records"] += 1  # truncated trailing record
+                return
+            obj_len = _BINARY_HEADER.unpack_from(header)[-1]
+            obj_id = await reader.readexactly(obj_len)
+            try:
+                yield _decode_binary(header, obj_id)
+            except UnicodeDecodeError:
+                self.stats["bad_records"] += 1
+
+    # ------------------------------------------------------------------
+    # Compression
+    # ------------------------------------------------------------------
+
+    async def _worker(self, queue: asyncio.Queue, fleet: HYSOCFleetCompressor):
+        while True:
+            enqueued_at, point = await queue.get()
+            try:
+                delay_ms = (time.perf_counter() - enqueued_at) * 1e3
+                self._delays.append(delay_ms)
+                if delay_ms > self.stats["max_queue_delay_ms"]:
+                    self.stats["max_queue_delay_ms"] = delay_ms
+                try:
+                    emitted = fleet.process_point(point)
+                except Exception:
+                    self.stats["point_errors"] += 1
+                    logger.exception("Dropped a point of object %r: pipeline error", point.obj_id)
+                    continue
+                self.stats["points_processed"] += 1
+                if emitted:
+                    await self._emit(emitted)
+            finally:
+                queue.task_done()
+            # get() on a non-empty queue does not yield to the event loop;
+            # yield periodically so readers and other shards make progress.
+            if self.stats["points_processed"] % 256 == 0:
+                await asyncio.sleep(0)
+
+    async def _emit(self, emitted: Iterable):
+        for obj_id, seg in emitted:
+            try:
+                result = self.sink(obj_id, seg)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                self.stats["sink_errors"] += 1
+                logger.exception("Dropped a segment of object %r: sink error", obj_id)
+                continue
+            self.stats["segments_out"] += 1
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    @property
+    def queued_points(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def get_diagnostics(self) -> dict:
+        diag = dict(self.stats)
+        elapsed = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        diag["elapsed_seconds"] = elapsed
+        diag["points_per_second"] = diag["points_processed"] / elapsed if elapsed > 0 else 0.0
+        diag["queued_points"] = self.queued_points
+        if self._delays:
+            ordered = sorted(self._delays)
+            diag["queue_delay_p50_ms"] = ordered[len(ordered) // 2]
+            diag["queue_delay_p95_ms"] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        diag["active_objects"] = sum(f.active_objects for f in self.fleets)
+        diag["total_buffered_points"] = sum(f.total_buffered_points for f in self.fleets)
+        return diag
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+async def send_points(
+    points: Iterable[Point],
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    path: Optional[str] = None,
+    protocol: str = SERVER_DEFAULT_PROTOCOL,
+    batch_size: int = 256,
+) -> int:
+    """
+    Minimal client: streams ``points`` to a server over TCP (host/port) or a
+    Unix socket (path), draining the socket every ``batch_size`` records so
+    server backpressure slows the sender. Returns the number of points sent.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host or "127.0.0.1", port)
+    encode = ENCODERS[protocol]
+    sent = 0
+    buf = bytearray()
+    try:
+        for point in points:
+            buf += encode(point)
+            sent += 1
+            if sent % batch_size == 0:
+                writer.write(buf)
+                buf.clear()
+                await writer.drain()
+        if buf:
+            writer.write(buf)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+        await reader.read()  # server closes once it has read everything
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+    return sent
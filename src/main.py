@@ -12,21 +12,32 @@ def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="HYSOC/Oracle orchestrator entrypoint")
     parser.add_argument("--input", type=str, required=True, help="Path to input CSV trajectory")
     parser.add_argument("--mode", choices=["hysoc_g", "hysoc_n"], default="hysoc_g")
+    parser.add_argument(
+        "--timestamp-format",
+        type=str,
+        default=None,
+        help="strftime format of the time column (default: inferred, e.g. ISO-8601)",
+    )
     return parser
 
 
-def run_hysoc(input_path: Path, mode: str) -> None:
+def run_hysoc(input_path: Path, mode: str, timestamp_format: str | None = None) -> None:
     strategy = CompressionStrategy.GEOMETRIC if mode == "hysoc_g" else CompressionStrategy.NETWORK_SEMANTIC
     config = HYSOCConfig(move_compression_strategy=strategy)
-    stream = TrajectoryStream(filepath=input_path, col_mapping={"lat": "latitude", "lon": "longitude", "timestamp": "time"})
+    stream = TrajectoryStream(
+        filepath=input_path,
+        col_mapping={"lat": "latitude", "lon": "longitude", "timestamp": "time"},
+        timestamp_format=timestamp_format,
+    )
     points = list(stream.stream())
+    print(f"[ingest] {stream.stats.rows} rows in {stream.stats.seconds:.3f}s ({stream.stats.rows_per_second:,.0f} rows/s)")
     result = HYSOCCompressor(config=config).compress(points)
     print(f"[{mode}] Compressed {len(result.original_points)} -> {len(result.keypoints)} points")
 
 
 def main() -> None:
     args = build_arg_parser().parse_args()
-    run_hysoc(Path(args.input), args.mode)
+    run_hysoc(Path(args.input), args.mode, args.timestamp_format)
 
 
 if __name__ == "__main__":
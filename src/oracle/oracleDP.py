@@ -3,7 +3,7 @@ from typing import List
 from constants.dp_defaults import DP_DEFAULT_EPSILON_METERS
 from core.point import Point
 from core.segment import Segment
-from engines.dp import DouglasPeuckerCompressor
+from engines.dp import DouglasPeuckerCompressor, DPSignificance
 
 
 class OracleDP:
@@ -37,3 +37,11 @@ class OracleDP:
             return []
             
         return self.compressor.compress(segment.points)
+
+    def significance(self, segment: Segment) -> DPSignificance:
+        """
+        DP significance hierarchy of a segment: ``.select(eps)`` equals
+        ``OracleDP(eps).process(segment)`` for every eps >= 0, so epsilon
+        sweeps run DP once per segment.
+        """
+        return self.compressor.significance(segment.points)
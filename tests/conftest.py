@@ -0,0 +1,37 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.point import Point
+
+
+def _dwell_drive_dwell(obj_id: str, start: datetime, lat0: float, road_ids: bool = False) -> list[Point]:
+    """Dwell 60 s, drive ~1 km north, dwell 60 s (1 Hz); road ids change every 50 points if asked."""
+    points = []
+    for i in range(260):
+        if i < 60:
+            lat = lat0 + 0.000005 * math.sin(i)
+        elif i < 200:
+            lat = lat0 + 0.01 * (i - 60) / 140
+        else:
+            lat = lat0 + 0.01 + 0.000005 * math.cos(i)
+        road_id = 1000 + i // 50 if road_ids else None
+        points.append(Point(lat, -74.0, start + timedelta(seconds=i), obj_id, road_id=road_id))
+    return points
+
+
+def _interleave(*trajectories: list[Point]) -> list[Point]:
+    return sorted((p for traj in trajectories for p in traj), key=lambda p: p.timestamp)
+
+
+@pytest.fixture
+def make_trip():
+    """Factory for one object's dwell / drive / dwell trip (multi-object fleet and server tests)."""
+    return _dwell_drive_dwell
+
+
+@pytest.fixture
+def interleave():
+    """Merges several objects' trajectories into one time-ordered stream."""
+    return _interleave
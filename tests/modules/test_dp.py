@@ -60,3 +60,83 @@ def test_dp_tight_tolerance():
     
     # Retains all points since 0.1m is incredibly small
     assert len(compressed) == len(points)
+
+def test_iterative_dp_matches_recursive_reference():
+    import math
+    import random
+    from engines.dp import _perpendicular_distance_deg
+
+    # The original recursive slicing implementation.
+    def reference(points, eps):
+        if len(points) <= 2:
+            return points
+        dmax, index, end = 0.0, 0, len(points) - 1
+        for i in range(1, end):
+            p, s, e = points[i], points[0], points[end]
+            d = _perpendicular_distance_deg(p.lat, p.lon, s.lat, s.lon, e.lat, e.lon)
+            if d > dmax:
+                index, dmax = i, d
+        if dmax > eps:
+            return reference(points[:index + 1], eps)[:-1] + reference(points[index:], eps)
+        return [points[0], points[end]]
+
+    rng = random.Random(4)
+    base_time = datetime(2026, 1, 1, 12, 0, 0)
+    lat, lon, heading = 63.4, 10.4, 0.0
+    points = []
+    for i in range(2000):
+        heading += rng.gauss(0.0, 0.1)
+        lat += (10.0 * math.cos(heading) + rng.gauss(0.0, 3.0)) / 111_195.0
+        lon += (10.0 * math.sin(heading) + rng.gauss(0.0, 3.0)) / 50_000.0
+        points.append(Point(lat=lat, lon=lon, timestamp=base_time + timedelta(seconds=i), obj_id="test"))
+    points[700:700] = [points[700]] * 40  # repeated fixes
+    points.append(points[0])  # closed loop: start == end
+
+    for eps in (0.0, 2.0, 15.0, 500.0):
+        assert DouglasPeuckerCompressor(epsilon_meters=eps).compress(points) == reference(points, eps)
+
+def test_significance_select_matches_dp_at_every_epsilon():
+    import math
+    import random
+    from core.segment import Move
+    from oracle import OracleDP
+
+    rng = random.Random(9)
+    base_time = datetime(2026, 1, 1, 12, 0, 0)
+    lat, lon, heading = 63.4, 10.4, 0.0
+    points = []
+    for i in range(1500):
+        heading += rng.gauss(0.0, 0.1)
+        lat += (10.0 * math.cos(heading) + rng.gauss(0.0, 2.0)) / 111_195.0
+        lon += (10.0 * math.sin(heading) + rng.gauss(0.0, 2.0)) / 50_000.0
+        points.append(Point(lat=lat, lon=lon, timestamp=base_time + timedelta(seconds=i), obj_id="test"))
+    points.extend(points[400:200:-1])  # doubles back
+
+    significance = OracleDP().significance(Move(points=points))
+    assert math.isinf(significance.values[0]) and math.isinf(significance.values[-1])
+    for eps in (0.0, 0.5, 2.0, 7.5, 15.0, 60.0, 1e6):
+        expected = DouglasPeuckerCompressor(epsilon_meters=eps).compress(points)
+        assert significance.select(eps) == expected
+        assert significance.num_kept(eps) == len(expected)
+    with pytest.raises(ValueError):
+        significance.select(-1.0)
+
+
+def test_significance_ranks_prefixes_are_larger_epsilons():
+    import random
+
+    rng = random.Random(5)
+    base_time = datetime(2026, 1, 1, 12, 0, 0)
+    points = [
+        Point(lat=63.4 + rng.uniform(0, 0.01), lon=10.4 + 0.0005 * i, timestamp=base_time + timedelta(seconds=i), obj_id="test")
+        for i in range(400)
+    ]
+    significance = DouglasPeuckerCompressor().significance(points)
+    kept = significance.select(5.0)
+    ranks = significance.ranks(5.0)
+    assert len(ranks) == len(kept) and sorted(ranks) == list(range(len(kept)))
+    assert (ranks[0], ranks[-1]) == (0, 1)
+    for eps in (10.0, 50.0, 200.0, 600.0):
+        expected = DouglasPeuckerCompressor(epsilon_meters=eps).compress(points)
+        assert [p for p, r in zip(kept, ranks) if r < len(expected)] == expected
+    assert sorted(significance.ranks()) == list(range(len(points)))
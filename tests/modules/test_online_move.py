@@ -0,0 +1,104 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.point import Point, epoch_seconds
+from engines.dead_reckoning import DeadReckoningCompressor, DeadReckoningStream
+from engines.opening_window import OpeningWindowCompressor, OpeningWindowStream
+from eval.sed import calculate_sed_error
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+METERS_PER_DEG_LAT = 111_320.0
+
+
+def jittery_drive(n: int, seed: int) -> list[Point]:
+    """~10 m/s with a slowly turning heading, 3 m jitter and irregular 1-3 s sampling."""
+    rng = random.Random(seed)
+    lat, lon, heading, t = 40.70, -74.00, 0.0, 0
+    points = []
+    for _ in range(n):
+        dt = rng.choice((1, 1, 2, 3))
+        t += dt
+        heading += rng.gauss(0.0, 0.1)
+        lat += (10.0 * dt * math.cos(heading) + rng.gauss(0.0, 3.0)) / METERS_PER_DEG_LAT
+        lon += (10.0 * dt * math.sin(heading) + rng.gauss(0.0, 3.0)) / (METERS_PER_DEG_LAT * 0.758)
+        points.append(Point(lat, lon, START + timedelta(seconds=t), "veh"))
+    return points
+
+
+def straight_line(n: int) -> list[Point]:
+    return [Point(40.7 + 9.0 * i / METERS_PER_DEG_LAT, -74.0, START + timedelta(seconds=i), "veh")
+            for i in range(n)]
+
+
+def test_opening_window_bounds_sed_and_emits_at_once():
+    points = jittery_drive(3000, 1)
+    for eps in (2.0, 15.0, 60.0):
+        stream = OpeningWindowStream(epsilon_meters=eps)
+        keypoints = []
+        for i, p in enumerate(points):
+            emitted = stream.push(p)
+            # A keypoint leaves no later than one point after it (the float).
+            assert all(points.index(k) >= i - 1 for k in emitted)
+            keypoints.extend(emitted)
+            assert len(stream) <= 1
+        keypoints.extend(stream.finish())
+
+        assert keypoints == OpeningWindowCompressor(eps).compress(points)
+        kept = [points.index(k) for k in keypoints]
+        assert kept[0] == 0 and kept[-1] == len(points) - 1 and kept == sorted(kept)
+        worst = max(
+            calculate_sed_error(points[j], points[a], points[b])
+            for a, b in zip(kept, kept[1:])
+            for j in range(a + 1, b)
+        )
+        # Projection at the first point vs the metric's mid-segment latitude.
+        assert worst <= eps * (1 + 1e-4)
+        if eps >= 15.0:
+            assert len(keypoints) < len(points) / 4
+
+    line = straight_line(1000)
+    assert OpeningWindowCompressor(1.0).compress(line) == [line[0], line[-1]]
+    with pytest.raises(ValueError):
+        OpeningWindowStream(polygon_sides=2)
+
+
+def test_dead_reckoning_keypoints_predict_every_point():
+    points = jittery_drive(3000, 2)
+    eps = 15.0
+    keypoints = DeadReckoningCompressor(eps).compress(points)
+    assert keypoints[0] == points[0] and keypoints[-1] == points[-1]
+
+    # Replay the receiver: extrapolate from the last two keypoints only.
+    lat0 = points[0].lat
+    scale = METERS_PER_DEG_LAT * math.cos(math.radians(lat0))
+
+    def xy(p):
+        return (p.lon - points[0].lon) * scale, (p.lat - lat0) * METERS_PER_DEG_LAT
+
+    key_ids = {id(k) for k in keypoints}
+    prev = None
+    anchor = points[0]
+    for p in points[1:-1]:
+        ax, ay = xy(anchor)
+        vx = vy = 0.0
+        if prev is not None:
+            px, py = xy(prev)
+            dt_key = epoch_seconds(anchor) - epoch_seconds(prev)
+            vx, vy = (ax - px) / dt_key, (ay - py) / dt_key
+        dt = epoch_seconds(p) - epoch_seconds(anchor)
+        x, y = xy(p)
+        miss = math.hypot(x - (ax + vx * dt), y - (ay + vy * dt))
+        assert (miss > eps) == (id(p) in key_ids)
+        if id(p) in key_ids:
+            prev, anchor = anchor, p
+
+    # Constant speed on a line: the second keypoint fixes the velocity for good.
+    line = straight_line(1000)
+    assert DeadReckoningCompressor(eps).compress(line) == [line[0], line[2], line[-1]]
+    stream = DeadReckoningStream(eps)
+    for p in line:
+        stream.push(p)
+        assert len(stream) <= 1
@@ -0,0 +1,400 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+from core.batch import TrajectoryBatch
+from core.codec import decode_segment, encode_segment
+from core.compression import CompressionStrategy, HYSOCConfig, stitch_partial_moves
+from core.point import LocalProjection, Point
+from core.segment import Move, Stop
+from engines.step import STEPSegmenter, _GridRing
+from engines.step_multi import MultiSTEPSegmenter
+from hysoc import HYSOCGCompressor
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+METERS_PER_DEG_LAT = 111_195.0
+
+
+def long_trip() -> list[Point]:
+    """Dwell 120 s, drive 20 min at ~10 m/s, dwell 120 s, drive 5 min (1 Hz)."""
+    points = []
+    lat = 40.70
+    for i in range(1800):
+        if i < 120 or 1320 <= i < 1440:
+            jitter = 0.00001 * math.sin(i)
+            points.append(Point(lat + jitter, -74.0, START + timedelta(seconds=i), "veh"))
+            continue
+        lat += 10.0 / METERS_PER_DEG_LAT
+        points.append(Point(lat, -74.0 + 0.0001 * math.sin(i / 50), START + timedelta(seconds=i), "veh"))
+    return points
+
+
+def run(segmenter: STEPSegmenter, points: list[Point]):
+    """Segments ``points``; also returns the peak cache size while no stop is open."""
+    segments = []
+    peak = 0
+    for p in points:
+        segments.extend(segmenter.process_point(p))
+        if segmenter.current_sp_start is None:
+            peak = max(peak, segmenter.buffered_points)
+    segments.extend(segmenter.flush())
+    return segments, peak
+
+
+def stitched_points(segments):
+    """(kind, points) per segment with partial move chunks joined."""
+    out = []
+    for seg in segments:
+        kind = "stop" if isinstance(seg, Stop) else "move"
+        if out and out[-1][0] == "move" and out[-1][2]:
+            out[-1] = ("move", out[-1][1] + list(seg.points), isinstance(seg, Move) and seg.partial)
+            continue
+        out.append((kind, list(seg.points), isinstance(seg, Move) and seg.partial))
+    return [(kind, pts) for kind, pts, _ in out]
+
+
+def test_bounded_step_matches_unbounded_after_stitching():
+    points = long_trip()
+    unbounded, unbounded_peak = run(STEPSegmenter(), points)
+    segmenter = STEPSegmenter(max_move_points=60)
+    bounded, bounded_peak = run(segmenter, points)
+
+    assert segmenter.partial_chunks > 10 and segmenter.forced_cuts == 0
+    assert stitched_points(bounded) == stitched_points(unbounded)
+    assert unbounded_peak > 1000
+    assert bounded_peak <= 61
+    assert not bounded[-1].partial
+
+
+def test_max_move_seconds_limits_chunk_span():
+    segmenter = STEPSegmenter(max_move_seconds=120.0)
+    segments, _ = run(segmenter, long_trip())
+
+    chunks = [s for s in segments if isinstance(s, Move) and s.partial]
+    assert chunks
+    assert all((s.end_time - s.start_time).total_seconds() <= 120.0 for s in chunks)
+
+
+def test_slow_drift_is_force_cut_at_twice_the_limit():
+    # 0.5 m/s for 10 min: never a stop (points within D = 15 m span 30 s < T = 45 s),
+    # but points within 2D = 30 m of each other span 60 s, so no 2D cut is possible.
+    points = [
+        Point(40.7 + 0.5 * i / METERS_PER_DEG_LAT, -74.0, START + timedelta(seconds=i), "veh")
+        for i in range(600)
+    ]
+    segmenter = STEPSegmenter(min_duration_seconds=45.0, max_move_points=20)
+    segments, peak = run(segmenter, points)
+
+    assert segmenter.forced_cuts > 0
+    assert all(isinstance(s, Move) for s in segments)
+    # Twice the limit, or the last T seconds when those hold more points
+    assert peak <= 47
+    assert sum(len(s.points) for s in segments) == len(points)
+
+
+def fast_feed_dwell(hz: int = 5, dwell_seconds: int = 60) -> list[Point]:
+    """Drive 60 s at 10 m/s, dwell ``dwell_seconds`` with 1 m jitter, drive 60 s (``hz`` fixes per second)."""
+    points = []
+    lat = 40.70
+    n_drive = 60 * hz
+    for i in range(2 * n_drive + dwell_seconds * hz):
+        t = START + timedelta(seconds=i / hz)
+        if n_drive <= i < n_drive + dwell_seconds * hz:
+            points.append(Point(lat + math.sin(i) / METERS_PER_DEG_LAT, -74.0, t, "veh"))
+            continue
+        lat += 10.0 / hz / METERS_PER_DEG_LAT
+        points.append(Point(lat, -74.0, t, "veh"))
+    return points
+
+
+def test_forced_cuts_keep_dwells_longer_than_twice_the_limit():
+    # 300 dwell points at 5 Hz; T = 30 s holds 150 points, three times the limit of 50.
+    points = fast_feed_dwell()
+    unbounded, _ = run(STEPSegmenter(min_duration_seconds=30.0), points)
+    segmenter = STEPSegmenter(min_duration_seconds=30.0, max_move_points=50)
+    bounded, peak = run(segmenter, points)
+
+    assert [type(s).__name__ for s in unbounded] == ["Move", "Stop", "Move"]
+    assert stitched_points(bounded) == stitched_points(unbounded)
+    assert peak <= 151 + 2 * 50
+
+
+def test_stitch_clears_partial_flag_of_runs_ended_by_a_stop():
+    points = fast_feed_dwell()
+    config = HYSOCConfig(stop_min_duration_seconds=30.0, step_max_move_points=50)
+    result = HYSOCGCompressor(config).compress(points)
+    assert any(s.partial for s in result.segments)
+
+    stitched = stitch_partial_moves(result.segments)
+    assert [s.kind for s in stitched] == ["move", "stop", "move"]
+    assert not any(s.partial for s in stitched)
+    # A lone chunk followed by a stop is complete too.
+    lone = [result.segments[0], next(s for s in result.segments if s.kind == "stop")]
+    assert lone[0].partial
+    assert [s.partial for s in stitch_partial_moves(lone)] == [False, False]
+
+
+def test_hysoc_emits_partial_chunks_before_flush():
+    points = long_trip()
+    config = HYSOCConfig(step_max_move_points=100)
+    compressor = HYSOCGCompressor(config)
+
+    early = []
+    for p in points[:1300]:
+        early.extend(compressor.process_point(p))
+    assert any(seg.partial for seg in early)
+    assert compressor.buffered_points <= 101
+
+    result = HYSOCGCompressor(config).compress(points)
+    baseline = HYSOCGCompressor().compress(points)
+    stitched = stitch_partial_moves(result.segments)
+    assert [s.kind for s in stitched] == [s.kind for s in baseline.segments]
+    assert not any(s.partial for s in stitched)
+
+    partial = next(s for s in result.segments if s.partial)
+    decoded, _ = decode_segment(encode_segment(partial), obj_id="veh")
+    assert decoded.partial
+
+
+def dwell_trip(seed: int) -> list[Point]:
+    """Six long jittery dwells with short drives in between, irregular sampling."""
+    rng = random.Random(seed)
+    points = []
+    lat, lon = 40.70, -74.0
+    t = 0
+    for _ in range(6):
+        for _ in range(rng.randint(200, 900)):
+            r = rng.uniform(0.0, 14.0)
+            a = rng.uniform(0.0, 2 * math.pi)
+            points.append(Point(lat + r * math.sin(a) / METERS_PER_DEG_LAT,
+                                lon + r * math.cos(a) / METERS_PER_DEG_LAT,
+                                START + timedelta(seconds=t), "veh"))
+            t += rng.choice((1, 1, 2, 5))
+        for _ in range(rng.randint(20, 120)):
+            lat += rng.uniform(2.0, 12.0) / METERS_PER_DEG_LAT
+            points.append(Point(lat, lon, START + timedelta(seconds=t), "veh"))
+            t += 1
+    return points
+
+
+def test_stay_window_matches_full_scan():
+    # Long dwells exercise the active-stay window against the offline path.
+    points = dwell_trip(7)
+    segments = STEPSegmenter().process(points)
+    spans = STEPSegmenter().process_batch(TrajectoryBatch.from_points(points))
+
+    assert sum(isinstance(s, Stop) for s in segments) >= 6
+    assert [("stop" if isinstance(s, Stop) else "move") for s in segments] == [s.kind for s in spans]
+    assert [len(s.points) for s in segments] == [len(s) for s in spans]
+
+
+def test_grid_ring_wraps_and_grows():
+    ring = _GridRing(capacity=4)
+    projection = LocalProjection(40.7, -74.0)
+    projected = [projection.point(p) for p in long_trip()[:10]]
+    for i, p in enumerate(projected[:3]):
+        ring.append(p, i, -i)
+    ring.drop_before(2)
+    for i, p in enumerate(projected[3:], start=3):
+        ring.append(p, i, -i)
+
+    assert ring.offset == 2 and len(ring) == 8 and ring.capacity == 8
+    assert ring.points_between(2, 10) == projected[2:]
+    assert ring.item(9)[1:] == (9, -9)
+    assert ring.gx_np[ring.slots(4, 7)].tolist() == [4, 5, 6]
+
+
+def test_small_ring_matches_full_scan():
+    # A tiny initial capacity forces wrap-around and growth mid-stream, and a
+    # 10 Hz slow walk makes the backward scan reach the vectorized blocks.
+    walk = [
+        Point(40.7 + (0.04 * min(i, 3000) + 0.002 * (i % 50)) / METERS_PER_DEG_LAT, -74.0,
+              START + timedelta(seconds=i / 10), "veh")
+        for i in range(6000)
+    ]
+    for points in (dwell_trip(3), walk):
+        segmenter = STEPSegmenter()
+        segmenter.cache = _GridRing(capacity=2)
+        segments = segmenter.process(points)
+        spans = STEPSegmenter().process_batch(TrajectoryBatch.from_points(points))
+
+        assert segmenter.cache.capacity > 2
+        assert [("stop" if isinstance(s, Stop) else "move") for s in segments] == [s.kind for s in spans]
+        assert [len(s.points) for s in segments] == [len(s) for s in spans]
+
+
+def test_offline_step_matches_streaming():
+    walk = [
+        Point(40.7 + (0.3 * i + 3.0 * math.sin(i / 7)) / METERS_PER_DEG_LAT, -74.0,
+              START + timedelta(seconds=i), "veh")
+        for i in range(2000)
+    ]
+    for points in (dwell_trip(1), dwell_trip(5), long_trip(), walk):
+        for eps, t in ((15.0, 30.0), (10.0, 10.0), (40.0, 120.0)):
+            segments = STEPSegmenter(max_eps=eps, min_duration_seconds=t).process(points)
+            offline = STEPSegmenter(max_eps=eps, min_duration_seconds=t).process_offline(points)
+
+            assert [type(s) for s in offline] == [type(s) for s in segments]
+            assert [s.points for s in offline] == [s.points for s in segments]
+
+
+def test_offline_step_falls_back_on_unordered_timestamps():
+    points = dwell_trip(2)
+    points[100], points[101] = points[101], points[100]
+    segments = STEPSegmenter().process(points)
+    spans = STEPSegmenter().process_batch(TrajectoryBatch.from_points(points))
+
+    assert [len(s.points) for s in segments] == [len(s) for s in spans]
+
+
+def test_multi_config_step_matches_single_runs():
+    multi = MultiSTEPSegmenter.from_grid([10.0, 15.0, 40.0], [10.0, 30.0, 120.0])
+    for points in (dwell_trip(4), long_trip()):
+        results = multi.process(points)
+
+        assert len(results) == 9
+        for (eps, t), segments in zip(multi.configs, results):
+            single = STEPSegmenter(max_eps=eps, min_duration_seconds=t).process(points)
+            assert [type(s) for s in segments] == [type(s) for s in single]
+            assert [s.points for s in segments] == [s.points for s in single]
+
+
+def test_fused_stop_stats_keep_dwells_bounded():
+    points = dwell_trip(6)
+    plain = STEPSegmenter().process(points)
+    segmenter = STEPSegmenter(stop_stats=True)
+    fused = []
+    peak = 0  # cache size while a stop is open
+    for p in points:
+        fused.extend(segmenter.process_point(p))
+        if segmenter.current_sp_start is not None:
+            peak = max(peak, segmenter.buffered_points)
+    fused.extend(segmenter.flush())
+
+    assert [(type(s), s.start_time, s.end_time) for s in fused] == [
+        (type(s), s.start_time, s.end_time) for s in plain
+    ]
+    for a, b in zip(fused, plain):
+        if isinstance(a, Stop):
+            assert a.points == [] and a.stats.count == len(b.points)
+            assert math.isclose(a.centroid.lat, b.centroid.lat, abs_tol=1e-12)
+        else:
+            assert a.points == b.points
+    # About T = 30 s of points at 1-5 s sampling, not the 200-900 point dwells.
+    assert peak <= 40
+
+    config = HYSOCConfig(step_stop_stats=True)
+    result = HYSOCGCompressor(config).compress(points)
+    baseline = HYSOCGCompressor().compress(points)
+    assert [(s.kind, s.start_time, s.end_time) for s in result.segments] == [
+        (s.kind, s.start_time, s.end_time) for s in baseline.segments
+    ]
+
+
+def test_hysoc_streaming_squish_matches_whole_moves():
+    for points in (long_trip(), dwell_trip(8)):
+        config = HYSOCConfig(squish_streaming=True, squish_buffer_capacity=30)
+        compressor = HYSOCGCompressor(config)
+        peak = 0
+        streamed = []
+        for p in points:
+            streamed.extend(compressor.process_point(p))
+            if compressor.segmenter.current_sp_start is None:
+                peak = max(peak, compressor.buffered_points)
+        streamed.extend(compressor.flush())
+        baseline = HYSOCGCompressor(HYSOCConfig(squish_buffer_capacity=30)).compress(points)
+
+        assert [(s.kind, s.start_time, s.end_time, s.keypoints) for s in streamed] == [
+            (s.kind, s.start_time, s.end_time, s.keypoints) for s in baseline.segments
+        ]
+        assert not any(s.partial for s in streamed)
+        # STEP holds at most 2T seconds of a move (T = 30 s at 1 Hz), SQUISH its capacity plus one.
+        assert peak <= 2 * 30 + 31
+
+
+def test_hysoc_streaming_squish_keeps_long_t_segmentation():
+    # T = 300 s at 1 Hz: drive, walk up at 0.6 m/s, park 10 min, drive off.
+    points = []
+    lat = 40.70
+    for i in range(1700):
+        t = START + timedelta(seconds=i)
+        if 500 <= i < 1100:
+            points.append(Point(lat + 2e-6 * math.sin(i), -74.0, t, "veh"))
+            continue
+        lat += (0.6 if 300 <= i < 500 else 10.0) / METERS_PER_DEG_LAT
+        points.append(Point(lat, -74.0 + 0.0001 * math.sin(i / 50), t, "veh"))
+
+    whole = HYSOCGCompressor(HYSOCConfig(stop_min_duration_seconds=300.0)).compress(points)
+    compressor = HYSOCGCompressor(HYSOCConfig(stop_min_duration_seconds=300.0, squish_streaming=True))
+    streamed = compressor.compress(points)
+    assert [s.kind for s in whole.segments] == ["move", "stop", "move"]
+    assert [(s.kind, s.start_time, s.end_time, s.keypoints) for s in streamed.segments] == [
+        (s.kind, s.start_time, s.end_time, s.keypoints) for s in whole.segments
+    ]
+    # The walk never separates by 2D within the SQUISH capacity, but stays within 2T.
+    assert compressor.segmenter.forced_cuts == 0
+
+def test_hysoc_squish_e_streams_and_shrinks_straight_moves():
+    points = long_trip()
+    squish_e = HYSOCConfig(move_compression_strategy=CompressionStrategy.SQUISH_E, squish_e_sed_meters=15.0)
+    whole = HYSOCGCompressor(squish_e).compress(points)
+    squish_e.squish_streaming = True
+    compressor = HYSOCGCompressor(squish_e)
+    streamed = []
+    for p in points:
+        streamed.extend(compressor.process_point(p))
+    streamed.extend(compressor.flush())
+
+    assert [(s.kind, s.start_time, s.end_time, s.keypoints) for s in streamed] == [
+        (s.kind, s.start_time, s.end_time, s.keypoints) for s in whole.segments
+    ]
+    # Straight ~10 m/s drives with 8 m lateral wiggle: a handful of keypoints per move.
+    assert all(len(s.keypoints) <= 10 for s in whole.moves())
+
+
+def test_hysoc_online_move_strategies_emit_partial_keypoints():
+    from engines.dead_reckoning import DeadReckoningCompressor
+    from engines.opening_window import OpeningWindowCompressor
+
+    for points in (long_trip(), dwell_trip(3)):
+        moves = [s.points for s in run(STEPSegmenter(), points)[0] if isinstance(s, Move)]
+        for strategy, compressor in (
+            (CompressionStrategy.OPENING_WINDOW, OpeningWindowCompressor()),
+            (CompressionStrategy.DEAD_RECKONING, DeadReckoningCompressor()),
+        ):
+            hysoc = HYSOCGCompressor(HYSOCConfig(move_compression_strategy=strategy, squish_buffer_capacity=30))
+            peak = 0
+            streamed = []
+            for p in points:
+                streamed.extend(hysoc.process_point(p))
+                if hysoc.segmenter.current_sp_start is None:
+                    peak = max(peak, hysoc.buffered_points)
+            streamed.extend(hysoc.flush())
+
+            stitched = [s.keypoints for s in stitch_partial_moves(streamed) if s.kind == "move"]
+            assert stitched == [compressor.compress(m) for m in moves]
+            if max(map(len, moves)) > 60:
+                assert any(s.partial for s in streamed)
+            # STEP holds at most 2T seconds of a move (T = 30 s at 1 Hz), the online stream one point.
+            assert peak <= 2 * 30 + 1
+
+
+def test_hysoc_online_move_strategies_keep_dwells_on_fast_feeds():
+    # 5 Hz: the 300-point dwell is ten times the SQUISH capacity, which must not bound STEP.
+    points = fast_feed_dwell()
+    kinds = [s.kind for s in HYSOCGCompressor().compress(points).segments]
+    assert kinds == ["move", "stop", "move"]
+    for strategy in (CompressionStrategy.OPENING_WINDOW, CompressionStrategy.DEAD_RECKONING):
+        hysoc = HYSOCGCompressor(HYSOCConfig(move_compression_strategy=strategy, squish_buffer_capacity=30))
+        peak = 0
+        streamed = []
+        for p in points:
+            streamed.extend(hysoc.process_point(p))
+            if hysoc.segmenter.current_sp_start is None:
+                peak = max(peak, hysoc.buffered_points)
+        streamed.extend(hysoc.flush())
+        assert [s.kind for s in stitch_partial_moves(streamed)] == kinds
+        assert any(s.partial for s in streamed)
+        # Bounded by T = 30 s, not by the capacity: the drive is cut at 2D, never forced.
+        assert hysoc.segmenter.forced_cuts == 0
+        assert peak <= 2 * 30 * 5 + 1
@@ -1,6 +1,10 @@
+import math
+import random
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 from core.point import Point
+from core.stop_stats import StopStats
+from constants.stop_compression_defaults import StopCompressionStrategy
 from engines.stop_compressor import StopCompressor
 
 class TestStopCompression(unittest.TestCase):
@@ -29,5 +33,64 @@ class TestStopCompression(unittest.TestCase):
         self.assertEqual(result.start_time, t1)
         self.assertEqual(result.end_time, t3)
 
+    def test_compress_stats_matches_points(self):
+        t0 = datetime(2023, 1, 1, 12, 0, 0)
+        points = [
+            Point(lat=10.0 + 0.001 * (i % 7), lon=20.0 - 0.001 * (i % 5),
+                  timestamp=t0 + timedelta(seconds=i), obj_id="1")
+            for i in range(40)
+        ]
+        stats = StopStats()
+        stats.extend(points)
+
+        # Up to the reservoir size every strategy sees all points.
+        for strategy in StopCompressionStrategy:
+            compressor = StopCompressor(strategy=strategy)
+            expected = compressor.compress(points)
+            result = compressor.compress_stats(stats)
+            self.assertAlmostEqual(result.centroid.lat, expected.centroid.lat, places=12)
+            self.assertAlmostEqual(result.centroid.lon, expected.centroid.lon, places=12)
+            self.assertEqual(result.start_time, t0)
+            self.assertEqual(result.end_time, points[-1].timestamp)
+
+    def test_stats_reservoir_is_bounded(self):
+        t0 = datetime(2023, 1, 1, 12, 0, 0)
+        stats = StopStats(reservoir_size=8)
+        for i in range(1000):
+            stats.add(Point(lat=float(i), lon=0.0, timestamp=t0 + timedelta(seconds=i), obj_id="1"))
+
+        self.assertEqual(stats.count, 1000)
+        self.assertEqual(len(stats.reservoir), 8)
+        self.assertEqual((stats.min_lat, stats.max_lat), (0.0, 999.0))
+        self.assertEqual(stats.centroid().lat, 499.5)
+
+    def test_fast_medoid_and_snap_match_pairwise_loops(self):
+        rng = random.Random(5)
+        t0 = datetime(2023, 1, 1, 12, 0, 0)
+        points = [
+            Point(lat=40.75 + rng.gauss(0, 6e-5) + (4e-4 if i % 9 == 0 else 0.0),
+                  lon=-73.99 + rng.gauss(0, 8e-5),
+                  timestamp=t0 + timedelta(seconds=i), obj_id="1")
+            for i in range(400)
+        ]
+
+        def sum_dist(q):
+            return sum(math.hypot(q.lat - p.lat, (q.lon - p.lon) * math.cos(math.radians((q.lat + p.lat) / 2.0)))
+                       for p in points)
+
+        best = min(points, key=sum_dist)
+        medoid = StopCompressor(StopCompressionStrategy.MEDOID).compress(points).centroid
+        self.assertEqual((medoid.lat, medoid.lon), (best.lat, best.lon))
+
+        loose = StopCompressor(StopCompressionStrategy.MEDOID, medoid_tolerance=0.01).compress(points).centroid
+        chosen = next(p for p in points if (p.lat, p.lon) == (loose.lat, loose.lon))
+        self.assertLessEqual(sum_dist(chosen), sum_dist(best) * (1.01 + 1e-6))
+
+        lat = sum(p.lat for p in points) / len(points)
+        lon = sum(p.lon for p in points) / len(points)
+        nearest = min(points, key=lambda p: (p.lat - lat) ** 2 + ((p.lon - lon) * math.cos(math.radians((p.lat + lat) / 2.0))) ** 2)
+        snapped = StopCompressor(StopCompressionStrategy.SNAP_TO_NEAREST).compress(points).centroid
+        self.assertEqual((snapped.lat, snapped.lon), (nearest.lat, nearest.lon))
+
 if __name__ == '__main__':
     unittest.main()
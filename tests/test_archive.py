@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.archive import ArchiveReader, ArchiveWriter
+from core.compression import BYTES_PER_POINT, CompressionStrategy, SegmentResult
+from core.point import Point
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def at(seconds: float) -> datetime:
+    return START + timedelta(seconds=seconds)
+
+
+def make_segments(obj_id: str) -> list[SegmentResult]:
+    """stop [0, 100] at A, move 101..200 A->B, stop [201, 300] at B."""
+    a = Point(40.70, -74.00, at(0), obj_id)
+    move = [Point(40.70 + 0.0001 * k, -74.00, at(101 + 11 * k), obj_id) for k in range(10)]
+    b = Point(move[-1].lat, -74.00, at(201), obj_id)
+    return [
+        SegmentResult("stop", at(0), at(100), [a], BYTES_PER_POINT),
+        SegmentResult("move", move[0].timestamp, move[-1].timestamp, move, len(move) * BYTES_PER_POINT),
+        SegmentResult("stop", at(201), at(300), [b], BYTES_PER_POINT),
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "fleet.hysa"
+    with ArchiveWriter(path) as writer:
+        for seg_a, seg_b in zip(make_segments("a"), make_segments("b")):
+            writer.append("a", seg_a)
+            writer.append("b", seg_b, CompressionStrategy.NETWORK_SEMANTIC)
+    with ArchiveReader(path) as reader:
+        yield reader
+
+
+def test_index_and_full_decode(archive):
+    assert archive.objects == ["a", "b"]
+    assert archive.segment_count("a") == 3
+    assert archive.time_range("a") == (at(0), at(300))
+    result = archive.read_trajectory("b")
+    assert result.strategy == CompressionStrategy.NETWORK_SEMANTIC
+    assert [s.kind for s in result.segments] == ["stop", "move", "stop"]
+
+
+def test_segments_overlapping_window(archive):
+    assert [s.kind for s in archive.segments("a", at(50), at(60))] == ["stop"]
+    assert [s.kind for s in archive.segments("a", at(90), at(150))] == ["stop", "move"]
+    assert archive.segments("a", at(400), at(500)) == []
+
+
+def test_read_range_interpolates_boundaries(archive):
+    track = archive.read_range("a", at(106.5), at(134))
+
+    assert track[0].timestamp == at(106.5)
+    assert track[0].lat == pytest.approx(40.70005)
+    assert [p.timestamp for p in track[1:]] == [at(112), at(123), at(134)]
+
+    # Window edge in the gap between the first stop and the move
+    track = archive.read_range("a", at(100.5), at(101))
+    assert [p.timestamp for p in track] == [at(100.5), at(101)]
+    assert track[0].lat == pytest.approx(40.70)
+
+    # Inside a stop: stationary at the stop keypoint
+    track = archive.read_range("a", at(10), at(20))
+    assert [(p.timestamp, p.lat) for p in track] == [(at(10), 40.70), (at(20), 40.70)]
+
+
+def test_read_range_accepts_aware_datetimes(archive):
+    plus_two = timezone(timedelta(hours=2))
+    t0 = at(106.5).replace(tzinfo=timezone.utc).astimezone(plus_two)
+    t1 = at(134).replace(tzinfo=timezone.utc).astimezone(plus_two)
+    assert archive.read_range("a", t0, t1) == archive.read_range("a", at(106.5), at(134))
+
+
+def test_out_of_order_append_rejected(tmp_path):
+    writer = ArchiveWriter(tmp_path / "bad.hysa")
+    segments = make_segments("a")
+    writer.append("a", segments[1])
+    with pytest.raises(ValueError):
+        writer.append("a", segments[0])
+    writer.close()
+
+
+def test_top_k_read_of_ranked_moves(tmp_path):
+    segments = make_segments("a")
+    move = segments[1]
+    ranks = [0, 4, 6, 2, 8, 3, 7, 5, 9, 1]
+    segments[1] = SegmentResult("move", move.start_time, move.end_time, move.keypoints, move.encoded_bytes, ranks=ranks)
+    path = tmp_path / "ranked.hysa"
+    with ArchiveWriter(path) as writer:
+        for seg in segments:
+            writer.append("a", seg)
+
+    with ArchiveReader(path) as reader:
+        coarse = reader.segments("a", max_keypoints=3)
+        assert [len(s.keypoints) for s in coarse] == [1, 3, 1]
+        assert [p.timestamp for p in coarse[1].keypoints] == [at(101), at(134), at(200)]
+        assert coarse[1].encoded_bytes < reader.segments("a")[1].encoded_bytes
+        assert [p.timestamp for p in reader.read_range("a", at(120), at(200), max_keypoints=3)] == [
+            at(120), at(134), at(200)
+        ]
@@ -0,0 +1,94 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from core.batch import NO_ROAD, TrajectoryBatch
+from core.compression import CompressionStrategy, TrajectoryResult
+from core.point import Point
+from core.segment import Stop
+from engines.dp import DouglasPeuckerCompressor
+from engines.squish import SquishCompressor
+from engines.step import STEPSegmenter
+
+
+def make_trajectory() -> list[Point]:
+    """Dwell at A for 2 min, drive ~1 km north-east, dwell at B for 2 min (1 Hz)."""
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    points = []
+    t = 0
+    for i in range(120):
+        jitter = 0.00001 * math.sin(i)
+        points.append(Point(40.70 + jitter, -74.00 + jitter, start + timedelta(seconds=t), "veh", road_id=10))
+        t += 1
+    for i in range(1, 100):
+        f = i / 100.0
+        points.append(Point(40.70 + 0.01 * f, -74.00 + 0.01 * f + 0.0005 * math.sin(7 * f),
+                            start + timedelta(seconds=t), "veh", road_id=11 + i // 20))
+        t += 1
+    for i in range(120):
+        jitter = 0.00001 * math.cos(i)
+        points.append(Point(40.71 + jitter, -73.99 + jitter, start + timedelta(seconds=t), "veh", road_id=None))
+        t += 1
+    return points
+
+
+def test_round_trip_preserves_points():
+    points = make_trajectory()
+    batch = TrajectoryBatch.from_points(points)
+
+    assert len(batch) == len(points)
+    assert batch.lat.dtype == np.float64
+    assert batch.epoch_us.dtype == np.int64
+    assert batch.object_id == "veh"
+    assert batch.to_points() == points
+    assert batch[5] == points[5]
+    assert batch[-1] == points[-1]
+    assert batch.road_code[-1] == NO_ROAD
+
+
+def test_slicing_returns_views():
+    batch = TrajectoryBatch.from_points(make_trajectory())
+    part = batch[10:20]
+
+    assert len(part) == 10
+    assert np.shares_memory(part.lat, batch.lat)
+    assert part.road_ids is batch.road_ids
+    assert part.to_points() == batch.to_points()[10:20]
+
+
+def test_step_process_batch_matches_streaming():
+    points = make_trajectory()
+    batch = TrajectoryBatch.from_points(points)
+
+    segments = STEPSegmenter(max_eps=15.0, min_duration_seconds=30.0).process(points)
+    spans = STEPSegmenter(max_eps=15.0, min_duration_seconds=30.0).process_batch(batch)
+
+    assert [("stop" if isinstance(s, Stop) else "move") for s in segments] == [s.kind for s in spans]
+    for seg, span in zip(segments, spans):
+        assert seg.points == points[span.start:span.stop]
+
+
+def test_dp_and_squish_batch_match_point_api():
+    points = make_trajectory()[100:240]
+    batch = TrajectoryBatch.from_points(points)
+
+    dp = DouglasPeuckerCompressor(epsilon_meters=5.0)
+    assert dp.compress_batch(batch).to_points() == dp.compress(points)
+
+    squish = SquishCompressor(capacity=12)
+    assert squish.compress_batch(batch).to_points() == squish.compress(points)
+
+
+def test_trajectory_result_from_batch():
+    batch = TrajectoryBatch.from_points(make_trajectory())
+    result = TrajectoryResult.from_batch(batch, segments=[], strategy=CompressionStrategy.GEOMETRIC)
+
+    assert result.object_id == "veh"
+    assert result.original_bytes == len(batch) * 24
+
+
+def test_mismatched_columns_rejected():
+    with pytest.raises(ValueError):
+        TrajectoryBatch.from_arrays([1.0, 2.0], [1.0], [0, 1])
@@ -0,0 +1,147 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.codec import (
+    SegmentReader,
+    SegmentWriter,
+    decode_segment,
+    decode_trajectory,
+    encode_segment,
+    encode_trajectory,
+    read_zigzag,
+    write_zigzag,
+)
+from core.compression import BYTES_PER_POINT, CompressionStrategy, HYSOCConfig, SegmentResult, TrajectoryResult
+from core.point import Point
+from hysoc import HYSOCGCompressor
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def make_segments() -> list[SegmentResult]:
+    stop_kp = Point(40.7001234, -74.0005678, START, "veh")
+    move_kps = [
+        Point(40.70 + 0.001 * i, -74.00 - 0.0007 * i, START + timedelta(seconds=120 + 7 * i), "veh", road_id=100 + i)
+        for i in range(6)
+    ]
+    return [
+        SegmentResult("stop", START, START + timedelta(seconds=119), [stop_kp], BYTES_PER_POINT),
+        SegmentResult("move", move_kps[0].timestamp, move_kps[-1].timestamp, move_kps, 6 * BYTES_PER_POINT),
+    ]
+
+
+def assert_same_keypoints(decoded: list[Point], original: list[Point]):
+    assert len(decoded) == len(original)
+    for d, o in zip(decoded, original):
+        assert abs(d.lat - o.lat) <= 0.5e-7 and abs(d.lon - o.lon) <= 0.5e-7
+        assert (d.timestamp, d.obj_id, d.road_id) == (o.timestamp, o.obj_id, o.road_id)
+
+
+def test_zigzag_round_trip():
+    for value in (0, 1, -1, 63, -64, 2**40, -(2**40)):
+        buf = bytearray()
+        write_zigzag(buf, value)
+        assert read_zigzag(buf, 0) == (value, len(buf))
+
+
+def test_segment_round_trip_and_size():
+    for seg in make_segments():
+        record = encode_segment(seg)
+        decoded, end = decode_segment(record, 0, obj_id="veh")
+
+        assert end == len(record) == decoded.encoded_bytes
+        assert decoded.kind == seg.kind
+        assert (decoded.start_time, decoded.end_time) == (seg.start_time, seg.end_time)
+        assert_same_keypoints(decoded.keypoints, seg.keypoints)
+        assert len(record) < seg.encoded_bytes
+
+
+def test_stream_writer_reader():
+    segments = make_segments()
+    buf = io.BytesIO()
+    writer = SegmentWriter(buf, "veh", CompressionStrategy.GEOMETRIC)
+    for seg in segments:
+        writer.write(seg)
+
+    assert writer.bytes_written == len(buf.getvalue())
+    result = TrajectoryResult("veh", [], segments, CompressionStrategy.GEOMETRIC)
+    assert buf.getvalue() == encode_trajectory(result)
+
+    buf.seek(0)
+    reader = SegmentReader(buf)
+    assert (reader.obj_id, reader.strategy) == ("veh", CompressionStrategy.GEOMETRIC)
+    for decoded, seg in zip(reader, segments):
+        assert_same_keypoints(decoded.keypoints, seg.keypoints)
+
+    assert_same_keypoints(decode_trajectory(buf.getvalue()).keypoints, result.keypoints)
+
+
+def test_truncated_stream_rejected():
+    data = encode_trajectory(TrajectoryResult("veh", [], make_segments(), CompressionStrategy.GEOMETRIC))
+    with pytest.raises(ValueError):
+        decode_trajectory(data[:-3])
+    with pytest.raises(ValueError):
+        decode_trajectory(b"XXXX" + data[4:])
+
+
+def test_hysoc_reports_measured_bytes():
+    points = [Point(40.7 + 0.0002 * i, -74.0, START + timedelta(seconds=i), "veh") for i in range(200)]
+    estimated = HYSOCGCompressor(HYSOCConfig()).compress(points)
+    measured = HYSOCGCompressor(HYSOCConfig(measure_encoded_bytes=True)).compress(points)
+
+    assert measured.keypoints == estimated.keypoints
+    assert [s.encoded_bytes for s in measured.segments] == [len(encode_segment(s)) for s in measured.segments]
+    assert measured.encoded_bytes < estimated.encoded_bytes
+
+
+def test_ranked_record_reads_top_k_prefix():
+    import math
+
+    move_kps = [
+        Point(40.70 + 0.0001 * i, -74.00 + 0.0003 * math.sin(i / 4), START + timedelta(seconds=i), "veh", road_id=i % 3 or None)
+        for i in range(60)
+    ]
+    ranks = [0] + [(7 * i) % 58 + 2 for i in range(1, 59)] + [1]
+    seg = SegmentResult("move", START, move_kps[-1].timestamp, move_kps, 0, ranks=ranks)
+    record = encode_segment(seg)
+
+    full, end = decode_segment(record, 0, obj_id="veh")
+    assert end == len(record) == full.encoded_bytes
+    assert full.ranks == ranks
+    assert_same_keypoints(full.keypoints, move_kps)
+
+    sizes = []
+    for k in (2, 10, 30):
+        top, end = decode_segment(record, 0, obj_id="veh", max_keypoints=k)
+        assert end == len(record)
+        assert_same_keypoints(top.keypoints, seg.top_k(k))
+        assert sorted(top.ranks) == list(range(k))
+        sizes.append(top.encoded_bytes)
+    assert sizes == sorted(sizes) and sizes[-1] < len(record)
+
+    # Records without ranks decode in full; ranks must be a permutation.
+    plain = make_segments()[1]
+    assert len(decode_segment(encode_segment(plain), max_keypoints=2)[0].keypoints) == len(plain.keypoints)
+    with pytest.raises(ValueError):
+        encode_segment(SegmentResult("move", START, START, move_kps[:2], 0, ranks=[0, 0]))
+
+
+def test_hysoc_progressive_keypoints_rank_moves():
+    import math
+
+    points = [
+        Point(40.7 + 0.0002 * i, -74.0 + 0.0004 * math.sin(i / 10), START + timedelta(seconds=i), "veh")
+        for i in range(400)
+    ]
+    for strategy in (CompressionStrategy.GEOMETRIC, CompressionStrategy.SQUISH_E, CompressionStrategy.OPENING_WINDOW):
+        plain = HYSOCGCompressor(HYSOCConfig(move_compression_strategy=strategy, dp_epsilon_meters=2.0)).compress(points)
+        config = HYSOCConfig(move_compression_strategy=strategy, dp_epsilon_meters=2.0, progressive_keypoints=True)
+        ranked = HYSOCGCompressor(config).compress(points)
+
+        assert ranked.keypoints == plain.keypoints
+        for seg in ranked.moves():
+            assert sorted(seg.ranks) == list(range(len(seg.keypoints)))
+            decoded, _ = decode_segment(encode_segment(seg), obj_id="veh", max_keypoints=4)
+            assert_same_keypoints(decoded.keypoints, seg.top_k(4))
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import numpy as np
+
+from core.columnar_store import ColumnarStore, find_store, load_trajectory_points, trajectory_bbox
+from core.stream import TrajectoryStream
+
+HEADER = "time,latitude,longitude,altitude,osm_way_id\n"
+
+
+def write_dataset(root):
+    raw = root / "raw" / "Tiny"
+    raw.mkdir(parents=True)
+    (raw / "7.csv").write_text(
+        HEADER
+        + "2024-01-01 08:00:00,40.70,-74.00,1.0,11\n"
+        + "2024-01-01 08:00:01,40.72,-74.03,1.0,\n"
+        + "2024-01-01 08:00:02,40.71,-74.01,1.0,12\n"
+    )
+    (raw / "12.csv").write_text(
+        HEADER
+        + "2024-02-01 09:00:00,51.50,-0.10,1.0,12\n"
+        + "2024-02-01 09:00:05,51.51,-0.12,1.0,13\n"
+    )
+    return raw
+
+
+def test_build_and_load_round_trip(tmp_path):
+    raw = write_dataset(tmp_path)
+    store = ColumnarStore.build(raw, tmp_path / "columnar" / "Tiny")
+
+    assert store.obj_ids == ("7", "12")
+    info = store.info("7")
+    assert (info.offset, info.count) == (0, 3)
+    assert info.bbox == (40.70, -74.03, 40.72, -74.00)
+    assert info.duration_seconds == 2.0
+    assert store.bbox() == (40.70, -74.03, 51.51, -0.10)
+
+    reopened = ColumnarStore(store.path)
+    batch = reopened.load("12")
+    assert isinstance(batch.lat, np.memmap)
+    assert batch.object_id == "12"
+
+    points = reopened.points("7")
+    assert points[0].timestamp == datetime(2024, 1, 1, 8, 0, 0)
+    assert [p.road_id for p in points] == [11, None, 12]
+    assert points == list(TrajectoryStream(raw / "7.csv", default_obj_id="7").stream())
+
+
+def test_loader_uses_store_and_falls_back_to_csv(tmp_path):
+    raw = write_dataset(tmp_path)
+    root = tmp_path / "columnar"
+    csv_path = raw / "7.csv"
+
+    from_csv = load_trajectory_points(csv_path, road_ids=False, root=root)
+    assert trajectory_bbox(csv_path, root=tmp_path / "elsewhere") is None
+
+    ColumnarStore.build(raw, root / "Tiny")
+    from_store = load_trajectory_points(csv_path, obj_id="veh", road_ids=False, root=root)
+    assert find_store(raw, root=root) is not None
+    assert from_store == [p.__class__(p.lat, p.lon, p.timestamp, "veh") for p in from_csv]
+
+    # Road ids from a column with gaps are ints on both paths.
+    with_roads_csv = load_trajectory_points(csv_path, root=tmp_path / "elsewhere")
+    with_roads_store = load_trajectory_points(csv_path, root=root)
+    assert [p.road_id for p in with_roads_csv] == [p.road_id for p in with_roads_store] == [11, None, 12]
+    assert all(type(p.road_id) in (int, type(None)) for p in with_roads_csv)
+    assert all(p.road_id is None for p in from_store)
+    assert trajectory_bbox(csv_path, root=root) == (40.70, -74.03, 40.72, -74.00)
+
+
+def test_invalid_rows_are_skipped_by_store_and_csv_loader(tmp_path):
+    raw = tmp_path / "raw" / "Dirty"
+    raw.mkdir(parents=True)
+    csv_path = raw / "3.csv"
+    csv_path.write_text(
+        HEADER
+        + "2024-01-01 08:00:00,40.70,-74.00,1.0,11\n"
+        + ",40.71,-74.01,1.0,11\n"
+        + "2024-01-01 08:00:02,abc,-74.02,1.0,11\n"
+        + "2024-01-01 08:00:03,40.73,,1.0,12\n"
+        + "yesterday,40.74,-74.04,1.0,12\n"
+        + "2024-01-01 08:00:05,40.75,-74.05,1.0,12\n"
+    )
+    root = tmp_path / "columnar"
+
+    from_csv = load_trajectory_points(csv_path, root=root)
+    store = ColumnarStore.build(raw, root / "Dirty")
+    from_store = load_trajectory_points(csv_path, root=root)
+
+    assert [(p.lat, p.lon, p.road_id) for p in from_csv] == [(40.70, -74.00, 11), (40.75, -74.05, 12)]
+    assert from_store == from_csv
+    assert store.info("3").count == 2
+
+
+def test_store_without_valid_points_has_no_bbox(tmp_path):
+    raw = tmp_path / "raw" / "Empty"
+    raw.mkdir(parents=True)
+    (raw / "1.csv").write_text(HEADER + "badtime,40.70,-74.00,1.0,11\n")
+    store = ColumnarStore.build(raw, tmp_path / "columnar" / "Empty")
+
+    assert store.info("1").count == 0
+    assert store.bbox() is None
+    assert len(store.load("1")) == 0
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from core.compression import HYSOCConfig
+from hysoc import HYSOCFleetCompressor, HYSOCGCompressor
+
+
+def test_fleet_matches_single_object_pipelines(make_trip, interleave):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    a = make_trip("a", start, 40.70)
+    b = make_trip("b", start + timedelta(seconds=30), 40.80)
+    config = HYSOCConfig(stop_min_duration_seconds=30.0)
+
+    fleet_results = HYSOCFleetCompressor(config=config).compress(interleave(a, b))
+
+    for traj in (a, b):
+        expected = HYSOCGCompressor(config=config).compress(traj)
+        got = fleet_results[traj[0].obj_id]
+        assert got.keypoints == expected.keypoints
+        assert [s.kind for s in got.segments] == [s.kind for s in expected.segments]
+
+
+def test_idle_objects_are_flushed_and_evicted(make_trip, interleave):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    a = make_trip("a", start, 40.70)[:100]
+    b = make_trip("b", start + timedelta(seconds=200), 40.80)
+    fleet = HYSOCFleetCompressor(idle_timeout_seconds=60.0)
+
+    emitted = []
+    for p in interleave(a, b):
+        emitted.extend(fleet.process_point(p))
+
+    assert "a" not in fleet and "b" in fleet
+    assert fleet.diagnostics["idle_evictions"] == 1
+    a_points = sum(len(seg.keypoints) for oid, seg in emitted if oid == "a")
+    assert a_points > 0
+    assert fleet.buffered_points("a") == 0
+
+
+def test_memory_ceiling_is_enforced(make_trip, interleave):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    trajectories = [make_trip(f"v{k}", start, 40.70 + 0.1 * k)[:50] for k in range(4)]
+    fleet = HYSOCFleetCompressor(max_buffered_points=120)
+
+    for p in interleave(*trajectories):
+        fleet.process_point(p)
+        assert fleet.total_buffered_points <= 120
+        assert fleet.total_buffered_points == sum(fleet.buffered_points().values())
+
+    assert fleet.diagnostics["memory_evictions"] > 0
+    fleet.flush()
+    assert fleet.active_objects == 0
+    assert fleet.total_buffered_points == 0
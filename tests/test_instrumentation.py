@@ -0,0 +1,92 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from constants.instrumentation_defaults import InstrumentationLevel
+from core.compression import HYSOCConfig
+from core.instrumentation import Instrumentation, LatencyHistogram
+from core.point import Point
+from hysoc import HYSOCGCompressor
+
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def create_point(i: int, lat: float, lon: float) -> Point:
+    return Point(lat=lat, lon=lon, timestamp=START + timedelta(seconds=i), obj_id="veh")
+
+
+def make_trajectory() -> list[Point]:
+    """Park 40 s, drive 90 s east at ~8 m/s, park 40 s (1 Hz): stop, move, stop at T = 30 s."""
+    lon_step = 8.0 / (111_195.0 * math.cos(math.radians(40.7)))
+    points = [create_point(i, 40.7 + 0.000003 * math.sin(i), -74.0) for i in range(40)]
+    points += [create_point(40 + i, 40.7, -74.0 + lon_step * i) for i in range(1, 91)]
+    end_lon = -74.0 + lon_step * 90
+    points += [create_point(131 + i, 40.7 + 0.000003 * math.cos(i), end_lon) for i in range(40)]
+    return points
+
+
+def test_histogram_percentiles_within_bucket_error():
+    hist = LatencyHistogram()
+    for us in range(1, 1001):
+        hist.record(us * 1e-6)
+
+    assert hist.count == 1000
+    assert hist.max_s == pytest.approx(1e-3)
+    for q, expected_us in ((50, 500), (95, 950), (99, 990)):
+        assert hist.summary()[f"p{q}_us"] == pytest.approx(expected_us, rel=0.1)
+
+    other = LatencyHistogram()
+    other.record(5e-3)
+    hist.merge(other)
+    assert hist.count == 1001 and hist.percentile(100) == pytest.approx(5e-3, rel=0.1)
+
+
+def test_sampled_level_times_one_in_n_points():
+    instr = Instrumentation(InstrumentationLevel.SAMPLED, sample_every=10)
+    timed = [instr.begin_point() for _ in range(100)]
+    assert sum(timed) == 10 and timed[0]
+    assert instr.current_weight == 10.0
+
+
+@pytest.mark.parametrize("level", list(InstrumentationLevel))
+def test_levels_do_not_change_output(level):
+    points = make_trajectory()
+    baseline = HYSOCGCompressor(HYSOCConfig(stop_min_duration_seconds=30.0)).compress(points)
+
+    config = HYSOCConfig(
+        stop_min_duration_seconds=30.0,
+        instrumentation_level=level,
+        instrumentation_sample_every=20,
+    )
+    compressor = HYSOCGCompressor(config)
+    result = compressor.compress(points)
+    diag = compressor.get_diagnostics()
+
+    assert result.keypoints == baseline.keypoints
+    if level is InstrumentationLevel.OFF:
+        assert "latency" not in diag
+        assert diag["segmentation_time_s"] == 0.0
+        return
+
+    stages = diag["latency"]["stages"]
+    assert {"point_total", "segmentation"} <= set(stages)
+    if level is InstrumentationLevel.FULL:
+        assert {"stop_compression", "move_compression"} <= set(stages)
+    expected_timed = len(points) if level is InstrumentationLevel.FULL else math.ceil(len(points) / 20)
+    assert stages["point_total"]["count"] == expected_timed
+    assert stages["segmentation"]["count"] == expected_timed
+    assert 0.0 < stages["point_total"]["p50_us"] <= stages["point_total"]["p99_us"] <= stages["point_total"]["max_us"] * 1.0001
+    assert diag["segmentation_time_s"] > 0.0
+
+
+def test_default_level_keeps_stage_totals_exact():
+    points = make_trajectory()
+    compressor = HYSOCGCompressor(HYSOCConfig(stop_min_duration_seconds=30.0))
+    compressor.compress(points)
+    latency = compressor.get_diagnostics()["latency"]
+
+    assert compressor.config.instrumentation_level is InstrumentationLevel.FULL
+    assert latency["sample_every"] == 1
+    assert latency["stages"]["point_total"]["count"] == len(points)
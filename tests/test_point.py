@@ -0,0 +1,78 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from constants.geo_defaults import EARTH_RADIUS_M
+from core.point import LocalProjection, Point, ProjectedPoint, epoch_seconds, to_epoch_seconds
+from engines.step import STEPSegmenter
+
+
+def test_projected_point_equals_point():
+    p = Point(40.7, -74.0, datetime(2024, 1, 1, 8, 0, 0), "veh", road_id=3)
+    pp = LocalProjection(40.7, -74.0).point(p)
+
+    assert isinstance(pp, ProjectedPoint)
+    assert pp == p and p == pp
+    assert hash(pp) == hash(p)
+    assert pp.to_point() == p
+    assert (pp.x, pp.y) == (0.0, 0.0)
+    assert pp.t == epoch_seconds(p) == 1704096000.0
+
+
+def test_projection_round_trip_and_scale():
+    proj = LocalProjection(40.7, -74.0)
+    x, y = proj.project(40.71, -73.99)
+
+    # ~1.11 km north, ~0.84 km east at this latitude
+    assert math.isclose(y, 1111.95, rel_tol=1e-3)
+    assert math.isclose(x, 842.6, rel_tol=1e-3)
+    lat, lon = proj.unproject(x, y)
+    assert math.isclose(lat, 40.71) and math.isclose(lon, -73.99)
+
+
+def test_naive_timestamps_read_as_utc():
+    naive = datetime(2024, 1, 1, 0, 0, 0)
+    aware = naive.replace(tzinfo=timezone.utc)
+    assert to_epoch_seconds(naive) == to_epoch_seconds(aware) == aware.timestamp()
+
+
+def test_step_emits_projected_points():
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    points = [Point(40.7, -74.0 + 0.0001 * i, start + timedelta(seconds=i), "veh") for i in range(20)]
+
+    segments = STEPSegmenter(max_eps=15.0, min_duration_seconds=30.0).process(points)
+    emitted = [p for seg in segments for p in seg.points]
+
+    assert emitted == points
+    assert all(isinstance(p, ProjectedPoint) for p in emitted)
+
+
+def test_reanchored_projection_is_continuous():
+    proj = LocalProjection(45.0, -74.0)
+    moved = proj.reanchored(40.0, -73.5)
+    assert moved.project(40.0, -73.5) == proj.project(40.0, -73.5)
+    lat, lon = moved.unproject(*moved.project(40.0001, -73.4999))
+    assert math.isclose(lat, 40.0001) and math.isclose(lon, -73.4999)
+    # East-west meters near the new anchor use its latitude.
+    x0, _ = moved.project(40.0, -73.5)
+    x1, _ = moved.project(40.0, -73.5 + 1e-4)
+    assert math.isclose(x1 - x0, math.radians(1e-4) * EARTH_RADIUS_M * math.cos(math.radians(40.0)), rel_tol=1e-9)
+
+
+def test_step_reanchors_on_long_drives():
+    # Drive 45 -> 40 deg N without stopping, then alternate 16 m east-west:
+    # with the scale of 45 deg these fixes would look 14.8 m apart (a stop).
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    points = []
+    lat = 45.0
+    for i in range(500):
+        lat -= 0.01
+        points.append(Point(lat, -74.0, start + timedelta(seconds=i), "veh"))
+    step_lon = math.degrees(16.0 / (EARTH_RADIUS_M * math.cos(math.radians(lat))))
+    for k in range(61):
+        points.append(Point(lat, -74.0 + step_lon * (k % 2), start + timedelta(seconds=500 + k), "veh"))
+
+    segmenter = STEPSegmenter(max_eps=15.0, min_duration_seconds=30.0)
+    assert [seg.__class__.__name__ for seg in segmenter.process(points)] == ["Move"]
+    assert abs(segmenter.projection.origin_lat - lat) <= 0.01
+    offline = STEPSegmenter(max_eps=15.0, min_duration_seconds=30.0).process_offline(points)
+    assert [seg.__class__.__name__ for seg in offline] == ["Move"]
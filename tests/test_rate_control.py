@@ -0,0 +1,158 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.compression import CompressionStrategy, HYSOCConfig
+from core.point import Point
+from core.rate_control import ByteBudgetController
+from engines.dp import DouglasPeuckerCompressor
+from engines.squish_dp import HybridSquishDPCompressor, HybridSquishDPConfig
+from eval.sed import calculate_sed_stats
+from hysoc import HYSOCGCompressor
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+METERS_PER_DEG_LAT = 111_195.0
+
+
+def winding_day(seed: int = 3) -> list[Point]:
+    """Six 10-minute drives (straight and winding alternately) separated by 2-minute dwells (1 Hz)."""
+    rng = random.Random(seed)
+    points = []
+    lat, lon = 40.70, -74.00
+    t = 0
+    for trip in range(6):
+        for _ in range(120):
+            points.append(Point(lat + rng.gauss(0, 2e-6), lon, START + timedelta(seconds=t), "veh"))
+            t += 1
+        heading = rng.uniform(0, 2 * math.pi)
+        for i in range(600):
+            if trip % 2:
+                heading += 0.05 * math.sin(i / 15)
+            lat += 10.0 * math.cos(heading) / METERS_PER_DEG_LAT
+            lon += 10.0 * math.sin(heading) / (METERS_PER_DEG_LAT * 0.76)
+            points.append(Point(lat, lon, START + timedelta(seconds=t), "veh"))
+            t += 1
+    return points
+
+
+def window_peak(segments, window_seconds: float) -> int:
+    """Largest byte total of segments ending within any window_seconds span."""
+    ends = [(s.end_time.timestamp(), s.encoded_bytes) for s in segments]
+    peak = 0
+    for t, _ in ends:
+        peak = max(peak, sum(b for e, b in ends if t - window_seconds < e <= t))
+    return peak
+
+
+def test_controller_caps_sliding_window():
+    controller = ByteBudgetController(budget_bytes=1000, window_seconds=100.0, burst_fraction=1.0)
+    t0 = START
+    assert controller.allowance(t0, 400) == 400
+    controller.record(t0, 400)
+    controller.record(t0 + timedelta(seconds=10), 500)
+    # 900 B in the window: only 100 B left however much the bucket holds.
+    assert controller.allowance(t0 + timedelta(seconds=20), 800) == 100
+    assert controller.window_bytes(t0 + timedelta(seconds=20)) == 900
+    # The first record leaves the window after 100 s.
+    assert controller.window_bytes(t0 + timedelta(seconds=100)) == 500
+
+
+def test_controller_paces_with_bounded_burst():
+    controller = ByteBudgetController(budget_bytes=3600, window_seconds=3600.0, burst_fraction=0.25)
+    assert controller.allowance(START, 10_000) == 900
+    controller.record(START, 900)
+    # 1 B/s accrues after the burst is spent.
+    assert controller.allowance(START + timedelta(seconds=60), 10_000) == 60
+    # A long idle period refills no more than the burst.
+    assert controller.allowance(START + timedelta(seconds=3000), 10_000) == 900
+
+
+def test_controller_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        ByteBudgetController(budget_bytes=0)
+    with pytest.raises(ValueError):
+        ByteBudgetController(budget_bytes=100, burst_fraction=0.0)
+
+
+def test_epsilon_for_keeps_at_most_max_points():
+    points = winding_day()[120:720]
+    significance = DouglasPeuckerCompressor().significance(points)
+    for max_points in (2, 5, 17, 40):
+        eps = significance.epsilon_for(max_points, 1.0)
+        assert eps >= 1.0
+        assert 2 <= significance.num_kept(eps) <= max_points
+        assert significance.select(eps) == DouglasPeuckerCompressor(epsilon_meters=eps).compress(points)
+    assert significance.epsilon_for(len(points), 1.0) == 1.0
+    assert significance.num_kept(significance.epsilon_for(1)) == 0
+
+
+def test_hybrid_max_keypoints_limits_output():
+    points = winding_day()[840:1440]
+    compressor = HybridSquishDPCompressor(HybridSquishDPConfig(capacity=100, dp_epsilon_meters=1.0))
+    unlimited = compressor.compress(points)
+    assert len(unlimited) > 8
+    limited = compressor.compress(points, max_keypoints=8)
+    assert 2 <= len(limited) <= 8
+    assert limited[0] == unlimited[0] and limited[-1] == unlimited[-1]
+    assert len(compressor.compress(points[:50], max_keypoints=4)) <= 4
+
+
+def test_hysoc_budget_holds_over_sliding_window():
+    points = winding_day()
+    budget = HYSOCConfig(
+        squish_buffer_capacity=100,
+        dp_epsilon_meters=2.0,
+        byte_budget_bytes=1500,
+        byte_budget_window_seconds=1800.0,
+        byte_budget_burst_fraction=0.5,
+    )
+    fixed = HYSOCGCompressor(HYSOCConfig(squish_buffer_capacity=100, dp_epsilon_meters=2.0)).compress(points)
+    compressor = HYSOCGCompressor(budget)
+    budgeted = compressor.compress(points)
+
+    assert window_peak(fixed.segments, 1800.0) > 1500
+    assert window_peak(budgeted.segments, 1800.0) <= 1500
+    assert compressor.get_diagnostics()["rate_control_throttled_moves"] > 0
+    # Stops are never shrunk, and every move keeps its end points.
+    assert len(budgeted.stops()) == len(fixed.stops())
+    assert budgeted.encoded_bytes < fixed.encoded_bytes
+    assert calculate_sed_stats(points, budgeted.keypoints)["average_sed"] >= (
+        calculate_sed_stats(points, fixed.keypoints)["average_sed"]
+    )
+
+
+def test_hysoc_budget_streaming_matches_whole_moves():
+    points = winding_day()
+    config = HYSOCConfig(squish_buffer_capacity=100, byte_budget_bytes=1500, byte_budget_window_seconds=1800.0)
+    whole = HYSOCGCompressor(config).compress(points)
+    config.squish_streaming = True
+    streamed = HYSOCGCompressor(config).compress(points)
+    assert [(s.kind, s.keypoints) for s in streamed.segments] == [(s.kind, s.keypoints) for s in whole.segments]
+
+
+def test_byte_budget_requires_geometric_strategy():
+    config = HYSOCConfig(move_compression_strategy=CompressionStrategy.SQUISH_E, byte_budget_bytes=1000)
+    with pytest.raises(ValueError):
+        HYSOCGCompressor(config)
+
+
+def test_hysoc_budget_drops_moves_that_cannot_keep_their_end_points():
+    points = winding_day()
+    fixed = HYSOCGCompressor(HYSOCConfig(squish_buffer_capacity=100)).compress(points)
+    for measure in (False, True):
+        config = HYSOCConfig(
+            squish_buffer_capacity=100,
+            byte_budget_bytes=200,
+            byte_budget_window_seconds=3600.0,
+            measure_encoded_bytes=measure,
+        )
+        compressor = HYSOCGCompressor(config)
+        result = compressor.compress(points)
+        dropped = compressor.get_diagnostics()["rate_control_dropped_moves"]
+
+        # Too little for every move's end points: some moves keep just those, the rest are dropped.
+        assert 0 < dropped < len(fixed.moves())
+        assert all(len(m.keypoints) >= 2 for m in result.moves())
+        assert len(result.moves()) + dropped == len(fixed.moves())
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from core.compression import HYSOCConfig
+from core.point import Point
+from hysoc import HYSOCGCompressor
+from hysoc.server import HYSOCIngestServer, decode_ndjson, encode_ndjson, send_points
+
+
+CONFIG = HYSOCConfig(stop_min_duration_seconds=30.0)
+
+
+def collect_keypoints(emitted):
+    keypoints = {}
+    for obj_id, seg in emitted:
+        keypoints.setdefault(obj_id, []).extend(seg.keypoints)
+    return keypoints
+
+
+def assert_matches_offline(emitted, trajectories):
+    keypoints = collect_keypoints(emitted)
+    for traj in trajectories:
+        expected = HYSOCGCompressor(config=CONFIG).compress(traj).keypoints
+        got = keypoints[traj[0].obj_id]
+        assert len(got) == len(expected)
+        for g, e in zip(got, expected):
+            assert abs(g.lat - e.lat) < 1e-9 and abs(g.lon - e.lon) < 1e-9
+            assert abs((g.timestamp - e.timestamp).total_seconds()) < 1e-5
+
+
+def test_ndjson_round_trip():
+    p = Point(40.7, -74.0, datetime(2024, 1, 1, 8, 0, 0, 250000), "veh", road_id=42)
+    q = decode_ndjson(encode_ndjson(p))
+    assert (q.lat, q.lon, q.obj_id, q.road_id) == (p.lat, p.lon, p.obj_id, p.road_id)
+    assert abs((q.timestamp - p.timestamp).total_seconds()) < 1e-5
+
+
+def test_tcp_ndjson_clients_match_offline_compression(make_trip):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    a = make_trip("a", start, 40.70, road_ids=True)
+    b = make_trip("b", start + timedelta(seconds=30), 40.80, road_ids=True)
+    emitted = []
+
+    async def run():
+        server = HYSOCIngestServer(sink=lambda oid, seg: emitted.append((oid, seg)), config=CONFIG, shards=2)
+        port = await server.start_tcp("127.0.0.1", 0)
+        await asyncio.gather(send_points(a, port=port), send_points(b, port=port))
+        await server.stop()
+        return server.get_diagnostics()
+
+    diag = asyncio.run(run())
+    assert diag["points_processed"] == len(a) + len(b)
+    assert diag["connections"] == 2
+    assert_matches_offline(emitted, [a, b])
+
+
+def test_unix_binary_backpressure_with_async_sink(make_trip, interleave):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    a = make_trip("a", start, 40.70, road_ids=True)
+    b = make_trip("b", start, 40.80, road_ids=True)
+    emitted = []
+
+    async def sink(obj_id, seg):
+        await asyncio.sleep(0)
+        emitted.append((obj_id, seg))
+
+    async def run(path):
+        server = HYSOCIngestServer(sink=sink, config=CONFIG, protocol="binary", shards=1, queue_size=4)
+        await server.start_unix(path)
+        await send_points(interleave(a, b), path=path, protocol="binary")
+        await server.stop()
+        return server.get_diagnostics()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        diag = asyncio.run(run(os.path.join(tmp, "hysoc.sock")))
+
+    assert diag["points_processed"] == len(a) + len(b)
+    assert diag["backpressure_waits"] > 0
+    assert diag["queued_points"] == 0 and diag["active_objects"] == 0
+    assert_matches_offline(emitted, [a, b])
+    assert any(kp.road_id is not None for _, seg in emitted for kp in seg.keypoints)
+
+
+def test_malformed_ndjson_lines_are_counted_and_skipped(make_trip):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    points = make_trip("a", start, 40.70, road_ids=True)[:20]
+
+    async def run():
+        server = HYSOCIngestServer(sink=lambda oid, seg: None, config=CONFIG)
+        port = await server.start_tcp("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"not json\n" + b"".join(encode_ndjson(p) for p in points) + b'{"lat": 1}\n')
+        writer.write_eof()
+        await reader.read()
+        writer.close()
+        await server.stop()
+        return server.get_diagnostics()
+
+    diag = asyncio.run(run())
+    assert diag["bad_records"] == 2
+    assert diag["points_processed"] == len(points)
+
+
+def test_pipeline_and_sink_errors_are_counted_and_skipped(make_trip, interleave):
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    a = make_trip("a", start, 40.70, road_ids=True)
+    b = make_trip("b", start, 40.80, road_ids=True)
+    c = make_trip("c", start, 40.90, road_ids=True)
+    emitted = []
+
+    def sink(obj_id, seg):
+        if obj_id == "b":
+            raise RuntimeError("sink down")
+        emitted.append((obj_id, seg))
+
+    async def run():
+        server = HYSOCIngestServer(sink=sink, config=CONFIG, shards=1, queue_size=4)
+        fleet = server.fleets[0]
+        process_point = fleet.process_point
+
+        def failing_process_point(point):
+            if point.obj_id == "c":
+                raise ValueError("bad point")
+            return process_point(point)
+
+        fleet.process_point = failing_process_point
+        port = await server.start_tcp("127.0.0.1", 0)
+
+        async def feed():
+            await send_points(interleave(a, b, c), port=port)
+            await server.stop()
+
+        # The worker survives both failures, so its queue drains instead of blocking the reader.
+        await asyncio.wait_for(feed(), timeout=10.0)
+        return server.get_diagnostics()
+
+    diag = asyncio.run(run())
+    assert diag["point_errors"] == len(c)
+    assert diag["points_processed"] == len(a) + len(b)
+    assert diag["sink_errors"] > 0
+    assert diag["segments_out"] == len(emitted)
+    assert_matches_offline(emitted, [a])
@@ -1,7 +1,9 @@
+import math
+import random
 import unittest
 from datetime import datetime, timedelta
-from core.point import Point
-from engines.squish import SquishCompressor
+from core.point import Point, epoch_seconds
+from engines.squish import SquishCompressor, SquishECompressor, SquishEStream, SquishStream, _sed_priority
 
 class TestSquishCompressor(unittest.TestCase):
     def setUp(self):
@@ -88,5 +90,116 @@ class TestSquishCompressor(unittest.TestCase):
         # Check if P2 is in the result
         self.assertTrue(any(p.lat == 2.0 and p.lon == 2.0 for p in result))
 
+    def test_stream_matches_compress_with_bounded_memory(self):
+        points = [
+            self.create_point(i, 0.01 * i + 0.003 * math.sin(i / 3.0), 0.002 * math.cos(i / 7.0))
+            for i in range(2000)
+        ]
+        stream = SquishStream(capacity=20)
+        peak = 0
+        for p in points:
+            stream.push(p)
+            peak = max(peak, len(stream), len(stream._heap))
+
+        result = stream.finish()
+        self.assertEqual(result, SquishCompressor(capacity=20).compress(points))
+        self.assertLessEqual(peak, 21)
+        self.assertEqual((len(stream), stream.pushed), (0, 0))
+
+    def test_engine_matches_brute_force_squish(self):
+        # Reference: after every overflow, recompute all interior SED
+        # priorities against the current neighbours and drop the minimum
+        # (oldest first on ties).
+        def brute_force(points, capacity):
+            kept = []
+            for i, _ in enumerate(points):
+                kept.append(i)
+                if len(kept) > capacity:
+                    def key(j):
+                        a, b, c = (points[kept[k]] for k in (j - 1, j, j + 1))
+                        prio = _sed_priority(a.lat, a.lon, epoch_seconds(a), b.lat, b.lon, epoch_seconds(b),
+                                             c.lat, c.lon, epoch_seconds(c))
+                        return prio, kept[j]
+                    del kept[min(range(1, len(kept) - 1), key=key)]
+            return [points[i] for i in kept]
+
+        rng = random.Random(3)
+        points = [self.create_point(i, rng.uniform(0, 1), rng.choice((0.0, 0.5, rng.uniform(0, 1))))
+                  for i in range(300)]
+        for capacity in (3, 10, 40):
+            self.assertEqual(SquishCompressor(capacity=capacity).compress(points), brute_force(points, capacity))
+
+    def meters_sed(self, points, kept):
+        """Worst SED in meters of ``points`` against the polyline through ``kept``."""
+        lat0 = points[0].lat
+        scale_x = 111_195.0 * math.cos(math.radians(lat0))
+        worst = 0.0
+        for a, c in zip(kept, kept[1:]):
+            ia, ic = points.index(a), points.index(c)
+            ta, tc = epoch_seconds(a), epoch_seconds(c)
+            for b in points[ia + 1:ic]:
+                r = (epoch_seconds(b) - ta) / (tc - ta)
+                lat = a.lat + r * (c.lat - a.lat)
+                lon = a.lon + r * (c.lon - a.lon)
+                worst = max(worst, math.hypot((b.lat - lat) * 111_195.0, (b.lon - lon) * scale_x))
+        return worst
+
+    def test_squish_e_bounds_sed_and_collapses_lines(self):
+        rng = random.Random(5)
+        lat, lon = 40.7, -74.0
+        points = []
+        for i in range(1500):
+            lat += (rng.gauss(0.0, 1.0) + (8.0 if (i // 200) % 2 else 0.0)) / 111_195.0
+            lon += (rng.gauss(0.0, 1.0) + 6.0) / 84_000.0
+            points.append(self.create_point(i, lat, lon))
+        for mu in (2.0, 10.0, 50.0):
+            kept = SquishECompressor(ratio=1.0, sed_bound_meters=mu).compress(points)
+            self.assertEqual((kept[0], kept[-1]), (points[0], points[-1]))
+            self.assertLessEqual(self.meters_sed(points, kept), mu)
+            self.assertLess(len(kept), len(points))
+
+        line = [self.create_point(i, 40.7 + 1e-5 * i, -74.0 + 2e-5 * i) for i in range(500)]
+        self.assertEqual(SquishECompressor(sed_bound_meters=0.5).compress(line), [line[0], line[-1]])
+
+    def test_squish_e_ratio_lower_bound(self):
+        rng = random.Random(6)
+        points = [self.create_point(i, 40.7 + rng.uniform(0, 0.01), -74.0 + rng.uniform(0, 0.01))
+                  for i in range(1000)]
+        for ratio in (2.0, 5.0, 40.0):
+            stream = SquishEStream(ratio=ratio, sed_bound_meters=0.0)
+            for p in points:
+                stream.push(p)
+                self.assertLessEqual(len(stream), max(4, int(stream.pushed / ratio)))
+            kept = stream.finish()
+            self.assertEqual(kept, SquishECompressor(ratio, 0.0).compress(points))
+            self.assertEqual((kept[0], kept[-1]), (points[0], points[-1]))
+        with self.assertRaises(ValueError):
+            SquishECompressor(ratio=0.5)
+
+    def test_finish_ranked_orders_by_continued_eviction(self):
+        rng = random.Random(4)
+        points = [self.create_point(i, 40.7 + rng.uniform(0, 0.01), -74.0 + rng.uniform(0, 0.01))
+                  for i in range(300)]
+        kept, ranks = SquishCompressor(capacity=40).compress_ranked(points)
+        self.assertEqual(kept, SquishCompressor(capacity=40).compress(points))
+        self.assertEqual(sorted(ranks), list(range(len(kept))))
+        self.assertEqual((ranks[0], ranks[-1]), (0, 1))
+
+        # Reference: keep dropping the interior survivor with the smallest SED.
+        remaining = list(kept)
+        while len(remaining) > 2:
+            sed = [
+                _sed_priority(a.lat, a.lon, epoch_seconds(a), b.lat, b.lon, epoch_seconds(b),
+                              c.lat, c.lon, epoch_seconds(c))
+                for a, b, c in zip(remaining, remaining[1:], remaining[2:])
+            ]
+            del remaining[1 + sed.index(min(sed))]
+            top = [p for p, r in zip(kept, ranks) if r < len(remaining)]
+            self.assertEqual(top, remaining)
+
+        kept, ranks = SquishECompressor(sed_bound_meters=20.0).compress_ranked(points)
+        self.assertEqual(kept, SquishECompressor(sed_bound_meters=20.0).compress(points))
+        self.assertEqual(sorted(ranks), list(range(len(kept))))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from core.batch import NO_ROAD
+from core.stream import TrajectoryStream
+
+
+CSV = """time,latitude,longitude,osm_way_id,trajectory_id
+2024-01-01 08:00:00,40.70,-74.00,11,a
+2024-01-01 08:00:01,40.71,-74.01,,a
+2024-01-01 08:00:02,40.72,-74.02,12,b
+2024-01-01 08:00:03,40.73,-74.03,12,b
+2024-01-01 08:00:04,40.74,-74.04,13,a
+"""
+
+
+def make_stream(tmp_path, **kwargs) -> TrajectoryStream:
+    path = tmp_path / "traj.csv"
+    path.write_text(CSV)
+    return TrajectoryStream(path, timestamp_format="%Y-%m-%d %H:%M:%S", **kwargs)
+
+
+def test_stream_yields_plain_points(tmp_path):
+    stream = make_stream(tmp_path, chunksize=2)
+    points = list(stream.stream())
+
+    assert len(points) == 5
+    assert type(points[0].timestamp) is datetime
+    assert points[0].timestamp == datetime(2024, 1, 1, 8, 0, 0)
+    assert (points[0].lat, points[0].lon) == (40.70, -74.00)
+    assert [p.obj_id for p in points] == ["a", "a", "b", "b", "a"]
+    assert points[1].road_id is None
+    assert points[2].road_id == 12
+    assert stream.stats.rows == 5
+    assert stream.stats.chunks == 3
+    assert stream.stats.rows_per_second > 0
+
+
+def test_stream_batches_match_points(tmp_path):
+    stream = make_stream(tmp_path, chunksize=3)
+    points = list(stream.stream())
+    batches = list(stream.stream_batches())
+
+    assert [len(b) for b in batches] == [3, 2]
+    assert batches[0].road_code[1] == NO_ROAD
+    assert [p for b in batches for p in b.to_points()] == points
+
+
+def test_stream_default_obj_id(tmp_path):
+    path = tmp_path / "single.csv"
+    path.write_text("time,latitude,longitude\n2024-01-01 08:00:00,40.7,-74.0\n")
+    stream = TrajectoryStream(path, default_obj_id="veh")
+
+    assert [p.obj_id for p in stream.stream()] == ["veh"]
+    assert next(stream.stream_batches()).object_id == "veh"
+
+
+def test_stream_batches_keep_missing_obj_ids_apart(tmp_path):
+    path = tmp_path / "traj.csv"
+    path.write_text(CSV.replace("12,b\n2024-01-01 08:00:03", "12,\n2024-01-01 08:00:03"))
+    batch = next(TrajectoryStream(path).stream_batches())
+    ids = [batch.obj_ids[code] for code in batch.obj_code]
+
+    assert ids[:2] == ["a", "a"] and ids[3:] == ["b", "a"]
+    assert ids[2] != ids[2]  # NaN: its own object, not "a" or "b"
+    assert len(set(batch.obj_code.tolist())) == 3